@@ -0,0 +1,36 @@
+#    Copyright 2007-2009 QSpin - www.qspin.be
+#
+#    This file is part of QTaste framework.
+#
+#    QTaste is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Lesser General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    QTaste is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Lesser General Public License for more details.
+#
+#    You should have received a copy of the GNU Lesser General Public License
+#    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+
+##
+# QTaste control script: check that the control actions started in parallel are ready when the SUT is started.
+# <p>
+# The control script starts a chain of control actions in parallel mode, the last one creating a file after some time.
+# @preparation None
+##
+
+import os, tempfile
+from qtaste import *
+
+def Step1():
+	"""
+	@step      Check that the file created by the last control action exists
+	@expected  The file exists as the control script returns only when all the control actions have been started
+	"""
+	if not os.path.exists(os.path.join(tempfile.gettempdir(), "qtaste_parallel_actions.ready")):
+		raise QTasteTestFailException("The control script returned before the end of the start of its last control action")
+
+doStep(Step1)
@@ -0,0 +1,36 @@
+import os, tempfile, time
+from controlscript import *
+
+print "This is a simple control script. It starts a chain of control actions concurrently, the last one being slow."
+print "Start parameter is %s, additional parameters are %s" % (start, arguments)
+
+readyFileName = os.path.join(tempfile.gettempdir(), "qtaste_parallel_actions.ready")
+
+
+class CreateReadyFile(ControlAction):
+	""" Control script action creating the ready file after some time on start and removing it on stop """
+	def __init__(self, delay):
+		ControlAction.__init__(self, "Create ready file after %s seconds" % delay)
+		self.delay = delay
+
+	def start(self):
+		if os.path.exists(readyFileName):
+			os.remove(readyFileName)
+		time.sleep(self.delay)
+		open(readyFileName, "w").close()
+		print "Ready file created"
+
+	def stop(self):
+		if os.path.exists(readyFileName):
+			os.remove(readyFileName)
+
+
+a = Sleep(0.5, "Start of a")
+b = Sleep(0.5, "Start of b").after(a)
+c = CreateReadyFile(3).after(b)
+
+ControlScript([
+    a,
+    b,
+    c
+], parallel=True)
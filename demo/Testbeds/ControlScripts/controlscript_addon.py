@@ -10,7 +10,7 @@ import time
 
 class ControlScriptAddon(ControlScript):
 	""" Control script Addon"""
-	def __init__(self, controlActions):
+	def __init__(self, controlActions, parallel=False):
 		"""
 		Initialize ControlScript object.
 		Store controlActions in self.controlActions,
@@ -18,8 +18,9 @@ class ControlScriptAddon(ControlScript):
 		store TESTBED environment variable in self.testbed,
 		and execute start() or stop() following the value of the first command-line argument (must be 'start' or 'stop')
 		@param controlActions sequence of ControlAction (list or tuple) 
+		@param parallel if True, start and stop independent control actions concurrently
 		"""
-		ControlScript.__init__(self, controlActions)
+		ControlScript.__init__(self, controlActions, parallel)
 
 class VirtualBox(ControlAction):
 	""" Control script action for starting/stopping a Virtual Box image """
@@ -51,7 +52,9 @@ class VirtualBox(ControlAction):
 		print "Starting " + self.description + "..."
 		print commandArguments;
 		self.executeCommand(commandArguments);
-		time.sleep(30)
+		if not self.readinessProbes:
+			# no readiness probe declared, wait for the worst-case boot time
+			time.sleep(30)
 		print
 
 	def stop(self):
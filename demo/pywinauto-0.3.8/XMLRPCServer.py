@@ -1,6 +1,7 @@
 import xmlrpclib
 from SimpleXMLRPCServer import SimpleXMLRPCServer
 from pywinauto import application
+from pywinauto import timings
 
 latestSessionID = 0
 sessionList = {}
@@ -74,6 +75,15 @@ def selectTreeViewItem(sessionID, windowName, treeviewName, item):
     getApplicationContext(sessionID)[windowName][treeviewName].Select(item)
     return 0
 
+def getWaitStatistics():
+    print ('getting wait statistics\n')
+    return [statistics.AsDict() for statistics in timings.GetWaitStatistics()]
+
+def resetWaitStatistics():
+    print ('resetting wait statistics\n')
+    timings.ResetWaitStatistics()
+    return 0
+
 def getApplicationContext(sessionID):
     global sessionList
     return sessionList[sessionID]
@@ -90,4 +100,6 @@ server.register_function(getText)
 server.register_function(setText)
 server.register_function(listElements)
 server.register_function(selectTreeViewItem)
+server.register_function(getWaitStatistics)
+server.register_function(resetWaitStatistics)
 server.serve_forever()
\ No newline at end of file
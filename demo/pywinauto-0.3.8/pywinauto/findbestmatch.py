@@ -42,6 +42,12 @@ except NameError:
 
 find_best_control_match_cutoff = .6
 
+# maximum number of match ratios kept in the cache
+match_ratios_cache_size = 10000
+
+# maximum number of windows for which the control matcher is kept
+control_matchers_cache_size = 20
+
 #====================================================================
 class MatchError(IndexError):
     "A suitable match could not be found"
@@ -56,7 +62,55 @@ class MatchError(IndexError):
             "Could not find '%s' in '%s'"% (tofind, self.items))
 
 
-_cache = {}
+#====================================================================
+class _LRUCache(object):
+    """A dictionary like cache which keeps at most max_size items
+
+    When the cache is full, the least recently used items are removed.
+    """
+    def __init__(self, max_size):
+        "Initialize the empty cache"
+        self.max_size = max_size
+        self._items = {}
+        self._tick = 0
+
+    def __contains__(self, key):
+        "Return True if key is in the cache"
+        return key in self._items
+
+    def __len__(self):
+        "Return the number of items in the cache"
+        return len(self._items)
+
+    def __getitem__(self, key):
+        "Return the item and mark it as recently used"
+        value = self._items[key][0]
+        self._tick += 1
+        self._items[key] = (value, self._tick)
+        return value
+
+    def __setitem__(self, key, value):
+        "Add or replace an item, removing the oldest items if full"
+        self._tick += 1
+        self._items[key] = (value, self._tick)
+        if len(self._items) > self.max_size:
+            self._remove_oldest()
+
+    def clear(self):
+        "Remove all the items"
+        self._items.clear()
+
+    def _remove_oldest(self):
+        "Remove the least recently used quarter of the items"
+        ticks = [tick for unused, tick in self._items.values()]
+        ticks.sort()
+        oldest_kept = ticks[len(ticks) - (self.max_size * 3) // 4]
+        for key, (unused, tick) in self._items.items():
+            if tick < oldest_kept:
+                del self._items[key]
+
+
+_cache = _LRUCache(match_ratios_cache_size)
 
 # given a list of texts return the match score for each
 # and the best score and text with best score
@@ -440,6 +494,208 @@ def build_unique_dict(controls):
     return name_control_map
 
 
+#====================================================================
+def _calculate_ratio(matches, length):
+    "Return the ratio as calculated by difflib.SequenceMatcher"
+    if length:
+        return 2.0 * matches / length
+    return 1.0
+
+def _char_counts(text):
+    "Return the number of occurrences of each character of text"
+    counts = {}
+    for char in text:
+        counts[char] = counts.get(char, 0) + 1
+    return counts
+
+def _common_chars_count(counts1, counts2):
+    "Return the number of characters in common, as in quick_ratio()"
+    if len(counts1) > len(counts2):
+        counts1, counts2 = counts2, counts1
+    matches = 0
+    for char, count in counts1.items():
+        matches += min(count, counts2.get(char, 0))
+    return matches
+
+
+#====================================================================
+class ControlMatcher(object):
+    """Find the controls of a window that best match a text
+
+    This gives the same results as find_best_control_matches() but
+    it is meant to be reused for all the lookups in a window:
+
+    * the cleaned and lower case variants of the control names are
+      computed only once
+    * the names which cannot match better than the best name found
+      so far are skipped using bounds of the ratio computed from the
+      lengths and characters of the names (as real_quick_ratio() and
+      quick_ratio() do but without a SequenceMatcher)
+    * the results of the last lookups are kept in a bounded cache
+    """
+
+    def __init__(self, name_control_map, cache_size = 100):
+        """Initialize the matcher
+
+        * **name_control_map** the map of the unique control names to
+          the controls, as returned by build_unique_dict()
+        * **cache_size** the number of lookup results to keep
+        """
+        self.name_control_map = name_control_map
+        self._names = name_control_map.keys()
+
+        # the variants of the names, in the same order as
+        # in find_best_control_matches()
+        self._variants = []
+        for clean, ignore_case in (
+            (False, False), (False, True), (True, False), (True, True)):
+
+            ratio_offset = 1
+            if clean:
+                ratio_offset *= .9
+
+            if ignore_case:
+                ratio_offset *= .9
+
+            texts = []
+            for text in self._names:
+                if clean:
+                    text = _clean_non_chars(text)
+
+                if ignore_case:
+                    text = text.lower()
+
+                texts.append(text)
+
+            self._variants.append((ignore_case, ratio_offset, texts))
+
+        self._char_counts = {}
+        self._sequence_matchers = {}
+        self._results = _LRUCache(cache_size)
+
+    def find_best_matches(self, search_text):
+        """Return the controls that best match search_text
+
+        Raise a MatchError if no control name matches well enough.
+        """
+        search_text = unicode(search_text)
+
+        if search_text in self._results:
+            best_ratio, best_names = self._results[search_text]
+        else:
+            best_ratio = 0
+            best_names = []
+            for ignore_case, ratio_offset, texts in self._variants:
+                ratio, names = self._find_best_names(
+                    search_text, ignore_case, ratio_offset, texts)
+
+                if ratio > best_ratio:
+                    best_ratio = ratio
+                    best_names = names
+
+            self._results[search_text] = (best_ratio, best_names)
+
+        if best_ratio < find_best_control_match_cutoff:
+            raise MatchError(items = self._names, tofind = search_text)
+
+        return [self.name_control_map[name] for name in best_names]
+
+    def _find_best_names(self, search_text, ignore_case, ratio_offset, texts):
+        "Return the best ratio and names for one variant of the names"
+        if ignore_case:
+            search_text = search_text.lower()
+
+        search_counts = _char_counts(search_text)
+
+        best_ratio = 0
+        best_names = []
+        for name, text in zip(self._names, texts):
+            # a name can only be one of the best if its ratio
+            # is at least the cutoff and the best ratio so far
+            limit = max(find_best_control_match_cutoff, best_ratio)
+            length = len(search_text) + len(text)
+
+            ratio = _calculate_ratio(
+                min(len(search_text), len(text)), length) * ratio_offset
+
+            if ratio >= limit:
+                ratio = _calculate_ratio(
+                    _common_chars_count(
+                        search_counts, self._get_char_counts(text)),
+                    length) * ratio_offset
+
+                if ratio >= limit:
+                    ratio = self._get_sequence_matcher(
+                        text, search_text).ratio() * ratio_offset
+
+            if ratio > best_ratio and \
+                ratio >= find_best_control_match_cutoff:
+
+                best_ratio = ratio
+                best_names = [name]
+
+            elif ratio == best_ratio and \
+                ratio >= find_best_control_match_cutoff:
+                best_names.append(name)
+
+        return best_ratio, best_names
+
+    def _get_char_counts(self, text):
+        "Return the characters counts of a name, computed once"
+        counts = self._char_counts.get(text)
+        if counts is None:
+            counts = _char_counts(text)
+            self._char_counts[text] = counts
+        return counts
+
+    def _get_sequence_matcher(self, text, search_text):
+        """Return a SequenceMatcher comparing search_text to text
+
+        The matcher is kept for each name as the SequenceMatcher
+        analyses its second sequence once for all.
+        """
+        ratio_calc = self._sequence_matchers.get(text)
+        if ratio_calc is None:
+            ratio_calc = difflib.SequenceMatcher()
+            ratio_calc.set_seq2(text)
+            self._sequence_matchers[text] = ratio_calc
+        ratio_calc.set_seq1(search_text)
+        return ratio_calc
+
+
+_control_matchers = _LRUCache(control_matchers_cache_size)
+
+#====================================================================
+def _controls_key(controls):
+    """Return a key identifying the controls and what their names
+    depend on (text, position and visibility)"""
+    key = []
+    for ctrl in controls:
+        rect = ctrl.Rectangle()
+        key.append((
+            getattr(ctrl, 'handle', id(ctrl)),
+            ctrl.WindowText(),
+            ctrl.IsVisible(),
+            rect.left, rect.top, rect.right, rect.bottom))
+    return tuple(key)
+
+
+#====================================================================
+def get_control_matcher(controls):
+    """Return the ControlMatcher for the controls
+
+    The matcher is reused as long as the controls, their text, position
+    and visibility don't change.
+    """
+    key = _controls_key(controls)
+    if key in _control_matchers:
+        return _control_matchers[key]
+
+    matcher = ControlMatcher(build_unique_dict(controls))
+    _control_matchers[key] = matcher
+    return matcher
+
+
 #====================================================================
 def find_best_control_matches(search_text, controls):
     """Returns the control that is the the best match to search_text
@@ -454,7 +710,16 @@ def find_best_control_matches(search_text, controls):
     then it will just add "ListView".
     """
 
-    name_control_map = build_unique_dict(controls)
+    return get_control_matcher(controls).find_best_matches(search_text)
+
+
+#====================================================================
+def _find_best_name_matches(search_text, name_control_map):
+    """Returns the controls whose names best match search_text
+
+    This is how find_best_control_matches() worked before ControlMatcher
+    was added, it is kept as the reference of the matcher benchmark.
+    """
 
 
 #    # collect all the possible names for all controls
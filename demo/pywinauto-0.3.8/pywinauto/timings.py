@@ -81,10 +81,32 @@ The Following are the individual timing settings that can be adjusted:
 * after_editsetedittext_wait  default(0)
 * after_editselect_wait  default(0)
 
+The following settings control how WaitUntil() and WaitUntilPasses()
+poll (see "Polling" below):
+
+* retry_first_interval  default(0)
+* retry_backoff_factor  default(1)
+
+Polling
+-------
+By default the waiting functions retry every retry_interval seconds.
+If retry_first_interval is set, the first retry is done after that
+interval and each next interval is multiplied by retry_backoff_factor,
+up to retry_interval. So a condition which becomes true quickly is
+detected quickly while a long wait does not retry too often.
+Timings.Fast() and Timings.Slow() select such an adaptive polling.
+
+An event source (see AddEventSource()) can also wake up the waiting
+functions as soon as something happens, so that they retry immediately.
+
+The duration and number of retries of the waits are collected per
+waited function (see GetWaitStatistics()), to help adjusting the
+timeouts and retry intervals.
 """
 
 import time
 import operator
+import threading
 
 
 __revision__ = "$Revision: 453 $"
@@ -144,6 +166,9 @@ class TimeConfig(object):
         'after_listboxfocuschange_wait': 0,
         'after_editsetedittext_wait': 0,
         'after_editselect_wait': 0,
+
+        'retry_first_interval': 0,
+        'retry_backoff_factor': 1,
     }
 
 
@@ -171,13 +196,17 @@ class TimeConfig(object):
 
         Currently this changes the timing in the following ways:
         timeouts = 1 second
-        waits = 0 seconds
-        retries = .001 seconds (minimum!)
+        waits = half of the current waits
+        retries = first retry after .001 seconds then doubling the
+        retry interval up to the default retry interval
 
         (if existing times are faster then keep existing times)
         """
 
         for setting in TimeConfig.__default_timing:
+            if setting.startswith("retry_"):
+                continue
+
             # set timeouts to the min of the current speed or 1 second
             if "_timeout" in setting:
                 TimeConfig._timings[setting] = \
@@ -187,10 +216,15 @@ class TimeConfig(object):
                 TimeConfig._timings[setting] = TimeConfig._timings[setting] / 2
 
             elif setting.endswith("_retry"):
-                TimeConfig._timings[setting] = 0.001
+                TimeConfig._timings[setting] = min(
+                    TimeConfig.__default_timing[setting],
+                    TimeConfig._timings[setting])
 
             #self._timings['app_start_timeout'] = .5
 
+        TimeConfig._timings['retry_first_interval'] = 0.001
+        TimeConfig._timings['retry_backoff_factor'] = 2
+
 
     def Slow(self):
         """Set slow timing values
@@ -198,11 +232,15 @@ class TimeConfig(object):
         Currently this changes the timing in the following ways:
         timeouts = default timeouts * 10
         waits = default waits * 3
-        retries = default retries * 3
+        retries = default retries * 3, the first retry being
+        after .2 seconds and the next ones 1.5 times longer each
 
         (if existing times are slower then keep existing times)
         """
         for setting in TimeConfig.__default_timing:
+            if setting.startswith("retry_"):
+                continue
+
             if "_timeout" in setting:
                 TimeConfig._timings[setting] = max(
                     TimeConfig.__default_timing[setting] * 10,
@@ -221,6 +259,9 @@ class TimeConfig(object):
             if TimeConfig._timings[setting] < .2:
                 TimeConfig._timings[setting]= .2
 
+        TimeConfig._timings['retry_first_interval'] = .2
+        TimeConfig._timings['retry_backoff_factor'] = 1.5
+
     def Defaults(self):
         "Set all timings to the default time"
         TimeConfig._timings = TimeConfig.__default_timing.copy()
@@ -234,6 +275,162 @@ class TimeoutError(RuntimeError):
     pass
 
 
+#=========================================================================
+class WaitStatistics(object):
+    """Statistics of the waits for a function
+
+    * **calls** the number of waits
+    * **timeouts** the number of waits which timed out
+    * **retries** the total number of retries (not counting the first call)
+    * **total_time** the total time waited, in seconds
+    * **max_time** the longest wait which did not time out, in seconds
+    """
+    def __init__(self, name):
+        "Initialize the statistics of the function named name"
+        self.name = name
+        self.calls = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.total_time = 0.
+        self.max_time = 0.
+
+    def Add(self, waited, retries, timed_out):
+        "Add a wait to the statistics"
+        self.calls += 1
+        self.retries += retries
+        self.total_time += waited
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.max_time = max(self.max_time, waited)
+
+    def AsDict(self):
+        "Return the statistics as a dictionary (e.g. for XML-RPC)"
+        return {
+            'name' : self.name,
+            'calls' : self.calls,
+            'timeouts' : self.timeouts,
+            'retries' : self.retries,
+            'total_time' : self.total_time,
+            'max_time' : self.max_time,
+        }
+
+
+_wait_statistics = {}
+_wait_statistics_lock = threading.Lock()
+
+def _func_name(func):
+    "Return the name of func used for the statistics"
+    name = getattr(func, '__name__', repr(func))
+    owner = getattr(func, 'im_self', None)
+    if owner is not None:
+        name = owner.__class__.__name__ + "." + name
+    return name
+
+def _record_wait(func, waited, retries, timed_out):
+    "Add a wait for func to the statistics"
+    name = _func_name(func)
+    _wait_statistics_lock.acquire()
+    try:
+        if name not in _wait_statistics:
+            _wait_statistics[name] = WaitStatistics(name)
+        _wait_statistics[name].Add(waited, retries, timed_out)
+    finally:
+        _wait_statistics_lock.release()
+
+def GetWaitStatistics():
+    "Return the list of the WaitStatistics of the waited functions"
+    _wait_statistics_lock.acquire()
+    try:
+        names = _wait_statistics.keys()
+        names.sort()
+        statistics = []
+        for name in names:
+            copy = WaitStatistics(name)
+            copy.__dict__.update(_wait_statistics[name].__dict__)
+            statistics.append(copy)
+        return statistics
+    finally:
+        _wait_statistics_lock.release()
+
+def ResetWaitStatistics():
+    "Remove all the collected wait statistics"
+    _wait_statistics_lock.acquire()
+    try:
+        _wait_statistics.clear()
+    finally:
+        _wait_statistics_lock.release()
+
+
+#=========================================================================
+_events = threading.Condition()
+_events_count = 0
+_event_sources = []
+
+def NotifyWaiters():
+    """Wake up the waiting functions so that they retry immediately
+
+    This is meant to be called by event sources, from any thread.
+    """
+    global _events_count
+    _events.acquire()
+    try:
+        _events_count += 1
+        _events.notifyAll()
+    finally:
+        _events.release()
+
+def AddEventSource(source):
+    """Add a source of events waking up the waiting functions
+
+    **source** must have a Start(notify) method, which is called
+    now and must make the source call notify() (usually from another
+    thread) whenever the state of the windows may have changed (e.g.
+    a window was created, destroyed or shown), and a Stop() method,
+    which is called by RemoveEventSource().
+
+    When at least one event source is added, the waiting functions
+    don't sleep but wait for an event during the retry interval.
+    """
+    source.Start(NotifyWaiters)
+    _event_sources.append(source)
+
+def RemoveEventSource(source):
+    "Stop and remove an event source added by AddEventSource()"
+    _event_sources.remove(source)
+    source.Stop()
+
+def _next_interval(interval, retry_interval):
+    """Return the interval to wait before the next retry
+
+    **interval** is the previous interval or None for the first retry
+    """
+    if interval is None:
+        interval = Timings.retry_first_interval or retry_interval
+    else:
+        interval *= Timings.retry_backoff_factor
+    return min(interval, retry_interval)
+
+def _sleep(interval, events_count):
+    """Sleep for interval seconds or until an event is notified
+
+    **events_count** is the value of _events_count before the previous
+    try, so that the events notified since then are not missed.
+    Return True if an event was notified.
+    """
+    if not _event_sources:
+        time.sleep(interval)
+        return False
+
+    _events.acquire()
+    try:
+        if _events_count == events_count:
+            _events.wait(interval)
+        return _events_count != events_count
+    finally:
+        _events.release()
+
+
 #=========================================================================
 def WaitUntil(
     timeout, 
@@ -270,6 +467,9 @@ def WaitUntil(
     """
     
     start = time.time()
+    events_count = _events_count
+    interval = None
+    retries = 0
 
     func_val = func(*args)
     # while the function hasn't returned what we are waiting for    
@@ -280,15 +480,22 @@ def WaitUntil(
     
         # if we have to wait some more        
         if waited < timeout:
-            # wait either the retry_interval or else the amount of
+            # wait either the retry interval or else the amount of
             # time until the timeout expires (whichever is less)
-            time.sleep(min(retry_interval, timeout - waited))
+            interval = _next_interval(interval, retry_interval)
+            if _sleep(min(interval, timeout - waited), events_count):
+                # something happened - poll fast again
+                interval = None
+            events_count = _events_count
             func_val = func(*args)
+            retries += 1
         else:
+            _record_wait(func, waited, retries, True)
             err = TimeoutError("timed out")
             err.function_value = func_val
             raise err
             
+    _record_wait(func, time.time() - start, retries, False)
     return func_val
 
 
@@ -331,6 +538,9 @@ def WaitUntilPasses(
     
     start = time.time()
     waited = 0
+    events_count = _events_count
+    interval = None
+    retries = 0
 
     # keep trying until the timeout is passed
     while waited <= timeout:
@@ -346,13 +556,22 @@ def WaitUntilPasses(
             waited = time.time() - start
 
             if  waited < timeout:
-                time.sleep(min(retry_interval, timeout - waited))
+                interval = _next_interval(interval, retry_interval)
+                if _sleep(min(interval, timeout - waited), events_count):
+                    # something happened - poll fast again
+                    interval = None
+                events_count = _events_count
+                retries += 1
             else:
+                _record_wait(func, waited, retries, True)
+
                 # re-raise the original exeption
                 err = TimeoutError()
                 err.original_exception = e
                 raise err
     
+    _record_wait(func, time.time() - start, retries, False)
+
     # return the function value
     return func_val
 
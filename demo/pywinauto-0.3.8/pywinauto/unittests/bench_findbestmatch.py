@@ -0,0 +1,158 @@
+# GUI Application automation and testing library
+# Copyright (C) 2006 Mark Mc Mahon
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Benchmark of the control name matching of findbestmatch.py
+
+Compares the ControlMatcher with the previous way of matching control
+names on synthetic lists of control names. It doesn't use any window
+so it can be run on any platform:
+
+    python bench_findbestmatch.py [number_of_names] [number_of_lookups]
+"""
+
+__revision__ = "$Revision: 234 $"
+
+import os.path
+import random
+import sys
+import time
+
+# import findbestmatch directly as the pywinauto package needs Windows
+sys.path.insert(0, os.path.join(os.path.split(os.path.abspath(__file__))[0], ".."))
+import findbestmatch
+
+_words = [
+    u"OK", u"Cancel", u"Apply", u"Help", u"Open", u"Save", u"Close",
+    u"File", u"Name", u"Type", u"Size", u"Look", u"in", u"Font", u"Style",
+    u"Color", u"Sample", u"Script", u"Effects", u"Strikeout", u"Underline",
+    u"Left", u"Right", u"Top", u"Bottom", u"Margin", u"Page", u"Preview",
+    u"Paper", u"Source", u"Orientation", u"Portrait", u"Landscape"]
+
+_classes = [
+    u"Button", u"Edit", u"Static", u"ComboBox", u"ListBox", u"CheckBox",
+    u"RadioButton", u"GroupBox", u"ListView", u"TreeView", u"TabControl"]
+
+
+def make_names(count, seed = 0):
+    "Return a UniqueDict of count synthetic control names"
+    rand = random.Random(seed)
+    names = findbestmatch.UniqueDict()
+    for index in range(count):
+        text = u" ".join(rand.sample(_words, rand.randint(1, 3)))
+        if rand.random() < .3:
+            text += u":"
+        if rand.random() < .2:
+            text = u"&" + text
+        class_name = rand.choice(_classes)
+
+        # the same names as build_unique_dict() adds for a control
+        names[text] = index
+        names[class_name] = index
+        names[text + class_name] = index
+    return names
+
+
+def make_search_texts(names, count, seed = 1):
+    "Return count search texts, most of them being altered names"
+    rand = random.Random(seed)
+    all_names = names.keys()
+    search_texts = []
+    for index in range(count):
+        text = rand.choice(all_names)
+        choice = rand.random()
+        if choice < .3:
+            text = text.lower()
+        elif choice < .5:
+            text = findbestmatch._clean_non_chars(text)
+        elif choice < .6:
+            text = text[:-1]
+        elif choice < .7:
+            text = u"".join(rand.sample(_words, 2))
+        search_texts.append(text)
+    return search_texts
+
+
+def _find(find_function, search_text):
+    "Return the result of a lookup, or None if nothing matches"
+    try:
+        return find_function(search_text)
+    except findbestmatch.MatchError:
+        return None
+
+
+def run(names_count, lookups_count):
+    "Run the benchmark and print the results"
+    names = make_names(names_count)
+    search_texts = make_search_texts(names, lookups_count)
+
+    # previous way: each lookup recomputes all the ratios of the
+    # 4 variants of the names, and the ratios cache starts empty
+    # as it would for a new window
+    findbestmatch._cache.clear()
+    start = time.time()
+    expected = []
+    for search_text in search_texts:
+        findbestmatch._cache.clear()
+        expected.append(_find(
+            lambda text: findbestmatch._find_best_name_matches(text, names),
+            search_text))
+    reference_time = time.time() - start
+
+    start = time.time()
+    matcher = findbestmatch.ControlMatcher(names)
+    results = [_find(matcher.find_best_matches, search_text)
+        for search_text in search_texts]
+    matcher_time = time.time() - start
+
+    differences = 0
+    for search_text, expected_result, result in zip(
+        search_texts, expected, results):
+
+        if expected_result != result:
+            differences += 1
+
+    print "%d names, %d lookups (%d distinct)" % (
+        len(names), len(search_texts), len(set(search_texts)))
+    print "  previous matching: %8.3f s" % reference_time
+    print "  ControlMatcher:    %8.3f s (x%.1f)" % (
+        matcher_time, reference_time / max(matcher_time, 1e-6))
+    print "  different results: %d" % differences
+
+    return differences
+
+
+def main():
+    "Run the benchmark for the sizes given on the command line"
+    names_counts = [20, 100, 300]
+    lookups_count = 200
+    if len(sys.argv) > 1:
+        names_counts = [int(sys.argv[1])]
+    if len(sys.argv) > 2:
+        lookups_count = int(sys.argv[2])
+
+    differences = 0
+    for names_count in names_counts:
+        differences += run(names_count, lookups_count)
+
+    if differences:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -115,6 +115,43 @@ class TestIsAboveOrToLeft(unittest.TestCase):
         self.assertEqual(result, False)
 
 
+class TestControlMatcher(unittest.TestCase):
+    def setUp(self):
+        self.names = findbestmatch.UniqueDict()
+        for index, text in enumerate((
+            u"OK", u"OKButton", u"Button", u"&Cancel", u"CancelButton",
+            u"File name:", u"File name:Edit", u"Edit", u"Look in:")):
+            self.names[text] = index
+        self.matcher = findbestmatch.ControlMatcher(self.names)
+
+    def testSameAsBefore(self):
+        "the matcher finds the same controls as before"
+        for search_text in (u"OK", u"ok", u"Cancel", u"cancelbutton",
+            u"FileName", u"Edit1", u"LookIn", u"Lookin:"):
+            self.assertEqual(
+                self.matcher.find_best_matches(search_text),
+                findbestmatch._find_best_name_matches(search_text, self.names))
+
+    def testNoMatch(self):
+        self.assertRaises(
+            findbestmatch.MatchError,
+            self.matcher.find_best_matches, u"xyz")
+
+
+class TestLRUCache(unittest.TestCase):
+    def testLeastRecentlyUsedRemoved(self):
+        cache = findbestmatch._LRUCache(4)
+        for key in range(4):
+            cache[key] = key
+        cache[0]
+        cache[4] = 4
+
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(0 in cache, True)
+        self.assertEqual(1 in cache, False)
+        self.assertEqual(4 in cache, True)
+
+
 if __name__ == "__main__":
 
     unittest.main()
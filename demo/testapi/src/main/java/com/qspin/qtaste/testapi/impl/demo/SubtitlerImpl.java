@@ -9,9 +9,14 @@ import javax.swing.JLabel;
 import javax.swing.JWindow;
 import javax.swing.SwingConstants;
 
+import com.qspin.qtaste.kernel.testapi.ComponentLifecycle;
 import com.qspin.qtaste.testapi.api.Subtitler;
 import com.qspin.qtaste.testsuite.QTasteException;
 
+/**
+ * The subtitler thread is started once for the whole test suite.
+ */
+@ComponentLifecycle(ComponentLifecycle.Scope.TEST_SUITE)
 public final class SubtitlerImpl implements Subtitler, Runnable {
 
 	/**
@@ -20,12 +20,29 @@
 package com.qspin.qtaste.config;
 
 import java.io.File;
+import java.io.FileInputStream;
+import java.io.IOException;
+import java.io.InputStream;
 import java.util.ArrayList;
+import java.util.Collections;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.Iterator;
 import java.util.List;
+import java.util.Map;
 import java.util.NoSuchElementException;
+import java.util.Set;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ConcurrentMap;
+import java.util.regex.Matcher;
+import java.util.regex.Pattern;
+import java.util.zip.CRC32;
 
 import org.apache.commons.configuration.ConfigurationException;
 import org.apache.commons.configuration.ConversionException;
+import org.apache.commons.configuration.PropertyConverter;
+import org.apache.commons.configuration.event.ConfigurationEvent;
+import org.apache.commons.configuration.event.ConfigurationListener;
 import org.apache.log4j.Logger;
 
 import com.qspin.qtaste.util.Log4jLoggerFactory;
@@ -43,10 +60,23 @@ public class TestBedConfiguration extends XMLConfiguration {
     private static List<ConfigurationChangeHandler> configurationChangeHandlers = new ArrayList<ConfigurationChangeHandler>();
     private static long lastModifiedTime;
     private static String sutVersion;
+    private static long loadedContentChecksum;
+    private static boolean standbyInstancesActive = false;
+    private static final Pattern COMPONENT_KEY_PATTERN = Pattern.compile("\\.(\\w+)");
+    private volatile Snapshot snapshot;
 
     private TestBedConfiguration() throws ConfigurationException {
         super(configFile);
         lastModifiedTime = new File(configFile).lastModified();
+        loadedContentChecksum = getContentChecksum(configFile);
+        // the snapshot is built again after a change of the configuration
+        addConfigurationListener(new ConfigurationListener() {
+            public void configurationChanged(ConfigurationEvent event) {
+                if (!event.isBeforeUpdate()) {
+                    snapshot = null;
+                }
+            }
+        });
         logger.info("Loaded testbed configuration file " + configFile);
     }
 
@@ -107,12 +137,41 @@ public class TestBedConfiguration extends XMLConfiguration {
     public static void reloadConfigFileIfModified() {
         long newLastModifiedTime = new File(configFile).lastModified();
         if (newLastModifiedTime != lastModifiedTime) {
+            if (instance != null && getContentChecksum(configFile) == loadedContentChecksum) {
+                // only touched, no need to reload it and to release the components
+                lastModifiedTime = newLastModifiedTime;
+                return;
+            }
             logger.info("Testbed configuration file " + configFile + " has been modified and will be reloaded");
             instance = null;
             onConfigurationChange();
         }
     }
 
+    /**
+     * Compute the checksum of the content of a file.
+     * @param file the file name
+     * @return the CRC32 checksum of the file content, or -1 if the file cannot be read
+     */
+    private static long getContentChecksum(String file) {
+        try {
+            InputStream input = new FileInputStream(file);
+            try {
+                CRC32 checksum = new CRC32();
+                byte[] buffer = new byte[8192];
+                int length;
+                while ((length = input.read(buffer)) > 0) {
+                    checksum.update(buffer, 0, length);
+                }
+                return checksum.getValue();
+            } finally {
+                input.close();
+            }
+        } catch (IOException e) {
+            return -1;
+        }
+    }
+
     /**
      * Check if testbed has a control script.
      * @return true if testbed has a control script, false otherwise
@@ -141,6 +200,35 @@ public class TestBedConfiguration extends XMLConfiguration {
         return getString("control_script.arguments");
     }
 
+    /**
+     * Return the arguments of the control script to start and stop the warm standby SUT instance or null if none.
+     * @return the arguments of the control script for the warm standby SUT instance or null if none.
+     */
+    public String getControlScriptStandbyArguments() {
+        return getString("control_script.standby_arguments");
+    }
+
+    /**
+     * Select the instances of the multiple instances components: the normal instances or their standby instances,
+     * i.e. the instances whose standby_of attribute is the id of the normal instance, which are used when the SUT
+     * has been swapped to its warm standby instance. The components instances are released if the selection changes.
+     * @param active true to use the standby instances, false to use the normal instances
+     */
+    public static void setStandbyInstancesActive(boolean active) {
+        if (active != standbyInstancesActive) {
+            standbyInstancesActive = active;
+            onConfigurationChange();
+        }
+    }
+
+    /**
+     * Check if the standby instances of the multiple instances components are used.
+     * @return true if the standby instances are used, false otherwise
+     */
+    public static boolean isStandbyInstancesActive() {
+        return standbyInstancesActive;
+    }
+
     /**
      * Return the id of the default instance
      * @return id of the default instance
@@ -154,21 +242,14 @@ public class TestBedConfiguration extends XMLConfiguration {
     }
 
     /**
-     * Return the index corresponding to the instance id specified as parameter
+     * Return the index corresponding to the instance id specified as parameter,
+     * or to its standby instance if the standby instances are used
      * @param instanceId the instance id
      * @param component The component name.
      * @return the index of the instance id, -1 if the instance is not found
      */
     public int getMIIndex(String instanceId, String component) {
-        for (int i = 0; i <= instance.getMaxIndex("multiple_instances_components." + component); i++) {
-            String id = instance.getString("multiple_instances_components." + component + "(" + i + ") [@id]");
-            if (id == null)
-                return -1;
-            if (id.equals(instanceId)) {
-                return i;
-            }
-        }
-        return -1;
+        return getSnapshot().getIndex(instanceId, component, standbyInstancesActive);
     }
 
     /**
@@ -179,8 +260,7 @@ public class TestBedConfiguration extends XMLConfiguration {
      * @return The value of the parameter identified by the key or null if the key is not present
      */
     public String getMIString(String instanceId, String component, String key) {
-        int index = getMIIndex(instanceId, component);
-        return instance.getString("multiple_instances_components." + component + "(" + index + ")." + key);
+        return getMIValue(instanceId, component, key);
     }
 
     /**
@@ -192,8 +272,8 @@ public class TestBedConfiguration extends XMLConfiguration {
      * @return The value of the parameter identified by the key or defaultValue if the key is not present
      */
     public String getMIString(String instanceId, String component, String key, String defaultValue) {
-        int index = getMIIndex(instanceId, component);
-        return instance.getString("multiple_instances_components." + component + "(" + index + ")." + key, defaultValue);
+        String value = getMIValue(instanceId, component, key);
+        return value != null ? value : defaultValue;
     }
 
     /**
@@ -208,8 +288,7 @@ public class TestBedConfiguration extends XMLConfiguration {
      *             if the value associated to the configuration key is convertible into a int value.
      */
     public int getMIInt(String instanceId, String component, String key) throws NoSuchElementException, ConversionException {
-        int index = getMIIndex(instanceId, component);
-        return instance.getInt("multiple_instances_components." + component + "(" + index + ")." + key);
+        return PropertyConverter.toInteger(getRequiredMIValue(instanceId, component, key));
     }
 
     /**
@@ -223,8 +302,8 @@ public class TestBedConfiguration extends XMLConfiguration {
      *             if the value associated to the configuration key is convertible into a int value.
      */
     public int getMIInt(String instanceId, String component, String key, int defaultValue) throws ConversionException {
-        int index = getMIIndex(instanceId, component);
-        return instance.getInt("multiple_instances_components." + component + "(" + index + ")." + key, defaultValue);
+        String value = getMIValue(instanceId, component, key);
+        return value != null ? PropertyConverter.toInteger(value) : defaultValue;
     }
 
     /**
@@ -239,8 +318,7 @@ public class TestBedConfiguration extends XMLConfiguration {
      *             if the value associated to the configuration key is convertible into a boolean value.
      */
     public boolean getMIBoolean(String instanceId, String component, String key) throws NoSuchElementException, ConversionException {
-        int index = getMIIndex(instanceId, component);
-        return instance.getBoolean("multiple_instances_components." + component +" (" + index + ")." + key);
+        return PropertyConverter.toBoolean(getRequiredMIValue(instanceId, component, key));
     }
 
     /**
@@ -254,8 +332,8 @@ public class TestBedConfiguration extends XMLConfiguration {
      *             if the value associated to the configuration key is convertible into a boolean value.
      */
     public boolean getMIBoolean(String instanceId, String component, String key, boolean defaultValue) throws ConversionException {
-        int index = getMIIndex(instanceId, component);
-        return instance.getBoolean("multiple_instances_components." + component + "(" + index + ")." + key, defaultValue);
+        String value = getMIValue(instanceId, component, key);
+        return value != null ? PropertyConverter.toBoolean(value) : defaultValue;
     }
 
     /**
@@ -270,8 +348,7 @@ public class TestBedConfiguration extends XMLConfiguration {
      *             if the value associated to the configuration key is convertible into a short value.
      */
     public short getMIShort(String instanceId, String component, String key) throws NoSuchElementException, ConversionException {
-        int index = getMIIndex(instanceId, component);
-        return instance.getShort("multiple_instances_components." + component + "(" + index + ")." + key);
+        return PropertyConverter.toShort(getRequiredMIValue(instanceId, component, key));
     }
 
     /**
@@ -285,8 +362,109 @@ public class TestBedConfiguration extends XMLConfiguration {
      *             if the value associated to the configuration key is convertible into a short value.
      */
     public short getMIShort(String instanceId, String component, String key, short defaultValue) throws ConversionException {
-        int index = getMIIndex(instanceId, component);
-         return instance.getShort("multiple_instances_components." + component + "(" + index + ")." + key, defaultValue);
+        String value = getMIValue(instanceId, component, key);
+        return value != null ? PropertyConverter.toShort(value) : defaultValue;
+    }
+
+    /**
+     * Get the value associated with the given configuration key for the specified instanceId, from the snapshot.
+     * @return the interpolated value or null if the key is not present
+     */
+    private String getMIValue(String instanceId, String component, String key) {
+        return getSnapshot().getValue(this, "multiple_instances_components." + component + "(" + getMIIndex(instanceId, component) + ")." + key);
+    }
+
+    private String getRequiredMIValue(String instanceId, String component, String key) throws NoSuchElementException {
+        String value = getMIValue(instanceId, component, key);
+        if (value == null) {
+            throw new NoSuchElementException("'multiple_instances_components." + component + "." + key + "' doesn't map to an existing object for instance " + instanceId);
+        }
+        return value;
+    }
+
+    /**
+     * Get the snapshot of the configuration, building it if the configuration has changed since it was built.
+     * @return the snapshot
+     */
+    private Snapshot getSnapshot() {
+        Snapshot currentSnapshot = snapshot;
+        if (currentSnapshot == null) {
+            currentSnapshot = new Snapshot(this);
+            snapshot = currentSnapshot;
+        }
+        return currentSnapshot;
+    }
+
+    /**
+     * Immutable flattened view of the multiple instances components of the configuration, with the index of each
+     * (component, instance id) and a cache of the values read, so that the lookups don't go through the configuration
+     * expression engine each time. A new snapshot is built when the configuration changes and replaces the previous
+     * one atomically, so that it can be used concurrently.
+     */
+    private static final class Snapshot {
+        // cached value of the keys which are not present, compared by identity
+        private static final String NULL_VALUE = new String();
+        private final Map<String, Integer> indexes;
+        private final Map<String, Integer> standbyIndexes;
+        private final ConcurrentMap<String, String> values = new ConcurrentHashMap<String, String>();
+
+        private Snapshot(TestBedConfiguration config) {
+            Map<String, Integer> indexes = new HashMap<String, Integer>();
+            Map<String, Integer> standbyIndexes = new HashMap<String, Integer>();
+            Set<String> components = new HashSet<String>();
+            Iterator<?> keys = config.getKeys("multiple_instances_components");
+            while (keys.hasNext()) {
+                String key = ((String) keys.next()).substring("multiple_instances_components".length());
+                Matcher matcher = COMPONENT_KEY_PATTERN.matcher(key);
+                if (matcher.lookingAt()) {
+                    components.add(matcher.group(1));
+                }
+            }
+            for (String component : components) {
+                String componentKey = "multiple_instances_components." + component;
+                boolean idsEnded = false;
+                for (int i = 0; i <= config.getMaxIndex(componentKey); i++) {
+                    String id = config.getString(componentKey + "(" + i + ")[@id]");
+                    // as before, the instances following an instance without id are not found
+                    idsEnded |= (id == null);
+                    if (!idsEnded && !indexes.containsKey(getIndexKey(id, component))) {
+                        indexes.put(getIndexKey(id, component), i);
+                    }
+                    String standbyOf = config.getString(componentKey + "(" + i + ")[@standby_of]");
+                    if (standbyOf != null && !standbyIndexes.containsKey(getIndexKey(standbyOf, component))) {
+                        standbyIndexes.put(getIndexKey(standbyOf, component), i);
+                    }
+                }
+            }
+            this.indexes = Collections.unmodifiableMap(indexes);
+            this.standbyIndexes = Collections.unmodifiableMap(standbyIndexes);
+        }
+
+        private static String getIndexKey(String instanceId, String component) {
+            return component + "(" + instanceId + ")";
+        }
+
+        private int getIndex(String instanceId, String component, boolean standby) {
+            Integer index = null;
+            if (standby) {
+                index = standbyIndexes.get(getIndexKey(instanceId, component));
+            }
+            if (index == null) {
+                index = indexes.get(getIndexKey(instanceId, component));
+            }
+            return index != null ? index : -1;
+        }
+
+        private String getValue(TestBedConfiguration config, String key) {
+            String value = values.get(key);
+            if (value == null) {
+                value = config.getString(key);
+                values.putIfAbsent(key, value != null ? value : NULL_VALUE);
+            } else if (value == NULL_VALUE) {
+                value = null;
+            }
+            return value;
+        }
     }
 
     /**
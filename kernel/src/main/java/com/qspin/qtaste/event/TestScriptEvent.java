@@ -0,0 +1,141 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.event;
+
+import java.util.Locale;
+
+import org.python.core.PyTuple;
+
+import com.qspin.qtaste.reporter.testresults.TestResult;
+
+/**
+ * Structured event of a test script execution, logged as a log4j message object.
+ * <p>
+ * The text of the event is only formatted by its toString() method, i.e. when an appender renders the message,
+ * so that the log files are unchanged while the log4j sinks running in the same JVM, like the GUI log panel,
+ * can get the step structure from the event fields instead of parsing the message.
+ */
+public abstract class TestScriptEvent {
+
+    /**
+     * Beginning of a test script step.
+     */
+    public static class StepBegin extends TestScriptEvent {
+        private final String stepId;
+        private final String stepName;
+
+        public StepBegin(String stepId, String stepName) {
+            this.stepId = stepId;
+            this.stepName = stepName;
+        }
+
+        public String getStepId() {
+            return stepId;
+        }
+
+        public String getStepName() {
+            return stepName;
+        }
+
+        @Override
+        public String toString() {
+            return "Begin of step " + stepId + " (" + stepName + ")";
+        }
+    }
+
+    /**
+     * End of a test script step, with its status and elapsed time.
+     */
+    public static class StepEnd extends TestScriptEvent {
+        private final String stepId;
+        private final String stepName;
+        private final TestResult.Status status;
+        private final double elapsedTime_s;
+
+        public StepEnd(String stepId, String stepName, TestResult.Status status, double elapsedTime_s) {
+            this.stepId = stepId;
+            this.stepName = stepName;
+            this.status = status;
+            this.elapsedTime_s = elapsedTime_s;
+        }
+
+        public String getStepId() {
+            return stepId;
+        }
+
+        public String getStepName() {
+            return stepName;
+        }
+
+        public TestResult.Status getStatus() {
+            return status;
+        }
+
+        public double getElapsedTime() {
+            return elapsedTime_s;
+        }
+
+        @Override
+        public String toString() {
+            return "End of step " + stepId + " (" + stepName + ") - status: " + status
+                    + " - elapsed time: " + String.format(Locale.US, "%.3f", elapsedTime_s) + " seconds";
+        }
+    }
+
+    /**
+     * Invocation of a verb of a component, whose arguments are only formatted when the event is rendered.
+     */
+    public static class VerbInvoke extends TestScriptEvent {
+        private final String componentName;
+        private final String verb;
+        private final PyTuple arguments;
+
+        public VerbInvoke(String componentName, String verb, PyTuple arguments) {
+            this.componentName = componentName;
+            this.verb = verb;
+            this.arguments = arguments;
+        }
+
+        public String getComponentName() {
+            return componentName;
+        }
+
+        public String getVerb() {
+            return verb;
+        }
+
+        public PyTuple getArguments() {
+            return arguments;
+        }
+
+        /**
+         * @return the arguments as represented by python, without the tuple parentheses and trailing comma
+         */
+        public String getFormattedArguments() {
+            String tuple = arguments.__str__().toString();
+            return tuple.substring(1, tuple.length() - (arguments.__len__() == 1 ? 2 : 1));
+        }
+
+        @Override
+        public String toString() {
+            return "Invoking " + componentName + "." + verb + "(" + getFormattedArguments() + ")";
+        }
+    }
+}
@@ -28,6 +28,7 @@ import java.util.ArrayList;
 public class Campaign {
     String name;
     ArrayList<CampaignRun> runs;
+    int profilingInterval;
     
     public Campaign() {
         runs = new ArrayList<CampaignRun>();
@@ -40,4 +41,12 @@ public class Campaign {
     public ArrayList<CampaignRun> getRuns() {
         return runs;
     }
+
+    /**
+     * Returns the sampling interval of the test scripts profiling.
+     * @return the sampling interval in milliseconds, or 0 if the test scripts are not profiled
+     */
+    public int getProfilingInterval() {
+        return profilingInterval;
+    }
 }
@@ -28,6 +28,7 @@ import org.python.util.PythonInterpreter;
 
 import com.qspin.qtaste.config.StaticConfiguration;
 import com.qspin.qtaste.config.TestBedConfiguration;
+import com.qspin.qtaste.config.TestEngineConfiguration;
 import com.qspin.qtaste.log.Log4jServer;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
 import com.qspin.qtaste.util.versioncontrol.VersionControl;
@@ -41,7 +42,7 @@ public class CampaignLauncher {
 	private static Logger logger = Log4jLoggerFactory.getLogger(CampaignLauncher.class);
 
     private static void showUsage() {
-        System.err.println("Usage: <command> <campaignFileName.xml> [-sutversion <sut_version_identifier>]");
+        System.err.println("Usage: <command> <campaignFileName.xml> [-sutversion <sut_version_identifier>] [-engine <engineFileName.xml>] [-shards <count>] [-impact git:<revision>|<changedFilesList>]");
         System.exit(1);
     }
 
@@ -58,13 +59,41 @@ public class CampaignLauncher {
       	logger.info("QTaste kernel version: " + com.qspin.qtaste.kernel.Version.getInstance().getFullVersion());
   		logger.info("QTaste testAPI version: " + VersionControl.getInstance().getTestApiVersion(""));
 
-        // handle config file name and optional -sutversion
-        if (args.length != 1 && (args.length != 3 || !args[1].equals("-sutversion"))) {
+        // handle config file name and optional arguments
+        if (args.length < 1 || args[0].startsWith("-")) {
             showUsage();
         }
-        if (args.length == 3) {
-            logger.info("SUT version: " + args[2]);
-            TestBedConfiguration.setSUTVersion(args[2]);
+        String sutVersion = null;
+        int shardsCount = 1;
+        String changes = null;
+        int i = 1;
+        while (i < args.length) {
+            if (args[i].equals("-sutversion") && (i + 1 < args.length)) {
+                sutVersion = args[i + 1];
+                logger.info("SUT version: " + sutVersion);
+                TestBedConfiguration.setSUTVersion(sutVersion);
+                i += 2;
+            } else if (args[i].equals("-engine") && (i + 1 < args.length)) {
+                logger.info("Using " + args[i + 1] + " as engine configuration file");
+                TestEngineConfiguration.setConfigFile(args[i + 1]);
+                i += 2;
+            } else if (args[i].equals("-shards") && (i + 1 < args.length)) {
+                try {
+                    shardsCount = Integer.parseInt(args[i + 1]);
+                    if (shardsCount <= 0) {
+                        throw new NumberFormatException();
+                    }
+                } catch (NumberFormatException e) {
+                    showUsage();
+                }
+                logger.info("Executing campaign in " + shardsCount + " shards");
+                i += 2;
+            } else if (args[i].equals("-impact") && (i + 1 < args.length)) {
+                changes = args[i + 1];
+                i += 2;
+            } else {
+                showUsage();
+            }
         }
         // start the log4j server
         Log4jServer.getInstance().start();
@@ -80,7 +109,16 @@ public class CampaignLauncher {
 
         try {
             Campaign campaign = campaignManager.readFile(args[0]);
-            executionResult = campaignManager.execute(campaign);
+            if (changes != null) {
+                TestImpactAnalyzer analyzer = new TestImpactAnalyzer(TestImpactAnalyzer.readChangedFiles(changes));
+                int selectedTestCasesCount = analyzer.selectAffectedTestCases(campaign);
+                logger.info(selectedTestCasesCount + " test cases affected by the changes of " + changes + " selected");
+            }
+            if (shardsCount > 1) {
+                executionResult = new ShardedCampaignExecutor(campaign, shardsCount, sutVersion).execute();
+            } else {
+                executionResult = campaignManager.execute(campaign);
+            }
         } finally {
             shutdown();
         }
@@ -34,6 +34,8 @@ import org.w3c.dom.NodeList;
 import com.qspin.qtaste.config.StaticConfiguration;
 import com.qspin.qtaste.config.TestBedConfiguration;
 import com.qspin.qtaste.kernel.engine.TestEngine;
+import com.qspin.qtaste.kernel.testapi.ComponentLifecycle;
+import com.qspin.qtaste.kernel.testapi.TestAPIImpl;
 import com.qspin.qtaste.reporter.campaign.CampaignReportManager;
 import com.qspin.qtaste.reporter.campaign.CampaignResult;
 import com.qspin.qtaste.reporter.campaign.CampaignResult.Status;
@@ -41,6 +43,7 @@ import com.qspin.qtaste.reporter.testresults.TestResult;
 import com.qspin.qtaste.reporter.testresults.TestResultsReportManager;
 import com.qspin.qtaste.testsuite.TestReportListener;
 import com.qspin.qtaste.testsuite.TestSuite;
+import com.qspin.qtaste.testsuite.impl.JythonScriptProfiler;
 import com.qspin.qtaste.testsuite.impl.MetaTestSuite;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
 
@@ -94,6 +97,15 @@ public class CampaignManager implements TestReportListener {
         String campaignName = el.getAttributeNode("name").getValue();
         result.name = campaignName;
 
+        String profile = el.getAttribute("profile");
+        if (profile.length() > 0) {
+            try {
+                result.profilingInterval = Integer.parseInt(profile);
+            } catch (NumberFormatException e) {
+                logger.error("profile attribute in " + fileName + " file should be a sampling interval in milliseconds");
+            }
+        }
+
         NodeList nodeLst = doc.getElementsByTagName("run");
         for (int s = 0; s < nodeLst.getLength(); s++) {
             Node node = nodeLst.item(s);
@@ -101,6 +113,7 @@ public class CampaignManager implements TestReportListener {
                 Element element = (Element) node;
                 CampaignRun run = new CampaignRun();
                 run.testbed = element.getAttribute("testbed");
+                run.name = element.getAttribute("name");
                 result.runs.add(run);
                 NodeList nodeList = element.getElementsByTagName("testsuite");
 
@@ -109,6 +122,8 @@ public class CampaignManager implements TestReportListener {
 
                     run.testsuites.add(params);
                     params.setDirectory(nodeList.item(t).getAttributes().getNamedItem("directory").getNodeValue());
+                    Node smokeNode = nodeList.item(t).getAttributes().getNamedItem("smoke");
+                    params.setSmoke(smokeNode != null && Boolean.parseBoolean(smokeNode.getNodeValue()));
 
                     NodeList childList = nodeList.item(t).getChildNodes();
                     for (int c = 0; c < childList.getLength(); c++) {
@@ -164,6 +179,10 @@ public class CampaignManager implements TestReportListener {
     	campaignResult = true;
         currentCampaign = campaign;
         campaignStartTimeStamp = new Date();
+        int previousProfilingInterval = JythonScriptProfiler.getSamplingInterval();
+        if (campaign.getProfilingInterval() > 0) {
+            JythonScriptProfiler.setSamplingInterval(campaign.getProfilingInterval());
+        }
         try
         {
 	        createReport();
@@ -173,7 +192,7 @@ public class CampaignManager implements TestReportListener {
 	                break;
 	            }
 	        	currentTestBed = run.getTestbed();
-	            String testSuiteName = currentCampaign.getName() + " - " + currentTestBed.substring(0, currentTestBed.lastIndexOf('.'));
+	            String testSuiteName = currentCampaign.getName() + " - " + run.getName();
 	            TestBedConfiguration.setConfigFile(StaticConfiguration.TESTBED_CONFIG_DIRECTORY + "/" + currentTestBed);
 	            currentTestSuite = MetaTestSuite.createMetaTestSuite(testSuiteName, run.getTestsuites());
 	            if (currentTestSuite == null) {
@@ -188,7 +207,9 @@ public class CampaignManager implements TestReportListener {
         }
         finally
         {
+        	TestAPIImpl.getInstance().terminateComponents(ComponentLifecycle.Scope.CAMPAIGN);
         	TestEngine.tearDown();
+        	JythonScriptProfiler.setSamplingInterval(previousProfilingInterval);
         	campaignStartTimeStamp = null;
         	currentCampaign = null;
         }
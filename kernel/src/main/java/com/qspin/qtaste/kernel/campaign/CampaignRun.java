@@ -27,6 +27,7 @@ import java.util.ArrayList;
  */
 public class CampaignRun {
     String testbed;
+    String name;
     ArrayList<TestSuiteParams> testsuites;
     
     public CampaignRun() {
@@ -36,6 +37,17 @@ public class CampaignRun {
     public String getTestbed() {
         return testbed;
     }
+
+    /**
+     * Returns the name of the run, used in the name of its test suite.
+     * @return the name given in the campaign file, or the testbed name without extension if none
+     */
+    public String getName() {
+        if (name != null && name.length() > 0) {
+            return name;
+        }
+        return testbed.substring(0, testbed.lastIndexOf('.'));
+    }
     
     public ArrayList<TestSuiteParams> getTestsuites() {
         return testsuites;
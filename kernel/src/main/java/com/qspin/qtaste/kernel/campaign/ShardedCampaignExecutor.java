@@ -0,0 +1,505 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.kernel.campaign;
+
+import java.io.File;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.lang.management.ManagementFactory;
+import java.text.SimpleDateFormat;
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.Comparator;
+import java.util.Date;
+import java.util.HashMap;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.TreeSet;
+
+import javax.xml.parsers.DocumentBuilderFactory;
+import javax.xml.transform.OutputKeys;
+import javax.xml.transform.Transformer;
+import javax.xml.transform.TransformerFactory;
+import javax.xml.transform.dom.DOMSource;
+import javax.xml.transform.stream.StreamResult;
+
+import org.apache.commons.configuration.XMLConfiguration;
+import org.apache.log4j.Logger;
+import org.w3c.dom.Document;
+import org.w3c.dom.Element;
+
+import com.qspin.qtaste.config.StaticConfiguration;
+import com.qspin.qtaste.config.TestBedConfiguration;
+import com.qspin.qtaste.config.TestEngineConfiguration;
+import com.qspin.qtaste.reporter.campaign.CampaignReportManager;
+import com.qspin.qtaste.reporter.campaign.CampaignResult;
+import com.qspin.qtaste.reporter.testresults.archive.TestResultsArchive;
+import com.qspin.qtaste.reporter.testresults.xml.XMLReportMerger;
+import com.qspin.qtaste.testsuite.TestData;
+import com.qspin.qtaste.testsuite.TestScript;
+import com.qspin.qtaste.testsuite.impl.DirectoryTestSuite;
+import com.qspin.qtaste.util.Log4jLoggerFactory;
+
+/**
+ * Executes a campaign in several QTaste JVMs (shards), to use all the cores of the machine.
+ * <p>
+ * The selected data rows of the test scripts of each campaign run are split into shards, balancing the shards
+ * with the durations of the tests in the last runs of the test results archive (longest tests first, each one
+ * in the least loaded shard). Each shard is a campaign executed by a child CampaignLauncher JVM, with its own
+ * engine configuration (report directory and log4j server port) in the shard-&lt;n&gt; sub-directory of the
+ * campaign report directory. Once all the shards are finished, the XML reports of the shards are merged into
+ * one XML report per campaign run and the campaign report is generated from the merged reports.
+ * <p>
+ * All the shards use the testbed of the run at the same time, so the testbeds must not have a control script:
+ * the shards would start and stop the same SUT. A campaign with such a testbed is not executed.
+ */
+public class ShardedCampaignExecutor {
+
+    private static Logger logger = Log4jLoggerFactory.getLogger(ShardedCampaignExecutor.class);
+    /** number of archived runs used to estimate the tests durations */
+    private static final int DURATION_HISTORY_RUNS = 10;
+    /** estimated duration of a test without history, if no test has any history */
+    private static final long DEFAULT_TEST_DURATION_MS = 1000;
+    private static final int DEFAULT_LOG4J_SERVER_PORT = 4446;
+
+    /**
+     * Execution of a test script data row, the unit of the sharding.
+     */
+    private static class Test {
+        private final int testSuiteIndex;
+        private final TestSuiteParams testSuiteParams;
+        private final String testCaseDirectory;
+        private final int rowId;
+        private long estimatedDuration_ms;
+
+        Test(int testSuiteIndex, TestSuiteParams testSuiteParams, String testCaseDirectory, int rowId) {
+            this.testSuiteIndex = testSuiteIndex;
+            this.testSuiteParams = testSuiteParams;
+            this.testCaseDirectory = testCaseDirectory;
+            this.rowId = rowId;
+        }
+    }
+
+    private final Campaign campaign;
+    private final int shardsCount;
+    private final String sutVersion;
+    private final Map<String, Long> testDurations;
+
+    /**
+     * Creates an executor of a campaign in shards.
+     * @param campaign the campaign
+     * @param shardsCount the number of shards
+     * @param sutVersion the SUT version to pass to the shards, or null if not specified
+     */
+    public ShardedCampaignExecutor(Campaign campaign, int shardsCount, String sutVersion) {
+        this.campaign = campaign;
+        this.shardsCount = shardsCount;
+        this.sutVersion = sutVersion;
+        this.testDurations = readTestDurations();
+    }
+
+    /**
+     * Executes the campaign in the shards and generates the merged reports.
+     * @return true if all the shards executed their campaign successfully, false otherwise
+     */
+    public boolean execute() {
+        for (CampaignRun run : campaign.getRuns()) {
+            TestBedConfiguration.setConfigFile(StaticConfiguration.TESTBED_CONFIG_DIRECTORY + "/" + run.getTestbed());
+            if (TestBedConfiguration.getInstance().hasControlScript()) {
+                logger.error("Testbed " + run.getTestbed() + " has a control script, campaign " + campaign.getName()
+                        + " cannot be executed in shards as they would all start and stop the same SUT");
+                return false;
+            }
+        }
+
+        Date timeStamp = new Date();
+        TestEngineConfiguration config = TestEngineConfiguration.getInstance();
+        File reportDirectory = new File(config.getString("reporting.generated_report_path"),
+                new SimpleDateFormat("yyyy-MM-dd_HH.mm.ss").format(timeStamp));
+
+        // split the runs in shards
+        List<List<CampaignRun>> shardsRuns = new ArrayList<List<CampaignRun>>();
+        for (int shard = 0; shard < shardsCount; shard++) {
+            shardsRuns.add(new ArrayList<CampaignRun>());
+        }
+        for (int runIndex = 0; runIndex < campaign.getRuns().size(); runIndex++) {
+            List<CampaignRun> runShards = splitRun(campaign.getRuns().get(runIndex), runIndex);
+            for (int shard = 0; shard < shardsCount; shard++) {
+                if (!runShards.get(shard).getTestsuites().isEmpty()) {
+                    shardsRuns.get(shard).add(runShards.get(shard));
+                }
+            }
+        }
+
+        // start the shards
+        List<Process> processes = new ArrayList<Process>();
+        List<Thread> outputCopiers = new ArrayList<Thread>();
+        boolean result = true;
+        for (int shard = 0; shard < shardsCount; shard++) {
+            if (shardsRuns.get(shard).isEmpty()) {
+                continue;
+            }
+            File shardDirectory = new File(reportDirectory, "shard-" + (shard + 1));
+            try {
+                processes.add(startShard(shard, shardsRuns.get(shard), shardDirectory, outputCopiers));
+            } catch (Exception e) {
+                logger.error("Unable to start shard " + (shard + 1) + " of campaign " + campaign.getName(), e);
+                result = false;
+            }
+        }
+
+        // wait for the shards end
+        for (Process process : processes) {
+            try {
+                result &= (process.waitFor() == 0); // NOSONAR - Potentially dangerous use of non-short-circuit logic
+            } catch (InterruptedException e) {
+                logger.error("Interrupted while waiting for the end of the shards, killing them");
+                for (Process p : processes) {
+                    p.destroy();
+                }
+                result = false;
+                break;
+            }
+        }
+        for (Thread outputCopier : outputCopiers) {
+            try {
+                outputCopier.join();
+            } catch (InterruptedException e) {
+                break;
+            }
+        }
+
+        generateReports(timeStamp, reportDirectory);
+        return result;
+    }
+
+    /**
+     * Reads the mean duration of the tests in the last archived runs.
+     * @return the mean durations in milliseconds, by test key
+     */
+    private static Map<String, Long> readTestDurations() {
+        try {
+            TestResultsArchive archive = new TestResultsArchive(TestResultsArchive.getConfiguredArchiveDirectory());
+            return TestResultsArchive.getMeanElapsedTimes(archive.readRuns(DURATION_HISTORY_RUNS));
+        } catch (IOException e) {
+            logger.warn("Unable to read the test results archive, the shards will be balanced by number of tests: " + e.getMessage());
+            return new HashMap<String, Long>();
+        }
+    }
+
+    /**
+     * Gets the mean duration of a test in the archived runs. As a shard executes each test case directory
+     * as a test suite, the test may have been archived under its name in the campaign test suite
+     * or under its test case directory name.
+     * @return the mean duration in milliseconds, or null if the test has no history
+     */
+    private Long getTestDuration(Test test) {
+        String testSuiteDirectory = new File(test.testSuiteParams.getDirectory()).getPath();
+        String testCaseName = test.testCaseDirectory;
+        if (testCaseName.startsWith(testSuiteDirectory + File.separator)) {
+            testCaseName = testCaseName.substring(testSuiteDirectory.length() + 1);
+        }
+        Long duration = testDurations.get(testCaseName + " - " + test.rowId);
+        if (duration == null) {
+            duration = testDurations.get(new File(test.testCaseDirectory).getName() + " - " + test.rowId);
+        }
+        return duration;
+    }
+
+    /**
+     * Gets the name of a campaign run in the shards campaigns, which is unique in the campaign so that
+     * the reports of several runs on the same testbed are not merged together.
+     */
+    private String getShardRunName(int runIndex) {
+        return campaign.getRuns().get(runIndex).getName() + " - run " + (runIndex + 1);
+    }
+
+    /**
+     * Splits the selected data rows of the test scripts of a campaign run in shards.
+     * @return the run of each shard, whose test suites are test case directories with selected data rows
+     */
+    private List<CampaignRun> splitRun(CampaignRun run, int runIndex) {
+        TestBedConfiguration.setConfigFile(StaticConfiguration.TESTBED_CONFIG_DIRECTORY + "/" + run.getTestbed());
+        List<Test> tests = new ArrayList<Test>();
+        for (int i = 0; i < run.getTestsuites().size(); i++) {
+            TestSuiteParams testSuiteParams = run.getTestsuites().get(i);
+            DirectoryTestSuite testSuite = DirectoryTestSuite.createDirectoryTestSuite(testSuiteParams.getDirectory());
+            if (testSuite == null) {
+                continue;
+            }
+            testSuite.selectRows(testSuiteParams.getSelectedDataRows());
+            testSuite.selectTestCases(testSuiteParams.getSelectedTestCases());
+            for (TestScript testScript : testSuite.getTestScripts()) {
+                for (TestData testData : testScript.getTestDataSet().getData()) {
+                    if (testData.isSelected()) {
+                        tests.add(new Test(i, testSuiteParams, testScript.getTestCaseDirectory(), testData.getRowId()));
+                    }
+                }
+            }
+        }
+
+        // estimate the durations, the tests without history being estimated to the median duration
+        List<Long> knownDurations = new ArrayList<Long>();
+        for (Test test : tests) {
+            Long duration = getTestDuration(test);
+            if (duration != null) {
+                test.estimatedDuration_ms = duration;
+                knownDurations.add(duration);
+            } else {
+                test.estimatedDuration_ms = -1;
+            }
+        }
+        Collections.sort(knownDurations);
+        long defaultDuration = knownDurations.isEmpty() ? DEFAULT_TEST_DURATION_MS : knownDurations.get(knownDurations.size() / 2);
+        for (Test test : tests) {
+            if (test.estimatedDuration_ms < 0) {
+                test.estimatedDuration_ms = defaultDuration;
+            }
+        }
+
+        // assign the longest tests first, each one to the least loaded shard
+        List<Test> sortedTests = new ArrayList<Test>(tests);
+        Collections.sort(sortedTests, new Comparator<Test>() {
+            public int compare(Test t1, Test t2) {
+                return t1.estimatedDuration_ms > t2.estimatedDuration_ms ? -1 : (t1.estimatedDuration_ms < t2.estimatedDuration_ms ? 1 : 0);
+            }
+        });
+        long[] shardsDurations = new long[shardsCount];
+        Map<Test, Integer> testsShards = new HashMap<Test, Integer>();
+        for (Test test : sortedTests) {
+            int leastLoadedShard = 0;
+            for (int shard = 1; shard < shardsCount; shard++) {
+                if (shardsDurations[shard] < shardsDurations[leastLoadedShard]) {
+                    leastLoadedShard = shard;
+                }
+            }
+            shardsDurations[leastLoadedShard] += test.estimatedDuration_ms;
+            testsShards.put(test, leastLoadedShard);
+        }
+
+        // group the tests of each shard by test script, keeping the campaign order
+        List<CampaignRun> runShards = new ArrayList<CampaignRun>();
+        for (int shard = 0; shard < shardsCount; shard++) {
+            Map<String, TestSuiteParams> shardTestSuites = new LinkedHashMap<String, TestSuiteParams>();
+            for (Test test : tests) {
+                if (testsShards.get(test) != shard) {
+                    continue;
+                }
+                String key = test.testSuiteIndex + File.pathSeparator + test.testCaseDirectory;
+                TestSuiteParams params = shardTestSuites.get(key);
+                if (params == null) {
+                    params = new TestSuiteParams();
+                    params.setDirectory(test.testCaseDirectory);
+                    params.setDataRows(new TreeSet<Integer>());
+                    params.setCount(test.testSuiteParams.getCount());
+                    params.setLoopInHours(test.testSuiteParams.loopInHours());
+                    shardTestSuites.put(key, params);
+                }
+                params.getSelectedDataRows().add(test.rowId);
+            }
+            CampaignRun shardRun = new CampaignRun();
+            shardRun.testbed = run.getTestbed();
+            shardRun.name = getShardRunName(runIndex);
+            shardRun.testsuites.addAll(shardTestSuites.values());
+            runShards.add(shardRun);
+            logger.info("Shard " + (shard + 1) + " of testbed " + run.getTestbed() + ": " + shardRun.testsuites.size()
+                    + " test scripts, estimated duration " + shardsDurations[shard] / 1000 + " s");
+        }
+        return runShards;
+    }
+
+    /**
+     * Writes the campaign and engine configuration files of a shard and starts its JVM.
+     */
+    private Process startShard(int shard, List<CampaignRun> runs, File shardDirectory, List<Thread> outputCopiers) throws Exception {
+        shardDirectory.mkdirs();
+        File campaignFile = new File(shardDirectory, "campaign.xml");
+        // same campaign name in all the shards, so that the reports of a run have the same test suite name
+        writeCampaignFile(campaign.getName(), runs, campaignFile);
+        File engineFile = new File(shardDirectory, "engine.xml");
+        writeEngineFile(shard, shardDirectory, engineFile);
+
+        List<String> command = new ArrayList<String>();
+        command.add(System.getProperty("java.home") + File.separator + "bin" + File.separator + "java");
+        for (String jvmArgument : ManagementFactory.getRuntimeMXBean().getInputArguments()) {
+            // a debugger can only be attached to one JVM on the same port
+            if (!jvmArgument.startsWith("-agentlib:jdwp") && !jvmArgument.startsWith("-Xrunjdwp") && !jvmArgument.equals("-Xdebug")) {
+                command.add(jvmArgument);
+            }
+        }
+        command.add("-cp");
+        command.add(System.getProperty("java.class.path"));
+        command.add(CampaignLauncher.class.getName());
+        command.add(campaignFile.getPath());
+        command.add("-engine");
+        command.add(engineFile.getPath());
+        if (sutVersion != null) {
+            command.add("-sutversion");
+            command.add(sutVersion);
+        }
+
+        ProcessBuilder processBuilder = new ProcessBuilder(command);
+        processBuilder.redirectErrorStream(true);
+        logger.info("Starting shard " + (shard + 1) + " of campaign " + campaign.getName() + " in " + shardDirectory);
+        Process process = processBuilder.start();
+        process.getOutputStream().close();
+        outputCopiers.add(startOutputCopier(process.getInputStream(), new File(shardDirectory, "output.log")));
+        return process;
+    }
+
+    private static Thread startOutputCopier(final InputStream input, final File outputFile) throws IOException {
+        final OutputStream output = new FileOutputStream(outputFile);
+        Thread thread = new Thread("Shard output copier") {
+            @Override
+            public void run() {
+                try {
+                    byte[] buffer = new byte[8192];
+                    int length;
+                    while ((length = input.read(buffer)) > 0) {
+                        output.write(buffer, 0, length);
+                        output.flush();
+                    }
+                } catch (IOException e) {
+                    logger.warn("Error while copying shard output into " + outputFile + ": " + e.getMessage());
+                } finally {
+                    try {
+                        output.close();
+                    } catch (IOException e) {
+                        logger.warn("Unable to close " + outputFile + ": " + e.getMessage());
+                    }
+                }
+            }
+        };
+        thread.setDaemon(true);
+        thread.start();
+        return thread;
+    }
+
+    private void writeCampaignFile(String campaignName, List<CampaignRun> runs, File file) throws Exception {
+        Document doc = DocumentBuilderFactory.newInstance().newDocumentBuilder().newDocument();
+        Element campaignElement = doc.createElement("campaign");
+        campaignElement.setAttribute("name", campaignName);
+        if (campaign.getProfilingInterval() > 0) {
+            campaignElement.setAttribute("profile", String.valueOf(campaign.getProfilingInterval()));
+        }
+        doc.appendChild(campaignElement);
+        for (CampaignRun run : runs) {
+            Element runElement = doc.createElement("run");
+            runElement.setAttribute("testbed", run.getTestbed());
+            runElement.setAttribute("name", run.getName());
+            for (TestSuiteParams params : run.getTestsuites()) {
+                Element testSuiteElement = doc.createElement("testsuite");
+                testSuiteElement.setAttribute("directory", params.getDirectory());
+                StringBuilder selector = new StringBuilder();
+                for (Integer rowId : params.getSelectedDataRows()) {
+                    if (selector.length() > 0) {
+                        selector.append(',');
+                    }
+                    selector.append(rowId);
+                }
+                Element testDataElement = doc.createElement("testdata");
+                testDataElement.setAttribute("selector", selector.toString());
+                testSuiteElement.appendChild(testDataElement);
+                if (params.getCount() != 1) {
+                    Element countElement = doc.createElement("count");
+                    countElement.setTextContent(String.valueOf(params.getCount()));
+                    testSuiteElement.appendChild(countElement);
+                }
+                if (params.loopInHours()) {
+                    testSuiteElement.appendChild(doc.createElement("loopInHours"));
+                }
+                runElement.appendChild(testSuiteElement);
+            }
+            campaignElement.appendChild(runElement);
+        }
+        Transformer transformer = TransformerFactory.newInstance().newTransformer();
+        transformer.setOutputProperty(OutputKeys.METHOD, "xml");
+        transformer.setOutputProperty(OutputKeys.ENCODING, "ISO-8859-1");
+        transformer.setOutputProperty(OutputKeys.INDENT, "yes");
+        transformer.transform(new DOMSource(doc), new StreamResult(file));
+    }
+
+    /**
+     * Writes the engine configuration of a shard: the current engine configuration with the shard directory as
+     * report directory, the same test results archive and a log4j server port specific to the shard.
+     */
+    private static void writeEngineFile(int shard, File shardDirectory, File file) throws Exception {
+        TestEngineConfiguration config = TestEngineConfiguration.getInstance();
+        int log4jServerPort = config.getInt("log4j_server.port", DEFAULT_LOG4J_SERVER_PORT);
+        XMLConfiguration shardConfig = (XMLConfiguration) config.clone();
+        shardConfig.setProperty("reporting.generated_report_path", shardDirectory.getAbsolutePath());
+        shardConfig.setProperty("reporting.archive_path", TestResultsArchive.getConfiguredArchiveDirectory().getAbsolutePath());
+        shardConfig.setProperty("log4j_server.port", log4jServerPort + 1 + shard);
+        shardConfig.save(file);
+    }
+
+    /**
+     * Merges the XML reports of the shards, by campaign run, and generates the campaign report.
+     */
+    private void generateReports(Date timeStamp, File reportDirectory) {
+        Map<String, List<XMLReportMerger.Report>> reportsByTestSuite = new LinkedHashMap<String, List<XMLReportMerger.Report>>();
+        for (File reportFile : XMLReportMerger.findReportFiles(reportDirectory)) {
+            try {
+                XMLReportMerger.Report report = new XMLReportMerger.Report(reportFile);
+                List<XMLReportMerger.Report> testSuiteReports = reportsByTestSuite.get(report.getTestSuite());
+                if (testSuiteReports == null) {
+                    testSuiteReports = new ArrayList<XMLReportMerger.Report>();
+                    reportsByTestSuite.put(report.getTestSuite(), testSuiteReports);
+                }
+                testSuiteReports.add(report);
+            } catch (IOException e) {
+                logger.error("Unable to read XML report " + reportFile, e);
+            }
+        }
+
+        CampaignReportManager campaignReportManager = CampaignReportManager.getInstance();
+        campaignReportManager.startReport(timeStamp, campaign.getName());
+        for (int runIndex = 0; runIndex < campaign.getRuns().size(); runIndex++) {
+            CampaignRun run = campaign.getRuns().get(runIndex);
+            String runName = getShardRunName(runIndex);
+            String testSuiteName = campaign.getName() + " - " + runName;
+            CampaignResult result = new CampaignResult(run.getTestbed());
+            List<XMLReportMerger.Report> runReports = reportsByTestSuite.get(testSuiteName);
+            if (runReports == null) {
+                result.setStatus(CampaignResult.Status.NOT_EXECUTED);
+            } else {
+                File mergedReportFile = new File(reportDirectory, "log-" + runName.replaceAll("[^\\w\\-.]", "_") + ".xml");
+                result.setDetailedURL(mergedReportFile.getPath());
+                try {
+                    XMLReportMerger.Report merged = XMLReportMerger.merge(runReports, testSuiteName, mergedReportFile);
+                    result.setResult(merged.getCounter("numberTestsToExecute"), merged.getCounter("numberTestsExecuted"),
+                            merged.getCounter("numberTestsPassed"), merged.getCounter("numberTestsFailed"),
+                            merged.getCounter("numberTestsNotAvailable"), merged.getCounter("numberTestsRetries"),
+                            merged.getDate("startDate"), merged.getDate("endDate"));
+                    logger.info("Merged " + runReports.size() + " XML reports of run " + runName + " into " + mergedReportFile);
+                } catch (IOException e) {
+                    logger.error("Unable to merge the XML reports of run " + runName, e);
+                    result.setStatus(CampaignResult.Status.NOT_AVAILABLE);
+                }
+            }
+            campaignReportManager.putEntry(result);
+        }
+        campaignReportManager.refresh();
+        campaignReportManager.stopReport();
+    }
+}
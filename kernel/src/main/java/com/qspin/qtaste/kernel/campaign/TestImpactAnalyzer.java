@@ -0,0 +1,423 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.kernel.campaign;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileFilter;
+import java.io.FileReader;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.util.ArrayList;
+import java.util.Collection;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.LinkedHashSet;
+import java.util.LinkedList;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.regex.Matcher;
+import java.util.regex.Pattern;
+
+import org.apache.log4j.Logger;
+
+import com.qspin.qtaste.config.StaticConfiguration;
+import com.qspin.qtaste.io.CSVFile;
+import com.qspin.qtaste.testsuite.impl.JythonTestScript;
+import com.qspin.qtaste.util.FileUtilities;
+import com.qspin.qtaste.util.Log4jLoggerFactory;
+
+/**
+ * Selects the test cases of a campaign which are affected by a set of changed files.
+ * <p>
+ * The dependencies of a test case are:
+ * <ul>
+ * <li>the files of its test case directory, including its test script, its test data and its requirements,
+ * <li>the files referenced by its "FILE_" test data,
+ * <li>the pythonlib modules imported by its test script, and recursively by these modules,
+ * <li>the dependencies of the test scripts imported using importTestScript(),
+ * <li>the components it gets from the test API, a changed file named after a component
+ *     (e.g. Engine.java or EngineImpl.java for the Engine component) affecting the test cases using it.
+ * </ul>
+ * The test suites marked with the "smoke" attribute in the campaign file are always executed.
+ */
+public class TestImpactAnalyzer {
+
+    private static Logger logger = Log4jLoggerFactory.getLogger(TestImpactAnalyzer.class);
+    private static final Pattern IMPORT_MODULE_PATTERN = Pattern.compile("^\\s*import\\s+([\\w.]+(?:\\s*,\\s*[\\w.]+)*)");
+    private static final Pattern IMPORT_SYMBOLS_PATTERN = Pattern.compile("^\\s*from\\s+([\\w.]+)\\s+import\\s+\\(?\\s*(\\*|\\w+(?:\\s*,\\s*\\w+)*)");
+    private static final Pattern IMPORT_TEST_SCRIPT_PATTERN = Pattern.compile("importTestScript\\s*\\(\\s*[rR]?['\"]([^'\"]+)['\"]");
+    private static final Pattern COMPONENT_PATTERN = Pattern.compile("testAPI\\s*\\.\\s*get(\\w+)\\s*\\(");
+    private static final String GIT_CHANGES_PREFIX = "git:";
+
+    private final Set<File> changedFiles = new HashSet<File>();
+    private final Set<String> changedComponents = new HashSet<String>();
+    // imported modules and used components of the python files already parsed, by canonical file
+    private final Map<File, PythonFile> pythonFiles = new HashMap<File, PythonFile>();
+    // complete transitive dependencies of the python files, by python path and canonical file
+    private final Map<List<String>, Map<File, PythonDependencies>> pythonFilesDependencies = new HashMap<List<String>, Map<File, PythonDependencies>>();
+
+    /**
+     * Modules imported and components used directly by a python file.
+     */
+    private static class PythonFile {
+        private final List<String> modules = new ArrayList<String>();
+        private final Set<String> components = new HashSet<String>();
+    }
+
+    /**
+     * Dependencies of a python file: the files it depends on, itself included, and the components it uses.
+     */
+    private static class PythonDependencies {
+        private final Set<File> files = new HashSet<File>();
+        private final Set<String> components = new HashSet<String>();
+
+        private void addAll(PythonDependencies dependencies) {
+            files.addAll(dependencies.files);
+            components.addAll(dependencies.components);
+        }
+    }
+
+    /**
+     * Creates an analyzer for a set of changed files.
+     * @param changedFiles the changed files, relative to the current directory or absolute
+     */
+    public TestImpactAnalyzer(Collection<String> changedFiles) {
+        for (String changedFile : changedFiles) {
+            File file = getCanonicalFile(new File(changedFile));
+            this.changedFiles.add(file);
+            String component = file.getName();
+            if (component.lastIndexOf('.') > 0) {
+                component = component.substring(0, component.lastIndexOf('.'));
+            }
+            if (component.endsWith("Impl")) {
+                component = component.substring(0, component.length() - "Impl".length());
+            }
+            changedComponents.add(component);
+        }
+    }
+
+    /**
+     * Reads the changed files.
+     * @param changes "git:<revision>" to get the files changed since a git revision, in the working tree
+     *                of the current directory, or the name of a file listing the changed files, one per line
+     * @return the changed files, relative to the current directory or absolute
+     * @throws IOException if the changed files cannot be read
+     */
+    public static List<String> readChangedFiles(String changes) throws IOException {
+        BufferedReader reader;
+        Process process = null;
+        if (changes.startsWith(GIT_CHANGES_PREFIX)) {
+            String revision = changes.substring(GIT_CHANGES_PREFIX.length());
+            logger.info("Getting the files changed since git revision " + revision);
+            ProcessBuilder processBuilder = new ProcessBuilder("git", "diff", "--name-only", "--relative", revision);
+            processBuilder.redirectErrorStream(true);
+            process = processBuilder.start();
+            process.getOutputStream().close();
+            reader = new BufferedReader(new InputStreamReader(process.getInputStream()));
+        } else {
+            reader = new BufferedReader(new FileReader(changes));
+        }
+        List<String> changedFiles = new ArrayList<String>();
+        try {
+            String line;
+            while ((line = reader.readLine()) != null) {
+                line = line.trim();
+                if (line.length() > 0) {
+                    changedFiles.add(line);
+                }
+            }
+        } finally {
+            reader.close();
+        }
+        if (process != null) {
+            try {
+                if (process.waitFor() != 0) {
+                    throw new IOException("git diff failed: " + changedFiles);
+                }
+            } catch (InterruptedException e) {
+                throw new IOException("Interrupted while waiting for git diff");
+            }
+        }
+        return changedFiles;
+    }
+
+    /**
+     * Restricts the test suites of a campaign to the test cases affected by the changed files, the test suites
+     * marked as smoke tests being kept entirely. The test suites without affected test case and the runs without
+     * test suite are removed.
+     * @param campaign the campaign, which is modified
+     * @return the number of selected test cases, smoke test suites not included
+     */
+    public int selectAffectedTestCases(Campaign campaign) {
+        int selectedTestCasesCount = 0;
+        for (Iterator<CampaignRun> runIterator = campaign.getRuns().iterator(); runIterator.hasNext();) {
+            CampaignRun run = runIterator.next();
+            for (Iterator<TestSuiteParams> testSuiteIterator = run.getTestsuites().iterator(); testSuiteIterator.hasNext();) {
+                TestSuiteParams testSuiteParams = testSuiteIterator.next();
+                if (testSuiteParams.isSmoke()) {
+                    logger.info("Keeping smoke test suite " + testSuiteParams.getDirectory());
+                    continue;
+                }
+                Set<String> selectedTestCases = new LinkedHashSet<String>();
+                for (File testCaseDirectory : findTestCaseDirectories(new File(testSuiteParams.getDirectory()))) {
+                    String reason = getImpactReason(testCaseDirectory);
+                    if (reason != null) {
+                        logger.info("Selecting test case " + testCaseDirectory + ": " + reason);
+                        selectedTestCases.add(testCaseDirectory.getPath());
+                    }
+                }
+                if (selectedTestCases.isEmpty()) {
+                    testSuiteIterator.remove();
+                } else {
+                    testSuiteParams.setSelectedTestCases(selectedTestCases);
+                    selectedTestCasesCount += selectedTestCases.size();
+                }
+            }
+            if (run.getTestsuites().isEmpty()) {
+                logger.info("No test case affected for testbed " + run.getTestbed());
+                runIterator.remove();
+            }
+        }
+        return selectedTestCasesCount;
+    }
+
+    /**
+     * Finds the test case directories of a test suite directory, as DirectoryTestSuite does.
+     * @param directory the test suite directory
+     * @return the test case directories, in alphabetical order
+     */
+    public static List<File> findTestCaseDirectories(File directory) {
+        List<File> testCaseDirectories = new ArrayList<File>();
+        if (new File(directory, StaticConfiguration.TEST_SCRIPT_FILENAME).exists()
+                && new File(directory, StaticConfiguration.TEST_DATA_FILENAME).exists()) {
+            testCaseDirectories.add(directory);
+        } else {
+            File[] subdirectories = FileUtilities.listSortedFiles(directory, new FileFilter() {
+                public boolean accept(File pathname) {
+                    return pathname.isDirectory();
+                }
+            });
+            if (subdirectories != null) {
+                for (File subdirectory : subdirectories) {
+                    testCaseDirectories.addAll(findTestCaseDirectories(subdirectory));
+                }
+            }
+        }
+        return testCaseDirectories;
+    }
+
+    /**
+     * Checks if a test case is affected by the changed files.
+     * @param testCaseDirectory the test case directory
+     * @return the reason why the test case is affected, or null if it is not affected
+     */
+    public String getImpactReason(File testCaseDirectory) {
+        File canonicalTestCaseDirectory = getCanonicalFile(testCaseDirectory);
+        for (File changedFile : changedFiles) {
+            if (isInDirectory(changedFile, canonicalTestCaseDirectory)) {
+                return changedFile + " changed";
+            }
+        }
+        PythonDependencies dependencies = getTestCaseDependencies(canonicalTestCaseDirectory, new HashSet<File>());
+        for (File file : dependencies.files) {
+            if (changedFiles.contains(file)) {
+                return "dependency " + file + " changed";
+            }
+        }
+        for (String component : dependencies.components) {
+            if (changedComponents.contains(component)) {
+                return "component " + component + " changed";
+            }
+        }
+        return null;
+    }
+
+    private PythonDependencies getTestCaseDependencies(File testCaseDirectory, Set<File> visitedTestCases) {
+        PythonDependencies dependencies = new PythonDependencies();
+        if (!visitedTestCases.add(testCaseDirectory)) {
+            return dependencies;
+        }
+        File testScriptFile = new File(testCaseDirectory, StaticConfiguration.TEST_SCRIPT_FILENAME);
+        dependencies.addAll(getPythonFileDependencies(testScriptFile, JythonTestScript.getAdditionalPythonPath(testScriptFile)));
+
+        // files referenced by test data
+        File testDataFile = new File(testCaseDirectory, StaticConfiguration.TEST_DATA_FILENAME);
+        dependencies.files.add(testDataFile);
+        try {
+            for (LinkedHashMap<String, String> row : new CSVFile(testDataFile).getCSVDataSet()) {
+                for (Map.Entry<String, String> data : row.entrySet()) {
+                    if (data.getKey().startsWith("FILE_") && data.getValue() != null && data.getValue().length() > 0) {
+                        File file = new File(data.getValue());
+                        dependencies.files.add(getCanonicalFile(file.isAbsolute() ? file : new File(testCaseDirectory, data.getValue())));
+                    }
+                }
+            }
+        } catch (IOException e) {
+            logger.warn("Unable to read test data file " + testDataFile + ": " + e.getMessage());
+        }
+
+        // imported test scripts, whose path is relative to the parent directory of the test case directory
+        for (String importedTestScript : readImportedTestScripts(testScriptFile)) {
+            File importedTestCaseDirectory = getCanonicalFile(new File(testCaseDirectory.getParentFile(), importedTestScript));
+            dependencies.addAll(getTestCaseDependencies(importedTestCaseDirectory, visitedTestCases));
+        }
+        return dependencies;
+    }
+
+    /**
+     * Gets the dependencies of a python file, i.e. the file itself, the modules it imports from the python path,
+     * recursively, and the components it uses.
+     * <p>
+     * The import graph is walked until all the reachable modules are visited, so that the dependencies of modules
+     * in circular imports are complete. Only complete dependencies are memoized.
+     */
+    private PythonDependencies getPythonFileDependencies(File file, List<String> pythonPath) {
+        file = getCanonicalFile(file);
+        Map<File, PythonDependencies> pythonPathDependencies = pythonFilesDependencies.get(pythonPath);
+        if (pythonPathDependencies == null) {
+            pythonPathDependencies = new HashMap<File, PythonDependencies>();
+            pythonFilesDependencies.put(new ArrayList<String>(pythonPath), pythonPathDependencies);
+        }
+        PythonDependencies dependencies = pythonPathDependencies.get(file);
+        if (dependencies != null) {
+            return dependencies;
+        }
+        dependencies = new PythonDependencies();
+        LinkedList<File> filesToVisit = new LinkedList<File>();
+        filesToVisit.add(file);
+        while (!filesToVisit.isEmpty()) {
+            File visitedFile = filesToVisit.removeFirst();
+            if (!dependencies.files.add(visitedFile)) {
+                continue;
+            }
+            PythonDependencies visitedFileDependencies = pythonPathDependencies.get(visitedFile);
+            if (visitedFileDependencies != null) {
+                dependencies.addAll(visitedFileDependencies);
+                continue;
+            }
+            PythonFile pythonFile = parsePythonFile(visitedFile);
+            dependencies.components.addAll(pythonFile.components);
+            for (String module : pythonFile.modules) {
+                File moduleFile = findModule(module, pythonPath);
+                if (moduleFile != null) {
+                    filesToVisit.add(getCanonicalFile(moduleFile));
+                }
+            }
+        }
+        pythonPathDependencies.put(file, dependencies);
+        return dependencies;
+    }
+
+    /**
+     * Parses the modules imported and the components used directly by a python file.
+     */
+    private PythonFile parsePythonFile(File file) {
+        PythonFile pythonFile = pythonFiles.get(file);
+        if (pythonFile != null) {
+            return pythonFile;
+        }
+        pythonFile = new PythonFile();
+        pythonFiles.put(file, pythonFile);
+        try {
+            BufferedReader reader = new BufferedReader(new FileReader(file));
+            try {
+                String line;
+                while ((line = reader.readLine()) != null) {
+                    line = line.split("#", 2)[0];
+                    Matcher matcher = IMPORT_SYMBOLS_PATTERN.matcher(line);
+                    if (matcher.find()) {
+                        for (String symbol : matcher.group(2).split("\\s*,\\s*")) {
+                            // the imported symbol may be a sub-module
+                            if (!symbol.equals("*")) {
+                                pythonFile.modules.add(matcher.group(1) + "." + symbol);
+                            }
+                        }
+                        pythonFile.modules.add(matcher.group(1));
+                    } else {
+                        matcher = IMPORT_MODULE_PATTERN.matcher(line);
+                        if (matcher.find()) {
+                            for (String module : matcher.group(1).split("\\s*,\\s*")) {
+                                pythonFile.modules.add(module);
+                            }
+                        }
+                    }
+                    matcher = COMPONENT_PATTERN.matcher(line);
+                    while (matcher.find()) {
+                        pythonFile.components.add(matcher.group(1));
+                    }
+                }
+            } finally {
+                reader.close();
+            }
+        } catch (IOException e) {
+            logger.warn("Unable to read python file " + file + ": " + e.getMessage());
+        }
+        return pythonFile;
+    }
+
+    private static File findModule(String module, List<String> pythonPath) {
+        String modulePath = module.replace('.', File.separatorChar);
+        for (String directory : pythonPath) {
+            File moduleFile = new File(directory, modulePath + ".py");
+            if (moduleFile.isFile()) {
+                return moduleFile;
+            }
+            moduleFile = new File(directory, modulePath + File.separator + "__init__.py");
+            if (moduleFile.isFile()) {
+                return moduleFile;
+            }
+        }
+        return null;
+    }
+
+    private static List<String> readImportedTestScripts(File testScriptFile) {
+        List<String> importedTestScripts = new ArrayList<String>();
+        try {
+            Matcher matcher = IMPORT_TEST_SCRIPT_PATTERN.matcher(FileUtilities.readFileContent(testScriptFile.getPath()));
+            while (matcher.find()) {
+                importedTestScripts.add(matcher.group(1));
+            }
+        } catch (IOException e) {
+            logger.warn("Unable to read test script " + testScriptFile + ": " + e.getMessage());
+        }
+        return importedTestScripts;
+    }
+
+    private static boolean isInDirectory(File file, File directory) {
+        for (File parent = file.getParentFile(); parent != null; parent = parent.getParentFile()) {
+            if (parent.equals(directory)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    private static File getCanonicalFile(File file) {
+        try {
+            return file.getAbsoluteFile().getCanonicalFile();
+        } catch (IOException e) {
+            return file.getAbsoluteFile();
+        }
+    }
+}
@@ -19,6 +19,7 @@
 
 package com.qspin.qtaste.kernel.campaign;
 
+import java.util.Set;
 import java.util.SortedSet;
 
 /**
@@ -30,6 +31,8 @@ public class TestSuiteParams {
     private SortedSet<Integer> selectedDataRows;
     private int count = 1; // default value for counter
     private boolean loopInHours;
+    private boolean smoke;
+    private Set<String> selectedTestCases;
     
     public String getDirectory() {
         return directory;
@@ -62,4 +65,26 @@ public class TestSuiteParams {
     public void setLoopInHours(boolean loopInHours) {
         this.loopInHours = loopInHours;
     }
+
+    /**
+     * @return true if the test suite is a smoke test suite, always executed when the tests are selected by impact analysis
+     */
+    public boolean isSmoke() {
+        return smoke;
+    }
+    
+    public void setSmoke(boolean smoke) {
+        this.smoke = smoke;
+    }
+    
+    /**
+     * @return the directories of the test cases to execute, or null to execute all the test cases of the test suite
+     */
+    public Set<String> getSelectedTestCases() {
+        return selectedTestCases;
+    }
+    
+    public void setSelectedTestCases(Set<String> selectedTestCases) {
+        this.selectedTestCases = selectedTestCases;
+    }
 }
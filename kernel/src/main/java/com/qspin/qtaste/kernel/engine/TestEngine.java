@@ -37,6 +37,8 @@ import com.qspin.qtaste.config.TestBedConfiguration;
 import com.qspin.qtaste.config.TestEngineConfiguration;
 import com.qspin.qtaste.datacollection.collection.ProbeManager;
 import com.qspin.qtaste.kernel.campaign.CampaignManager;
+import com.qspin.qtaste.kernel.testapi.ComponentLifecycle;
+import com.qspin.qtaste.kernel.testapi.TestAPIImpl;
 import com.qspin.qtaste.log.Log4jServer;
 import com.qspin.qtaste.reporter.testresults.TestResult;
 import com.qspin.qtaste.reporter.testresults.TestResult.Status;
@@ -44,6 +46,7 @@ import com.qspin.qtaste.reporter.testresults.TestResultImpl;
 import com.qspin.qtaste.reporter.testresults.TestResultsReportManager;
 import com.qspin.qtaste.testsuite.TestSuite;
 import com.qspin.qtaste.testsuite.impl.DirectoryTestSuite;
+import com.qspin.qtaste.testsuite.impl.JythonScriptProfiler;
 import com.qspin.qtaste.util.Exec;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
 import com.qspin.qtaste.util.versioncontrol.VersionControl;
@@ -67,6 +70,8 @@ public class TestEngine {
 	private static volatile boolean isSUTStartingManually = false;
 	private static volatile boolean isSUTStartedManually = false;
     private static volatile boolean isSUTRunning = false;
+	// warm standby SUT instance starter, started in background to replace the SUT instance when it has to be restarted
+	private static StandbySUTStarter standbySUTStarter;
 
 	/**
 	 * Check if Test was aborted by user.
@@ -149,6 +154,9 @@ public class TestEngine {
         	reportManager.startReport(new Date(), testSuite.getName());
         }
 		boolean executionSuccess = testSuite.execute(debug, true);
+		// components living for the campaign are terminated at the end of the campaign, if any
+		TestAPIImpl.getInstance().terminateComponents(CampaignManager.getInstance().getCurrentCampaign() != null ?
+				ComponentLifecycle.Scope.TEST_SUITE : ComponentLifecycle.Scope.CAMPAIGN);
 		reportManager.stopReport();
 		currentTestSuite = null;
 		return executionSuccess;
@@ -197,11 +205,31 @@ public class TestEngine {
 			}
 			isStartStopSUTCancelled = true;
 			sutStartStopExec.kill();
+			if (standbySUTStarter != null) {
+				standbySUTStarter.cancel();
+			}
 		}
 	}
 
 	private static boolean startOrStopSUT(boolean start, TestResult tr) {
 		needToRestartSUT = !start;
+		return runControlScript(start, getActiveControlScriptArguments(), TestBedConfiguration.isStandbyInstancesActive(),
+				isRestartingSUT, sutStartStopExec, tr);
+	}
+
+	/**
+	 * Executes the start or stop command of the control script.
+	 *
+	 * @param start true to start the SUT, false to stop it
+	 * @param scriptArguments the arguments of the control script, or null if none
+	 * @param standbyInstance true if the command controls the SUT instance started with the standby arguments,
+	 *        given to the control script by the SUT_INSTANCE environment variable
+	 * @param restart true if the SUT is restarted
+	 * @param exec the executor of the command, used to cancel it
+	 * @param tr the test result in which errors are reported, or null
+	 * @return true if the command succeeded, false otherwise
+	 */
+	private static boolean runControlScript(boolean start, String scriptArguments, boolean standbyInstance, boolean restart, Exec exec, TestResult tr) {
 		String startOrStop = start ? "start" : "stop";
 		TestBedConfiguration config = TestBedConfiguration.getInstance();
 		if (hasControlScript()) {
@@ -225,8 +253,7 @@ public class TestEngine {
 								    + " -cp \"" + jythonHome + "/../build/jython-engine.jar" + File.pathSeparator
 									+ jythonJar + File.pathSeparator + classPath + "\" org.python.util.jython";
 			}
-			String scriptArguments = config.getControlScriptArguments();
-			String startOrStopCommand = scriptFilename + " " + startOrStop + " " + (scriptArguments != null ? scriptArguments : "") + (isRestartingSUT ? "-restart true" : "");
+			String startOrStopCommand = scriptFilename + " " + startOrStop + " " + (scriptArguments != null ? scriptArguments : "") + (restart ? "-restart true" : "");
 			logger.info((start ? "Starting" : "Stopping") + " SUT using command '" + startOrStopCommand + "'");
 			// report the control script
 			try {
@@ -234,9 +261,10 @@ public class TestEngine {
 				Map<String, String> env = new HashMap<String, String>(
 						System.getenv());
 				env.put("TESTBED", config.getFileName());
+				env.put("SUT_INSTANCE", standbyInstance ? "standby" : "main");
 				String startOrStopFullCommand = (scriptEngine != null ? scriptEngine + " " + startOrStopCommand : startOrStopCommand);
 				logger.trace("FULL COMMAND : '" + startOrStopFullCommand + "'");
-				int exitCode = sutStartStopExec.exec(startOrStopFullCommand, env, output);
+				int exitCode = exec.exec(startOrStopFullCommand, env, output);
 				if (isStartStopSUTCancelled || (start && isAbortedByUser())) {
 					String errMsg = "SUT " + startOrStop + " command cancelled";
 					logger.info(errMsg);
@@ -287,7 +315,17 @@ public class TestEngine {
 			TestResultsReportManager reportManager = TestResultsReportManager.getInstance();
 			reportManager.putEntry(tr);
 			isRestartingSUT = true;
-			boolean returnValue = stopSUT(tr) && startSUT(tr);
+			// the components may be connected to the SUT
+			TestAPIImpl.getInstance().terminateComponents();
+			boolean returnValue;
+			if (swapToStandbySUT()) {
+				returnValue = true;
+			} else {
+				returnValue = stopSUT(tr) && startSUT(tr);
+				if (returnValue && hasWarmStandby()) {
+					startStandbySUT();
+				}
+			}
 			isRestartingSUT = false;
 			tr.stop();
 			reportManager.refresh();
@@ -298,10 +336,141 @@ public class TestEngine {
 		}
 	}
 
+	/**
+	 * Check if the testbed declares a warm standby SUT instance, i.e. control script arguments
+	 * to start a second SUT instance on the alternate ports of the standby component instances.
+	 */
+	private static boolean hasWarmStandby() {
+		return useControlScript() && TestBedConfiguration.getInstance().getControlScriptStandbyArguments() != null;
+	}
+
+	/**
+	 * Return the control script arguments of the SUT instance used by the components.
+	 */
+	private static String getActiveControlScriptArguments() {
+		TestBedConfiguration config = TestBedConfiguration.getInstance();
+		return TestBedConfiguration.isStandbyInstancesActive() ? config.getControlScriptStandbyArguments() : config.getControlScriptArguments();
+	}
+
+	/**
+	 * Return the control script arguments of the SUT instance not used by the components.
+	 */
+	private static String getInactiveControlScriptArguments() {
+		TestBedConfiguration config = TestBedConfiguration.getInstance();
+		return TestBedConfiguration.isStandbyInstancesActive() ? config.getControlScriptArguments() : config.getControlScriptStandbyArguments();
+	}
+
+	/**
+	 * Start (after stopping it) the SUT instance not used by the components in background, as warm standby instance.
+	 */
+	private static void startStandbySUT() {
+		standbySUTStarter = new StandbySUTStarter(getInactiveControlScriptArguments(), !TestBedConfiguration.isStandbyInstancesActive());
+		standbySUTStarter.start();
+	}
+
+	/**
+	 * Swap the components to the warm standby SUT instance, waiting for it to be started if needed,
+	 * and replace the previous SUT instance by a new warm standby instance in background.
+	 *
+	 * @return true if the components have been swapped, false if there is no warm standby SUT instance
+	 *         or if it couldn't be started
+	 */
+	private static boolean swapToStandbySUT() {
+		if (standbySUTStarter == null) {
+			return false;
+		}
+		boolean standbyStarted = standbySUTStarter.waitForEnd();
+		standbySUTStarter = null;
+		if (!standbyStarted) {
+			return false;
+		}
+		TestBedConfiguration.setStandbyInstancesActive(!TestBedConfiguration.isStandbyInstancesActive());
+		needToRestartSUT = false;
+		setSUTAsRunning(false);
+		logger.info("SUT swapped to warm standby instance");
+		startStandbySUT();
+		return true;
+	}
+
+	/**
+	 * Stop the warm standby SUT instance, cancelling its start if it is in progress.
+	 *
+	 * @param tr the test result in which errors are reported
+	 */
+	private static void stopStandbySUT(TestResult tr) {
+		if (standbySUTStarter != null) {
+			standbySUTStarter.cancel();
+			standbySUTStarter.waitForEnd();
+			standbySUTStarter = null;
+			logger.info("Stopping warm standby SUT instance");
+			runControlScript(false, getInactiveControlScriptArguments(), !TestBedConfiguration.isStandbyInstancesActive(), false, new Exec(), tr);
+		}
+	}
+
+	/**
+	 * Thread starting the warm standby SUT instance, after stopping it.
+	 */
+	private static class StandbySUTStarter extends Thread {
+		private final String scriptArguments;
+		private final boolean standbyInstance;
+		private final Exec exec = new Exec();
+		private volatile boolean started = false;
+		private volatile boolean cancelled = false;
+
+		private StandbySUTStarter(String scriptArguments, boolean standbyInstance) {
+			super("StandbySUTStarter");
+			this.scriptArguments = scriptArguments;
+			this.standbyInstance = standbyInstance;
+			setDaemon(true);
+		}
+
+		@Override
+		public void run() {
+			logger.info("Starting warm standby SUT instance");
+			started = runControlScript(false, scriptArguments, standbyInstance, false, exec, null) && !cancelled
+					&& runControlScript(true, scriptArguments, standbyInstance, false, exec, null) && !cancelled;
+			if (!started && !cancelled) {
+				logger.error("Couldn't start warm standby SUT instance, the SUT will be restarted without it");
+			}
+		}
+
+		private void cancel() {
+			cancelled = true;
+			exec.kill();
+		}
+
+		/**
+		 * Wait for the end of the start of the warm standby SUT instance.
+		 *
+		 * @return true if the warm standby SUT instance has been started, false otherwise
+		 */
+		private boolean waitForEnd() {
+			if (isAlive()) {
+				logger.info("Waiting for warm standby SUT instance to be started");
+			}
+			try {
+				join();
+			} catch (InterruptedException e) {
+				logger.warn("Interrupted while waiting for warm standby SUT instance to be started");
+				return false;
+			}
+			return started;
+		}
+	}
+
 	public static boolean needToRestartSUT() {
 		return useControlScript() && needToRestartSUT;
 	}
 
+	/**
+	 * Check if the SUT can be restarted, i.e. if a control_script is declared.
+	 *
+	 * @return true if the SUT can be restarted, false otherwise
+	 */
+	public static boolean canRestartSUT() {
+		return useControlScript();
+	}
+
 	/**
 	 * Set need to restart SUT.
 	 *
@@ -332,10 +501,16 @@ public class TestEngine {
 			tr.start();
 			TestResultsReportManager reportManager = TestResultsReportManager.getInstance();
 			reportManager.putEntry(tr);
+			// a warm standby SUT instance left by a previous initialization is stopped as the SUT is started again
+			stopStandbySUT(tr);
+			TestBedConfiguration.setStandbyInstancesActive(false);
 			success &= stopSUT(tr);
 			if (success) {
 				success &= startSUT(tr);
 			}
+			if (success && hasWarmStandby()) {
+				startStandbySUT();
+			}
 			tr.stop();
 			reportManager.refresh();
 			if (!success) {
@@ -360,12 +535,16 @@ public class TestEngine {
 		isStartStopSUTCancelled = false;
 
 		if (useControlScript()) {
+			// the components may be connected to the SUT
+			TestAPIImpl.getInstance().terminateComponents();
 			TestResultsReportManager reportManager = TestResultsReportManager.getInstance();
 			TestResult tr = new TestResultImpl("Stop SUT", null, null, 1, 1);
 			tr.setTestScriptVersion("-");
 			tr.start();
 			reportManager.putEntry(tr);
 			stopSUT(tr);
+			stopStandbySUT(tr);
+			TestBedConfiguration.setStandbyInstancesActive(false);
 			tr.stop();
 			reportManager.refresh();
 		}
@@ -397,7 +576,7 @@ public class TestEngine {
 	}
 
 	private static void showUsage() {
-		System.err.println("Usage: <command> -testsuite <testsuiteDirectory> -testbed <configFileName.xml> [-engine <engineFileName.xml>] [-loop [<count> | <hours>h]] [-sutversion <sut_version_identifier>]");
+		System.err.println("Usage: <command> -testsuite <testsuiteDirectory> -testbed <configFileName.xml> [-engine <engineFileName.xml>] [-loop [<count> | <hours>h]] [-segment <count> | <hours>h] [-sutversion <sut_version_identifier>] [-profile [<sampling_interval_ms>]]");
 		shutdown();
 		System.exit(1);
 	}
@@ -413,13 +592,15 @@ public class TestEngine {
 			logger.info("QTaste testAPI version: " + VersionControl.getInstance().getTestApiVersion(""));
 
 			// handle optional config file name
-			if ((args.length < 4) || (args.length > 10)) {
+			if ((args.length < 4) || (args.length > 14)) {
 				showUsage();
 			}
 			String testSuiteDir = null;
 			String testbed = null;
 			int numberLoops = 1;
 			boolean loopsInHours = false;
+			int segmentSize = 0;
+			boolean segmentsInHours = false;
 			int i = 0;
 			while (i < args.length) {
 				if (args[i].equals("-testsuite") && (i + 1 < args.length)) {
@@ -469,10 +650,47 @@ public class TestEngine {
 						i++;
 					}
 					logger.info(message);
+				} else if (args[i].equals("-segment") && (i + 1 < args.length)) {
+					String countOrHoursStr;
+					if (args[i + 1].endsWith("h")) {
+						segmentsInHours = true;
+						countOrHoursStr = args[i + 1].substring(0, args[i + 1].length() - 1);
+					} else {
+						segmentsInHours = false;
+						countOrHoursStr = args[i + 1];
+					}
+					try {
+						segmentSize = Integer.parseInt(countOrHoursStr);
+						if (segmentSize <= 0) {
+							throw new NumberFormatException();
+						}
+					} catch (NumberFormatException e) {
+						showUsage();
+					}
+					logger.info("Splitting report in segments of " + segmentSize + " "
+							+ (segmentsInHours ? "hour" : "execution")
+							+ (segmentSize > 1 ? "s" : ""));
+					i += 2;
 				} else if (args[i].equals("-sutversion") && (i + 1 < args.length)) {
 					logger.info("Using " + args[i + 1] + " as sutversion");
 					TestBedConfiguration.setSUTVersion(args[i + 1]);
 					i += 2;
+				} else if (args[i].equals("-profile")) {
+					int samplingInterval = JythonScriptProfiler.DEFAULT_SAMPLING_INTERVAL;
+					if ((i + 1 < args.length) && !args[i + 1].startsWith("-")) {
+						try {
+							samplingInterval = Integer.parseInt(args[i + 1]);
+							if (samplingInterval <= 0) {
+								throw new NumberFormatException();
+							}
+						} catch (NumberFormatException e) {
+							showUsage();
+						}
+						i += 2;
+					} else {
+						i++;
+					}
+					JythonScriptProfiler.setSamplingInterval(samplingInterval);
 				} else {
 					showUsage();
 				}
@@ -494,6 +712,7 @@ public class TestEngine {
 			PythonInterpreter.initialize(System.getProperties(), properties, new String[] { "" });
 			TestSuite testSuite = DirectoryTestSuite.createDirectoryTestSuite(testSuiteDir);
 			testSuite.setExecutionLoops(numberLoops, loopsInHours);
+			testSuite.setReportSegments(segmentSize, segmentsInHours);
 			executionResult = execute(testSuite);
 		} finally {
 			shutdown();
@@ -0,0 +1,78 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.kernel.testapi;
+
+import java.lang.annotation.Documented;
+import java.lang.annotation.ElementType;
+import java.lang.annotation.Inherited;
+import java.lang.annotation.Retention;
+import java.lang.annotation.RetentionPolicy;
+import java.lang.annotation.Target;
+
+/**
+ * Declares the lifecycle scope of a Test API component implementation, i.e. how long the component
+ * stays initialized between a call to {@link Component#initialize()} and a call to {@link Component#terminate()}.
+ * <p>
+ * Components whose implementation class is not annotated have the {@link Scope#DATA_ROW} scope:
+ * they are initialized before and terminated after each test data row.
+ * Components doing expensive work in their initialize() method (connection, thread creation...)
+ * can declare a wider scope, for example:
+ * <pre>
+ * &#64;ComponentLifecycle(ComponentLifecycle.Scope.TEST_SCRIPT)
+ * public class MyComponentImpl implements MyComponent {
+ * </pre>
+ * Whatever their scope, all the components are terminated when the SUT is stopped or restarted
+ * and when the testbed configuration changes.
+ */
+@Documented
+@Inherited
+@Retention(RetentionPolicy.RUNTIME)
+@Target(ElementType.TYPE)
+public @interface ComponentLifecycle {
+
+    /**
+     * Component lifecycle scope, from the narrowest to the widest.
+     */
+    public enum Scope {
+        /** initialized before and terminated after each test data row (and each retry) */
+        DATA_ROW,
+        /** terminated after the last data row of the test script */
+        TEST_SCRIPT,
+        /** terminated at the end of the test suite execution */
+        TEST_SUITE,
+        /** terminated at the end of the campaign, or of the test suite execution if not in a campaign */
+        CAMPAIGN;
+
+        /**
+         * Returns the lifecycle scope of a component.
+         * @param component the component
+         * @return the scope declared by the component implementation class, or DATA_ROW if none
+         */
+        public static Scope of(Component component) {
+            ComponentLifecycle lifecycle = component.getClass().getAnnotation(ComponentLifecycle.class);
+            return lifecycle == null ? DATA_ROW : lifecycle.value();
+        }
+    }
+
+    /**
+     * The lifecycle scope of the component.
+     */
+    Scope value();
+}
@@ -103,7 +103,8 @@ public interface TestAPI {
     public ComponentFactory getComponentFactory(String componentName) throws NoSuchElementException;
 
     /**
-     * Initializes all instantiated components. 
+     * Initializes all instantiated components which are not initialized,
+     * i.e. which have been terminated or have never been terminated nor initialized. 
      * If a component cannot be initialized, it is unregistered from its factory.
      */
     public void initializeComponents();        
@@ -112,4 +113,12 @@ public interface TestAPI {
      * Terminates all instantiated components.
      */
     public void terminateComponents();        
+
+    /**
+     * Terminates the instantiated components whose lifecycle scope is not wider than the ended scope.
+     * The other components stay initialized and won't be initialized again by {@link #initializeComponents()}.
+     * @param endedScope the scope whose end is reached
+     * @see ComponentLifecycle
+     */
+    public void terminateComponents(ComponentLifecycle.Scope endedScope);
 }
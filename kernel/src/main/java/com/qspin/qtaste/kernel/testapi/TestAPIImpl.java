@@ -22,12 +22,16 @@ package com.qspin.qtaste.kernel.testapi;
 import java.lang.reflect.Method;
 import java.util.ArrayList;
 import java.util.Collection;
+import java.util.Collections;
 import java.util.HashMap;
+import java.util.IdentityHashMap;
 import java.util.List;
 import java.util.NoSuchElementException;
+import java.util.Set;
 
 import org.apache.log4j.Logger;
 
+import com.qspin.qtaste.config.TestBedConfiguration;
 import com.qspin.qtaste.testsuite.QTasteException;
 import com.qspin.qtaste.testsuite.TestData;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
@@ -42,10 +46,22 @@ public class TestAPIImpl implements TestAPI {
     // key is component name, value is ManagerVerbs instance
     private HashMap<String, FactoryVerbs> map;
     private static TestAPIImpl instance = null;
+    // instantiated components which are initialized, i.e. not terminated since their last initialization
+    private final Set<Component> initializedComponents = Collections.newSetFromMap(new IdentityHashMap<Component, Boolean>());
+    // instantiated components which are terminated, i.e. not initialized since their last termination
+    private final Set<Component> terminatedComponents = Collections.newSetFromMap(new IdentityHashMap<Component, Boolean>());
 
     // not public as only TestAPIFactory can create such instance!
     private TestAPIImpl() {
         map = new HashMap<String, FactoryVerbs>();
+
+        // the components factories forget their instances when the configuration changes, so terminate them now
+        TestBedConfiguration.registerConfigurationChangeHandler(new TestBedConfiguration.ConfigurationChangeHandler() {
+
+            public void onConfigurationChange() {
+                terminateInitializedComponents();
+            }
+        });
     }
 
     public static TestAPI getInstance() {
@@ -186,12 +202,17 @@ public class TestAPIImpl implements TestAPI {
         ArrayList<String> verbs;
     }
 
-    public void initializeComponents() {
+    public synchronized void initializeComponents() {
         SingletonComponentFactory singletonComponentFactory = SingletonComponentFactory.getInstance();
         List<Component> componentsToBeRemoved = new ArrayList<Component>();
         for (Component component : singletonComponentFactory.getComponentsInstances()) {
+            if (initializedComponents.contains(component)) {
+                continue;
+            }
             try {
                 component.initialize();
+                initializedComponents.add(component);
+                terminatedComponents.remove(component);
             } catch (QTasteException e) {
                 logger.warn("Couldn't initialize component " + component.getClass().getSimpleName() + ": " + e.getMessage() + ".\nInstance will be deleted.");
                 componentsToBeRemoved.add(component);
@@ -204,8 +225,13 @@ public class TestAPIImpl implements TestAPI {
         componentsToBeRemoved.clear();
         MultipleInstancesComponentFactory multipleInstancesComponentFactory = MultipleInstancesComponentFactory.getInstance();
         for (Component component : multipleInstancesComponentFactory.getComponentsInstances()) {
+            if (initializedComponents.contains(component)) {
+                continue;
+            }
             try {
                 component.initialize();
+                initializedComponents.add(component);
+                terminatedComponents.remove(component);
             } catch (QTasteException e) {
                 componentsToBeRemoved.add(component);
                 logger.warn("Couldn't initialize component " + component.getClass().getSimpleName() + ": " + e.getMessage() + ".\nInstance will be deleted.");
@@ -217,15 +243,52 @@ public class TestAPIImpl implements TestAPI {
     }
 
     public void terminateComponents() {
-        ArrayList<Component> components = new ArrayList<Component>();
+        terminateComponents(ComponentLifecycle.Scope.CAMPAIGN);
+    }
+
+    public synchronized void terminateComponents(ComponentLifecycle.Scope endedScope) {
+        // only the initialized components are terminated, as the components of a narrower scope are already terminated
+        for (Component component : updateInitializedComponents()) {
+            if (initializedComponents.contains(component) && ComponentLifecycle.Scope.of(component).compareTo(endedScope) <= 0) {
+                terminateComponent(component);
+            }
+        }
+    }
+
+    private synchronized void terminateInitializedComponents() {
+        updateInitializedComponents();
+        for (Component component : new ArrayList<Component>(initializedComponents)) {
+            terminateComponent(component);
+        }
+    }
+
+    /**
+     * Updates the initialized and terminated components sets with the instantiated components.
+     * @return the instantiated components
+     */
+    private List<Component> updateInitializedComponents() {
+        List<Component> components = new ArrayList<Component>();
         components.addAll(SingletonComponentFactory.getInstance().getComponentsInstances());
         components.addAll(MultipleInstancesComponentFactory.getInstance().getComponentsInstances());
+        // forget the components which are not instantiated anymore
+        initializedComponents.retainAll(components);
+        terminatedComponents.retainAll(components);
         for (Component component : components) {
-            try {
-                component.terminate();
-            } catch (QTasteException e) {
-                logger.warn("Couldn't terminate component " + component.getClass().getSimpleName() + ": " + e.getMessage());
+            if (!terminatedComponents.contains(component)) {
+                // instantiated since the last update, the component has been initialized by its constructor
+                initializedComponents.add(component);
             }
         }
+        return components;
+    }
+
+    private void terminateComponent(Component component) {
+        initializedComponents.remove(component);
+        terminatedComponents.add(component);
+        try {
+            component.terminate();
+        } catch (QTasteException e) {
+            logger.warn("Couldn't terminate component " + component.getClass().getSimpleName() + ": " + e.getMessage());
+        }
     }
 }
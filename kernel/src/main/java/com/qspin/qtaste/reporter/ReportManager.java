@@ -20,8 +20,10 @@
 
 package com.qspin.qtaste.reporter;
 
+import java.io.File;
 import java.util.ArrayList;
 import java.util.Date;
+import java.util.List;
 
 /**
  * The class that will extends a report manager is responsible for:
@@ -48,6 +50,20 @@ public abstract class ReportManager {
         return this.reportName;
     }
     
+    /**
+     * Gets the files of the current report, one per formatter.
+     * @return the report files
+     */
+    public List<File> getReportFiles() {
+        List<File> reportFiles = new ArrayList<File>();
+        for (ReportFormatter formatter : formatters) {
+            if (formatter.getReportFile() != null) {
+                reportFiles.add(formatter.getReportFile());
+            }
+        }
+        return reportFiles;
+    }
+
     public void stopReport() {
         for (ReportFormatter formatter : formatters) {
             formatter.stopReport();
@@ -80,15 +80,25 @@ public class CampaignResult extends Result {
     }
 
     public void setTestSuiteResult(TestSuite testSuite) {
-        nbTestsToExecute = testSuite.getNbTestsToExecute();
-        nbTestsExecuted = testSuite.getNbTestsExecuted();
-        nbTestsPassed = testSuite.getNbTestsPassed();
-        nbTestsFailed = testSuite.getNbTestsFailed();
-        nbTestsNotAvailable = testSuite.getNbTestsNotAvailable();
-        nbTestsRetries = testSuite.getNbTestsRetries();
-        nbTestsFailed = testSuite.getNbTestsFailed();
-        startExecutionDate = testSuite.getStartExecutionDate();
-        stopExecutionDate = testSuite.getStopExecutionDate();
+        setResult(testSuite.getNbTestsToExecute(), testSuite.getNbTestsExecuted(), testSuite.getNbTestsPassed(),
+                testSuite.getNbTestsFailed(), testSuite.getNbTestsNotAvailable(), testSuite.getNbTestsRetries(),
+                testSuite.getStartExecutionDate(), testSuite.getStopExecutionDate());
+    }
+
+    /**
+     * Sets the counters and dates of the run and updates its status accordingly.
+     * Used when the run has not been executed by a test suite of this JVM, e.g. for the merged results of a sharded campaign.
+     */
+    public void setResult(int nbTestsToExecute, int nbTestsExecuted, int nbTestsPassed, int nbTestsFailed, int nbTestsNotAvailable,
+                          int nbTestsRetries, Date startExecutionDate, Date stopExecutionDate) {
+        this.nbTestsToExecute = nbTestsToExecute;
+        this.nbTestsExecuted = nbTestsExecuted;
+        this.nbTestsPassed = nbTestsPassed;
+        this.nbTestsFailed = nbTestsFailed;
+        this.nbTestsNotAvailable = nbTestsNotAvailable;
+        this.nbTestsRetries = nbTestsRetries;
+        this.startExecutionDate = startExecutionDate;
+        this.stopExecutionDate = stopExecutionDate;
 
         if (stopExecutionDate == null) {
             setStatus(Status.RUNNING);
@@ -24,15 +24,24 @@
  */
 package com.qspin.qtaste.reporter.testresults;
 
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.DataInputStream;
+import java.io.DataOutputStream;
+import java.io.IOException;
 import java.util.ArrayList;
 import java.util.Collection;
 import java.util.Date;
 import java.util.LinkedHashMap;
 import java.util.List;
 
+import org.apache.log4j.Logger;
+
 import com.qspin.qtaste.reporter.Result;
 import com.qspin.qtaste.testsuite.TestData;
 import com.qspin.qtaste.testsuite.TestRequirement;
+import com.qspin.qtaste.util.Log4jLoggerFactory;
+import com.qspin.qtaste.util.StringPool;
 
 /**
  *
@@ -40,6 +49,7 @@ import com.qspin.qtaste.testsuite.TestRequirement;
  */
 public class TestResultImpl extends Result implements TestResult  {
 
+    private static Logger logger = Log4jLoggerFactory.getLogger(TestResultImpl.class);
     private TestData data;
     private List<TestRequirement> mRequirements;
     private long start;
@@ -70,6 +80,11 @@ public class TestResultImpl extends Result implements TestResult  {
     
     // stores the step execution result
     private LinkedHashMap<String, StepResult> stepResults;
+    // file containing the step results and the stack once spilled, null if they are in memory
+    private TestResultsSpillFile spillFile;
+    private long spillOffset;
+    // number of holders of this test result, i.e. the report manager and the GUI tables displaying it
+    private int holdersCount;
     //private TestResultsReportManager reportFormaterManager;
 
     /** Creates a new instance of TestResultImpl */
@@ -225,11 +240,15 @@ public class TestResultImpl extends Result implements TestResult  {
         this.returnValue = returnValue;
     }
 
-    public void setStackTrace(String stackTrace) {
+    public synchronized void setStackTrace(String stackTrace) {
+        loadSpilledDetails();
         this.stackTrace = stackTrace;
     }
 
-    public String getStackTrace() {
+    public synchronized String getStackTrace() {
+        if (spillFile != null) {
+            return readSpilledDetails().stackTrace;
+        }
         return this.stackTrace;
     }
 
@@ -241,7 +260,8 @@ public class TestResultImpl extends Result implements TestResult  {
         this.retryCount = retryCount;
     }
     
-    public void addStepResult(String stepId, String functionName, String stepDescription, String expectedResult, Status stepStatus, double elapsedTime) {
+    public synchronized void addStepResult(String stepId, String functionName, String stepDescription, String expectedResult, Status stepStatus, double elapsedTime) {
+        loadSpilledDetails();
         StepResult stepResult;
         if (stepResults.containsKey(stepId)) {
             stepResult = stepResults.get(stepId);
@@ -257,7 +277,10 @@ public class TestResultImpl extends Result implements TestResult  {
         stepResult.setElpasedTime(elapsedTime);
     }
 
-    public Collection<StepResult> getStepResults() {
+    public synchronized Collection<StepResult> getStepResults() {
+        if (spillFile != null) {
+            return readSpilledDetails().stepResults.values();
+        }
         return stepResults.values();
     }
     
@@ -329,19 +352,182 @@ public class TestResultImpl extends Result implements TestResult  {
 //        this.reportFormaterManager = reportFormaterManager;
 //    }
 
-    public void setStack(ArrayList<StackTraceElement> stack) {
+    public synchronized void setStack(ArrayList<StackTraceElement> stack) {
+        loadSpilledDetails();
         this.stack = stack;
     }
 
-    public ArrayList<StackTraceElement> getStack() {
+    public synchronized ArrayList<StackTraceElement> getStack() {
+        if (spillFile != null) {
+            return readSpilledDetails().stack;
+        }
         return stack;
     }
 
-    public void addStackTraceElement(StackTraceElement stackElement)
+    public synchronized void addStackTraceElement(StackTraceElement stackElement)
     {
+        loadSpilledDetails();
         stack.add(stackElement);
     }
 
+    /**
+     * Reduces the memory used by this finished test result, by sharing its repeated strings
+     * (test name, directory, step names and descriptions...) with the other test results.
+     * @param pool the pool of strings shared by the test results
+     */
+    public synchronized void compact(StringPool pool) {
+        name = pool.intern(name);
+        id = pool.intern(id);
+        testCaseDirectory = pool.intern(testCaseDirectory);
+        testScriptVersion = pool.intern(testScriptVersion);
+        comment = pool.intern(comment);
+        failedFunctionId = pool.intern(failedFunctionId);
+        if (stepResults != null) {
+            for (StepResult stepResult : stepResults.values()) {
+                stepResult.stepId = pool.intern(stepResult.stepId);
+                stepResult.functionName = pool.intern(stepResult.functionName);
+                stepResult.stepDescription = pool.intern(stepResult.stepDescription);
+                stepResult.expectedResult = pool.intern(stepResult.expectedResult);
+            }
+        }
+        if (stack != null) {
+            stack.trimToSize();
+        }
+    }
+
+    /**
+     * Moves the step results and the stack of this finished test result to a spill file.
+     * They are read back from the file when they are needed, or kept in memory again if they are modified.
+     * @param spillFile the spill file
+     * @throws IOException if the details cannot be written to the spill file
+     */
+    public synchronized void spillDetails(TestResultsSpillFile spillFile) throws IOException {
+        if (this.spillFile != null) {
+            return;
+        }
+        ByteArrayOutputStream bytes = new ByteArrayOutputStream();
+        DataOutputStream output = new DataOutputStream(bytes);
+        writeString(output, stackTrace);
+        output.writeInt(stack.size());
+        for (StackTraceElement stackElement : stack) {
+            writeString(output, stackElement.getClassName());
+            writeString(output, stackElement.getMethodName());
+            writeString(output, stackElement.getFileName());
+            output.writeInt(stackElement.getLineNumber());
+        }
+        output.writeInt(stepResults.size());
+        for (StepResult stepResult : stepResults.values()) {
+            writeString(output, stepResult.stepId);
+            writeString(output, stepResult.functionName);
+            writeString(output, stepResult.stepDescription);
+            writeString(output, stepResult.expectedResult);
+            output.writeInt(stepResult.status == null ? -1 : stepResult.status.ordinal());
+            output.writeDouble(stepResult.elpasedTime);
+        }
+        output.close();
+        spillOffset = spillFile.write(bytes.toByteArray());
+        spillFile.retain();
+        this.spillFile = spillFile;
+        stackTrace = null;
+        stack = null;
+        stepResults = null;
+    }
+
+    public synchronized boolean isSpilled() {
+        return spillFile != null;
+    }
+
+    /**
+     * Adds a holder of this test result, which must call {@link #release()} once it doesn't display or report it anymore.
+     */
+    public synchronized void retain() {
+        holdersCount++;
+    }
+
+    /**
+     * Removes a holder of this test result. Once it has no more holders, its spilled details are dropped
+     * and the spill file is released.
+     */
+    public synchronized void release() {
+        if (holdersCount > 0 && --holdersCount == 0 && spillFile != null) {
+            spillFile.release();
+            spillFile = null;
+            stack = new ArrayList<StackTraceElement>();
+            stepResults = new LinkedHashMap<String, StepResult>();
+        }
+    }
+
+    /**
+     * Keeps the spilled details in memory again, before modifying them.
+     */
+    private void loadSpilledDetails() {
+        if (spillFile != null) {
+            SpilledDetails details = readSpilledDetails();
+            stackTrace = details.stackTrace;
+            stack = details.stack;
+            stepResults = details.stepResults;
+            spillFile.release();
+            spillFile = null;
+        }
+    }
+
+    private SpilledDetails readSpilledDetails() {
+        SpilledDetails details = new SpilledDetails();
+        try {
+            DataInputStream input = new DataInputStream(new ByteArrayInputStream(spillFile.read(spillOffset)));
+            details.stackTrace = readString(input);
+            int stackSize = input.readInt();
+            for (int i = 0; i < stackSize; i++) {
+                details.stack.add(new StackTraceElement(readString(input), readString(input), readString(input), input.readInt()));
+            }
+            int stepResultsCount = input.readInt();
+            Status[] statuses = Status.values();
+            for (int i = 0; i < stepResultsCount; i++) {
+                StepResult stepResult = new StepResult();
+                stepResult.stepId = readString(input);
+                stepResult.functionName = readString(input);
+                stepResult.stepDescription = readString(input);
+                stepResult.expectedResult = readString(input);
+                int statusOrdinal = input.readInt();
+                stepResult.status = (statusOrdinal < 0 ? null : statuses[statusOrdinal]);
+                stepResult.elpasedTime = input.readDouble();
+                details.stepResults.put(stepResult.stepId, stepResult);
+            }
+        } catch (IOException e) {
+            logger.error("Error while reading the details of test result " + id + " from " + spillFile.getFile(), e);
+        }
+        return details;
+    }
+
+    private static void writeString(DataOutputStream output, String value) throws IOException {
+        if (value == null) {
+            output.writeInt(-1);
+        } else {
+            byte[] bytes = value.getBytes("UTF-8");
+            output.writeInt(bytes.length);
+            output.write(bytes);
+        }
+    }
+
+    private static String readString(DataInputStream input) throws IOException {
+        int length = input.readInt();
+        if (length < 0) {
+            return null;
+        }
+        byte[] bytes = new byte[length];
+        input.readFully(bytes);
+        return new String(bytes, "UTF-8");
+    }
+
+    /**
+     * Step results and stack read from the spill file.
+     */
+    private static class SpilledDetails {
+        String stackTrace;
+        ArrayList<StackTraceElement> stack = new ArrayList<StackTraceElement>();
+        LinkedHashMap<String, StepResult> stepResults = new LinkedHashMap<String, StepResult>();
+    }
+
 	public String getTestScriptVersion() {
 		return testScriptVersion;
 	}
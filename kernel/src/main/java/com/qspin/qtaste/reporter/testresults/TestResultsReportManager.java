@@ -21,15 +21,19 @@ package com.qspin.qtaste.reporter.testresults;
 import java.io.File;
 import java.io.IOException;
 import java.lang.reflect.Constructor;
+import java.text.SimpleDateFormat;
 import java.util.ArrayList;
 import java.util.Date;
+import java.util.LinkedList;
 
 import org.apache.log4j.Logger;
 
 import com.qspin.qtaste.config.TestEngineConfiguration;
 import com.qspin.qtaste.reporter.ReportFormatter;
 import com.qspin.qtaste.reporter.ReportManager;
+import com.qspin.qtaste.reporter.testresults.archive.TestResultsArchive;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
+import com.qspin.qtaste.util.StringPool;
 
 /**
  * A TestResultsReportManager manager is responsible to maintain the results of a test results report
@@ -40,13 +44,22 @@ public class TestResultsReportManager extends ReportManager {
 
     private static Logger logger = Log4jLoggerFactory.getLogger(TestResultsReportManager.class);
     private static TestResultsReportManager instance = null;
+    private static final int DEFAULT_RESULTS_IN_MEMORY = 100;
     private ArrayList<TestResult> results;
+    private TestResultsArchive archive;
+    private Date reportTimeStamp;
+    // finished test results whose details are still in memory, from the oldest to the newest
+    private LinkedList<TestResultImpl> unspilledResults = new LinkedList<TestResultImpl>();
+    private int maxUnspilledResults;
+    private TestResultsSpillFile spillFile;
+    private StringPool stringPool = new StringPool();
 
     private TestResultsReportManager() {
         super();
         results = new ArrayList<TestResult>();
 
         TestEngineConfiguration config = TestEngineConfiguration.getInstance();
+        maxUnspilledResults = config.getInt("reporting.results_in_memory", DEFAULT_RESULTS_IN_MEMORY);
         String output = config.getString("reporting.generated_report_path");
 
         // create the directory if not exists
@@ -54,6 +67,7 @@ public class TestResultsReportManager extends ReportManager {
         if (!outputDir.exists()) {
             outputDir.mkdirs();
         }
+        archive = new TestResultsArchive(TestResultsArchive.getConfiguredArchiveDirectory());
     }
 
     /**
@@ -69,9 +83,79 @@ public class TestResultsReportManager extends ReportManager {
 
     @Override
     public void startReport(Date timeStamp, String name) {
-        results.clear();
+        releaseResults();
+        stringPool.clear();
+        TimingStatistics.getInstance().clear();
+        TestSchedule.getInstance().clear();
+        reportTimeStamp = timeStamp;
         initFormatters(name);
         super.startReport(timeStamp, name);
+        try {
+            archive.startRun(timeStamp, name);
+        } catch (IOException e) {
+            logger.error("Error while creating the test results archive", e);
+        }
+    }
+
+    @Override
+    public void stopReport() {
+        String name = reportName;
+        super.stopReport();
+        archive.stopRun();
+        writeTimingStatistics(name);
+        writeSchedule(name);
+        reportTimeStamp = null;
+    }
+
+    /**
+     * Gets the directory of the current report, in which the report files are generated.
+     * @return the report directory, or null if no report is started
+     */
+    public File getReportDirectory() {
+        if (reportTimeStamp == null) {
+            return null;
+        }
+        String output = TestEngineConfiguration.getInstance().getString("reporting.generated_report_path");
+        return new File(output, new SimpleDateFormat("yyyy-MM-dd_HH.mm.ss").format(reportTimeStamp));
+    }
+
+    /**
+     * Writes the timing statistics of the report in the report directory.
+     */
+    private void writeTimingStatistics(String name) {
+        File reportDir = getReportDirectory();
+        if (reportDir == null) {
+            return;
+        }
+        if (!reportDir.exists()) {
+            reportDir.mkdirs();
+        }
+        File timingsFile = new File(reportDir, "timings-" + name.replaceAll("[^\\w\\-.]", "_") + ".tsv");
+        try {
+            TimingStatistics.getInstance().writeFile(timingsFile);
+        } catch (IOException e) {
+            logger.error("Error while writing timing statistics file " + timingsFile, e);
+        }
+    }
+
+    /**
+     * Writes the order in which the tests have been scheduled, with their expected and actual durations,
+     * in the report directory, if a scheduling policy is used.
+     */
+    private void writeSchedule(String name) {
+        File reportDir = getReportDirectory();
+        if (reportDir == null || TestSchedule.getInstance().isEmpty()) {
+            return;
+        }
+        if (!reportDir.exists()) {
+            reportDir.mkdirs();
+        }
+        File scheduleFile = new File(reportDir, "schedule-" + name.replaceAll("[^\\w\\-.]", "_") + ".tsv");
+        try {
+            TestSchedule.getInstance().writeFile(scheduleFile);
+        } catch (IOException e) {
+            logger.error("Error while writing schedule file " + scheduleFile, e);
+        }
     }
 
     private void initFormatters(String reportName) {
@@ -94,13 +178,76 @@ public class TestResultsReportManager extends ReportManager {
 
     }
 
+    /**
+     * Releases the results of the previous report. Their spill file is deleted once they are not displayed anymore,
+     * a new spill file being created for the next report when needed.
+     */
+    void releaseResults() {
+        for (TestResult result : results) {
+            if (result instanceof TestResultImpl) {
+                ((TestResultImpl) result).release();
+            }
+        }
+        results.clear();
+        unspilledResults.clear();
+        if (spillFile != null) {
+            spillFile.release();
+            spillFile = null;
+        }
+    }
+
     public void putEntry(TestResult tr) {
         results.add(tr);
+        if (tr instanceof TestResultImpl) {
+            ((TestResultImpl) tr).retain();
+        }
         for (ReportFormatter formatter : formatters) {
             formatter.refresh();
         }
     }
 
+    /**
+     * Archives a finished test result, to be called once the test execution is finished.
+     * The test result is then compacted and, once enough test results have finished after it,
+     * its details are moved to the spill file.
+     * @param tr the test result
+     */
+    public void archiveEntry(TestResult tr) {
+        TestSchedule.getInstance().recordExecuted(tr);
+        try {
+            archive.addResult(tr);
+        } catch (IOException e) {
+            logger.error("Error while archiving the test result of " + tr.getId(), e);
+        }
+        if (tr instanceof TestResultImpl) {
+            TestResultImpl result = (TestResultImpl) tr;
+            result.compact(stringPool);
+            if (maxUnspilledResults >= 0) {
+                unspilledResults.add(result);
+                while (unspilledResults.size() > maxUnspilledResults) {
+                    spill(unspilledResults.removeFirst());
+                }
+            }
+        }
+    }
+
+    private void spill(TestResultImpl result) {
+        try {
+            if (spillFile == null) {
+                spillFile = TestResultsSpillFile.createTemporary();
+            }
+            result.spillDetails(spillFile);
+        } catch (IOException e) {
+            logger.error("Error while moving the details of the test results to a file, they will be kept in memory", e);
+            maxUnspilledResults = -1;
+            unspilledResults.clear();
+        }
+    }
+
+    public TestResultsArchive getArchive() {
+        return archive;
+    }
+
     public String getReportFileName(String format) {
         try {
             for (ReportFormatter formatter : formatters) {
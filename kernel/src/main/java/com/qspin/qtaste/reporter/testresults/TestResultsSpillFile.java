@@ -0,0 +1,170 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.reporter.testresults;
+
+import java.io.File;
+import java.io.IOException;
+import java.io.RandomAccessFile;
+import java.util.LinkedHashMap;
+import java.util.Map;
+
+import org.apache.log4j.Logger;
+
+import com.qspin.qtaste.util.Log4jLoggerFactory;
+
+/**
+ * Append-only file in which the details of the finished test results are moved out of memory.
+ * <p>
+ * Each record is a byte array preceded by its length and is identified by its offset in the file.
+ * The last read records are cached, so that a formatter or the GUI reading the same results
+ * several times doesn't read the file each time.
+ * <p>
+ * The file is shared by its creator and the test results whose details it contains. It is deleted once all of them
+ * have released it.
+ */
+public class TestResultsSpillFile {
+
+    private static Logger logger = Log4jLoggerFactory.getLogger(TestResultsSpillFile.class);
+    private static final int CACHE_SIZE = 64;
+
+    private final File file;
+    private RandomAccessFile randomAccessFile;
+    // number of users of the file, its creator being the first one
+    private int usersCount = 1;
+    private final Map<Long, byte[]> cache = new LinkedHashMap<Long, byte[]>(16, 0.75f, true) {
+        private static final long serialVersionUID = 1L;
+
+        @Override
+        protected boolean removeEldestEntry(Map.Entry<Long, byte[]> eldest) {
+            return size() > CACHE_SIZE;
+        }
+    };
+
+    /**
+     * Creates a spill file, deleted when it is closed and when the JVM exits.
+     * @param file the file
+     * @throws IOException if the file cannot be created
+     */
+    public TestResultsSpillFile(File file) throws IOException {
+        this.file = file;
+        file.deleteOnExit();
+        randomAccessFile = new RandomAccessFile(file, "rw");
+        randomAccessFile.setLength(0);
+        logger.info("Moving the details of the finished test results to " + file);
+    }
+
+    /**
+     * Creates a spill file in the temporary directory.
+     * @return the spill file
+     * @throws IOException if the file cannot be created
+     */
+    public static TestResultsSpillFile createTemporary() throws IOException {
+        return new TestResultsSpillFile(File.createTempFile("qtaste-results-", ".spill"));
+    }
+
+    public File getFile() {
+        return file;
+    }
+
+    /**
+     * Appends a record.
+     * @param record the record content
+     * @return the record offset, to be given to {@link #read(long)}
+     * @throws IOException if the record cannot be written
+     */
+    public synchronized long write(byte[] record) throws IOException {
+        checkOpen();
+        long offset = randomAccessFile.length();
+        byte[] lengthPrefixedRecord = new byte[4 + record.length];
+        lengthPrefixedRecord[0] = (byte) (record.length >>> 24);
+        lengthPrefixedRecord[1] = (byte) (record.length >>> 16);
+        lengthPrefixedRecord[2] = (byte) (record.length >>> 8);
+        lengthPrefixedRecord[3] = (byte) record.length;
+        System.arraycopy(record, 0, lengthPrefixedRecord, 4, record.length);
+        randomAccessFile.seek(offset);
+        randomAccessFile.write(lengthPrefixedRecord);
+        return offset;
+    }
+
+    /**
+     * Reads a record.
+     * @param offset the record offset, as returned by {@link #write(byte[])}
+     * @return the record content, which must not be modified
+     * @throws IOException if the record cannot be read
+     */
+    public synchronized byte[] read(long offset) throws IOException {
+        byte[] record = cache.get(offset);
+        if (record == null) {
+            checkOpen();
+            randomAccessFile.seek(offset);
+            record = new byte[randomAccessFile.readInt()];
+            randomAccessFile.readFully(record);
+            cache.put(offset, record);
+        }
+        return record;
+    }
+
+    /**
+     * Returns the size of the file.
+     * @return the size of the file, in bytes
+     */
+    public synchronized long length() throws IOException {
+        checkOpen();
+        return randomAccessFile.length();
+    }
+
+    /**
+     * Adds a user of the file, which must call {@link #release()} once it doesn't need the file anymore.
+     */
+    public synchronized void retain() {
+        usersCount++;
+    }
+
+    /**
+     * Removes a user of the file, the file being closed and deleted when it has no more users.
+     */
+    public synchronized void release() {
+        if (usersCount > 0 && --usersCount == 0) {
+            close();
+        }
+    }
+
+    /**
+     * Closes and deletes the file. The records cannot be read anymore.
+     */
+    public synchronized void close() {
+        cache.clear();
+        if (randomAccessFile != null) {
+            try {
+                randomAccessFile.close();
+            } catch (IOException e) {
+                logger.warn("Error while closing test results spill file " + file, e);
+            }
+            randomAccessFile = null;
+            file.delete();
+        }
+    }
+
+    private void checkOpen() throws IOException {
+        if (randomAccessFile == null) {
+            throw new IOException("Test results spill file " + file + " is closed");
+        }
+    }
+}
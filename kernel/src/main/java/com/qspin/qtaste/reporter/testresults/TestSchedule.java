@@ -0,0 +1,154 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.reporter.testresults;
+
+import java.io.File;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.io.PrintWriter;
+import java.util.ArrayList;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+
+/**
+ * Order in which the tests have been scheduled during a report, with their expected duration,
+ * computed from the test results archive, and their actual duration.
+ */
+public class TestSchedule {
+
+    /**
+     * Scheduled execution of a test (one row of a test script).
+     */
+    public static class Entry {
+        private final String testCaseName;
+        private final int rowId;
+        private final long expectedElapsedTime_ms;
+        private long actualElapsedTime_ms = -1;
+        private int trialsCount;
+
+        Entry(String testCaseName, int rowId, long expectedElapsedTime_ms) {
+            this.testCaseName = testCaseName;
+            this.rowId = rowId;
+            this.expectedElapsedTime_ms = expectedElapsedTime_ms;
+        }
+
+        public String getTestCaseName() {
+            return testCaseName;
+        }
+
+        public int getRowId() {
+            return rowId;
+        }
+
+        /**
+         * @return the expected duration in milliseconds, or -1 if unknown
+         */
+        public long getExpectedElapsedTimeMs() {
+            return expectedElapsedTime_ms;
+        }
+
+        /**
+         * @return the actual duration of all the trials in milliseconds, or -1 if the test has not been executed
+         */
+        public long getActualElapsedTimeMs() {
+            return actualElapsedTime_ms;
+        }
+
+        public int getTrialsCount() {
+            return trialsCount;
+        }
+    }
+
+    private static TestSchedule instance = null;
+    private final Map<String, Entry> entries = new LinkedHashMap<String, Entry>();
+
+    private TestSchedule() {
+    }
+
+    synchronized public static TestSchedule getInstance() {
+        if (instance == null) {
+            instance = new TestSchedule();
+        }
+        return instance;
+    }
+
+    /**
+     * Removes all the scheduled tests.
+     */
+    public synchronized void clear() {
+        entries.clear();
+    }
+
+    /**
+     * Records that a test is scheduled after the previously scheduled ones.
+     * A test scheduled again, e.g. in a new loop, is moved at the end of the schedule.
+     * @param testCaseName the test case name
+     * @param rowId the test data row id
+     * @param expectedElapsedTime_ms the expected duration in milliseconds, or -1 if unknown
+     */
+    public synchronized void recordScheduled(String testCaseName, int rowId, long expectedElapsedTime_ms) {
+        String key = testCaseName + " - " + rowId;
+        entries.remove(key);
+        entries.put(key, new Entry(testCaseName, rowId, expectedElapsedTime_ms));
+    }
+
+    /**
+     * Records the duration of a trial of a scheduled test, ignored if the test has not been scheduled.
+     * @param result the finished test result
+     */
+    public synchronized void recordExecuted(TestResult result) {
+        if (entries.isEmpty()) {
+            return;
+        }
+        Entry entry = entries.get(result.getName() + " - " + (result.getTestData() == null ? 0 : result.getTestData().getRowId()));
+        if (entry != null) {
+            entry.actualElapsedTime_ms = Math.max(0, entry.actualElapsedTime_ms) + result.getElapsedTimeMs();
+            entry.trialsCount++;
+        }
+    }
+
+    public synchronized List<Entry> getEntries() {
+        return new ArrayList<Entry>(entries.values());
+    }
+
+    public synchronized boolean isEmpty() {
+        return entries.isEmpty();
+    }
+
+    /**
+     * Writes the scheduled tests in a tab-separated file, with one line per test in the scheduled order.
+     * @param file the file to write
+     * @throws IOException if the file cannot be written
+     */
+    public void writeFile(File file) throws IOException {
+        PrintWriter writer = new PrintWriter(new FileWriter(file));
+        try {
+            writer.println("order\ttest_case\trow\texpected_ms\tactual_ms\ttrials");
+            int order = 1;
+            for (Entry entry : getEntries()) {
+                writer.println(order++ + "\t" + entry.getTestCaseName() + "\t" + entry.getRowId() + "\t"
+                        + entry.getExpectedElapsedTimeMs() + "\t" + entry.getActualElapsedTimeMs() + "\t" + entry.getTrialsCount());
+            }
+        } finally {
+            writer.close();
+        }
+    }
+}
@@ -0,0 +1,213 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.reporter.testresults;
+
+import java.io.File;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.io.PrintWriter;
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.Comparator;
+import java.util.List;
+import java.util.Locale;
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+
+import com.qspin.qtaste.util.TimingHistogram;
+
+/**
+ * Timing statistics of the test steps and of the component verbs invoked by the test scripts,
+ * collected during a report.
+ * <p>
+ * The durations are recorded in a histogram per step (test case and step name) and per
+ * verb (component and verb name), from which the percentiles and the elements taking
+ * most of the execution time are computed.
+ */
+public class TimingStatistics {
+
+    /**
+     * Kind of timed element.
+     */
+    public enum Kind {
+        STEP, VERB
+    }
+
+    /**
+     * Summary of the durations of a timed element, in milliseconds.
+     */
+    public static class Summary {
+        private final Kind kind;
+        private final String name;
+        private final long count;
+        private final double total_ms, mean_ms, p50_ms, p95_ms, p99_ms, max_ms;
+
+        Summary(Kind kind, String name, TimingHistogram histogram) {
+            this.kind = kind;
+            this.name = name;
+            synchronized (histogram) {
+                count = histogram.getCount();
+                total_ms = histogram.getTotal_ns() / 1e6;
+                mean_ms = histogram.getMean_ns() / 1e6;
+                p50_ms = histogram.getPercentile_ns(50) / 1e6;
+                p95_ms = histogram.getPercentile_ns(95) / 1e6;
+                p99_ms = histogram.getPercentile_ns(99) / 1e6;
+                max_ms = histogram.getMax_ns() / 1e6;
+            }
+        }
+
+        public Kind getKind() {
+            return kind;
+        }
+
+        public String getName() {
+            return name;
+        }
+
+        public long getCount() {
+            return count;
+        }
+
+        public double getTotal_ms() {
+            return total_ms;
+        }
+
+        public double getMean_ms() {
+            return mean_ms;
+        }
+
+        public double getP50_ms() {
+            return p50_ms;
+        }
+
+        public double getP95_ms() {
+            return p95_ms;
+        }
+
+        public double getP99_ms() {
+            return p99_ms;
+        }
+
+        public double getMax_ms() {
+            return max_ms;
+        }
+    }
+
+    private static TimingStatistics instance = null;
+    private final Map<String, TimingHistogram> stepHistograms = new ConcurrentHashMap<String, TimingHistogram>();
+    private final Map<String, TimingHistogram> verbHistograms = new ConcurrentHashMap<String, TimingHistogram>();
+
+    private TimingStatistics() {
+    }
+
+    synchronized public static TimingStatistics getInstance() {
+        if (instance == null) {
+            instance = new TimingStatistics();
+        }
+        return instance;
+    }
+
+    /**
+     * Removes all the recorded durations.
+     */
+    public void clear() {
+        stepHistograms.clear();
+        verbHistograms.clear();
+    }
+
+    /**
+     * Records the duration of a test step.
+     * @param testCaseName the test case name
+     * @param stepName the step name
+     * @param duration_ns the step duration, in nanoseconds
+     */
+    public void recordStep(String testCaseName, String stepName, long duration_ns) {
+        getHistogram(stepHistograms, testCaseName + " / " + stepName).record(duration_ns);
+    }
+
+    /**
+     * Records the duration of a component verb invocation.
+     * @param componentName the component name
+     * @param verb the verb name
+     * @param duration_ns the invocation duration, in nanoseconds
+     */
+    public void recordVerb(String componentName, String verb, long duration_ns) {
+        getHistogram(verbHistograms, componentName + "." + verb).record(duration_ns);
+    }
+
+    private static TimingHistogram getHistogram(Map<String, TimingHistogram> histograms, String name) {
+        TimingHistogram histogram = histograms.get(name);
+        if (histogram == null) {
+            synchronized (histograms) {
+                histogram = histograms.get(name);
+                if (histogram == null) {
+                    histogram = new TimingHistogram();
+                    histograms.put(name, histogram);
+                }
+            }
+        }
+        return histogram;
+    }
+
+    /**
+     * Gets the summaries of the timed elements of a kind, sorted by decreasing total duration.
+     * @param kind the kind of timed elements
+     * @param maxCount the maximum number of summaries to return, or 0 to return all of them
+     * @return the summaries of the elements taking most of the execution time
+     */
+    public List<Summary> getSummaries(Kind kind, int maxCount) {
+        Map<String, TimingHistogram> histograms = (kind == Kind.STEP ? stepHistograms : verbHistograms);
+        List<Summary> summaries = new ArrayList<Summary>();
+        for (Map.Entry<String, TimingHistogram> entry : histograms.entrySet()) {
+            summaries.add(new Summary(kind, entry.getKey(), entry.getValue()));
+        }
+        Collections.sort(summaries, new Comparator<Summary>() {
+            public int compare(Summary s1, Summary s2) {
+                return Double.compare(s2.getTotal_ms(), s1.getTotal_ms());
+            }
+        });
+        if (maxCount > 0 && summaries.size() > maxCount) {
+            return new ArrayList<Summary>(summaries.subList(0, maxCount));
+        }
+        return summaries;
+    }
+
+    /**
+     * Writes the summaries of all the timed elements in a tab-separated file,
+     * with one line per element and the durations in milliseconds.
+     * @param file the file to write
+     * @throws IOException if the file cannot be written
+     */
+    public void writeFile(File file) throws IOException {
+        PrintWriter writer = new PrintWriter(new FileWriter(file));
+        try {
+            writer.println("kind\tname\tcount\ttotal_ms\tmean_ms\tp50_ms\tp95_ms\tp99_ms\tmax_ms");
+            for (Kind kind : Kind.values()) {
+                for (Summary summary : getSummaries(kind, 0)) {
+                    writer.println(String.format(Locale.US, "%s\t%s\t%d\t%.3f\t%.3f\t%.3f\t%.3f\t%.3f\t%.3f",
+                            kind.toString().toLowerCase(), summary.getName(), summary.getCount(), summary.getTotal_ms(),
+                            summary.getMean_ms(), summary.getP50_ms(), summary.getP95_ms(), summary.getP99_ms(), summary.getMax_ms()));
+                }
+            }
+        } finally {
+            writer.close();
+        }
+    }
+}
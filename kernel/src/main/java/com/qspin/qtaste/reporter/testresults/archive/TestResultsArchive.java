@@ -0,0 +1,605 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.reporter.testresults.archive;
+
+import java.io.BufferedReader;
+import java.io.BufferedWriter;
+import java.io.File;
+import java.io.FileInputStream;
+import java.io.FileOutputStream;
+import java.io.FilenameFilter;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.io.Writer;
+import java.text.ParseException;
+import java.text.SimpleDateFormat;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.Collections;
+import java.util.Date;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+
+import org.apache.log4j.Logger;
+
+import com.qspin.qtaste.config.TestEngineConfiguration;
+import com.qspin.qtaste.reporter.testresults.TestResult;
+import com.qspin.qtaste.reporter.testresults.TestResultImpl;
+import com.qspin.qtaste.util.Log4jLoggerFactory;
+
+/**
+ * Append-only archive of the test results, used to follow the results over several runs.
+ * <p>
+ * Each run (report) is stored in its own tab-separated text file, named after the run
+ * start time so that the files sort chronologically. A file contains one "T" line per
+ * executed test (test case, row id, status, retry count, elapsed time and failure reason)
+ * followed by one "S" line per step of this test. The lines of a test are written at once
+ * when the test is finished, so that archiving doesn't slow down the test execution.
+ * <p>
+ * The archived runs can be read back to get the status trend of the tests, the flaky tests
+ * and the steps whose duration has increased in the last run.
+ */
+public class TestResultsArchive {
+
+    public static final String FILE_EXTENSION = ".results";
+    private static final String FILE_HEADER = "# QTaste test results archive 1";
+    private static final String DATE_FORMAT = "yyyy-MM-dd_HH.mm.ss";
+
+    private static Logger logger = Log4jLoggerFactory.getLogger(TestResultsArchive.class);
+    private final File archiveDirectory;
+    private Writer writer;
+    private File runFile;
+
+    /**
+     * Archived result of one execution of a test (one row, one trial).
+     */
+    public static class TestRecord {
+        private final long startTime;
+        private final String testCase;
+        private final int rowId;
+        private final TestResult.Status status;
+        private final int retryCount;
+        private final long elapsedTime_ms;
+        private final String failedFunctionId;
+        private final int failedLineNumber;
+        private final String failureReason;
+        private final List<StepRecord> steps = new ArrayList<StepRecord>();
+
+        TestRecord(long startTime, String testCase, int rowId, TestResult.Status status, int retryCount, long elapsedTime_ms,
+                   String failedFunctionId, int failedLineNumber, String failureReason) {
+            this.startTime = startTime;
+            this.testCase = testCase;
+            this.rowId = rowId;
+            this.status = status;
+            this.retryCount = retryCount;
+            this.elapsedTime_ms = elapsedTime_ms;
+            this.failedFunctionId = failedFunctionId;
+            this.failedLineNumber = failedLineNumber;
+            this.failureReason = failureReason;
+        }
+
+        /**
+         * Returns the key identifying a test over the runs, made of the test case name and the row id.
+         */
+        public String getKey() {
+            return testCase + " - " + rowId;
+        }
+
+        public long getStartTime() {
+            return startTime;
+        }
+
+        public String getTestCase() {
+            return testCase;
+        }
+
+        public int getRowId() {
+            return rowId;
+        }
+
+        public TestResult.Status getStatus() {
+            return status;
+        }
+
+        public int getRetryCount() {
+            return retryCount;
+        }
+
+        public long getElapsedTimeMs() {
+            return elapsedTime_ms;
+        }
+
+        public String getFailedFunctionId() {
+            return failedFunctionId;
+        }
+
+        public int getFailedLineNumber() {
+            return failedLineNumber;
+        }
+
+        public String getFailureReason() {
+            return failureReason;
+        }
+
+        public List<StepRecord> getSteps() {
+            return steps;
+        }
+    }
+
+    /**
+     * Archived result of a test step.
+     */
+    public static class StepRecord {
+        private final String stepId;
+        private final String functionName;
+        private final TestResult.Status status;
+        private final double elapsedTime;
+
+        StepRecord(String stepId, String functionName, TestResult.Status status, double elapsedTime) {
+            this.stepId = stepId;
+            this.functionName = functionName;
+            this.status = status;
+            this.elapsedTime = elapsedTime;
+        }
+
+        /**
+         * Returns the key identifying a step of a test, made of the step id and the step function name.
+         */
+        public String getKey() {
+            return stepId + " " + functionName;
+        }
+
+        public String getStepId() {
+            return stepId;
+        }
+
+        public String getFunctionName() {
+            return functionName;
+        }
+
+        public TestResult.Status getStatus() {
+            return status;
+        }
+
+        /**
+         * Returns the step elapsed time, in seconds.
+         */
+        public double getElapsedTime() {
+            return elapsedTime;
+        }
+    }
+
+    /**
+     * Archived run.
+     */
+    public static class Run {
+        private final String name;
+        private final Date startDate;
+        private final List<TestRecord> tests = new ArrayList<TestRecord>();
+
+        Run(String name, Date startDate) {
+            this.name = name;
+            this.startDate = startDate;
+        }
+
+        public String getName() {
+            return name;
+        }
+
+        public Date getStartDate() {
+            return startDate;
+        }
+
+        /**
+         * Returns all the test executions of the run, including the retried ones, in execution order.
+         */
+        public List<TestRecord> getTests() {
+            return tests;
+        }
+
+        /**
+         * Returns the last execution of each test of the run, by test key, in execution order.
+         */
+        public Map<String, TestRecord> getFinalTests() {
+            Map<String, TestRecord> finalTests = new LinkedHashMap<String, TestRecord>();
+            for (TestRecord test : tests) {
+                finalTests.remove(test.getKey());
+                finalTests.put(test.getKey(), test);
+            }
+            return finalTests;
+        }
+    }
+
+    /**
+     * Step whose duration in the last run exceeds its median duration in the previous runs.
+     */
+    public static class StepRegression {
+        private final String testKey;
+        private final String stepKey;
+        private final double medianElapsedTime;
+        private final double lastElapsedTime;
+
+        StepRegression(String testKey, String stepKey, double medianElapsedTime, double lastElapsedTime) {
+            this.testKey = testKey;
+            this.stepKey = stepKey;
+            this.medianElapsedTime = medianElapsedTime;
+            this.lastElapsedTime = lastElapsedTime;
+        }
+
+        public String getTestKey() {
+            return testKey;
+        }
+
+        public String getStepKey() {
+            return stepKey;
+        }
+
+        /**
+         * Returns the median elapsed time of the step in the previous runs, in seconds.
+         */
+        public double getMedianElapsedTime() {
+            return medianElapsedTime;
+        }
+
+        /**
+         * Returns the elapsed time of the step in the last run, in seconds.
+         */
+        public double getLastElapsedTime() {
+            return lastElapsedTime;
+        }
+    }
+
+    /**
+     * Creates an archive stored in the given directory.
+     * @param archiveDirectory the archive directory, created on first run if it doesn't exist
+     */
+    public TestResultsArchive(File archiveDirectory) {
+        this.archiveDirectory = archiveDirectory;
+    }
+
+    /**
+     * Gets the archive directory defined in the engine configuration by "reporting.archive_path",
+     * defaulting to the "archive" sub-directory of the generated reports directory.
+     * @return the configured archive directory
+     */
+    public static File getConfiguredArchiveDirectory() {
+        TestEngineConfiguration config = TestEngineConfiguration.getInstance();
+        String archivePath = config.getString("reporting.archive_path");
+        if (archivePath == null) {
+            return new File(config.getString("reporting.generated_report_path"), "archive");
+        }
+        return new File(archivePath);
+    }
+
+    public File getArchiveDirectory() {
+        return archiveDirectory;
+    }
+
+    /**
+     * Starts archiving a new run, stopping the current one if any.
+     * @param timeStamp the run start time
+     * @param reportName the report name
+     * @throws IOException if the run file cannot be created
+     */
+    public synchronized void startRun(Date timeStamp, String reportName) throws IOException {
+        stopRun();
+        if (!archiveDirectory.exists()) {
+            archiveDirectory.mkdirs();
+        }
+        String baseName = new SimpleDateFormat(DATE_FORMAT).format(timeStamp) + "_" + reportName.replaceAll("[^\\w\\-.]", "_");
+        runFile = new File(archiveDirectory, baseName + FILE_EXTENSION);
+        for (int i = 1; runFile.exists(); i++) {
+            runFile = new File(archiveDirectory, baseName + "_" + i + FILE_EXTENSION);
+        }
+        writer = new BufferedWriter(new OutputStreamWriter(new FileOutputStream(runFile), "UTF-8"));
+        writer.write(FILE_HEADER + "\n");
+        writer.write("R\t" + timeStamp.getTime() + "\t" + escape(reportName) + "\n");
+        writer.flush();
+        logger.info("Archiving test results in " + runFile);
+    }
+
+    /**
+     * Appends a finished test result to the current run, if any.
+     * @param result the test result
+     * @throws IOException if the result cannot be written
+     */
+    public synchronized void addResult(TestResult result) throws IOException {
+        if (writer == null) {
+            return;
+        }
+        StringBuilder record = new StringBuilder();
+        Date startDate = result.getStartDate();
+        record.append("T\t").append(startDate == null ? 0 : startDate.getTime())
+              .append('\t').append(escape(result.getName()))
+              .append('\t').append(result.getTestData() == null ? 0 : result.getTestData().getRowId())
+              .append('\t').append(result.getStatus())
+              .append('\t').append(result.getRetryCount())
+              .append('\t').append(result.getElapsedTimeMs())
+              .append('\t').append(escape(result.getFailedFunctionId()))
+              .append('\t').append(result.getFailedLineNumber())
+              .append('\t').append(escape(result.getExtraResultDetails()))
+              .append('\n');
+        for (TestResultImpl.StepResult step : result.getStepResults()) {
+            record.append("S\t").append(escape(step.getStepId()))
+                  .append('\t').append(escape(step.getFunctionName()))
+                  .append('\t').append(step.getStatus())
+                  .append('\t').append(step.getElpasedTime())
+                  .append('\n');
+        }
+        writer.write(record.toString());
+        writer.flush();
+    }
+
+    /**
+     * Stops archiving the current run, if any.
+     */
+    public synchronized void stopRun() {
+        if (writer != null) {
+            try {
+                writer.close();
+            } catch (IOException e) {
+                logger.error("Error while closing test results archive " + runFile, e);
+            }
+            writer = null;
+            runFile = null;
+        }
+    }
+
+    /**
+     * Reads the last archived runs, except the run currently archived by this archive, which is still in progress.
+     * @param maxRuns the maximum number of runs to read, or 0 to read all the runs
+     * @return the runs, from the oldest to the newest
+     * @throws IOException if a run file cannot be read
+     */
+    public List<Run> readRuns(int maxRuns) throws IOException {
+        List<Run> runs = new ArrayList<Run>();
+        final File currentRunFile;
+        synchronized (this) {
+            currentRunFile = runFile;
+        }
+        File[] runFiles = archiveDirectory.listFiles(new FilenameFilter() {
+            public boolean accept(File dir, String name) {
+                return name.endsWith(FILE_EXTENSION) && !new File(dir, name).equals(currentRunFile);
+            }
+        });
+        if (runFiles == null) {
+            return runs;
+        }
+        Arrays.sort(runFiles);
+        int first = (maxRuns > 0 ? Math.max(0, runFiles.length - maxRuns) : 0);
+        for (int i = first; i < runFiles.length; i++) {
+            runs.add(readRun(runFiles[i]));
+        }
+        return runs;
+    }
+
+    private Run readRun(File file) throws IOException {
+        BufferedReader reader = new BufferedReader(new InputStreamReader(new FileInputStream(file), "UTF-8"));
+        try {
+            String name = file.getName();
+            Date startDate;
+            try {
+                startDate = new SimpleDateFormat(DATE_FORMAT).parse(name);
+            } catch (ParseException e) {
+                startDate = new Date(file.lastModified());
+            }
+            Run run = null;
+            TestRecord test = null;
+            String line;
+            int lineNumber = 0;
+            while ((line = reader.readLine()) != null) {
+                lineNumber++;
+                if (line.length() == 0 || line.startsWith("#")) {
+                    continue;
+                }
+                String[] fields = line.split("\t", -1);
+                try {
+                    if (fields[0].equals("R") && fields.length >= 3) {
+                        run = new Run(unescape(fields[2]), new Date(Long.parseLong(fields[1])));
+                    } else if (fields[0].equals("T") && fields.length >= 10) {
+                        test = new TestRecord(Long.parseLong(fields[1]), unescape(fields[2]), Integer.parseInt(fields[3]),
+                                TestResult.Status.valueOf(fields[4]), Integer.parseInt(fields[5]), Long.parseLong(fields[6]),
+                                unescape(fields[7]), Integer.parseInt(fields[8]), unescape(fields[9]));
+                        if (run == null) {
+                            run = new Run(name, startDate);
+                        }
+                        run.getTests().add(test);
+                    } else if (fields[0].equals("S") && fields.length >= 5 && test != null) {
+                        test.getSteps().add(new StepRecord(unescape(fields[1]), unescape(fields[2]),
+                                TestResult.Status.valueOf(fields[3]), Double.parseDouble(fields[4])));
+                    } else {
+                        logger.warn("Ignoring invalid line " + lineNumber + " of test results archive " + file);
+                    }
+                } catch (IllegalArgumentException e) {
+                    // also catches NumberFormatException, e.g. for a truncated line
+                    logger.warn("Ignoring invalid line " + lineNumber + " of test results archive " + file + ": " + e.getMessage());
+                }
+            }
+            return (run != null ? run : new Run(name, startDate));
+        } finally {
+            reader.close();
+        }
+    }
+
+    /**
+     * Gets the final status of each test in each run.
+     * @param runs the runs, from the oldest to the newest
+     * @return the statuses by test key, with one entry per run (null if the test was not executed in this run)
+     */
+    public static Map<String, List<TestResult.Status>> getStatusTrends(List<Run> runs) {
+        Map<String, List<TestResult.Status>> trends = new LinkedHashMap<String, List<TestResult.Status>>();
+        for (int runIndex = 0; runIndex < runs.size(); runIndex++) {
+            for (TestRecord test : runs.get(runIndex).getFinalTests().values()) {
+                List<TestResult.Status> trend = trends.get(test.getKey());
+                if (trend == null) {
+                    trend = new ArrayList<TestResult.Status>(Collections.<TestResult.Status>nCopies(runs.size(), null));
+                    trends.put(test.getKey(), trend);
+                }
+                trend.set(runIndex, test.getStatus());
+            }
+        }
+        return trends;
+    }
+
+    /**
+     * Gets the mean elapsed time of the final execution of each test in the given runs.
+     * @param runs the runs
+     * @return the mean elapsed times in milliseconds, by test key
+     */
+    public static Map<String, Long> getMeanElapsedTimes(List<Run> runs) {
+        Map<String, Long> totalElapsedTimes = new LinkedHashMap<String, Long>();
+        Map<String, Integer> counts = new LinkedHashMap<String, Integer>();
+        for (Run run : runs) {
+            for (TestRecord test : run.getFinalTests().values()) {
+                Long total = totalElapsedTimes.get(test.getKey());
+                Integer count = counts.get(test.getKey());
+                totalElapsedTimes.put(test.getKey(), (total == null ? 0 : total) + test.getElapsedTimeMs());
+                counts.put(test.getKey(), (count == null ? 0 : count) + 1);
+            }
+        }
+        Map<String, Long> meanElapsedTimes = new LinkedHashMap<String, Long>();
+        for (Map.Entry<String, Long> entry : totalElapsedTimes.entrySet()) {
+            meanElapsedTimes.put(entry.getKey(), entry.getValue() / counts.get(entry.getKey()));
+        }
+        return meanElapsedTimes;
+    }
+
+    /**
+     * Gets the flaky tests, i.e. the tests which have both succeeded and failed in the given runs
+     * or which have succeeded only after a retry.
+     * @param runs the runs
+     * @return the keys of the flaky tests
+     */
+    public static List<String> getFlakyTests(List<Run> runs) {
+        Map<String, Boolean> succeeded = new LinkedHashMap<String, Boolean>();
+        Map<String, Boolean> failed = new LinkedHashMap<String, Boolean>();
+        for (Run run : runs) {
+            for (TestRecord test : run.getTests()) {
+                if (test.getStatus() == TestResult.Status.SUCCESS) {
+                    succeeded.put(test.getKey(), Boolean.TRUE);
+                } else if (test.getStatus() == TestResult.Status.FAIL) {
+                    failed.put(test.getKey(), Boolean.TRUE);
+                }
+            }
+        }
+        List<String> flakyTests = new ArrayList<String>();
+        for (String testKey : failed.keySet()) {
+            if (succeeded.containsKey(testKey)) {
+                flakyTests.add(testKey);
+            }
+        }
+        return flakyTests;
+    }
+
+    /**
+     * Gets the steps whose duration in the last run exceeds their median duration in the previous runs
+     * by more than a given ratio. Only successful steps are compared.
+     * @param runs the runs, from the oldest to the newest
+     * @param threshold the minimum relative increase, e.g. 0.5 for 50%
+     * @param minElapsedTime the minimum elapsed time in the last run of the reported steps, in seconds,
+     *        to ignore the short steps whose duration varies too much
+     * @return the regressions
+     */
+    public static List<StepRegression> getStepDurationRegressions(List<Run> runs, double threshold, double minElapsedTime) {
+        List<StepRegression> regressions = new ArrayList<StepRegression>();
+        if (runs.size() < 2) {
+            return regressions;
+        }
+        // collect the previous durations of each step of each test
+        Map<String, List<Double>> previousElapsedTimes = new LinkedHashMap<String, List<Double>>();
+        for (Run run : runs.subList(0, runs.size() - 1)) {
+            for (TestRecord test : run.getFinalTests().values()) {
+                for (StepRecord step : test.getSteps()) {
+                    if (step.getStatus() == TestResult.Status.SUCCESS) {
+                        String key = test.getKey() + "\t" + step.getKey();
+                        List<Double> elapsedTimes = previousElapsedTimes.get(key);
+                        if (elapsedTimes == null) {
+                            elapsedTimes = new ArrayList<Double>();
+                            previousElapsedTimes.put(key, elapsedTimes);
+                        }
+                        elapsedTimes.add(step.getElapsedTime());
+                    }
+                }
+            }
+        }
+        for (TestRecord test : runs.get(runs.size() - 1).getFinalTests().values()) {
+            for (StepRecord step : test.getSteps()) {
+                List<Double> elapsedTimes = previousElapsedTimes.get(test.getKey() + "\t" + step.getKey());
+                if (elapsedTimes == null || step.getStatus() != TestResult.Status.SUCCESS || step.getElapsedTime() < minElapsedTime) {
+                    continue;
+                }
+                double median = getMedian(elapsedTimes);
+                if (step.getElapsedTime() > median * (1 + threshold)) {
+                    regressions.add(new StepRegression(test.getKey(), step.getKey(), median, step.getElapsedTime()));
+                }
+            }
+        }
+        return regressions;
+    }
+
+    private static double getMedian(List<Double> values) {
+        List<Double> sortedValues = new ArrayList<Double>(values);
+        Collections.sort(sortedValues);
+        int middle = sortedValues.size() / 2;
+        if (sortedValues.size() % 2 == 1) {
+            return sortedValues.get(middle);
+        }
+        return (sortedValues.get(middle - 1) + sortedValues.get(middle)) / 2;
+    }
+
+    private static String escape(String value) {
+        if (value == null) {
+            return "";
+        }
+        StringBuilder escaped = new StringBuilder(value.length());
+        for (int i = 0; i < value.length(); i++) {
+            char c = value.charAt(i);
+            switch (c) {
+                case '\\': escaped.append("\\\\"); break;
+                case '\t': escaped.append("\\t"); break;
+                case '\n': escaped.append("\\n"); break;
+                case '\r': escaped.append("\\r"); break;
+                default: escaped.append(c);
+            }
+        }
+        return escaped.toString();
+    }
+
+    private static String unescape(String value) {
+        StringBuilder unescaped = new StringBuilder(value.length());
+        for (int i = 0; i < value.length(); i++) {
+            char c = value.charAt(i);
+            if (c == '\\' && i + 1 < value.length()) {
+                char next = value.charAt(++i);
+                switch (next) {
+                    case 't': unescaped.append('\t'); break;
+                    case 'n': unescaped.append('\n'); break;
+                    case 'r': unescaped.append('\r'); break;
+                    default: unescaped.append(next);
+                }
+            } else {
+                unescaped.append(c);
+            }
+        }
+        return unescaped.toString();
+    }
+}
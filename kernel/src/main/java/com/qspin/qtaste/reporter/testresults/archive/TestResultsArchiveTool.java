@@ -0,0 +1,137 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.reporter.testresults.archive;
+
+import java.io.File;
+import java.text.SimpleDateFormat;
+import java.util.List;
+import java.util.Map;
+
+import com.qspin.qtaste.reporter.testresults.TestResult;
+import com.qspin.qtaste.reporter.testresults.archive.TestResultsArchive.Run;
+import com.qspin.qtaste.reporter.testresults.archive.TestResultsArchive.StepRegression;
+
+/**
+ * TestResultsArchiveTool is the command-line program to query the test results archive
+ */
+public class TestResultsArchiveTool {
+
+    private static final int DEFAULT_RUNS = 10;
+    private static final double DEFAULT_THRESHOLD_PERCENT = 50;
+    private static final double DEFAULT_MIN_STEP_TIME = 0.1;
+
+    private static void showUsage() {
+        System.err.println("Usage: <command> trend|flaky|steps [-archive <archive_directory>] [-runs <number_of_runs>]");
+        System.err.println("                 [-threshold <percent>] [-minsteptime <seconds>]");
+        System.err.println("  trend : status of each test in the last runs (S=success, F=fail, N=not available, -=not executed)");
+        System.err.println("  flaky : tests which have both succeeded and failed in the last runs");
+        System.err.println("  steps : steps whose duration in the last run exceeds their median duration in the previous runs by more than the threshold");
+        System.err.println("Default archive directory: " + TestResultsArchive.getConfiguredArchiveDirectory()
+                + ", default number of runs: " + DEFAULT_RUNS + ", default threshold: " + DEFAULT_THRESHOLD_PERCENT
+                + "%, default minimum step time: " + DEFAULT_MIN_STEP_TIME + "s");
+        System.exit(1);
+    }
+
+    public static void main(String[] args) throws Exception {
+        if (args.length < 1 || args.length % 2 != 1) {
+            showUsage();
+        }
+        String command = args[0];
+        File archiveDirectory = TestResultsArchive.getConfiguredArchiveDirectory();
+        int runsCount = DEFAULT_RUNS;
+        double threshold = DEFAULT_THRESHOLD_PERCENT;
+        double minStepTime = DEFAULT_MIN_STEP_TIME;
+        try {
+            for (int i = 1; i < args.length; i += 2) {
+                if (args[i].equals("-archive")) {
+                    archiveDirectory = new File(args[i + 1]);
+                } else if (args[i].equals("-runs")) {
+                    runsCount = Integer.parseInt(args[i + 1]);
+                } else if (args[i].equals("-threshold")) {
+                    threshold = Double.parseDouble(args[i + 1]);
+                } else if (args[i].equals("-minsteptime")) {
+                    minStepTime = Double.parseDouble(args[i + 1]);
+                } else {
+                    showUsage();
+                }
+            }
+        } catch (NumberFormatException e) {
+            showUsage();
+        }
+
+        List<Run> runs = new TestResultsArchive(archiveDirectory).readRuns(runsCount);
+        if (runs.isEmpty()) {
+            System.err.println("No archived run in " + archiveDirectory);
+            System.exit(1);
+        }
+
+        if (command.equals("trend")) {
+            showTrends(runs);
+        } else if (command.equals("flaky")) {
+            showFlakyTests(runs);
+        } else if (command.equals("steps")) {
+            showStepRegressions(runs, threshold / 100, minStepTime);
+        } else {
+            showUsage();
+        }
+        System.exit(0);
+    }
+
+    private static void showTrends(List<Run> runs) {
+        SimpleDateFormat format = new SimpleDateFormat("yyyy-MM-dd HH:mm:ss");
+        for (int i = 0; i < runs.size(); i++) {
+            System.out.println("Run " + (i + 1) + ": " + format.format(runs.get(i).getStartDate()) + " " + runs.get(i).getName());
+        }
+        System.out.println();
+        for (Map.Entry<String, List<TestResult.Status>> entry : TestResultsArchive.getStatusTrends(runs).entrySet()) {
+            StringBuilder trend = new StringBuilder();
+            for (TestResult.Status status : entry.getValue()) {
+                if (status == null) {
+                    trend.append('-');
+                } else if (status == TestResult.Status.SUCCESS) {
+                    trend.append('S');
+                } else if (status == TestResult.Status.FAIL) {
+                    trend.append('F');
+                } else {
+                    trend.append('N');
+                }
+            }
+            System.out.println(trend + "  " + entry.getKey());
+        }
+    }
+
+    private static void showFlakyTests(List<Run> runs) {
+        List<String> flakyTests = TestResultsArchive.getFlakyTests(runs);
+        System.out.println(flakyTests.size() + " flaky test(s) in the last " + runs.size() + " run(s)");
+        for (String testKey : flakyTests) {
+            System.out.println(testKey);
+        }
+    }
+
+    private static void showStepRegressions(List<Run> runs, double threshold, double minStepTime) {
+        List<StepRegression> regressions = TestResultsArchive.getStepDurationRegressions(runs, threshold, minStepTime);
+        System.out.println(regressions.size() + " step duration regression(s) in the last run compared to the " + (runs.size() - 1) + " previous run(s)");
+        for (StepRegression regression : regressions) {
+            System.out.println(String.format("%s | %s: %.3fs (median %.3fs, +%.0f%%)", regression.getTestKey(), regression.getStepKey(),
+                    regression.getLastElapsedTime(), regression.getMedianElapsedTime(),
+                    (regression.getLastElapsedTime() / regression.getMedianElapsedTime() - 1) * 100));
+        }
+    }
+}
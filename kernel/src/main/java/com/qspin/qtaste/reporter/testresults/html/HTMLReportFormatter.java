@@ -56,6 +56,7 @@ import com.qspin.qtaste.reporter.HTMLFormatter;
 import com.qspin.qtaste.reporter.testresults.TestResult;
 import com.qspin.qtaste.reporter.testresults.TestResultImpl.StepResult;
 import com.qspin.qtaste.reporter.testresults.TestResultsReportManager;
+import com.qspin.qtaste.reporter.testresults.TimingStatistics;
 import com.qspin.qtaste.testsuite.TestData;
 import com.qspin.qtaste.testsuite.TestRequirement;
 import com.qspin.qtaste.testsuite.TestSuite;
@@ -86,6 +87,7 @@ public class HTMLReportFormatter extends HTMLFormatter {
     private static final String FILE_NAME_FORMAT = "index-%TY.%<tm.%<td-%<THh%<TMm%<TSs.html";
     private static final String TEST_SUMMARY_FILE_NAME_FORMAT = "summary-%TY.%<tm.%<td-%<THh%<TMm%<TSs.png";
     private static final String INDEX_FILE_NAME = "index.html";
+    private static final int TIMING_STATISTICS_COUNT = 20;
     private static final DateFormat DATE_FORMAT = new SimpleDateFormat("yyyy-MM-dd HH:mm:ss");
     private String testSuiteName;
     private static String outputDir;
@@ -116,6 +118,7 @@ public class HTMLReportFormatter extends HTMLFormatter {
             templates.put("testData", template_root + File.separator + "report_test_data_header.html");
             templates.put("testRequirement", template_root + File.separator + "report_test_requirement_header.html");
             templates.put("executiveSummary", template_root + File.separator + "executive_summary_line.html");
+            templates.put("timingStatistics", template_root + File.separator + "timing_statistics_line.html");
 
 
         } catch (Exception e) {
@@ -167,25 +170,25 @@ public class HTMLReportFormatter extends HTMLFormatter {
         namesValues.add("###QTaste_TESTAPI_VERSION###", getTestAPIVersion());
 
         namesValues.add("###DATE_OF_REPORT###", DATE_FORMAT.format(generationDate));
-        if (currentTestSuite != null && currentTestSuite.getStartExecutionDate() != null) {
-            namesValues.add("###DATE_START###", DATE_FORMAT.format(currentTestSuite.getStartExecutionDate()));
+        if (currentTestSuite != null && currentTestSuite.getReportStartDate() != null) {
+            namesValues.add("###DATE_START###", DATE_FORMAT.format(currentTestSuite.getReportStartDate()));
         } else {
             namesValues.add("###DATE_START###", "&nbsp;");
         }
 
-        if (currentTestSuite != null && currentTestSuite.getStopExecutionDate() != null) {
-            namesValues.add("###DATE_END###", DATE_FORMAT.format(currentTestSuite.getStopExecutionDate()));
+        if (currentTestSuite != null && currentTestSuite.getReportStopDate() != null) {
+            namesValues.add("###DATE_END###", DATE_FORMAT.format(currentTestSuite.getReportStopDate()));
         } else {
             namesValues.add("###DATE_END###", "&nbsp;");
         }
 
         if (currentTestSuite != null) {
             String nbTestsToExecuteStr = currentTestSuite.getNbTestsToExecute() != -1 ? "" + currentTestSuite.getNbTestsToExecute() : "-";
-            namesValues.add("###TESTS_EXECUTED###", currentTestSuite.getNbTestsExecuted() + "/" + nbTestsToExecuteStr);
-            namesValues.add("###TESTS_PASSED###", currentTestSuite.getNbTestsPassed() + "/" + nbTestsToExecuteStr);
-            namesValues.add("###TESTS_FAILED###", currentTestSuite.getNbTestsFailed() + "/" + nbTestsToExecuteStr);
-            namesValues.add("###TESTS_NOT_AVAILABLE###", currentTestSuite.getNbTestsNotAvailable() + "/" + nbTestsToExecuteStr);
-            namesValues.add("###TESTS_RETRIES###", currentTestSuite.getNbTestsRetries() + "/" + nbTestsToExecuteStr);
+            namesValues.add("###TESTS_EXECUTED###", currentTestSuite.getNbTestsExecutedInReport() + "/" + nbTestsToExecuteStr);
+            namesValues.add("###TESTS_PASSED###", currentTestSuite.getNbTestsPassedInReport() + "/" + nbTestsToExecuteStr);
+            namesValues.add("###TESTS_FAILED###", currentTestSuite.getNbTestsFailedInReport() + "/" + nbTestsToExecuteStr);
+            namesValues.add("###TESTS_NOT_AVAILABLE###", currentTestSuite.getNbTestsNotAvailableInReport() + "/" + nbTestsToExecuteStr);
+            namesValues.add("###TESTS_RETRIES###", currentTestSuite.getNbTestsRetriesInReport() + "/" + nbTestsToExecuteStr);
         } else {
             namesValues.add("###TESTS_EXECUTED###", "&nbsp;");
             namesValues.add("###TESTS_PASSED###", "&nbsp;");
@@ -566,6 +569,8 @@ public class HTMLReportFormatter extends HTMLFormatter {
     public void generateFooter() {
         NamesValuesList<String, String> namesValues = new NamesValuesList<String, String>();
         namesValues.add("###SUMMARY_PICTURE###", testSummaryFileName);
+        namesValues.add("###TIMING_STEPS###", generateTimingStatistics(TimingStatistics.Kind.STEP));
+        namesValues.add("###TIMING_VERBS###", generateTimingStatistics(TimingStatistics.Kind.VERB));
         namesValues.add("###TESTBED_CONFIGURATION_FILE_NAME###", StringEscapeUtils.escapeHtml(getTestbedConfigurationFileName()));
         namesValues.add("###TESTBED_CONFIGURATION_FILE_CONTENT###", StringEscapeUtils.escapeHtml(getTestbedConfigurationFileContent()));
         String testbedControlScriptFileName = getTestbedControlScriptFileName();
@@ -580,6 +585,25 @@ public class HTMLReportFormatter extends HTMLFormatter {
         substituteAndWriteFile(templateContents.get("end"), namesValues);
     }
 
+    private String generateTimingStatistics(TimingStatistics.Kind kind) {
+        StringBuffer content = new StringBuffer();
+        String templateContent = this.templateContents.get("timingStatistics");
+
+        for (TimingStatistics.Summary summary : TimingStatistics.getInstance().getSummaries(kind, TIMING_STATISTICS_COUNT)) {
+            NamesValuesList<String, String> namesValues = new NamesValuesList<String, String>();
+            namesValues.add("###TIMING_NAME###", StringEscapeUtils.escapeHtml(summary.getName()));
+            namesValues.add("###TIMING_COUNT###", String.valueOf(summary.getCount()));
+            namesValues.add("###TIMING_TOTAL###", String.format("%.1f", summary.getTotal_ms() / 1000));
+            namesValues.add("###TIMING_MEAN###", String.format("%.1f", summary.getMean_ms()));
+            namesValues.add("###TIMING_P50###", String.format("%.1f", summary.getP50_ms()));
+            namesValues.add("###TIMING_P95###", String.format("%.1f", summary.getP95_ms()));
+            namesValues.add("###TIMING_P99###", String.format("%.1f", summary.getP99_ms()));
+            namesValues.add("###TIMING_MAX###", String.format("%.1f", summary.getMax_ms()));
+            content.append(getSubstitutedTemplateContent(templateContent, namesValues));
+        }
+        return content.toString();
+    }
+
     @Override
     public void stopReport() {
         super.stopReport();
@@ -597,10 +621,10 @@ public class HTMLReportFormatter extends HTMLFormatter {
 
         final DefaultPieDataset pieDataSet = new DefaultPieDataset();
 
-        pieDataSet.setValue("Passed", new Integer(currentTestSuite.getNbTestsPassed()));
-        pieDataSet.setValue("Failed", new Integer(currentTestSuite.getNbTestsFailed()));
-        pieDataSet.setValue("Tests in error", new Integer(currentTestSuite.getNbTestsNotAvailable()));
-        pieDataSet.setValue("Not executed", new Integer(currentTestSuite.getNbTestsToExecute() - currentTestSuite.getNbTestsExecuted()));
+        pieDataSet.setValue("Passed", new Integer(currentTestSuite.getNbTestsPassedInReport()));
+        pieDataSet.setValue("Failed", new Integer(currentTestSuite.getNbTestsFailedInReport()));
+        pieDataSet.setValue("Tests in error", new Integer(currentTestSuite.getNbTestsNotAvailableInReport()));
+        pieDataSet.setValue("Not executed", new Integer(currentTestSuite.getNbTestsToExecute() - currentTestSuite.getNbTestsExecutedInReport()));
         JFreeChart chart = null;
         final boolean drilldown = true;
 
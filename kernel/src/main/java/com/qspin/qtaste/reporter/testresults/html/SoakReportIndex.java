@@ -0,0 +1,246 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.reporter.testresults.html;
+
+import java.io.BufferedWriter;
+import java.io.File;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.io.PrintWriter;
+import java.text.DateFormat;
+import java.text.SimpleDateFormat;
+import java.util.ArrayList;
+import java.util.Date;
+import java.util.List;
+
+import org.apache.commons.lang.StringEscapeUtils;
+import org.apache.log4j.Logger;
+import org.jfree.chart.ChartFactory;
+import org.jfree.chart.ChartUtilities;
+import org.jfree.chart.JFreeChart;
+import org.jfree.chart.plot.PlotOrientation;
+import org.jfree.data.category.DefaultCategoryDataset;
+
+import com.qspin.qtaste.config.TestEngineConfiguration;
+import com.qspin.qtaste.testsuite.TestSuite;
+import com.qspin.qtaste.util.Log4jLoggerFactory;
+
+/**
+ * Index of the report segments of a test suite executed in soak mode.
+ * <p>
+ * In soak mode, the report of a long execution is split in segments, each one having its own report files,
+ * so that the results of a closed segment don't need to be kept in memory. The index is a lightweight HTML page
+ * linking the reports of the segments, with the pass rate and duration trends of the segments.
+ * It is regenerated each time a segment is added, in the "soak-<timestamp>" directory of the generated reports.
+ */
+public class SoakReportIndex {
+
+    private static Logger logger = Log4jLoggerFactory.getLogger(SoakReportIndex.class);
+    private static final String INDEX_FILE_NAME = "index.html";
+    private static final String PASS_RATE_CHART_FILE_NAME = "pass_rate.png";
+    private static final String DURATION_CHART_FILE_NAME = "duration.png";
+    private static final DateFormat DATE_FORMAT = new SimpleDateFormat("yyyy-MM-dd HH:mm:ss");
+
+    /**
+     * Summary of a closed report segment.
+     */
+    public static class Segment {
+        private final Date startDate;
+        private final Date stopDate;
+        private final int nbTestsExecuted, nbTestsPassed, nbTestsFailed, nbTestsNotAvailable, nbTestsRetries;
+        private final List<File> reportFiles;
+
+        Segment(TestSuite testSuite, List<File> reportFiles) {
+            startDate = testSuite.getReportStartDate();
+            stopDate = testSuite.getReportStopDate();
+            nbTestsExecuted = testSuite.getNbTestsExecutedInReport();
+            nbTestsPassed = testSuite.getNbTestsPassedInReport();
+            nbTestsFailed = testSuite.getNbTestsFailedInReport();
+            nbTestsNotAvailable = testSuite.getNbTestsNotAvailableInReport();
+            nbTestsRetries = testSuite.getNbTestsRetriesInReport();
+            this.reportFiles = new ArrayList<File>(reportFiles);
+        }
+
+        public Date getStartDate() {
+            return startDate;
+        }
+
+        public Date getStopDate() {
+            return stopDate;
+        }
+
+        public int getNbTestsExecuted() {
+            return nbTestsExecuted;
+        }
+
+        public int getNbTestsPassed() {
+            return nbTestsPassed;
+        }
+
+        public int getNbTestsFailed() {
+            return nbTestsFailed;
+        }
+
+        public int getNbTestsNotAvailable() {
+            return nbTestsNotAvailable;
+        }
+
+        public int getNbTestsRetries() {
+            return nbTestsRetries;
+        }
+
+        public List<File> getReportFiles() {
+            return reportFiles;
+        }
+
+        /**
+         * @return the percentage of executed tests which passed, or 0 if no test has been executed
+         */
+        public double getPassRate() {
+            return nbTestsExecuted > 0 ? nbTestsPassed * 100.0 / nbTestsExecuted : 0;
+        }
+
+        /**
+         * @return the segment duration, in seconds
+         */
+        public double getDuration_s() {
+            return (stopDate.getTime() - startDate.getTime()) / 1000.0;
+        }
+
+        /**
+         * @return the mean duration of the executed tests, in seconds, or 0 if no test has been executed
+         */
+        public double getMeanTestDuration_s() {
+            return nbTestsExecuted > 0 ? getDuration_s() / nbTestsExecuted : 0;
+        }
+    }
+
+    private final String testSuiteName;
+    private final File indexDirectory;
+    private final List<Segment> segments = new ArrayList<Segment>();
+
+    /**
+     * Creates an index of report segments.
+     * @param testSuiteName the name of the test suite
+     * @param startDate the execution start date, used to name the index directory
+     */
+    public SoakReportIndex(String testSuiteName, Date startDate) {
+        this.testSuiteName = testSuiteName;
+        String output = TestEngineConfiguration.getInstance().getString("reporting.generated_report_path");
+        indexDirectory = new File(output, "soak-" + new SimpleDateFormat("yyyy-MM-dd_HH.mm.ss").format(startDate));
+    }
+
+    public File getIndexFile() {
+        return new File(indexDirectory, INDEX_FILE_NAME);
+    }
+
+    public int getSegmentsCount() {
+        return segments.size();
+    }
+
+    public List<Segment> getSegments() {
+        return segments;
+    }
+
+    /**
+     * Adds a closed segment, with the counters and dates of the current report of the test suite,
+     * and regenerates the index and the trend charts.
+     * @param testSuite the test suite
+     * @param reportFiles the report files of the segment
+     */
+    public void addSegment(TestSuite testSuite, List<File> reportFiles) {
+        segments.add(new Segment(testSuite, reportFiles));
+        if (!indexDirectory.exists()) {
+            indexDirectory.mkdirs();
+        }
+        generateCharts();
+        try {
+            generateIndex();
+        } catch (IOException e) {
+            logger.error("Cannot generate the soak report index " + getIndexFile(), e);
+        }
+    }
+
+    private void generateCharts() {
+        DefaultCategoryDataset passRateDataset = new DefaultCategoryDataset();
+        DefaultCategoryDataset durationDataset = new DefaultCategoryDataset();
+        for (int i = 0; i < segments.size(); i++) {
+            Segment segment = segments.get(i);
+            String segmentNumber = String.valueOf(i + 1);
+            passRateDataset.addValue(segment.getPassRate(), "Pass rate (%)", segmentNumber);
+            durationDataset.addValue(segment.getMeanTestDuration_s(), "Mean test duration (s)", segmentNumber);
+        }
+        saveLineChart("Pass rate", "Pass rate (%)", passRateDataset, PASS_RATE_CHART_FILE_NAME);
+        saveLineChart("Test duration", "Mean test duration (s)", durationDataset, DURATION_CHART_FILE_NAME);
+    }
+
+    private void saveLineChart(String title, String valueAxisLabel, DefaultCategoryDataset dataset, String fileName) {
+        JFreeChart chart = ChartFactory.createLineChart(title, "Segment", valueAxisLabel, dataset, PlotOrientation.VERTICAL, false, false, false);
+        chart.setBackgroundPaint(java.awt.Color.white);
+        File chartFile = new File(indexDirectory, fileName);
+        File tempChartFile = new File(chartFile.getPath() + ".tmp");
+        try {
+            ChartUtilities.saveChartAsPNG(tempChartFile, chart, 600, 300);
+        } catch (IOException e) {
+            logger.error("Problem saving png chart", e);
+            return;
+        }
+        chartFile.delete();
+        if (!tempChartFile.renameTo(chartFile)) {
+            logger.error("Couldn't rename chart file " + tempChartFile + " into " + chartFile);
+        }
+    }
+
+    private void generateIndex() throws IOException {
+        PrintWriter index = new PrintWriter(new BufferedWriter(new FileWriter(getIndexFile())));
+        try {
+            String title = "Soak report of " + StringEscapeUtils.escapeHtml(testSuiteName);
+            index.println("<html>");
+            index.println("<head><title>" + title + "</title></head>");
+            index.println("<body>");
+            index.println("<h1>" + title + "</h1>");
+            index.println("<p><img src=\"" + PASS_RATE_CHART_FILE_NAME + "\"/> <img src=\"" + DURATION_CHART_FILE_NAME + "\"/></p>");
+            index.println("<table border=\"1\" cellspacing=\"0\" cellpadding=\"3\">");
+            index.println("<tr><th>Segment</th><th>Start</th><th>End</th><th>Duration (s)</th><th>Executed</th><th>Passed</th>"
+                    + "<th>Failed</th><th>In error</th><th>Retries</th><th>Pass rate (%)</th><th>Reports</th></tr>");
+            for (int i = 0; i < segments.size(); i++) {
+                Segment segment = segments.get(i);
+                StringBuilder links = new StringBuilder();
+                for (File reportFile : segment.getReportFiles()) {
+                    // the report files are in a sibling directory of the index directory
+                    String path = "../" + reportFile.getParentFile().getName() + "/" + reportFile.getName();
+                    String extension = reportFile.getName().substring(reportFile.getName().lastIndexOf('.') + 1).toUpperCase();
+                    links.append("<a href=\"").append(StringEscapeUtils.escapeHtml(path)).append("\">").append(extension).append("</a> ");
+                }
+                index.println("<tr><td>" + (i + 1) + "</td><td>" + DATE_FORMAT.format(segment.getStartDate()) + "</td><td>"
+                        + DATE_FORMAT.format(segment.getStopDate()) + "</td><td>" + String.format("%.0f", segment.getDuration_s())
+                        + "</td><td>" + segment.getNbTestsExecuted() + "</td><td>" + segment.getNbTestsPassed() + "</td><td>"
+                        + segment.getNbTestsFailed() + "</td><td>" + segment.getNbTestsNotAvailable() + "</td><td>"
+                        + segment.getNbTestsRetries() + "</td><td>" + String.format("%.1f", segment.getPassRate()) + "</td><td>"
+                        + links.toString().trim() + "</td></tr>");
+            }
+            index.println("</table>");
+            index.println("</body>");
+            index.println("</html>");
+        } finally {
+            index.close();
+        }
+    }
+}
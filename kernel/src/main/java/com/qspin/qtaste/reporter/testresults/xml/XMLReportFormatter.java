@@ -144,13 +144,13 @@ public class XMLReportFormatter extends XMLFormatter {
             namesValues.add("###TESTBED_CONTROL_SCRIPT_FILE_CONTENT###", "");
         }
         namesValues.add("###TEST_SUITE###", testSuiteDir);
-        if (currentTestSuite != null && currentTestSuite.getStartExecutionDate() != null) {
-            namesValues.add("###DATE_START###", DATE_FORMAT.format(currentTestSuite.getStartExecutionDate()));
+        if (currentTestSuite != null && currentTestSuite.getReportStartDate() != null) {
+            namesValues.add("###DATE_START###", DATE_FORMAT.format(currentTestSuite.getReportStartDate()));
         } else {
             namesValues.add("###DATE_START###", "");
         }
-        if (currentTestSuite != null && currentTestSuite.getStopExecutionDate() != null) {
-            namesValues.add("###DATE_END###", DATE_FORMAT.format(currentTestSuite.getStopExecutionDate()));
+        if (currentTestSuite != null && currentTestSuite.getReportStopDate() != null) {
+            namesValues.add("###DATE_END###", DATE_FORMAT.format(currentTestSuite.getReportStopDate()));
         } else {
             namesValues.add("###DATE_END###", "");
         }
@@ -160,11 +160,11 @@ public class XMLReportFormatter extends XMLFormatter {
             namesValues.add("###TESTS_TO_EXECUTE###", "");
         }
         if (currentTestSuite != null && testSuiteEnded) {
-            namesValues.add("###TESTS_EXECUTED###", String.valueOf(currentTestSuite.getNbTestsExecuted()));
-            namesValues.add("###TESTS_PASSED###", String.valueOf(currentTestSuite.getNbTestsPassed()));
-            namesValues.add("###TESTS_FAILED###", String.valueOf(currentTestSuite.getNbTestsFailed()));
-            namesValues.add("###TESTS_NOT_AVAILABLE###", String.valueOf(currentTestSuite.getNbTestsNotAvailable()));
-            namesValues.add("###TESTS_RETRIES###", String.valueOf(currentTestSuite.getNbTestsRetries()));
+            namesValues.add("###TESTS_EXECUTED###", String.valueOf(currentTestSuite.getNbTestsExecutedInReport()));
+            namesValues.add("###TESTS_PASSED###", String.valueOf(currentTestSuite.getNbTestsPassedInReport()));
+            namesValues.add("###TESTS_FAILED###", String.valueOf(currentTestSuite.getNbTestsFailedInReport()));
+            namesValues.add("###TESTS_NOT_AVAILABLE###", String.valueOf(currentTestSuite.getNbTestsNotAvailableInReport()));
+            namesValues.add("###TESTS_RETRIES###", String.valueOf(currentTestSuite.getNbTestsRetriesInReport()));
         } else {
             namesValues.add("###TESTS_EXECUTED###", "");
             namesValues.add("###TESTS_PASSED###", "");
@@ -0,0 +1,243 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.reporter.testresults.xml;
+
+import java.io.BufferedWriter;
+import java.io.File;
+import java.io.FileInputStream;
+import java.io.FileOutputStream;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.io.Writer;
+import java.text.ParseException;
+import java.text.SimpleDateFormat;
+import java.util.ArrayList;
+import java.util.Date;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.regex.Matcher;
+import java.util.regex.Pattern;
+
+import org.apache.commons.lang.StringEscapeUtils;
+
+import com.qspin.qtaste.util.FileUtilities;
+
+/**
+ * Merges XML test results reports generated by several QTaste JVMs for the same test suite, e.g. by the shards
+ * of a sharded campaign run, into one XML report.
+ * <p>
+ * An XML report is made of a main file, whose "log" element contains the counters of the report, and of a
+ * results file, included by the main file as an external entity. The merged main file is the main file of the
+ * first report with the counters summed, the earliest start date and the latest end date, and the merged results
+ * file is the concatenation of the results files.
+ */
+public class XMLReportMerger {
+
+    private static final Pattern LOG_ELEMENT_PATTERN = Pattern.compile("<log\\s[^>]*>");
+    private static final Pattern ATTRIBUTE_PATTERN = Pattern.compile("(\\w+)=\"([^\"]*)\"");
+    private static final Pattern RESULTS_ENTITY_PATTERN = Pattern.compile("(<!ENTITY\\s+results\\s+SYSTEM\\s+\")([^\"]*)(\")");
+    private static final String[] COUNTER_ATTRIBUTES = {"numberTestsExecuted", "numberTestsPassed", "numberTestsFailed",
+            "numberTestsNotAvailable", "numberTestsRetries"};
+    private static final String DATE_FORMAT = "yyyy-MM-dd HH:mm:ss";
+
+    /**
+     * Main file of an XML report, with the attributes of its "log" element.
+     */
+    public static class Report {
+        private final File file;
+        private final String content;
+        private final Map<String, String> attributes = new LinkedHashMap<String, String>();
+        private final File resultsFile;
+
+        /**
+         * Reads the main file of an XML report.
+         * @param file the main file
+         * @throws IOException if the file cannot be read or is not the main file of an XML report
+         */
+        public Report(File file) throws IOException {
+            this.file = file;
+            content = FileUtilities.readFileContent(file.getPath());
+            Matcher logElementMatcher = LOG_ELEMENT_PATTERN.matcher(content);
+            if (!logElementMatcher.find()) {
+                throw new IOException(file + " is not an XML report main file");
+            }
+            Matcher attributeMatcher = ATTRIBUTE_PATTERN.matcher(logElementMatcher.group());
+            while (attributeMatcher.find()) {
+                attributes.put(attributeMatcher.group(1), StringEscapeUtils.unescapeXml(attributeMatcher.group(2)));
+            }
+            Matcher resultsEntityMatcher = RESULTS_ENTITY_PATTERN.matcher(content);
+            resultsFile = (resultsEntityMatcher.find() ? new File(file.getParentFile(), resultsEntityMatcher.group(2)) : null);
+        }
+
+        public File getFile() {
+            return file;
+        }
+
+        public String getAttribute(String name) {
+            return attributes.get(name);
+        }
+
+        /**
+         * @return the test suite name of the report
+         */
+        public String getTestSuite() {
+            return attributes.get("testSuite");
+        }
+
+        /**
+         * @return the value of a counter attribute, or 0 if it is not set, e.g. because the report was not stopped
+         */
+        public int getCounter(String name) {
+            try {
+                return Integer.parseInt(attributes.get(name));
+            } catch (NumberFormatException e) {
+                return 0;
+            }
+        }
+
+        /**
+         * @return the value of a date attribute, or null if it is not set
+         */
+        public Date getDate(String name) {
+            String value = attributes.get(name);
+            if (value == null || value.length() == 0) {
+                return null;
+            }
+            try {
+                return new SimpleDateFormat(DATE_FORMAT).parse(value);
+            } catch (ParseException e) {
+                return null;
+            }
+        }
+    }
+
+    private XMLReportMerger() {
+    }
+
+    /**
+     * Finds the main files of the XML reports in a directory and its sub-directories.
+     * @param directory the directory
+     * @return the report main files, sorted by path
+     */
+    public static List<File> findReportFiles(File directory) {
+        List<File> reportFiles = new ArrayList<File>();
+        File[] files = FileUtilities.listSortedFiles(directory);
+        if (files != null) {
+            for (File file : files) {
+                if (file.isDirectory()) {
+                    reportFiles.addAll(findReportFiles(file));
+                } else if (file.getName().startsWith("log-") && !file.getName().startsWith("log-results-") && file.getName().endsWith(".xml")) {
+                    reportFiles.add(file);
+                }
+            }
+        }
+        return reportFiles;
+    }
+
+    /**
+     * Merges XML reports into one.
+     * @param reports the reports to merge, which must not be empty
+     * @param testSuiteName the test suite name of the merged report
+     * @param mergedReportFile the main file of the merged report, the merged results file being written
+     *                         in the same directory, with the "log-results-" prefix instead of "log-"
+     * @return the merged report
+     * @throws IOException if a report cannot be read or the merged report cannot be written
+     */
+    public static Report merge(List<Report> reports, String testSuiteName, File mergedReportFile) throws IOException {
+        File mergedResultsFile = new File(mergedReportFile.getParentFile(), mergedReportFile.getName().replaceFirst("^log-", "log-results-"));
+        if (!mergedReportFile.getParentFile().exists()) {
+            mergedReportFile.getParentFile().mkdirs();
+        }
+
+        // concatenate the results files
+        OutputStream output = new FileOutputStream(mergedResultsFile);
+        try {
+            byte[] buffer = new byte[8192];
+            for (Report report : reports) {
+                if (report.resultsFile == null || !report.resultsFile.exists()) {
+                    continue;
+                }
+                InputStream input = new FileInputStream(report.resultsFile);
+                try {
+                    int length;
+                    while ((length = input.read(buffer)) > 0) {
+                        output.write(buffer, 0, length);
+                    }
+                } finally {
+                    input.close();
+                }
+            }
+        } finally {
+            output.close();
+        }
+
+        // sum the counters
+        Map<String, String> mergedAttributes = new LinkedHashMap<String, String>();
+        mergedAttributes.put("testSuite", testSuiteName);
+        for (String counter : COUNTER_ATTRIBUTES) {
+            int sum = 0;
+            for (Report report : reports) {
+                sum += report.getCounter(counter);
+            }
+            mergedAttributes.put(counter, String.valueOf(sum));
+        }
+        int numberTestsToExecute = 0;
+        Date startDate = null;
+        Date endDate = null;
+        for (Report report : reports) {
+            int n = report.getCounter("numberTestsToExecute");
+            numberTestsToExecute = (numberTestsToExecute == -1 || n == -1 ? -1 : numberTestsToExecute + n);
+            Date reportStartDate = report.getDate("startDate");
+            if (reportStartDate != null && (startDate == null || reportStartDate.before(startDate))) {
+                startDate = reportStartDate;
+            }
+            Date reportEndDate = report.getDate("endDate");
+            if (reportEndDate != null && (endDate == null || reportEndDate.after(endDate))) {
+                endDate = reportEndDate;
+            }
+        }
+        mergedAttributes.put("numberTestsToExecute", String.valueOf(numberTestsToExecute));
+        mergedAttributes.put("startDate", startDate != null ? new SimpleDateFormat(DATE_FORMAT).format(startDate) : "");
+        mergedAttributes.put("endDate", endDate != null ? new SimpleDateFormat(DATE_FORMAT).format(endDate) : "");
+
+        // write the main file of the first report with the merged attributes
+        String content = reports.get(0).content;
+        Matcher logElementMatcher = LOG_ELEMENT_PATTERN.matcher(content);
+        logElementMatcher.find();
+        String logElement = logElementMatcher.group();
+        for (Map.Entry<String, String> attribute : mergedAttributes.entrySet()) {
+            logElement = logElement.replaceFirst("(\\s" + attribute.getKey() + "=\")[^\"]*(\")",
+                    "$1" + Matcher.quoteReplacement(StringEscapeUtils.escapeXml(attribute.getValue())) + "$2");
+        }
+        content = content.substring(0, logElementMatcher.start()) + logElement + content.substring(logElementMatcher.end());
+        content = RESULTS_ENTITY_PATTERN.matcher(content).replaceFirst("$1" + Matcher.quoteReplacement(mergedResultsFile.getName()) + "$3");
+        Writer writer = new BufferedWriter(new FileWriter(mergedReportFile));
+        try {
+            writer.write(content);
+        } finally {
+            writer.close();
+        }
+
+        return new Report(mergedReportFile);
+    }
+}
@@ -131,6 +131,12 @@ public interface TestData {
      */
     public void loadFileIfAny();
 
+    /**
+     * Releases the contents of the files loaded into this container, to free memory once the TestScript
+     * has been executed with this data. They are loaded again by the next call to loadFileIfAny.
+     */
+    public void unloadFiles();
+
     public LinkedHashMap<String, String> getDataHash();
 
     /**
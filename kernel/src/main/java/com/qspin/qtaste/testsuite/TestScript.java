@@ -36,11 +36,13 @@ import org.apache.log4j.Logger;
 import com.qspin.qtaste.config.TestEngineConfiguration;
 import com.qspin.qtaste.datacollection.collection.CacheImpl;
 import com.qspin.qtaste.kernel.engine.TestEngine;
+import com.qspin.qtaste.kernel.testapi.ComponentLifecycle;
 import com.qspin.qtaste.kernel.testapi.TestAPI;
 import com.qspin.qtaste.kernel.testapi.TestAPIImpl;
 import com.qspin.qtaste.reporter.testresults.TestResult;
 import com.qspin.qtaste.reporter.testresults.TestResultImpl;
 import com.qspin.qtaste.reporter.testresults.TestResultsReportManager;
+import com.qspin.qtaste.testsuite.impl.TestScheduler;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
 
 /**
@@ -62,6 +64,8 @@ public abstract class TestScript implements Executable {
     private boolean abortedByUser = false;
     private static final int DEFAULT_TIMEOUT = 60 * 1000;
     private int RETRY_COUNTER;
+    // true if the last executed data row failed and has to be retried
+    private boolean retryNeeded = false;
 
     public TestScript(File fileName, File testSuiteDirectory, String name, TestDataSet data, List<TestRequirement> requirements, TestSuite testSuite) {
         this.name = name;
@@ -85,6 +89,15 @@ public abstract class TestScript implements Executable {
      * @return true if success, false otherwise
      */
     public boolean execute(boolean debug) {
+        try {
+            return executeData(debug);
+        } finally {
+            // terminate the components living until the end of the test script
+            testAPI.terminateComponents(ComponentLifecycle.Scope.TEST_SCRIPT);
+        }
+    }
+
+    private boolean executeData(boolean debug) {
         final String INTERACTIVE_REPORT_NAME = "Interactive";
         boolean returnStatus = true;
         TestResultsReportManager reportManager = TestResultsReportManager.getInstance();
@@ -93,112 +106,171 @@ public abstract class TestScript implements Executable {
             reportManager.startReport(new Date(), INTERACTIVE_REPORT_NAME);
         }
         testResults = new LinkedList<TestResult>();
+        boolean postponeRetries = testSuite != null && TestScheduler.getInstance().isPostponingRetries();
 
         for (TestData data : ds.getData()) {
             if (data.isSelected()) {
                 data.setTestCaseDirectory(fileName.toString());
                 data.loadFileIfAny();
 
-                TestResult.Status status = TestResult.Status.NOT_EXECUTED;
-                int trial = 0;
-                boolean needToRetry = false;
-                // Retry the script "RETRY_COUNTER" times in case of failure
-                do {
-                	if (TestEngine.isAbortedByUser()) {
-                        return false;
-                	}
-
-                    if (TestEngine.needToRestartSUT()) {
-                        logger.info("SUT has to be restarted");
-                        if (!TestEngine.restartSUT()) {
-                            logger.fatal("Failed to restart SUT - exiting");
-                            return false;
-                        }
-                    }
+                TestResult.Status status = executeRow(debug, data, 0, postponeRetries ? 0 : RETRY_COUNTER, reportManager);
+                if (status == null) {
+                    return false;
+                }
+                if (status != TestResult.Status.SUCCESS) {
+                    returnStatus = false;
+                }
 
-                    if (trial == 0) {
-                        logger.info("Executing test script: " + getName() + " (row " + data.getRowId() + ")");
-                    } else {
-                        logger.info("Retrying test script: " + getName() + " (row " + data.getRowId() + ") after SUT restart");
-                        if (testSuite != null) {
-                            testSuite.reportTestRetry();
-                        }
-                    }
+                // the files contents are loaded again at the next execution of the row
+                data.unloadFiles();
 
-                    TestResult testResult = initTestResult(data, requirements, trial, reportManager, ds.getData().indexOf(data), ds.getData().size());
-                    testResults.add(testResult);
+                if (retryNeeded) {
+                    // the result is reported once the postponed retry is executed
+                    logger.info("Postponing retry of test script: " + getName() + " (row " + data.getRowId() + ") to the end of the run");
+                    testSuite.postponeRetry(this, data);
+                } else if (testSuite != null) {
+                    testSuite.reportTestResult(status);
+                }
+            }
 
-                    int timeout = DEFAULT_TIMEOUT;
-                    if (debug) {
-                        logger.info("Not using test timeout because running in debug mode");
-                    } else {
-	                    try {
-	                        timeout = data.getIntValue("TIMEOUT");
-	                        logger.info("Using test timeout of " + timeout + " seconds");
-	                        timeout = timeout * 1000;
-	                    } catch (QTasteDataException e) {
-	                        if (e.getMessage().contains("doesn't contain")) {
-	                            logger.info("No TIMEOUT test data, using default test timeout (" + DEFAULT_TIMEOUT / 1000 + " seconds)");
-	                        } else {
-	                            logger.error(e.getMessage() + ". Using default test timeout (" + DEFAULT_TIMEOUT / 1000 + " seconds)");
-	                        }
-	                    }
-                    }
+            if (isAbortedByUser()) {
+                return false;
+            }
+        }
+
+        return returnStatus;
+    }
+
+    /**
+     * Restarts the SUT and executes a retry of a data row which has been postponed to the end of the run,
+     * then reports its result to the test suite of the test script.
+     * @param debug true if in debug mode, false otherwise
+     * @param data the data row
+     * @return true if success, false otherwise
+     */
+    public boolean executePostponedRetry(boolean debug, TestData data) {
+        try {
+            data.loadFileIfAny();
+            // the SUT restart has been postponed together with the retry
+            TestEngine.setNeedToRestartSUT();
+            TestResult.Status status = executeRow(debug, data, 1, RETRY_COUNTER, TestResultsReportManager.getInstance());
+            if (status == null) {
+                return false;
+            }
+            data.unloadFiles();
+            if (testSuite != null) {
+                testSuite.reportTestResult(status);
+            }
+            return status == TestResult.Status.SUCCESS;
+        } finally {
+            testAPI.terminateComponents(ComponentLifecycle.Scope.TEST_SCRIPT);
+        }
+    }
 
-                    TaskThread taskThread = new TaskThread(debug, data, testResult, timeout);
+    /**
+     * Executes the trials of a data row, retrying it after a SUT restart in case of failure.
+     * Sets retryNeeded if the last trial failed and a retry remains to be done, in which case the SUT restart
+     * is left to the retry.
+     * @param firstTrial the first trial number, 0 for the first execution
+     * @param lastTrial the last trial number to execute
+     * @return the status of the last trial, or null if the execution must be stopped
+     */
+    private TestResult.Status executeRow(boolean debug, TestData data, int firstTrial, int lastTrial, TestResultsReportManager reportManager) {
+        TestResult.Status status = TestResult.Status.NOT_EXECUTED;
+        int trial = firstTrial;
+        boolean needToRetry = false;
+        // Retry the script "RETRY_COUNTER" times in case of failure
+        do {
+        	if (TestEngine.isAbortedByUser()) {
+                return null;
+        	}
+
+            if (TestEngine.needToRestartSUT()) {
+                logger.info("SUT has to be restarted");
+                if (!TestEngine.restartSUT()) {
+                    logger.fatal("Failed to restart SUT - exiting");
+                    return null;
+                }
+            }
 
-                    // clear cache history
-                    CacheImpl.getInstance().clearHistory();
+            if (trial == 0) {
+                logger.info("Executing test script: " + getName() + " (row " + data.getRowId() + ")");
+            } else {
+                logger.info("Retrying test script: " + getName() + " (row " + data.getRowId() + ") after SUT restart");
+                if (testSuite != null) {
+                    testSuite.reportTestRetry();
+                }
+            }
 
-                    // initialize instantiated components
-                    testAPI.initializeComponents();
+            TestResult testResult = initTestResult(data, requirements, trial, reportManager, ds.getData().indexOf(data), ds.getData().size());
+            testResults.add(testResult);
 
-                    testResult.start();
+            int timeout = DEFAULT_TIMEOUT;
+            if (debug) {
+                logger.info("Not using test timeout because running in debug mode");
+            } else {
+	            try {
+	                timeout = data.getIntValue("TIMEOUT");
+	                logger.info("Using test timeout of " + timeout + " seconds");
+	                timeout = timeout * 1000;
+	            } catch (QTasteDataException e) {
+	                if (e.getMessage().contains("doesn't contain")) {
+	                    logger.info("No TIMEOUT test data, using default test timeout (" + DEFAULT_TIMEOUT / 1000 + " seconds)");
+	                } else {
+	                    logger.error(e.getMessage() + ". Using default test timeout (" + DEFAULT_TIMEOUT / 1000 + " seconds)");
+	                }
+	            }
+            }
 
-                    // wait till the end of the Task or Timeout
-                    reportManager.putEntry(testResult);
+            TaskThread taskThread = new TaskThread(debug, data, testResult, timeout);
 
-                    taskThread.start();
-                    boolean taskThreadTerminated = taskThread.waitForEnd();
-                    //TODO: Issue #141: "... handle the test timeout by subtracting the time passed while the pop-up is displayed"
-                    // One possibility is to implement a Timeout manager to be able to change timeout behavior while thread is still running.
-                    // In this case, this shall be available from e.g. Utility (open input pop-up).
-                    // One idea to implement the timeout mechanism is to use conditional variables + mutex.
+            // clear cache history
+            CacheImpl.getInstance().clearHistory();
 
-                    reportManager.refresh();
+            // initialize instantiated components which are not initialized
+            testAPI.initializeComponents();
 
-                    // terminate instantiated components
-                    testAPI.terminateComponents();
+            testResult.start();
 
-                    // exit QTaste if test thread couldn't be stopped, because we are in an unstable state
-                    if (!taskThreadTerminated) {
-                        JOptionPane.showMessageDialog(null, "Couldn't stop test thread!\nQTaste will now exit because system state is unstable.", "Fatal error", JOptionPane.ERROR_MESSAGE);
-                        TestEngine.shutdown();
-                        System.exit(1);
-                    }
+            // wait till the end of the Task or Timeout
+            reportManager.putEntry(testResult);
 
-                    status = testResult.getStatus();
-                    if (status != TestResult.Status.SUCCESS)
-                    {
-                        if (status == TestResult.Status.FAIL) {
-                           needToRetry = TestEngine.setNeedToRestartSUT();
-                        }
-                        returnStatus = false;
-                    }
-                    trial++;
-                } while (needToRetry && trial <= RETRY_COUNTER);
+            taskThread.start();
+            boolean taskThreadTerminated = taskThread.waitForEnd();
+            //TODO: Issue #141: "... handle the test timeout by subtracting the time passed while the pop-up is displayed"
+            // One possibility is to implement a Timeout manager to be able to change timeout behavior while thread is still running.
+            // In this case, this shall be available from e.g. Utility (open input pop-up).
+            // One idea to implement the timeout mechanism is to use conditional variables + mutex.
 
-                if (testSuite != null) {
-                    testSuite.reportTestResult(status);
-                }
-            }
+            reportManager.refresh();
+            reportManager.archiveEntry(testResult);
 
-            if (isAbortedByUser()) {
-                return false;
+            // terminate instantiated components living for one data row
+            testAPI.terminateComponents(ComponentLifecycle.Scope.DATA_ROW);
+
+            // exit QTaste if test thread couldn't be stopped, because we are in an unstable state
+            if (!taskThreadTerminated) {
+                JOptionPane.showMessageDialog(null, "Couldn't stop test thread!\nQTaste will now exit because system state is unstable.", "Fatal error", JOptionPane.ERROR_MESSAGE);
+                TestEngine.shutdown();
+                System.exit(1);
             }
-        }
 
-        return returnStatus;
+            status = testResult.getStatus();
+            if (status != TestResult.Status.SUCCESS)
+            {
+                if (status == TestResult.Status.FAIL) {
+                    if (trial < lastTrial || trial >= RETRY_COUNTER) {
+                        needToRetry = TestEngine.setNeedToRestartSUT();
+                    } else {
+                        // the retry is postponed, the SUT will be restarted just before it
+                        needToRetry = TestEngine.canRestartSUT();
+                    }
+                }
+            }
+            trial++;
+        } while (needToRetry && trial <= lastTrial);
+        retryNeeded = needToRetry && trial <= RETRY_COUNTER;
+        return status;
     }
 
     public boolean isAbortedByUser() {
@@ -213,7 +285,12 @@ public abstract class TestScript implements Executable {
         return fileName.toString();
     }
 
-    private TestResult initTestResult(TestData data, List<TestRequirement> requirements, int retryCount, TestResultsReportManager reporter, int currentRowIndex, int numberRows) {
+    /**
+     * Gets the test case name, as reported in the test results, which is the test case directory
+     * relative to the test suite directory.
+     * @return the test case name
+     */
+    public String getTestCaseName() {
         String testCaseDirectory = getTestCaseDirectory();
         String testSuiteDirectory = this.testSuiteDirectory.toString();
         String testCaseName;
@@ -225,9 +302,12 @@ public abstract class TestScript implements Executable {
         if (testCaseName.equals("QTaste_interactive")) {
         	testCaseName = name;
         }
+        return testCaseName;
+    }
 
-        TestResult result = new TestResultImpl(testCaseName, data, requirements, currentRowIndex, numberRows);
-        result.setTestCaseDirectory(testCaseDirectory);
+    private TestResult initTestResult(TestData data, List<TestRequirement> requirements, int retryCount, TestResultsReportManager reporter, int currentRowIndex, int numberRows) {
+        TestResult result = new TestResultImpl(getTestCaseName(), data, requirements, currentRowIndex, numberRows);
+        result.setTestCaseDirectory(getTestCaseDirectory());
         result.setTestScriptVersion(version);
 
         // TODO: What's this???
@@ -24,6 +24,7 @@
  */
 package com.qspin.qtaste.testsuite;
 
+import java.io.File;
 import java.util.Date;
 import java.util.LinkedList;
 import java.util.List;
@@ -33,6 +34,7 @@ import org.apache.log4j.Logger;
 import com.qspin.qtaste.kernel.engine.TestEngine;
 import com.qspin.qtaste.reporter.testresults.TestResult;
 import com.qspin.qtaste.reporter.testresults.TestResultsReportManager;
+import com.qspin.qtaste.reporter.testresults.html.SoakReportIndex;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
 
 /**
@@ -42,9 +44,12 @@ import com.qspin.qtaste.util.Log4jLoggerFactory;
 public abstract class TestSuite implements TestReportListener {
 
     private static Logger logger = Log4jLoggerFactory.getLogger(TestSuite.class);
+    private static final long HOUR_MS = 60 * 60 * 1000L;
     protected String name;
     protected int numberLoops = 1;
     protected boolean loopsInTime = false;
+    protected int segmentSize = 0;
+    protected boolean segmentsInTime = false;
     private Date startExecutionDate;
     private Date stopExecutionDate;
     private int nbTestsToExecute = 0;
@@ -53,7 +58,31 @@ public abstract class TestSuite implements TestReportListener {
     private int nbTestsFailed = 0;
     private int nbTestsNotAvailable = 0;
     private int nbTestsRetries = 0;
+    // start and stop dates of the current report and counters at its start, the report being a segment of the execution in soak mode
+    private Date reportStartDate;
+    private Date reportStopDate;
+    private int reportStartNbTestsExecuted = 0;
+    private int reportStartNbTestsPassed = 0;
+    private int reportStartNbTestsFailed = 0;
+    private int reportStartNbTestsNotAvailable = 0;
+    private int reportStartNbTestsRetries = 0;
     private List<TestReportListener> testReportListeners = new LinkedList<TestReportListener>();
+    // test suite containing this test suite, to which the retries are postponed, null if this is the top-level test suite
+    private TestSuite parentTestSuite;
+    // data rows whose retry after a SUT restart has been postponed to the end of the execution of the top-level test suite
+    private List<PostponedRetry> postponedRetries = new LinkedList<PostponedRetry>();
+
+    private static class PostponedRetry {
+        private final TestSuite testSuite;
+        private final TestScript testScript;
+        private final TestData data;
+
+        private PostponedRetry(TestSuite testSuite, TestScript testScript, TestData data) {
+            this.testSuite = testSuite;
+            this.testScript = testScript;
+            this.data = data;
+        }
+    }
 
     /** Creates a new instance of TestSuite */
     public TestSuite(String name) {
@@ -82,8 +111,10 @@ public abstract class TestSuite implements TestReportListener {
      */
     public boolean execute(boolean debug, boolean initializeTestEngine) {
         boolean executionSuccess = true;
+        SoakReportIndex soakReportIndex = null;
         nbTestsToExecute = computeNumberTestsToExecute();
         startExecutionDate = new Date();
+        startReportCounters(startExecutionDate);
         reportTestSuiteStarted();
         if (nbTestsToExecute != 0 || !TestEngine.isAbortedByUser()) {
             if (!initializeTestEngine || TestEngine.initialize()) {
@@ -91,23 +122,46 @@ public abstract class TestSuite implements TestReportListener {
                     boolean continueExecution = true;
                     int currentExecution = 1;
                     long startTime_ms = System.currentTimeMillis();
+                    if (segmentSize > 0) {
+                        soakReportIndex = new SoakReportIndex(getName(), reportStartDate);
+                    }
+                    int segmentStartExecution = 1;
+                    long segmentStartTime_ms = startTime_ms;
                     do {
                         logger.info("Execution " + currentExecution + (numberLoops != -1 && !loopsInTime ? " of " + numberLoops : "") + " of test suite " + getName());
                         if (!executeOnce(debug)) {
                             executionSuccess = false;
                         }
+                        if (!executePostponedRetries(debug)) {
+                            executionSuccess = false;
+                        }
                         if (loopsInTime) {
                             long elapsedTime_ms = System.currentTimeMillis() - startTime_ms;
-                            long elapsedTime_m = elapsedTime_ms / 1000 / 60;
-                            continueExecution = elapsedTime_m < numberLoops;
+                            continueExecution = elapsedTime_ms < numberLoops * HOUR_MS;
                         } else {
                         	continueExecution = numberLoops == -1 || currentExecution < numberLoops;
                         }
                         continueExecution &= !TestEngine.isAbortedByUser();
+                        if (soakReportIndex != null && continueExecution) {
+                            boolean segmentEnded;
+                            if (segmentsInTime) {
+                                segmentEnded = System.currentTimeMillis() - segmentStartTime_ms >= segmentSize * HOUR_MS;
+                            } else {
+                                segmentEnded = currentExecution - segmentStartExecution + 1 >= segmentSize;
+                            }
+                            if (segmentEnded) {
+                                rollReportSegment(soakReportIndex);
+                                segmentStartExecution = currentExecution + 1;
+                                segmentStartTime_ms = System.currentTimeMillis();
+                            }
+                        }
                         currentExecution++;
                     } while (continueExecution);
                 } else {
                     executionSuccess = executeOnce(debug);
+                    if (!executePostponedRetries(debug)) {
+                        executionSuccess = false;
+                    }
                 }
             } else {
             	executionSuccess = false;
@@ -120,10 +174,99 @@ public abstract class TestSuite implements TestReportListener {
             executionSuccess = false;
         }
         stopExecutionDate = new Date();
+        reportStopDate = stopExecutionDate;
+        if (soakReportIndex != null) {
+            // the report of the last segment is stopped by the caller
+            soakReportIndex.addSegment(this, TestResultsReportManager.getInstance().getReportFiles());
+        }
         reportTestSuiteStopped();
         return executionSuccess;
     }
 
+    /**
+     * Closes the current report segment and starts a new one, so that the results of the closed segment
+     * are released from memory. The index of the segments is updated with the closed segment.
+     */
+    private void rollReportSegment(SoakReportIndex soakReportIndex) {
+        TestResultsReportManager reportManager = TestResultsReportManager.getInstance();
+        reportStopDate = new Date();
+        List<File> reportFiles = reportManager.getReportFiles();
+        reportManager.stopReport();
+        soakReportIndex.addSegment(this, reportFiles);
+        logger.info("Report segment " + soakReportIndex.getSegmentsCount() + " of test suite " + getName() + " closed");
+
+        // the report directory is named after the report timestamp, in seconds
+        Date previousReportStartDate = reportStartDate;
+        Date newReportStartDate = new Date(Math.max(System.currentTimeMillis(), previousReportStartDate.getTime() + 1000));
+        startReportCounters(newReportStartDate);
+        reportManager.startReport(newReportStartDate, getName());
+        reportManager.refresh();
+    }
+
+    /**
+     * Sets the test suite containing this test suite, to which the retries are postponed.
+     * @param parentTestSuite the parent test suite
+     */
+    public void setParentTestSuite(TestSuite parentTestSuite) {
+        this.parentTestSuite = parentTestSuite;
+    }
+
+    /**
+     * Postpones the retry of a failed data row to the end of the current execution of the top-level test suite,
+     * so that the retries triggering a SUT restart don't delay the feedback of the other tests.
+     * The result of the retry is reported to this test suite.
+     * @param testScript the test script
+     * @param data the data row to retry
+     */
+    public void postponeRetry(TestScript testScript, TestData data) {
+        postponeRetry(new PostponedRetry(this, testScript, data));
+    }
+
+    private void postponeRetry(PostponedRetry retry) {
+        if (parentTestSuite != null) {
+            parentTestSuite.postponeRetry(retry);
+        } else {
+            postponedRetries.add(retry);
+        }
+    }
+
+    /**
+     * Executes the postponed retries, in the order they have been postponed.
+     * @param debug true to execute in debug mode, false otherwise
+     * @return true if all the retries are successful, false otherwise
+     */
+    private boolean executePostponedRetries(boolean debug) {
+        boolean result = true;
+        if (!postponedRetries.isEmpty()) {
+            logger.info("Executing " + postponedRetries.size() + " postponed retries of test suite " + getName());
+        }
+        while (!postponedRetries.isEmpty()) {
+            if (TestEngine.isAbortedByUser()) {
+                // the failed executions of the rows which won't be retried are the final results
+                for (PostponedRetry retry : postponedRetries) {
+                    retry.testSuite.reportTestResult(TestResult.Status.FAIL);
+                }
+                postponedRetries.clear();
+                return false;
+            }
+            PostponedRetry retry = postponedRetries.remove(0);
+            if (!retry.testScript.executePostponedRetry(debug, retry.data)) {
+                result = false;
+            }
+        }
+        return result;
+    }
+
+    private void startReportCounters(Date startDate) {
+        reportStartDate = startDate;
+        reportStopDate = null;
+        reportStartNbTestsExecuted = nbTestsExecuted;
+        reportStartNbTestsPassed = nbTestsPassed;
+        reportStartNbTestsFailed = nbTestsFailed;
+        reportStartNbTestsNotAvailable = nbTestsNotAvailable;
+        reportStartNbTestsRetries = nbTestsRetries;
+    }
+
     public abstract List<TestScript> getTestScripts();
 
     public void reportTestSuiteStarted() {
@@ -153,6 +296,19 @@ public abstract class TestSuite implements TestReportListener {
         this.loopsInTime = loopsInHours;
     }
 
+    /**
+     * Splits the execution report in segments, each segment having its own report files, for long executions
+     * in loop (soak mode). The segments are closed between two executions of the test suite and an index of the
+     * segments, with the pass rate and duration trends, is generated.
+     * @param segmentSize number of executions or number of hours of execution per segment, or 0 for no segment
+     * @param segmentsInHours if true, segmentSize is the number of hours of execution per segment
+     *                        otherwise segmentSize is the number of executions per segment
+     */
+    public void setReportSegments(int segmentSize, boolean segmentsInHours) {
+        this.segmentSize = segmentSize;
+        this.segmentsInTime = segmentsInHours;
+    }
+
     public String getName() {
         return name;
     }
@@ -165,6 +321,22 @@ public abstract class TestSuite implements TestReportListener {
         return stopExecutionDate;
     }
 
+    /**
+     * Gets the start date of the current report, which is the start date of the current segment in soak mode.
+     * @return the start date of the current report
+     */
+    public Date getReportStartDate() {
+        return reportStartDate;
+    }
+
+    /**
+     * Gets the stop date of the current report, which is the stop date of the current segment in soak mode.
+     * @return the stop date of the current report, or null if it is not stopped
+     */
+    public Date getReportStopDate() {
+        return reportStopDate;
+    }
+
     public int getNbTestsToExecute() {
         return nbTestsToExecute;
     }
@@ -222,6 +394,26 @@ public abstract class TestSuite implements TestReportListener {
         return nbTestsRetries;
     }
 
+    public int getNbTestsExecutedInReport() {
+        return nbTestsExecuted - reportStartNbTestsExecuted;
+    }
+
+    public int getNbTestsPassedInReport() {
+        return nbTestsPassed - reportStartNbTestsPassed;
+    }
+
+    public int getNbTestsFailedInReport() {
+        return nbTestsFailed - reportStartNbTestsFailed;
+    }
+
+    public int getNbTestsNotAvailableInReport() {
+        return nbTestsNotAvailable - reportStartNbTestsNotAvailable;
+    }
+
+    public int getNbTestsRetriesInReport() {
+        return nbTestsRetries - reportStartNbTestsRetries;
+    }
+
     public void addTestReportListener(TestReportListener listener) {
         testReportListeners.add(listener);
     }
@@ -0,0 +1,240 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.testsuite.impl;
+
+import java.lang.reflect.Array;
+import java.lang.reflect.Field;
+import java.lang.reflect.Method;
+import java.lang.reflect.Modifier;
+import java.util.Collection;
+import java.util.Map;
+
+import org.python.core.PyArray;
+import org.python.core.PyInstance;
+import org.python.core.PyJavaInstance;
+import org.python.core.PyList;
+import org.python.core.PyObject;
+
+import com.qspin.qtaste.ui.debug.DebugVariable;
+
+/**
+ * Creates the debugger variables of the Python and Java objects of a test script.
+ * <p>
+ * The fields of a variable are only loaded when they are displayed, one level at a time.
+ * The number of fields per variable, the length of the values and the depth of the variables
+ * are bounded, and a variable whose object is the object of one of its parents is not expanded.
+ */
+public class DebugVariableInspector implements DebugVariable.FieldsLoader {
+
+    /** maximum number of fields loaded per variable */
+    public static final int MAX_FIELDS = 100;
+    /** maximum length of a variable value */
+    public static final int MAX_VALUE_LENGTH = 256;
+    /** maximum depth of a variable, a top-level variable having depth 0 */
+    public static final int MAX_DEPTH = 16;
+
+    /**
+     * Creates a variable whose fields will be loaded on first access.
+     * @param name the variable name
+     * @param object the variable object
+     * @param parent the parent variable, or null for a top-level variable
+     * @return the created variable
+     */
+    public DebugVariable createVariable(String name, Object object, DebugVariable parent) {
+        String type = (object == null ? "null" : object.getClass().toString());
+        String value = toString(object);
+        int depth = 0;
+        for (DebugVariable ancestor = parent; ancestor != null; ancestor = ancestor.getParent()) {
+            if (object != null && ancestor.getObject() == object) {
+                return new DebugVariable(name, type, "<cycle: same as " + ancestor.getVarName() + "> " + value);
+            }
+            depth++;
+        }
+        if (depth >= MAX_DEPTH) {
+            return new DebugVariable(name, type, value);
+        }
+        return new DebugVariable(name, type, value, object, parent, this);
+    }
+
+    @Override
+    public boolean hasFields(Object object) {
+        if (object instanceof PyObject) {
+            if (object instanceof PyJavaInstance) {
+                return hasJavaFields(((PyJavaInstance) object).__tojava__(Object.class));
+            }
+            return (object instanceof PyInstance) || (object instanceof PyList) || (object instanceof PyArray);
+        }
+        return hasJavaFields(object);
+    }
+
+    @Override
+    public void loadFields(DebugVariable variable) {
+        FieldsAdder fieldsAdder = new FieldsAdder(variable);
+        try {
+            Object object = variable.getObject();
+            if (object instanceof PyObject) {
+                loadPythonFields((PyObject) object, fieldsAdder);
+            } else {
+                loadJavaFields(object, fieldsAdder);
+            }
+        } catch (FieldsLimitReachedException e) {
+            variable.addField(new DebugVariable("...", "", "only the first " + MAX_FIELDS + " fields are displayed"));
+        } catch (RuntimeException e) {
+            // e.g. collection modified by another thread
+            variable.addField(new DebugVariable("...", "", "<" + e.getClass().getSimpleName() + " while loading fields>"));
+        }
+    }
+
+    private void loadPythonFields(PyObject object, FieldsAdder fieldsAdder) {
+        if (object instanceof PyInstance) {
+            PyInstance pyInstance = (PyInstance) object;
+            PyObject names = pyInstance.__dir__();
+            if (names instanceof PyList) {
+                PyList namesList = (PyList) names;
+                Object[] namesArray = (Object[]) namesList.getArray();
+                for (int i = 0; i < namesList.__len__(); i++) {
+                    String attributeName = namesArray[i].toString();
+                    fieldsAdder.add(attributeName, pyInstance.__findattr__(attributeName));
+                }
+            }
+        } else if (object instanceof PyList) {
+            PyList listValue = (PyList) object;
+            Object[] dataArray = (Object[]) listValue.getArray();
+            for (int i = 0; i < listValue.__len__(); i++) {
+                fieldsAdder.add("[" + i + "]", dataArray[i]);
+            }
+        } else if (object instanceof PyArray) {
+            loadArrayFields(((PyArray) object).getArray(), fieldsAdder);
+        } else if (object instanceof PyJavaInstance) {
+            loadJavaFields(((PyJavaInstance) object).__tojava__(Object.class), fieldsAdder);
+        }
+    }
+
+    private static boolean hasJavaFields(Object object) {
+        return object != null && (object.getClass().isArray() || !object.getClass().getName().startsWith("java.lang."));
+    }
+
+    private void loadJavaFields(Object object, FieldsAdder fieldsAdder) {
+        if (!hasJavaFields(object)) {
+            return;
+        }
+        if (object.getClass().isArray()) {
+            loadArrayFields(object, fieldsAdder);
+            return;
+        }
+        if (object instanceof Collection) {
+            int index = 0;
+            for (Object element : (Collection<?>) object) {
+                fieldsAdder.add("[" + index + "]", element);
+                index++;
+            }
+        } else if (object instanceof Map) {
+            for (Map.Entry<?, ?> entry : ((Map<?, ?>) object).entrySet()) {
+                fieldsAdder.add("[" + toString(entry.getKey()) + "]", entry.getValue());
+            }
+        }
+
+        for (Field field : object.getClass().getFields()) {
+            if (Modifier.isStatic(field.getModifiers())) {
+                continue;
+            }
+            try {
+                fieldsAdder.add(field.getName(), field.get(object));
+            } catch (IllegalAccessException e) {
+                fieldsAdder.addError(field.getName(), "Illegal Access Exception");
+            }
+        }
+        for (Method method : object.getClass().getMethods()) {
+            String methodName = method.getName();
+            if (methodName.startsWith("get") &&
+                    !methodName.equals("getClass") &&
+                    !methodName.equals("getAccessorKeys") &&
+                    method.getParameterTypes().length == 0 &&
+                    !Modifier.isStatic(method.getModifiers())) {
+                Object returnValue;
+                try {
+                    returnValue = method.invoke(object);
+                } catch (Exception e) {
+                    continue;
+                }
+                fieldsAdder.add(methodName, returnValue);
+            }
+        }
+    }
+
+    private void loadArrayFields(Object array, FieldsAdder fieldsAdder) {
+        if (array == null) {
+            return;
+        }
+        int length = Array.getLength(array);
+        for (int i = 0; i < length; i++) {
+            fieldsAdder.add("[" + i + "]", Array.get(array, i));
+        }
+    }
+
+    /**
+     * Returns the string representation of an object, truncated to {@link #MAX_VALUE_LENGTH} characters.
+     */
+    private static String toString(Object object) {
+        String value;
+        try {
+            value = String.valueOf(object);
+        } catch (Exception e) {
+            value = "<" + e.getClass().getSimpleName() + " in toString()>";
+        }
+        if (value.length() > MAX_VALUE_LENGTH) {
+            value = value.substring(0, MAX_VALUE_LENGTH) + "...";
+        }
+        return value;
+    }
+
+    /**
+     * Adds fields to a variable, up to {@link DebugVariableInspector#MAX_FIELDS}.
+     */
+    private class FieldsAdder {
+        private final DebugVariable variable;
+        private int count = 0;
+
+        FieldsAdder(DebugVariable variable) {
+            this.variable = variable;
+        }
+
+        void add(String name, Object object) {
+            checkLimit();
+            variable.addField(createVariable(name, object, variable));
+        }
+
+        void addError(String name, String error) {
+            checkLimit();
+            variable.addField(new DebugVariable(name, "", error));
+        }
+
+        private void checkLimit() {
+            if (count == MAX_FIELDS) {
+                throw new FieldsLimitReachedException();
+            }
+            count++;
+        }
+    }
+
+    @SuppressWarnings("serial")
+    private static class FieldsLimitReachedException extends RuntimeException {
+    }
+}
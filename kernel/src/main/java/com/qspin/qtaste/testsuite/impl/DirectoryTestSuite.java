@@ -30,8 +30,11 @@ import java.io.IOException;
 import java.util.ArrayList;
 import java.util.Arrays;
 import java.util.Comparator;
+import java.util.HashSet;
+import java.util.Iterator;
 import java.util.LinkedHashMap;
 import java.util.List;
+import java.util.Set;
 import java.util.SortedSet;
 
 import javax.xml.parsers.ParserConfigurationException;
@@ -93,6 +96,26 @@ public class DirectoryTestSuite extends TestSuite {
         }
     }
 
+    /**
+     * Keeps only some test cases of the test suite.
+     * @param testCaseDirectories directories of the test cases to keep
+     *                            or null to keep all the test cases
+     */
+    public void selectTestCases(Set<String> testCaseDirectories) {
+        if (testCaseDirectories == null) {
+            return;
+        }
+        Set<File> selectedDirectories = new HashSet<File>();
+        for (String testCaseDirectory : testCaseDirectories) {
+            selectedDirectories.add(new File(testCaseDirectory).getAbsoluteFile());
+        }
+        for (Iterator<TestScript> iterator = testScripts.iterator(); iterator.hasNext();) {
+            if (!selectedDirectories.contains(new File(iterator.next().getTestCaseDirectory()).getAbsoluteFile())) {
+                iterator.remove();
+            }
+        }
+    }
+
     public int computeNumberTestsToExecute() {
         if (numberLoops == -1 || loopsInTime) {
             return -1;
@@ -108,7 +131,7 @@ public class DirectoryTestSuite extends TestSuite {
 
     public boolean executeOnce(boolean debug) {
     	boolean result = true;
-        for (TestScript testScript : testScripts) {
+        for (TestScript testScript : TestScheduler.getInstance().scheduleTestScripts(testScripts)) {
             if (!testScript.execute(debug)) {
                 if (testScript.isAbortedByUser() || TestEngine.isAbortedByUser()) {
                     return false;
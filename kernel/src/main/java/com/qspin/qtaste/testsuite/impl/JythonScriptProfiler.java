@@ -0,0 +1,235 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.testsuite.impl;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileReader;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.io.PrintWriter;
+import java.util.HashMap;
+import java.util.Map;
+import java.util.TreeMap;
+
+import org.apache.log4j.Logger;
+
+import com.qspin.qtaste.util.Log4jLoggerFactory;
+
+/**
+ * Sampling profiler of the Python code executed by a test script thread.
+ * <p>
+ * The stack of the profiled thread is sampled periodically and the Python frames it contains
+ * (compiled by Jython with their source file name and line number) are aggregated by
+ * file:function:line. The result is written in the "collapsed stacks" format
+ * ("frame1;frame2;frame3 count" lines, from the outermost to the innermost frame),
+ * which can be converted to a flame graph by flamegraph.pl or loaded in speedscope.
+ * <p>
+ * Profiling is disabled by default and is enabled by setting a sampling interval.
+ */
+public class JythonScriptProfiler {
+
+    /** default sampling interval, in milliseconds */
+    public static final int DEFAULT_SAMPLING_INTERVAL = 10;
+    public static final String FILE_EXTENSION = ".collapsed";
+
+    private static Logger logger = Log4jLoggerFactory.getLogger(JythonScriptProfiler.class);
+    private static volatile int samplingInterval = 0;
+
+    private final Thread profiledThread;
+    private final int interval;
+    private final Map<String, Integer> stackCounts = new HashMap<String, Integer>();
+    private Thread samplerThread;
+    private volatile boolean stopped;
+    private int samplesCount;
+
+    /**
+     * Sets the sampling interval of the test scripts profiling.
+     * @param interval the sampling interval in milliseconds, or 0 to disable profiling
+     */
+    public static void setSamplingInterval(int interval) {
+        samplingInterval = Math.max(0, interval);
+        if (samplingInterval > 0) {
+            logger.info("Profiling test scripts with a sampling interval of " + samplingInterval + " ms");
+        }
+    }
+
+    /**
+     * Gets the sampling interval of the test scripts profiling.
+     * @return the sampling interval in milliseconds, or 0 if profiling is disabled
+     */
+    public static int getSamplingInterval() {
+        return samplingInterval;
+    }
+
+    public static boolean isEnabled() {
+        return samplingInterval > 0;
+    }
+
+    /**
+     * Creates a profiler of a thread, using the current sampling interval.
+     * @param profiledThread the thread executing the test script
+     */
+    public JythonScriptProfiler(Thread profiledThread) {
+        this.profiledThread = profiledThread;
+        this.interval = Math.max(1, samplingInterval);
+    }
+
+    /**
+     * Starts sampling the profiled thread.
+     */
+    public void start() {
+        samplerThread = new Thread("Jython script profiler") {
+            @Override
+            public void run() {
+                while (!stopped) {
+                    sample();
+                    try {
+                        Thread.sleep(interval);
+                    } catch (InterruptedException e) {
+                        return;
+                    }
+                }
+            }
+        };
+        samplerThread.setDaemon(true);
+        samplerThread.start();
+    }
+
+    /**
+     * Stops sampling the profiled thread and waits for the sampler thread end.
+     */
+    public void stop() {
+        stopped = true;
+        if (samplerThread != null) {
+            samplerThread.interrupt();
+            try {
+                samplerThread.join();
+            } catch (InterruptedException e) {
+                logger.warn("Interrupted while waiting for the end of the profiler thread");
+            }
+        }
+    }
+
+    private void sample() {
+        StackTraceElement[] stack = profiledThread.getStackTrace();
+        StringBuilder collapsedStack = new StringBuilder();
+        // the outermost frame is the last element of the stack trace
+        for (int i = stack.length - 1; i >= 0; i--) {
+            String frame = getPythonFrame(stack[i]);
+            if (frame != null) {
+                if (collapsedStack.length() > 0) {
+                    collapsedStack.append(';');
+                }
+                collapsedStack.append(frame);
+            }
+        }
+        if (collapsedStack.length() == 0) {
+            // not executing Python code
+            return;
+        }
+        String key = collapsedStack.toString();
+        synchronized (stackCounts) {
+            Integer count = stackCounts.get(key);
+            stackCounts.put(key, count == null ? 1 : count + 1);
+            samplesCount++;
+        }
+    }
+
+    /**
+     * Returns the "file:function:line" representation of a stack trace element,
+     * or null if it is not a frame of the test script or of a Python module.
+     */
+    private static String getPythonFrame(StackTraceElement stackElement) {
+        String className = stackElement.getClassName();
+        if (stackElement.getLineNumber() < 0 || !(className.startsWith("org.python.pycode.") || className.endsWith("$py"))) {
+            return null;
+        }
+        String fileName = stackElement.getFileName();
+        if (fileName == null || fileName.equals("embedded_jython") || fileName.endsWith(File.separator + "bdb.py")) {
+            // QTaste functions (doStep, test API wrapper...) and debugger
+            return null;
+        }
+        String methodName = stackElement.getMethodName();
+        if (methodName.equals("f$0")) {
+            methodName = "<module>";
+        } else {
+            // remove $i suffix from method name
+            int dollarIndex = methodName.indexOf("$");
+            if (dollarIndex > 0) {
+                methodName = methodName.substring(0, dollarIndex);
+            }
+        }
+        return (new File(fileName).getName() + ":" + methodName + ":" + stackElement.getLineNumber()).replace(';', ':');
+    }
+
+    public int getSamplesCount() {
+        synchronized (stackCounts) {
+            return samplesCount;
+        }
+    }
+
+    /**
+     * Writes the sampled stacks in a collapsed stacks file.
+     * If the file already exists, the sampled stacks are added to the stacks it contains,
+     * so that all the rows of a test case are aggregated in the same file.
+     * @param file the collapsed stacks file
+     * @throws IOException if the file cannot be read or written
+     */
+    public void writeCollapsedStacks(File file) throws IOException {
+        Map<String, Integer> counts = new TreeMap<String, Integer>();
+        if (file.exists()) {
+            BufferedReader reader = new BufferedReader(new FileReader(file));
+            try {
+                String line;
+                while ((line = reader.readLine()) != null) {
+                    int separatorIndex = line.lastIndexOf(' ');
+                    if (separatorIndex > 0) {
+                        try {
+                            counts.put(line.substring(0, separatorIndex), Integer.parseInt(line.substring(separatorIndex + 1)));
+                        } catch (NumberFormatException e) {
+                            logger.warn("Ignoring invalid line in " + file + ": " + line);
+                        }
+                    }
+                }
+            } finally {
+                reader.close();
+            }
+        }
+        synchronized (stackCounts) {
+            for (Map.Entry<String, Integer> entry : stackCounts.entrySet()) {
+                Integer count = counts.get(entry.getKey());
+                counts.put(entry.getKey(), count == null ? entry.getValue() : count + entry.getValue());
+            }
+        }
+        File parentDirectory = file.getAbsoluteFile().getParentFile();
+        if (!parentDirectory.exists()) {
+            parentDirectory.mkdirs();
+        }
+        PrintWriter writer = new PrintWriter(new FileWriter(file));
+        try {
+            for (Map.Entry<String, Integer> entry : counts.entrySet()) {
+                writer.println(entry.getKey() + " " + entry.getValue());
+            }
+        } finally {
+            writer.close();
+        }
+    }
+}
@@ -24,7 +24,6 @@ import java.io.FileNotFoundException;
 import java.io.IOException;
 import java.io.PrintWriter;
 import java.io.StringWriter;
-import java.lang.reflect.Field;
 import java.lang.reflect.InvocationTargetException;
 import java.lang.reflect.Method;
 import java.lang.reflect.UndeclaredThrowableException;
@@ -46,12 +45,10 @@ import javax.script.ScriptException;
 
 import org.apache.log4j.Logger;
 import org.python.core.Py;
-import org.python.core.PyArray;
 import org.python.core.PyClass;
 import org.python.core.PyDictionary;
 import org.python.core.PyException;
 import org.python.core.PyFunction;
-import org.python.core.PyInstance;
 import org.python.core.PyInteger;
 import org.python.core.PyJavaInstance;
 import org.python.core.PyList;
@@ -64,6 +61,7 @@ import org.python.core.PyTuple;
 
 import com.qspin.qtaste.config.StaticConfiguration;
 import com.qspin.qtaste.config.TestBedConfiguration;
+import com.qspin.qtaste.config.TestEngineConfiguration;
 import com.qspin.qtaste.debug.Breakpoint;
 import com.qspin.qtaste.debug.BreakpointEventHandler;
 import com.qspin.qtaste.debug.BreakpointManager;
@@ -71,6 +69,7 @@ import com.qspin.qtaste.event.DumpPythonResultEventHandler;
 import com.qspin.qtaste.event.TestScriptBreakpointEvent;
 import com.qspin.qtaste.event.TestScriptBreakpointHandler;
 import com.qspin.qtaste.event.TestScriptBreakpointListener;
+import com.qspin.qtaste.event.TestScriptEvent;
 import com.qspin.qtaste.kernel.engine.TestEngine;
 import com.qspin.qtaste.kernel.testapi.Component;
 import com.qspin.qtaste.kernel.testapi.ComponentsLoader;
@@ -79,6 +78,8 @@ import com.qspin.qtaste.kernel.testapi.TestAPIImpl;
 import com.qspin.qtaste.lang.DoubleWithPrecision;
 import com.qspin.qtaste.reporter.testresults.TestResult;
 import com.qspin.qtaste.reporter.testresults.TestResult.Status;
+import com.qspin.qtaste.reporter.testresults.TestResultsReportManager;
+import com.qspin.qtaste.reporter.testresults.TimingStatistics;
 import com.qspin.qtaste.testsuite.Executable;
 import com.qspin.qtaste.testsuite.QTasteDataException;
 import com.qspin.qtaste.testsuite.QTasteException;
@@ -144,6 +145,18 @@ public class JythonTestScript extends TestScript implements Executable {
         return logger;
     }
 
+    public static void logStepBegin(String stepId, String stepName) {
+        if (logger.isInfoEnabled()) {
+            logger.info(new TestScriptEvent.StepBegin(stepId, stepName));
+        }
+    }
+
+    public static void logStepEnd(String stepId, String stepName, Status status, double elapsedTime_s) {
+        if (logger.isInfoEnabled()) {
+            logger.info(new TestScriptEvent.StepEnd(stepId, stepName, status, elapsedTime_s));
+        }
+    }
+
     private static void initializeEmbeddedJython() {
         TestBedConfiguration testbedConfig = TestBedConfiguration.getInstance();
         if (testbedConfig != null) {
@@ -175,6 +188,7 @@ public class JythonTestScript extends TestScript implements Executable {
             String code =
                     "import sys as __sys\n" +
                     "from sets import Set as __Set\n" +
+                    "from java.lang import System as __System\n" +
                     "from com.qspin.qtaste.testsuite import QTasteException, QTasteTestFailException, QTasteDataException\n" +
                     "import com.qspin.qtaste.testsuite.impl.JythonTestScript.ScriptTestResultStatus as Status\n" +
                     "class ComponentNotPresentException(Exception):\n" +
@@ -190,11 +204,15 @@ public class JythonTestScript extends TestScript implements Executable {
             code +=
                     //   new-style test api - direct method call
                     "    def __invoke(self, method, arguments):\n" +
-                    "        self.testScript.logInvoke(method.im_self, method.__name__, str(arguments)[1:-1-(len(arguments)==1)])\n" +
+                    "        self.testScript.logInvoke(method.im_self, method.__name__, arguments)\n" +
+                    "        begin_time = __System.nanoTime()\n" +
                     "        try:\n" +
-                    "            return method(*arguments)\n" +
-                    "        except TypeError, e:\n" +
-                    "            raise QTasteDataException('Invalid argument(s): ' + str(e))\n" +
+                    "            try:\n" +
+                    "                return method(*arguments)\n" +
+                    "            except TypeError, e:\n" +
+                    "                raise QTasteDataException('Invalid argument(s): ' + str(e))\n" +
+                    "        finally:\n" +
+                    "            self.testScript.logInvokeTime(method.im_self, method.__name__, __System.nanoTime() - begin_time)\n" +
                     "    def stopTest(self, status, message):\n" +
                     "        if status == Status.FAIL:\n" +
                     "            raise QTasteTestFailException(message)\n" +
@@ -286,8 +304,8 @@ public class JythonTestScript extends TestScript implements Executable {
 
         try {
             String code =
-                    "import time as __time, sys as __sys\n" +
-                    "from java.lang import ThreadDeath as __ThreadDeath\n" +
+                    "import sys as __sys\n" +
+                    "from java.lang import System as __System, ThreadDeath as __ThreadDeath\n" +
                     "from java.lang.reflect import UndeclaredThrowableException as __UndeclaredThrowableException\n" +
                     "from com.sun.script.jython import JythonScope as __JythonScope\n" +
                     "from com.qspin.qtaste.testsuite import QTasteTestFailException\n" +
@@ -313,9 +331,9 @@ public class JythonTestScript extends TestScript implements Executable {
                     "    doStep.stepId = stepId = '.'.join(doStep.stepIdStack)\n" +
                     "    stepName = '.'.join(doStep.stepNameStack)\n" +
                     "    stepDoc = func.func_doc\n" +
-                    "    __JythonTestScript.getLogger().info('Begin of step %s (%s)' % (stepId, stepName))\n" +
+                    "    __JythonTestScript.logStepBegin(stepId, stepName)\n" +
                     "    status = __TestResultStatus.SUCCESS\n" +
-                    "    begin_time = __time.clock()\n" +
+                    "    begin_time = __System.nanoTime()\n" +
                     "    try:\n" +
                     "        try:\n" +
                     "            testScript.addStepResult(stepId, __TestResultStatus.RUNNING, stepName, stepDoc, 0)\n" +
@@ -327,9 +345,9 @@ public class JythonTestScript extends TestScript implements Executable {
                     "            status = __TestResultStatus.NOT_AVAILABLE\n" +
                     "            raise\n" +
                     "    finally:\n" +
-                    "        end_time = __time.clock()\n" +
-                    "        elapsed_time = end_time - begin_time\n" +
-                    "        __JythonTestScript.getLogger().info('End of step %s (%s) - status: %s - elapsed time: %.3f seconds' % (stepId, stepName, status, elapsed_time))\n" +
+                    "        end_time = __System.nanoTime()\n" +
+                    "        elapsed_time = (end_time - begin_time) / 1e9\n" +
+                    "        __JythonTestScript.logStepEnd(stepId, stepName, status, elapsed_time)\n" +
                     "        testScript.addStepResult(stepId, status, stepName, stepDoc, elapsed_time)\n" +
                     "        doStep.countStack.pop()\n" +
                     "        doStep.stepIdStack.pop()\n" +
@@ -468,6 +486,9 @@ public class JythonTestScript extends TestScript implements Executable {
             }
         }
         testResult.addStepResult(stepId, functionName, stepDescription, expectedResult, stepStatus, elapsedTimeMs);
+        if (stepStatus != Status.RUNNING) {
+            TimingStatistics.getInstance().recordStep(testResult.getName(), functionName, (long) (elapsedTime * 1e9));
+        }
     }
 
     /**
@@ -570,8 +591,14 @@ public class JythonTestScript extends TestScript implements Executable {
         return arguments;
     }
 
-    public void logInvoke(Component component, String method, String arguments) {
-        logger.info("Invoking " + testAPI.getComponentName(component) + "." + method + "(" + arguments + ")");
+    public void logInvoke(Component component, String method, PyTuple arguments) {
+        if (logger.isInfoEnabled()) {
+            logger.info(new TestScriptEvent.VerbInvoke(testAPI.getComponentName(component), method, arguments));
+        }
+    }
+
+    public void logInvokeTime(Component component, String method, long elapsedTime_ns) {
+        TimingStatistics.getInstance().recordVerb(testAPI.getComponentName(component), method, elapsedTime_ns);
     }
 
     public static List<String> getAdditionalPythonPath(File file) {
@@ -614,6 +641,13 @@ public class JythonTestScript extends TestScript implements Executable {
             testScriptBreakPointEventHandler.addTestScriptBreakpointListener(scriptBreakpoint);
         }
 
+        // profile the test script, except in debug mode where the execution is suspended at breakpoints
+        JythonScriptProfiler profiler = null;
+        if (!debug && JythonScriptProfiler.isEnabled()) {
+            profiler = new JythonScriptProfiler(Thread.currentThread());
+            profiler.start();
+        }
+
         try {
             bindings = engine.createBindings();
             engine.setBindings(bindings, ScriptContext.ENGINE_SCOPE);
@@ -709,10 +743,32 @@ public class JythonTestScript extends TestScript implements Executable {
             if (debug) {
                 testScriptBreakPointEventHandler.removeTestScriptBreakpointListener(scriptBreakpoint);
             }
+            if (profiler != null) {
+                profiler.stop();
+                writeProfile(profiler, result);
+            }
         }
         return true;
     }
 
+    /**
+     * Writes the stacks sampled by the profiler in a collapsed stacks file named after the test case,
+     * in the report directory.
+     */
+    private void writeProfile(JythonScriptProfiler profiler, TestResult result) {
+        File reportDirectory = TestResultsReportManager.getInstance().getReportDirectory();
+        if (reportDirectory == null) {
+            reportDirectory = new File(TestEngineConfiguration.getInstance().getString("reporting.generated_report_path"));
+        }
+        File profileFile = new File(reportDirectory, "profile-" + result.getName().replaceAll("[^\\w\\-.]", "_") + JythonScriptProfiler.FILE_EXTENSION);
+        try {
+            profiler.writeCollapsedStacks(profileFile);
+            logger.info("Profile of " + result.getId() + " (" + profiler.getSamplesCount() + " samples) written in " + profileFile);
+        } catch (IOException e) {
+            logger.error("Error while writing profile file " + profileFile + ": " + e.getMessage());
+        }
+    }
+
     protected PyList SaveTestDataValues(PyDictionary pythonArguments) throws QTasteDataException {
         PyList oldValues = new PyList();
         Iterator<?> argIterator = pythonArguments.items().iterator();
@@ -976,6 +1032,7 @@ public class JythonTestScript extends TestScript implements Executable {
         private final BreakpointManager breakpointMgr = BreakpointManager.getInstance();
         private TestScriptBreakpointEvent.Action action = null;
         private PyObject mLocals = null;
+        private final DebugVariableInspector debugVariableInspector = new DebugVariableInspector();
 
         /**
          * breakScript method is called from the Python Script in order to stop its execution
@@ -1090,6 +1147,10 @@ public class JythonTestScript extends TestScript implements Executable {
             }
         }
 
+        /**
+         * Gets the global and local variables of the script.
+         * Only the variables values are evaluated, their fields are loaded when displayed.
+         */
         private ArrayList<DebugVariable> getPythonVariablesDump() {
             Bindings globalContext = engine.getBindings(ScriptContext.ENGINE_SCOPE);
             ArrayList<DebugVariable> debugVariables = new ArrayList<DebugVariable>();
@@ -1105,10 +1166,7 @@ public class JythonTestScript extends TestScript implements Executable {
                         //                (!(variableValue instanceof java.lang.Class)) &&
                         //              (!(variableValue instanceof PyModule))
                         ) {
-                    //Object variableValue = locals.get(new PyString(localKey));
-                    DebugVariable debugVar = new DebugVariable(variableName, variableValue.getClass().toString(), variableValue.toString());
-                    debugVar = dumpPythonObject(variableValue, debugVar);
-                    debugVariables.add(debugVar);
+                    debugVariables.add(debugVariableInspector.createVariable(variableName, variableValue, null));
                 }
 
                 /*
@@ -1130,10 +1188,7 @@ public class JythonTestScript extends TestScript implements Executable {
                     if (oMap instanceof String) {
                         String localKey = (String) oMap;
                         Object oValue = locals.get(new PyString(localKey));
-                        DebugVariable debugVar = new DebugVariable(localKey.toString(),
-                                oValue.getClass().toString(), oValue.toString());
-                        debugVar = dumpPythonObject(oValue, debugVar);
-                        debugVariables.add(debugVar);
+                        debugVariables.add(debugVariableInspector.createVariable(localKey, oValue, null));
                     }
                 }
             }
@@ -1142,114 +1197,6 @@ public class JythonTestScript extends TestScript implements Executable {
         }
     }
 
-    private DebugVariable dumpJavaObject(Object javaObject, DebugVariable debugVar) {
-        if (javaObject.getClass().getName().startsWith("java.lang.")) {
-            return debugVar;
-        }
-        if (javaObject.getClass().equals(ArrayList.class)) {
-            ArrayList<?> arrayList = (ArrayList<?>) javaObject;
-            Iterator<?> arrayListIt = arrayList.iterator();
-            int index = 0;
-            while (arrayListIt.hasNext()) {
-                Object javaObjectInArray = arrayListIt.next();
-                DebugVariable fieldVar = new DebugVariable("[" + index + "]",
-                        javaObjectInArray.getClass().toString(), javaObjectInArray.toString());
-                fieldVar = dumpJavaObject(javaObjectInArray, fieldVar);
-                debugVar.addField(fieldVar);
-                index++;
-            }
-        }
-        Field[] fields = javaObject.getClass().getFields();
-        for (int fIndex = 0; fIndex < fields.length; fIndex++) {
-            Field field = fields[fIndex];
-            String fieldName = field.getName();
-            try {
-                Object fieldObject = field.get(javaObject);
-
-                String fieldValue = fieldObject.toString();
-                DebugVariable fieldVar = new DebugVariable(fieldName,
-                        field.getClass().toString(), fieldValue.toString());
-                fieldVar = dumpJavaObject(fieldValue, fieldVar);
-                debugVar.addField(fieldVar);
-            } catch (IllegalArgumentException e) {
-                debugVar.addField(new DebugVariable(fieldName,
-                        field.getClass().toString(), "Illegal argument"));
-            } catch (IllegalAccessException e) {
-                debugVar.addField(new DebugVariable(fieldName,
-                        field.getClass().toString(), "Illegal Access Exception"));
-            } catch (NullPointerException e) {
-                debugVar.addField(new DebugVariable(fieldName,
-                        field.getClass().toString(), "Null Pointer Exception"));
-            }
-        }
-        Method[] methods = javaObject.getClass().getMethods();
-        for (int methodIndex = 0; methodIndex < methods.length; methodIndex++) {
-            Method method = methods[methodIndex];
-            if ((method.getName().startsWith("get")) &&
-                    (!(method.getName().equals("getClass"))) &&
-                    (!(method.getName().equals("getAccessorKeys")))) {
-                try {
-                    Object returnValue = method.invoke(javaObject, new Object[]{});
-                    DebugVariable fieldVar = new DebugVariable(method.getName(),
-                            javaObject.getClass().toString(), returnValue.toString());
-                    fieldVar = dumpJavaObject(returnValue, fieldVar);
-                    debugVar.addField(fieldVar);
-                } catch (Exception e) {
-                }
-
-            }
-        }
-
-        return debugVar;
-
-    }
-
-    private DebugVariable dumpPythonObject(Object value, DebugVariable debugVar) {
-        if (value instanceof PyInstance) {
-            PyInstance pyInstance = (PyInstance) value;
-            Object javaInstance = pyInstance.__dir__().__tojava__(Object.class);
-            debugVar = dumpPythonObject(javaInstance, debugVar);
-            return debugVar;
-        }
-        if (value instanceof PyList) {
-            PyList listValue = (PyList) value;
-            Object[] dataArray = (Object[]) listValue.getArray();
-            for (int i = 0; i < listValue.__len__(); i++) {
-                Object o = dataArray[i];
-                debugVar.addField(new DebugVariable("[" + i + "]",
-                        o.getClass().toString(), o.toString()));
-            }
-            return debugVar;
-
-        }
-        if (value instanceof PyArray) {
-            PyArray arrayValue = (PyArray) value;
-            Object[] dataArray = (Object[]) arrayValue.getArray();
-            for (int i = 0; i < arrayValue.__len__(); i++) {
-                Object o = dataArray[i];
-                debugVar.addField(new DebugVariable("[" + i + "]",
-                        o.getClass().toString(), o.toString()));
-                debugVar = dumpJavaObject(o, debugVar);
-            }
-            return debugVar;
-        } else if (value instanceof PyJavaInstance) {
-            PyJavaInstance pythonValue = (PyJavaInstance) value;
-            Object javaObject = pythonValue.__tojava__(Object.class);
-            if (javaObject instanceof ArrayList) {
-                ArrayList<?> javaObjectArray = (ArrayList<?>) javaObject;
-                Iterator<?> arrayIterator = javaObjectArray.iterator();
-                while (arrayIterator.hasNext()) {
-                    Object arrayListObject = arrayIterator.next();
-                    debugVar = dumpJavaObject(arrayListObject, debugVar);
-                }
-            } else {
-                debugVar = dumpJavaObject(javaObject, debugVar);
-            }
-        }
-        return debugVar;
-
-    }
-
     /**
      * ScriptTestData class passed to the script interpreter
      */
@@ -73,8 +73,10 @@ public class MetaTestSuite extends TestSuite {
         		continue;
         	}
         	testSuite.selectRows(testSuiteParams.getSelectedDataRows());
+        	testSuite.selectTestCases(testSuiteParams.getSelectedTestCases());
             testSuite.setExecutionLoops(testSuiteParams.getCount(), testSuiteParams.loopInHours());
             testSuite.addTestReportListener(this);
+            testSuite.setParentTestSuite(this);
             testSuites.add(testSuite);
         }
 
@@ -110,7 +112,7 @@ public class MetaTestSuite extends TestSuite {
     @Override
     public boolean executeOnce(boolean debug) {
     	boolean result = true;
-        for (TestSuite testSuite : testSuites) {
+        for (TestSuite testSuite : TestScheduler.getInstance().scheduleTestSuites(testSuites)) {
             if (!testSuite.execute(debug, false)) {
                 if (TestEngine.isAbortedByUser()) {
                     return false;
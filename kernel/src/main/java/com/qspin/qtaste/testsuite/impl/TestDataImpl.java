@@ -237,6 +237,11 @@ public class TestDataImpl implements TestData, Serializable {
         }
     }
 
+    @Override
+	public void unloadFiles() {
+        hashFiles.clear();
+    }
+
     private void loadFile(String key, String filename) throws QTasteDataException {
         Path filePath = Paths.get(filename);
     	if (!filePath.isAbsolute()) {
@@ -0,0 +1,293 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.testsuite.impl;
+
+import java.io.File;
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.Comparator;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+import org.apache.log4j.Logger;
+
+import com.qspin.qtaste.config.TestEngineConfiguration;
+import com.qspin.qtaste.reporter.testresults.TestResult;
+import com.qspin.qtaste.reporter.testresults.TestResultsReportManager;
+import com.qspin.qtaste.reporter.testresults.TestSchedule;
+import com.qspin.qtaste.reporter.testresults.archive.TestResultsArchive;
+import com.qspin.qtaste.testsuite.TestData;
+import com.qspin.qtaste.testsuite.TestScript;
+import com.qspin.qtaste.testsuite.TestSuite;
+import com.qspin.qtaste.util.Log4jLoggerFactory;
+
+/**
+ * Orders the execution of the test scripts and test suites according to the history of the test results archive.
+ * <p>
+ * The scheduling order is configured by the "scheduling.order" engine configuration parameter:
+ * <ul>
+ * <li>"definition" (default): the test suite order, i.e. the alphabetical order of the test case directories
+ *     and the order of the test suites in the campaign,
+ * <li>"failed_first": the tests which failed or were in error at their last execution first,
+ *     to get a quick feedback on the fixes,
+ * <li>"shortest_first": the tests with the shortest mean duration first, to get a quick feedback,
+ * <li>"longest_first": the tests with the longest mean duration first, to reduce the total duration
+ *     when the tests are executed in parallel.
+ * </ul>
+ * Tests keep their definition order when they are equivalent for the scheduling order.
+ * When a scheduling policy is used, the scheduled order with the expected and actual durations is recorded
+ * in the {@link TestSchedule} of the report.
+ */
+public class TestScheduler {
+
+    public enum Order {
+        DEFINITION, FAILED_FIRST, SHORTEST_FIRST, LONGEST_FIRST
+    }
+
+    private static Logger logger = Log4jLoggerFactory.getLogger(TestScheduler.class);
+    private static TestScheduler instance = null;
+    private static final int HISTORY_RUNS = 10;
+
+    private Order order;
+    private boolean postponeRetries;
+    // mean duration in milliseconds and last final status of the tests, by test key
+    private Map<String, Long> meanDurations = new HashMap<String, Long>();
+    private Map<String, TestResult.Status> lastStatuses = new HashMap<String, TestResult.Status>();
+    private long historyTimeStamp = -1;
+
+    private TestScheduler() {
+        TestEngineConfiguration config = TestEngineConfiguration.getInstance();
+        String orderName = config.getString("scheduling.order", "definition");
+        try {
+            order = Order.valueOf(orderName.trim().toUpperCase());
+        } catch (IllegalArgumentException e) {
+            logger.error("Invalid scheduling order '" + orderName + "', using definition order");
+            order = Order.DEFINITION;
+        }
+        postponeRetries = config.getBoolean("scheduling.postpone_retries", false);
+    }
+
+    synchronized public static TestScheduler getInstance() {
+        if (instance == null) {
+            instance = new TestScheduler();
+        }
+        return instance;
+    }
+
+    public Order getOrder() {
+        return order;
+    }
+
+    public void setOrder(Order order) {
+        this.order = order;
+    }
+
+    /**
+     * @return true if the retries of the failed tests, which trigger a SUT restart, are executed at the end of the run
+     */
+    public boolean isPostponingRetries() {
+        return postponeRetries;
+    }
+
+    public void setPostponingRetries(boolean postponeRetries) {
+        this.postponeRetries = postponeRetries;
+    }
+
+    private boolean isEnabled() {
+        return order != Order.DEFINITION || postponeRetries;
+    }
+
+    /**
+     * Orders test scripts and records their selected data rows in the test schedule.
+     * @param testScripts the test scripts, in definition order
+     * @return the test scripts in scheduled order
+     */
+    public synchronized List<TestScript> scheduleTestScripts(List<TestScript> testScripts) {
+        if (!isEnabled()) {
+            return testScripts;
+        }
+        loadHistory();
+        final Map<TestScript, Long> expectedDurations = new HashMap<TestScript, Long>();
+        final Map<TestScript, Boolean> failures = new HashMap<TestScript, Boolean>();
+        for (TestScript testScript : testScripts) {
+            expectedDurations.put(testScript, getExpectedDuration(testScript));
+            failures.put(testScript, hasFailed(testScript));
+        }
+        List<TestScript> scheduledTestScripts = sort(testScripts, expectedDurations, failures);
+
+        TestSchedule schedule = TestSchedule.getInstance();
+        for (TestScript testScript : scheduledTestScripts) {
+            for (TestData data : testScript.getTestDataSet().getData()) {
+                if (data.isSelected()) {
+                    Long duration = meanDurations.get(getKey(testScript, data));
+                    schedule.recordScheduled(testScript.getTestCaseName(), data.getRowId(), duration != null ? duration : -1);
+                }
+            }
+        }
+        return scheduledTestScripts;
+    }
+
+    /**
+     * Orders test suites, a test suite being scheduled according to its test scripts.
+     * @param testSuites the test suites, in definition order
+     * @return the test suites in scheduled order
+     */
+    public synchronized <T extends TestSuite> List<T> scheduleTestSuites(List<T> testSuites) {
+        if (order == Order.DEFINITION) {
+            return testSuites;
+        }
+        loadHistory();
+        final Map<T, Long> expectedDurations = new HashMap<T, Long>();
+        final Map<T, Boolean> failures = new HashMap<T, Boolean>();
+        for (T testSuite : testSuites) {
+            long duration = 0;
+            boolean failed = false;
+            for (TestScript testScript : testSuite.getTestScripts()) {
+                duration += getExpectedDuration(testScript);
+                failed |= hasFailed(testScript);
+            }
+            expectedDurations.put(testSuite, duration);
+            failures.put(testSuite, failed);
+        }
+        return sort(testSuites, expectedDurations, failures);
+    }
+
+    <T> List<T> sort(List<T> items, final Map<T, Long> expectedDurations, final Map<T, Boolean> failures) {
+        List<T> sortedItems = new ArrayList<T>(items);
+        // the sort is stable, so that equivalent items keep their definition order
+        Collections.sort(sortedItems, new Comparator<T>() {
+            public int compare(T item1, T item2) {
+                switch (order) {
+                    case FAILED_FIRST:
+                        return (failures.get(item1) ? 0 : 1) - (failures.get(item2) ? 0 : 1);
+                    case SHORTEST_FIRST:
+                        return expectedDurations.get(item1).compareTo(expectedDurations.get(item2));
+                    case LONGEST_FIRST:
+                        return expectedDurations.get(item2).compareTo(expectedDurations.get(item1));
+                    default:
+                        return 0;
+                }
+            }
+        });
+        return sortedItems;
+    }
+
+    private static String getKey(TestScript testScript, TestData data) {
+        return getKey(testScript.getTestCaseName(), data.getRowId());
+    }
+
+    private static String getKey(String testCaseName, int rowId) {
+        return testCaseName + " - " + rowId;
+    }
+
+    private static List<Integer> getSelectedRowIds(TestScript testScript) {
+        List<Integer> rowIds = new ArrayList<Integer>();
+        for (TestData data : testScript.getTestDataSet().getData()) {
+            if (data.isSelected()) {
+                rowIds.add(data.getRowId());
+            }
+        }
+        return rowIds;
+    }
+
+    private long getExpectedDuration(TestScript testScript) {
+        return getExpectedDuration(testScript.getTestCaseName(), getSelectedRowIds(testScript));
+    }
+
+    /**
+     * Gets the expected duration of data rows of a test case, a data row without history
+     * being expected to last the mean duration of the data rows with history.
+     */
+    long getExpectedDuration(String testCaseName, List<Integer> rowIds) {
+        long duration = 0;
+        for (int rowId : rowIds) {
+            Long rowDuration = meanDurations.get(getKey(testCaseName, rowId));
+            duration += (rowDuration != null ? rowDuration : getDefaultDuration());
+        }
+        return duration;
+    }
+
+    private long getDefaultDuration() {
+        if (meanDurations.isEmpty()) {
+            return 0;
+        }
+        long total = 0;
+        for (long duration : meanDurations.values()) {
+            total += duration;
+        }
+        return total / meanDurations.size();
+    }
+
+    private boolean hasFailed(TestScript testScript) {
+        return hasFailed(testScript.getTestCaseName(), getSelectedRowIds(testScript));
+    }
+
+    /**
+     * @return true if one of the data rows of the test case failed or was in error at its last execution
+     */
+    boolean hasFailed(String testCaseName, List<Integer> rowIds) {
+        for (int rowId : rowIds) {
+            TestResult.Status status = lastStatuses.get(getKey(testCaseName, rowId));
+            if (status == TestResult.Status.FAIL || status == TestResult.Status.NOT_AVAILABLE) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    /**
+     * Loads the mean durations and the last statuses of the tests from the last archived runs,
+     * if the archive changed since they were loaded.
+     */
+    private void loadHistory() {
+        // the archive of the report manager doesn't read the run in progress
+        TestResultsArchive archive = TestResultsReportManager.getInstance().getArchive();
+        File archiveDirectory = archive.getArchiveDirectory();
+        // a new run file changes the modification time of the archive directory
+        long timeStamp = archiveDirectory.lastModified();
+        if (timeStamp == historyTimeStamp) {
+            return;
+        }
+        historyTimeStamp = timeStamp;
+        try {
+            loadHistory(archive.readRuns(HISTORY_RUNS));
+        } catch (IOException e) {
+            logger.warn("Unable to read the test results archive, tests will be scheduled without history: " + e.getMessage());
+            loadHistory(Collections.<TestResultsArchive.Run>emptyList());
+        }
+    }
+
+    /**
+     * Loads the mean durations and the last statuses of the tests from archived runs.
+     * @param runs the runs, from the oldest to the newest
+     */
+    synchronized void loadHistory(List<TestResultsArchive.Run> runs) {
+        meanDurations.clear();
+        lastStatuses.clear();
+        meanDurations.putAll(TestResultsArchive.getMeanElapsedTimes(runs));
+        for (TestResultsArchive.Run run : runs) {
+            for (TestResultsArchive.TestRecord test : run.getFinalTests().values()) {
+                lastStatuses.put(test.getKey(), test.getStatus());
+            }
+        }
+    }
+}
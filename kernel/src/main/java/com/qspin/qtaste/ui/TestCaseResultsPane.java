@@ -374,6 +374,15 @@ public class TestCaseResultsPane extends JSplitPane {
             if (runTabbedPane.getSelectedIndex()>0)
             {
                 int tabIndex = runTabbedPane.getSelectedIndex();
+                String tabName = runTabbedPane.getTitleAt(tabIndex);
+                // release the results of the closed tab
+                Object reportObject = runTabbedPane.getClientProperty("TestCaseReportTable_" + tabName);
+                if (reportObject instanceof TestCaseReportTable) {
+                    TestCaseReportTable reportTable = (TestCaseReportTable) reportObject;
+                    TestCaseReporter.removeTestCaseReportTableListener(reportTable);
+                    reportTable.resetTable();
+                    runTabbedPane.putClientProperty("TestCaseReportTable_" + tabName, null);
+                }
                 runTabbedPane.remove(tabIndex);
             }
         }
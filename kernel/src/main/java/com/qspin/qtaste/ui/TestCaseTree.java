@@ -45,6 +45,11 @@ import java.awt.event.MouseAdapter;
 import java.awt.event.MouseEvent;
 import java.io.File;
 import java.io.IOException;
+import java.util.ArrayList;
+import java.util.Enumeration;
+import java.util.HashSet;
+import java.util.List;
+import java.util.Set;
 
 import javax.swing.AbstractAction;
 import javax.swing.Action;
@@ -55,6 +60,7 @@ import javax.swing.SwingUtilities;
 import javax.swing.ToolTipManager;
 import javax.swing.TransferHandler;
 import javax.swing.event.TreeExpansionEvent;
+import javax.swing.event.TreeExpansionListener;
 import javax.swing.event.TreeSelectionEvent;
 import javax.swing.event.TreeSelectionListener;
 import javax.swing.event.TreeWillExpandListener;
@@ -77,9 +83,9 @@ import com.qspin.qtaste.ui.tools.HTMLDocumentLoader;
 import com.qspin.qtaste.ui.tools.PythonTestScript;
 import com.qspin.qtaste.ui.tools.TestCaseTreeCellRenderer;
 import com.qspin.qtaste.ui.tools.TestScriptCreation;
+import com.qspin.qtaste.ui.tools.TestSuiteDirectoryCache;
 import com.qspin.qtaste.ui.tools.TestSuiteRunDialog;
 import com.qspin.qtaste.util.DirectoryUtilities;
-import com.qspin.qtaste.util.FileUtilities;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
 
 @SuppressWarnings("serial")
@@ -100,6 +106,17 @@ public class TestCaseTree extends JTree implements DragSourceListener,
     private TestCaseTree mTestCaseTree;
     protected TestCasePane testCasePane;
     private static final String TEST_CASE_TAB_ON_SELECT_PROPERTY = "test_case_tab_on_select";
+    private final TestSuiteDirectoryCache directoryCache = TestSuiteDirectoryCache.getInstance();
+    // directories whose content is not known yet are added once scanned in background
+    private final TestSuiteDirectoryCache.Listener directoryListener = new TestSuiteDirectoryCache.Listener() {
+        public void directoriesChanged(final Set<File> directories) {
+            SwingUtilities.invokeLater(new Runnable() {
+                public void run() {
+                    refreshLoadedNodes((TCTreeNode) getModel().getRoot(), directories);
+                }
+            });
+        }
+    };
     DragSource ds;
     DropTarget dt;
 
@@ -123,6 +140,7 @@ public class TestCaseTree extends JTree implements DragSourceListener,
         TCTreeListener listener = new TCTreeListener();
         this.addMouseListener(listener);
         addTreeWillExpandListener(listener);
+        addTreeExpansionListener(listener);
         addTreeSelectionListener(listener);
         TreeSelectionModel selModel = this.getSelectionModel();
         selModel.setSelectionMode(TreeSelectionModel.SINGLE_TREE_SELECTION);
@@ -144,6 +162,50 @@ public class TestCaseTree extends JTree implements DragSourceListener,
 
     }
 
+    /**
+     * Listens to the directory cache while the tree is displayed, refreshing the loaded nodes
+     * for the changes which occurred meanwhile.
+     */
+    @Override
+    public void addNotify() {
+        super.addNotify();
+        directoryCache.addListener(directoryListener);
+        refreshLoadedNodes((TCTreeNode) getModel().getRoot(), updateWatchedDirectories());
+    }
+
+    /**
+     * Stops listening to the directory cache when the tree is no longer displayed, so that a discarded tree
+     * is not kept by the cache.
+     */
+    @Override
+    public void removeNotify() {
+        directoryCache.removeListener(directoryListener);
+        super.removeNotify();
+    }
+
+    /**
+     * Sets the directories watched in the directory cache to the displayed directory nodes,
+     * i.e. the root and the expanded directory nodes.
+     *
+     * @return the watched directories
+     */
+    private Set<File> updateWatchedDirectories() {
+        Set<File> directories = new HashSet<File>();
+        TCTreeNode rootNode = (TCTreeNode) getModel().getRoot();
+        directories.add(((FileNode) rootNode.getUserObject()).getFile().getAbsoluteFile());
+        Enumeration<TreePath> expandedPaths = getExpandedDescendants(new TreePath(rootNode));
+        if (expandedPaths != null) {
+            while (expandedPaths.hasMoreElements()) {
+                Object node = expandedPaths.nextElement().getLastPathComponent();
+                if (node instanceof TCTreeNode && ((TCTreeNode) node).getUserObject() instanceof FileNode) {
+                    directories.add(((FileNode) ((TCTreeNode) node).getUserObject()).getFile().getAbsoluteFile());
+                }
+            }
+        }
+        directoryCache.setWatchedDirectories(directoryListener, directories);
+        return directories;
+    }
+
     @Override
      public String getToolTipText(MouseEvent e) {
         if (getRowForLocation(e.getX(), e.getY()) == -1)
@@ -196,6 +258,7 @@ public class TestCaseTree extends JTree implements DragSourceListener,
         rootNode.setUserObject(rootFileNode);
         addTreeToDir(rootFileNode.getFile(), rootNode);
         updateUI();
+        updateWatchedDirectories();
         return rootNode;
     }
 
@@ -211,66 +274,106 @@ public class TestCaseTree extends JTree implements DragSourceListener,
     }
 
     protected void addTreeToDir(File file, DefaultMutableTreeNode parentNode) {
-        if (file.isDirectory()) {
-            File[] childFiles = FileUtilities.listSortedFiles(file);
-            for (int i = 0; i < childFiles.length; i++) {
-                addChildToTree(childFiles[i], parentNode);
-            }
+        File[] childFiles = directoryCache.getSubDirectories(file);
+        for (int i = 0; i < childFiles.length; i++) {
+            addChildToTree(childFiles[i], parentNode);
         }
     }
 
     protected boolean isTestcaseDir(File file) {
-        if (file.isDirectory()) {
-            File[] childFiles = FileUtilities.listSortedFiles(file);
-            for (int i = 0; i < childFiles.length; i++) {
-                if (childFiles[i].getName().equals(StaticConfiguration.TEST_SCRIPT_FILENAME)) {
-                    return true;
-                }
+        return directoryCache.isTestcaseDir(file);
+    }
+
+    protected boolean checkIfDirectoryContainsTestScriptFile(File file) {
+        return directoryCache.containsTestScript(file);
+    }
+
+    /**
+     * Checks if a directory must be displayed, i.e. if it contains test scripts.
+     * If not known yet, the directory is scanned in background and false is returned;
+     * the parent node is then refreshed once the directory has been scanned.
+     */
+    protected boolean isDisplayedDirectory(File file) {
+        return !file.isHidden() && Boolean.TRUE.equals(directoryCache.getContainsTestScript(file));
+    }
+
+    protected TCTreeNode createTreeNode(File file) {
+        FileNode fn = new FileNode(file, file.getName(), getTestCasePane().getTestSuiteDirectory());
+        return new TCTreeNode(fn, !fn.isTestcaseDir());
+    }
+
+    protected void addChildToTree(File file, DefaultMutableTreeNode parent) {
+        if (!isDisplayedDirectory(file)) {
+            return;
+        }
+        parent.add(createTreeNode(file));
+    }
+
+    /**
+     * Updates the children of a directory node from the directory content.
+     * The nodes of the directories which are still present are kept, so that their expansion state is preserved.
+     *
+     * @param parentNode the directory node
+     */
+    protected void refreshTreeNode(TCTreeNode parentNode) {
+        FileNode parentFileNode = (FileNode) parentNode.getUserObject();
+        DefaultTreeModel model = (DefaultTreeModel) getModel();
+        List<File> directories = new ArrayList<File>();
+        for (File file : directoryCache.getSubDirectories(parentFileNode.getFile())) {
+            if (isDisplayedDirectory(file)) {
+                directories.add(file);
             }
         }
-        return false;
 
-    }
+        // remove the nodes of the removed, changed or moved directories
+        int lastIndex = -1;
+        int childIndex = 0;
+        while (childIndex < parentNode.getChildCount()) {
+            TCTreeNode childNode = (TCTreeNode) parentNode.getChildAt(childIndex);
+            FileNode childFileNode = (FileNode) childNode.getUserObject();
+            int index = directories.indexOf(childFileNode.getFile());
+            if (index <= lastIndex || childNode.getAllowsChildren() == childFileNode.isTestcaseDir()) {
+                model.removeNodeFromParent(childNode);
+            } else {
+                lastIndex = index;
+                childIndex++;
+            }
+        }
 
-    protected boolean checkIfDirectoryContainsTestScriptFile(File file) {
-        File[] childFiles = FileUtilities.listSortedFiles(file);
-        for (int i = 0; i < childFiles.length; i++) {
-            if (childFiles[i].isDirectory()) {
-                FileNode childNode = new FileNode(childFiles[i], childFiles[i].getName(), getTestCasePane().getTestSuiteDirectory());
-                if (childNode.isTestcaseDir()) {
-                    return true;
-                } else {
-                    // go recursively into its directory
-                    boolean result = checkIfDirectoryContainsTestScriptFile(childFiles[i]);
-                    if (result) {
-                        return true;
-                    }
+        // insert the nodes of the new directories
+        for (int i = 0; i < directories.size(); i++) {
+            if (i < parentNode.getChildCount()) {
+                FileNode childFileNode = (FileNode) ((TCTreeNode) parentNode.getChildAt(i)).getUserObject();
+                if (childFileNode.getFile().equals(directories.get(i))) {
+                    continue;
                 }
             }
-
+            model.insertNodeInto(createTreeNode(directories.get(i)), parentNode, i);
         }
-        return false;
     }
 
-    protected void addChildToTree(File file, DefaultMutableTreeNode parent) {
-        if (!file.isDirectory()) {
+    /**
+     * Refreshes the root node and the expanded directory nodes affected by changes of the given directories.
+     */
+    private void refreshLoadedNodes(TCTreeNode node, Set<File> changedDirectories) {
+        if (!(node.getUserObject() instanceof FileNode) || !node.getAllowsChildren()) {
             return;
         }
-        FileNode fn = new FileNode(file, file.getName(), getTestCasePane().getTestSuiteDirectory());
-        // check if the directory is the child one containing data files
-        boolean nodeToAdd = fn.isTestcaseDir();
-        if (!fn.isTestcaseDir()) {
-            // go recursilvely to its child and check if it must be added
-            nodeToAdd = checkIfDirectoryContainsTestScriptFile(file);
+        String path = ((FileNode) node.getUserObject()).getFile().getAbsolutePath();
+        boolean affected = false;
+        for (File changedDirectory : changedDirectories) {
+            String changedPath = changedDirectory.getPath();
+            if (changedPath.equals(path) || changedPath.startsWith(path + File.separator)) {
+                affected = true;
+                break;
+            }
         }
-        if (!nodeToAdd) {
+        if (!affected || (!node.isRoot() && !isExpanded(new TreePath(node.getPath())))) {
             return;
         }
-        TCTreeNode node = new TCTreeNode(fn, !fn.isTestcaseDir());
-        final int NON_EXISTENT = -1;
-        if (parent.getIndex(node) == NON_EXISTENT &&
-                !file.isHidden()) {
-            parent.add(node);
+        refreshTreeNode(node);
+        for (int i = 0; i < node.getChildCount(); i++) {
+            refreshLoadedNodes((TCTreeNode) node.getChildAt(i), changedDirectories);
         }
     }
 
@@ -506,39 +609,19 @@ public class TestCaseTree extends JTree implements DragSourceListener,
                     }
 
                     FileNode draggedFileNode = (FileNode)tcTreeNode.getUserObject();
-                    draggedFileNode.getFile().renameTo(new File(fn.getFile() + "/" + draggedFileNode.getFile().getName()));
-                    // update target tree
+                    File draggedFile = draggedFileNode.getFile();
+                    draggedFile.renameTo(new File(fn.getFile() + "/" + draggedFile.getName()));
+                    directoryCache.invalidate(draggedFile.getParentFile());
+                    directoryCache.invalidate(fn.getFile());
 
                     testCasePane.parent.setCursor(Cursor.getPredefinedCursor(Cursor.WAIT_CURSOR));
 
-                    TCTreeNode parentTreeNode = (TCTreeNode)tcTargetNode.getParent();
-                    if (parentTreeNode!=null) {
-                        parentTreeNode.removeAllChildren();
-                        FileNode parentFileNode = (FileNode)parentTreeNode.getUserObject();
-                        addTreeToDir(parentFileNode.getFile(), parentTreeNode);
-                        ((DefaultTreeModel) getModel()).reload(parentTreeNode);
-                    }
-                    else
-                    {
-                        tcTargetNode.removeAllChildren();
-                        FileNode targetFileNode = (FileNode)tcTargetNode.getUserObject();
-                        addTreeToDir(targetFileNode.getFile(), tcTargetNode);
-                        ((DefaultTreeModel) getModel()).reload(tcTargetNode);
-                    }
+                    // update target tree, the moved directory is added once scanned
+                    refreshTreeNode(tcTargetNode);
                     // update source tree
-                    parentTreeNode = (TCTreeNode)tcTreeNode.getParent();
+                    TCTreeNode parentTreeNode = (TCTreeNode)tcTreeNode.getParent();
                     if (parentTreeNode!=null) {
-                        parentTreeNode.removeAllChildren();
-                        FileNode parentFileNode = (FileNode)parentTreeNode.getUserObject();
-                        addTreeToDir(parentFileNode.getFile(), parentTreeNode);
-                        ((DefaultTreeModel) getModel()).reload(parentTreeNode);
-                    }
-                    else
-                    {
-                        tcTreeNode.removeAllChildren();
-                        FileNode targetFileNode = (FileNode)tcTreeNode.getUserObject();
-                        addTreeToDir(targetFileNode.getFile(), tcTreeNode);
-                        ((DefaultTreeModel) getModel()).reload(tcTreeNode);
+                        refreshTreeNode(parentTreeNode);
                     }
                     testCasePane.parent.setCursor(Cursor.getPredefinedCursor(Cursor.DEFAULT_CURSOR));
                     dtde.getDropTargetContext().dropComplete(true);
@@ -564,19 +647,25 @@ public class TestCaseTree extends JTree implements DragSourceListener,
     /////////////////////////////////////////////////////////////////////////////////////
     //Inner Classes
     /////////////////////////////////////////////////////////////////////////////////////
-    public class TCTreeListener extends MouseAdapter implements TreeWillExpandListener, TreeSelectionListener {
+    public class TCTreeListener extends MouseAdapter implements TreeWillExpandListener, TreeExpansionListener, TreeSelectionListener {
 
         public void treeWillCollapse(TreeExpansionEvent event) {
         }
 
+        public void treeExpanded(TreeExpansionEvent event) {
+            updateWatchedDirectories();
+        }
+
+        public void treeCollapsed(TreeExpansionEvent event) {
+            updateWatchedDirectories();
+        }
+
         protected void addNodesToDir(TreePath path) {
             TCTreeNode tn = getTreeNode(path);
             if (tn != null) {
                 FileNode fn = (FileNode) tn.getUserObject();
                 if (fn.isDir()) {
-                    tn.removeAllChildren();
-                    addTreeToDir(fn.getFile(), tn);
-                    ((DefaultTreeModel) getModel()).reload(tn);
+                    refreshTreeNode(tn);
                 }
             }
         }
@@ -837,10 +926,9 @@ public class TestCaseTree extends JTree implements DragSourceListener,
 	            }
 
 	            TCTreeNode parentTreeNode = (TCTreeNode)tn.getParent();
-	            parentTreeNode.removeAllChildren();
 	            FileNode parentFileNode = (FileNode)parentTreeNode.getUserObject();
-	            addTreeToDir(parentFileNode.getFile(), parentTreeNode);
-	            ((DefaultTreeModel) getModel()).reload(parentTreeNode);
+	            directoryCache.invalidate(parentFileNode.getFile());
+	            refreshTreeNode(parentTreeNode);
 	            // reload the doc is selected
             	setTestCaseDoc(fn.getPythonTestScript().getTestcaseDoc(), false);
             	//
@@ -875,10 +963,9 @@ public class TestCaseTree extends JTree implements DragSourceListener,
                     if (deleted)
                     {
                         TCTreeNode parentTreeNode = (TCTreeNode)tn.getParent();
-                        parentTreeNode.removeAllChildren();
                         FileNode parentFileNode = (FileNode)parentTreeNode.getUserObject();
-                        addTreeToDir(parentFileNode.getFile(), parentTreeNode);
-                        ((DefaultTreeModel) getModel()).reload(parentTreeNode);
+                        directoryCache.invalidate(parentFileNode.getFile());
+                        refreshTreeNode(parentTreeNode);
                     }
                     else
                     {
@@ -931,9 +1018,8 @@ public class TestCaseTree extends JTree implements DragSourceListener,
 	            // update the tree view
 	            // add the tree
 
-	            tn.removeAllChildren();
-	            addTreeToDir(fn.getFile(), tn);
-	            ((DefaultTreeModel) getModel()).reload(tn);
+	            directoryCache.invalidate(fn.getFile());
+	            refreshTreeNode(tn);
 			} catch (IOException e1) {
 				// TODO Auto-generated catch block
 				e1.printStackTrace();
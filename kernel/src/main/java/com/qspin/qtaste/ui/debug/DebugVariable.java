@@ -21,16 +21,82 @@ package com.qspin.qtaste.ui.debug;
 
 import java.util.ArrayList;
 
+/**
+ * Variable displayed by the debugger.
+ * <p>
+ * The fields of a variable are either added explicitly or loaded from the variable object
+ * on first access, by a {@link FieldsLoader}.
+ */
 public class DebugVariable  {
+
+	/**
+	 * Loads the fields of a variable from its object.
+	 */
+	public interface FieldsLoader {
+		/**
+		 * Tells if an object may have fields, without loading them.
+		 */
+		boolean hasFields(Object object);
+		/**
+		 * Adds the fields of the variable object to the variable.
+		 */
+		void loadFields(DebugVariable variable);
+	}
 	
 	private ArrayList<DebugVariable> mFieldList;
 	private String m_Value;
 	private String m_Type;
 	private String m_VarName;
+	private Object mObject;
+	private DebugVariable mParent;
+	// not null until the fields are loaded, read without lock so that the Swing event thread never waits for a load
+	private volatile FieldsLoader mFieldsLoader;
+	// true while a thread loads the fields, guarded by this
+	private boolean mLoading;
 	
+	/**
+	 * Returns the fields of the variable, loading them if not yet done.
+	 * This may take time and should not be called from the Swing event thread if {@link #isLoaded()} is false.
+	 * The fields are loaded without holding the variable lock, a concurrent call waits until they are loaded.
+	 */
 	public ArrayList<DebugVariable> getFieldList() {
+		FieldsLoader fieldsLoader;
+		synchronized (this) {
+			while (mLoading) {
+				try {
+					wait();
+				} catch (InterruptedException e) {
+					Thread.currentThread().interrupt();
+					return mFieldList;
+				}
+			}
+			fieldsLoader = mFieldsLoader;
+			if (fieldsLoader == null) {
+				return mFieldList;
+			}
+			mLoading = true;
+		}
+		try {
+			fieldsLoader.loadFields(this);
+		} finally {
+			synchronized (this) {
+				mFieldsLoader = null;
+				mLoading = false;
+				notifyAll();
+			}
+		}
 		return mFieldList;
 	}
+	public boolean isLoaded() {
+		return mFieldsLoader == null;
+	}
+	public boolean hasFields() {
+		FieldsLoader fieldsLoader = mFieldsLoader;
+		if (fieldsLoader != null) {
+			return fieldsLoader.hasFields(mObject);
+		}
+		return !mFieldList.isEmpty();
+	}
 	public void setValue(String value) {
 		this.m_Value = value;
 	}
@@ -51,8 +117,24 @@ public class DebugVariable  {
 		mFieldList = new ArrayList<DebugVariable>();
 	}
 
+	/**
+	 * Creates a variable whose fields will be loaded from its object on first access.
+	 */
+	public DebugVariable(String variableName, String variableType, String value, Object object, DebugVariable parent, FieldsLoader fieldsLoader) {
+		this(variableName, variableType, value);
+		mObject = object;
+		mParent = parent;
+		mFieldsLoader = fieldsLoader;
+	}
+
 	public ArrayList<DebugVariable> getFields() {
-		return mFieldList;
+		return getFieldList();
+	}
+	public Object getObject() {
+		return mObject;
+	}
+	public DebugVariable getParent() {
+		return mParent;
 	}
 	public void addField(DebugVariable variableField)
 	{
@@ -29,6 +29,8 @@ import java.util.ArrayList;
 
 import javax.swing.JPanel;
 import javax.swing.JScrollPane;
+import javax.swing.event.TreeExpansionEvent;
+import javax.swing.event.TreeWillExpandListener;
 import javax.swing.table.DefaultTableModel;
 
 /**
@@ -80,6 +82,17 @@ public class DebugVariablePanel extends JPanel {
     	*/
     	mTableModel = new DebugVariableTreeTableModel();
     	mTree = new DebugTreeTable(mTableModel);
+    	// variables fields are only loaded when displayed
+    	mTree.getTree().addTreeWillExpandListener(new TreeWillExpandListener() {
+    		public void treeWillExpand(TreeExpansionEvent event) {
+    			Object node = event.getPath().getLastPathComponent();
+    			if (node instanceof VariableNode) {
+    				mTableModel.loadChildren((VariableNode)node);
+    			}
+    		}
+    		public void treeWillCollapse(TreeExpansionEvent event) {
+    		}
+    	});
     	JScrollPane sp = new JScrollPane(mTree);
         this.add(sp);
         
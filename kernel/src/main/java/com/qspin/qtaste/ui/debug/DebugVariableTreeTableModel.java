@@ -21,8 +21,8 @@ package com.qspin.qtaste.ui.debug;
 
 import java.util.ArrayList;
 
+import javax.swing.SwingWorker;
 import javax.swing.tree.DefaultTreeModel;
-import javax.swing.tree.TreeNode;
 
 import com.qspin.qtaste.ui.treetable.TreeTableModel;
 
@@ -35,48 +35,65 @@ public class DebugVariableTreeTableModel extends DefaultTreeModel //AbstractTree
     // Types of the columns.
     static protected Class<?>[]  cTypes = {TreeTableModel.class, String.class};
     
+    /**
+     * Displays the given variables. Only the top-level variables are added,
+     * the fields of a variable are added when its node is expanded, see {@link #loadChildren(VariableNode)}.
+     */
     public void setDebugVariables(ArrayList<DebugVariable> debugVariables) {
 		DebugRootNode rootNode = (DebugRootNode)this.getRoot();
-		// remove all children
-        ArrayList<TreeNode> childNodes = new ArrayList<TreeNode>();
-        if (rootNode.getChildren()!=null) {
-	        int[] indices = new int[rootNode.getChildCount()];
-	        int index=0;
+		rootNode.children = null;
+		rootNode.removeAllChildren();
+		rootNode.setDebugVariables(debugVariables);
+		if (rootNode.getChildren()!=null) {
 			for (Object childNode :rootNode.getChildren()) {
-	            indices[index]=index;
-				VariableNode childVarNode = (VariableNode)childNode;
-				childNodes.add(childVarNode);
-				index++;
+				rootNode.add((VariableNode)childNode);
 			}
-			this.fireTreeNodesRemoved(this, this.getPathToRoot(rootNode), indices, childNodes.toArray());
-			rootNode.children =null;
-			rootNode.removeAllChildren();
-        }
-		rootNode.setDebugVariables(debugVariables);
-		int currentIndex=0;
-		for (Object childNode :rootNode.getChildren()) {
-			rootNode.add((VariableNode)childNode);
- 	        this.fireTreeNodesInserted(this, new Object [] {this.getRoot()}, 
-	        		new int[] {currentIndex}, 
-	        		new Object[] {childNode});
- 	        ///
- 	       insertNode(childNode);
- 	        //
-			currentIndex++;
 		}
-        this.nodeChanged((TreeNode)this.getRoot());
+        this.nodeStructureChanged(rootNode);
     }
-    
-    private void insertNode(Object childNode) {
-		int currentIndex2=0;
-		for (Object fieldNode : ((VariableNode)childNode).getChildren()) {
-			((VariableNode)childNode).add((VariableNode)fieldNode);				
-	        this.fireTreeNodesInserted(this, new Object [] {childNode}, 
-	        		new int[] {currentIndex2},new Object[] {fieldNode}); 
-			currentIndex2++;
-			insertNode(fieldNode);
-		}
-    	
+
+    /**
+     * Adds the children of a variable node, if not yet done.
+     * If the variable fields are not loaded yet, they are evaluated in a background thread
+     * and an "evaluating..." node is displayed meanwhile, so that the GUI stays responsive.
+     */
+    public void loadChildren(final VariableNode node) {
+    	if (node.isChildrenAdded() || node.getVariable()==null) {
+    		return;
+    	}
+    	node.setChildrenAdded(true);
+    	final DebugVariable variable = node.getVariable();
+    	if (variable.isLoaded()) {
+    		addChildren(node);
+    		return;
+    	}
+    	final VariableNode evaluatingNode = new VariableNode(new DebugVariable("", "", "evaluating..."));
+    	insertNodeInto(evaluatingNode, node, 0);
+    	new SwingWorker<Object, Object>() {
+    		@Override
+    		protected Object doInBackground() {
+    			variable.getFieldList();
+    			return null;
+    		}
+    		@Override
+    		protected void done() {
+    			removeNodeFromParent(evaluatingNode);
+    			addChildren(node);
+    		}
+    	}.execute();
+    }
+
+    private void addChildren(VariableNode node) {
+    	Object[] children = node.getChildren();
+    	if (children==null || children.length==0) {
+    		return;
+    	}
+    	int[] indices = new int[children.length];
+    	for (int i=0; i < children.length; i++) {
+    		node.add((VariableNode)children[i]);
+    		indices[i] = i;
+    	}
+    	this.nodesWereInserted(node, indices);
     }
     
     public DebugVariableTreeTableModel() {
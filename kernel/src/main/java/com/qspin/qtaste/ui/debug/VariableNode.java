@@ -25,6 +25,7 @@ import java.util.ArrayList;
 public class VariableNode extends DebugNode {
 
 	private DebugVariable mVariable;
+	private boolean mChildrenAdded = false;
 	Object[] children; 
 	
 	public VariableNode(DebugVariable variable) {
@@ -40,11 +41,22 @@ public class VariableNode extends DebugNode {
 
     public boolean hasChildren(){
     	if (mVariable==null) return true;
-    	return mVariable.getFieldList().size()>0;
+    	return mVariable.hasFields();
+    }
+
+    /**
+     * Tells if the children have been added to the tree node (or are being added).
+     */
+    public boolean isChildrenAdded() {
+    	return mChildrenAdded;
+    }
+    public void setChildrenAdded(boolean childrenAdded) {
+    	mChildrenAdded = childrenAdded;
     }
 
     /**
      * Loads the children, caching the results in the children ivar.
+     * The variable fields are loaded if not yet done, which may take time.
      */
     protected Object[] getChildren() {
 		if (children != null) {
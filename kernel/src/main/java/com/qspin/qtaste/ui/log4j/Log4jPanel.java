@@ -73,6 +73,7 @@ import javax.swing.table.TableRowSorter;
 import org.apache.log4j.Logger;
 import org.apache.log4j.spi.LoggingEvent;
 
+import com.qspin.qtaste.event.TestScriptEvent;
 import com.qspin.qtaste.reporter.testresults.TestResult;
 import com.qspin.qtaste.ui.tools.SpringUtilities;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
@@ -437,7 +438,8 @@ public class Log4jPanel extends JPanel {
         Object message = loggingEvent.getMessage();
         String messageString = null;
         if (message != null) {
-            messageString = message.toString();
+            // rendered message is cached by the logging event, structured events being formatted only once
+            messageString = loggingEvent.getRenderedMessage();
             String[] throwableStrRep = loggingEvent.getThrowableStrRep();
             if (throwableStrRep != null) {
                 for (int i = 0; i < throwableStrRep.length; i++) {
@@ -451,14 +453,26 @@ public class Log4jPanel extends JPanel {
         } else {
             cols[LOG_MESSAGE] = null;
         }
-        if (messageString != null) {
-            Matcher matcher = BEGIN_STEP_PATTERN.matcher(messageString);
-            if (matcher.matches()) {
-                m_currentStepStack.push(matcher.group(1) + " - " + matcher.group(2));
+        boolean isStepEnd;
+        if (message instanceof TestScriptEvent) {
+            // structured event logged in this JVM, no need to parse the message
+            if (message instanceof TestScriptEvent.StepBegin) {
+                TestScriptEvent.StepBegin stepBegin = (TestScriptEvent.StepBegin) message;
+                m_currentStepStack.push(stepBegin.getStepId() + " - " + stepBegin.getStepName());
             }
+            isStepEnd = message instanceof TestScriptEvent.StepEnd;
+        } else {
+            // message received from another JVM, or logged as text
+            if (messageString != null) {
+                Matcher matcher = BEGIN_STEP_PATTERN.matcher(messageString);
+                if (matcher.matches()) {
+                    m_currentStepStack.push(matcher.group(1) + " - " + matcher.group(2));
+                }
+            }
+            isStepEnd = (messageString != null) && messageString.startsWith("End of step ");
         }
         cols[LOG_STEP] = m_currentStepStack.empty() ? null : m_currentStepStack.peek();
-        if ((messageString != null) && messageString.startsWith("End of step ")) {
+        if (isStepEnd && !m_currentStepStack.empty()) {
             m_currentStepStack.pop();
         }
 
@@ -50,6 +50,9 @@ public class TextAreaAppender extends WriterAppender {
 	 * JTextArea.
 	 */
 	public void append(final LoggingEvent loggingEvent) {
+		// render the message now, in the logging thread, as a structured message object may change
+		// or run script code when rendered; the rendered message is kept by the event
+		loggingEvent.getRenderedMessage();
 
 		// Append formatted message to textarea using the Swing Thread.
 		SwingUtilities.invokeLater(new Runnable() {
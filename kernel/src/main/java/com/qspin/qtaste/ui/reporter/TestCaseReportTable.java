@@ -71,6 +71,7 @@ import com.qspin.qtaste.config.StaticConfiguration;
 import com.qspin.qtaste.config.TestBedConfiguration;
 import com.qspin.qtaste.kernel.campaign.TestSuiteParams;
 import com.qspin.qtaste.reporter.testresults.TestResult;
+import com.qspin.qtaste.reporter.testresults.TestResultImpl;
 import com.qspin.qtaste.reporter.testresults.TestResultsReportManager;
 import com.qspin.qtaste.testsuite.TestSuite;
 import com.qspin.qtaste.testsuite.impl.MetaTestSuite;
@@ -369,6 +370,9 @@ public class TestCaseReportTable {
             //tcModel.addRow(cols);
             Integer rowNum = new Integer(tcModel.getRowCount());
             testCases.put(tr, rowNum);
+            if (tr instanceof TestResultImpl) {
+                ((TestResultImpl) tr).retain();
+            }
             long currentScrollBarMax = 0;
 
             JScrollPane scrollPane = (JScrollPane) tcTable.getParent().getParent();
@@ -535,10 +539,26 @@ public class TestCaseReportTable {
 
     public void resetTable() {
         tcModel.setRowCount(0);
-        testCases.clear();
+        releaseTestCases();
         clearReasonTable();
     }
 
+    /**
+     * Forgets the displayed test results, releasing them so that their details can be deleted.
+     */
+    private void releaseTestCases() {
+        for (TestResult tr : testCases.keySet()) {
+            releaseTestResult(tr);
+        }
+        testCases.clear();
+    }
+
+    private static void releaseTestResult(Object tr) {
+        if (tr instanceof TestResultImpl) {
+            ((TestResultImpl) tr).release();
+        }
+    }
+
     public void clearReasonTable() {
         if (tcReasonModel != null) {
             tcReasonModel.setRowCount(0);
@@ -667,7 +687,10 @@ public class TestCaseReportTable {
             int selNum = tcTable.getSelectedRowCount();
             while (selNum > 0) {
                 int[] selectedRowsId = tcTable.getSelectedRows();
-                testCases.remove(tcModel.getValueAt(selectedRowsId[0], TC));
+                Object tr = tcModel.getValueAt(selectedRowsId[0], TC);
+                if (testCases.remove(tr) != null) {
+                    releaseTestResult(tr);
+                }
                 tcModel.removeRow(selectedRowsId[0]);
                 selNum = tcTable.getSelectedRowCount();
             }
@@ -687,7 +710,7 @@ public class TestCaseReportTable {
 
         public void actionPerformed(ActionEvent e) {
             tcModel.setRowCount(0);
-            testCases.clear();
+            releaseTestCases();
         }
 
         public boolean isEnabled() {
@@ -62,6 +62,7 @@ import com.qspin.qtaste.config.StaticConfiguration;
 import com.qspin.qtaste.ui.TCTreeNode;
 import com.qspin.qtaste.ui.tools.FileNode;
 import com.qspin.qtaste.ui.tools.TestCaseTreeCellRenderer;
+import com.qspin.qtaste.ui.tools.TestSuiteDirectoryCache;
 import com.qspin.qtaste.ui.treetable.JTreeTable;
 import com.qspin.qtaste.util.FileUtilities;
 import com.qspin.qtaste.util.Log4jLoggerFactory;
@@ -155,23 +156,7 @@ public class TestCaseTree extends JTree implements DragSourceListener,
     }
 
     protected boolean checkIfDirectoryContainsTestScriptFile(File file) {
-        File[] childFiles = FileUtilities.listSortedFiles(file);
-        for (int i = 0; i < childFiles.length; i++) {
-            if (childFiles[i].isDirectory()) {
-                FileNode childNode = new FileNode(childFiles[i], childFiles[i].getName(),TESTUITE_DIR);
-                if (childNode.isTestcaseDir()) {
-                    return true;
-                } else {
-                    // go recursively into its directory
-                    boolean result = checkIfDirectoryContainsTestScriptFile(childFiles[i]);
-                    if (result) {
-                        return true;
-                    }
-                }
-            }
-
-        }
-        return false;
+        return TestSuiteDirectoryCache.getInstance().containsTestScript(file);
     }
 
     protected void addChildToTree(File file, DefaultMutableTreeNode parent) {
@@ -41,16 +41,7 @@ public class FileNode extends TreeNodeImpl{
 	private String m_TestSuiteDir;
 
     public boolean isTestcaseDir() {
-        if (f.isDirectory()) {
-        	
-            File[] childFiles = FileUtilities.listSortedFiles(f);
-            for (int i = 0; i < childFiles.length; i++) {
-                if (childFiles[i].getName().equalsIgnoreCase(StaticConfiguration.TEST_SCRIPT_FILENAME)) {
-                    return true;
-                }
-            }
-        }
-        return false;
+        return TestSuiteDirectoryCache.getInstance().isTestcaseDir(f);
     }
     /**
      * method to be improved
@@ -156,24 +147,7 @@ public class FileNode extends TreeNodeImpl{
     	return m_PythonTestScript;
     }
     protected boolean checkIfDirectoryContainsTestScriptFile(File file) {
-        File[] childFiles = FileUtilities.listSortedFiles(file);
-        if (childFiles==null) return false;
-        for (int i = 0; i < childFiles.length; i++) {
-            if (childFiles[i].isDirectory()) {
-                FileNode childNode = new FileNode(childFiles[i], childFiles[i].getName(), m_TestSuiteDir);
-                if (childNode.isTestcaseDir()) {
-                    return true;
-                } else {
-                    // go recursively into its directory
-                    boolean result = checkIfDirectoryContainsTestScriptFile(childFiles[i]);
-                    if (result) {
-                        return true;
-                    }
-                }
-            }
-
-        }
-        return false;
+        return TestSuiteDirectoryCache.getInstance().containsTestScript(file);
     }
     
     /**
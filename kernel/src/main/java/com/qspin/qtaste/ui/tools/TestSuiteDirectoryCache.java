@@ -0,0 +1,341 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.ui.tools;
+
+import java.io.File;
+import java.util.ArrayList;
+import java.util.Collection;
+import java.util.Collections;
+import java.util.HashSet;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.CopyOnWriteArrayList;
+import java.util.concurrent.LinkedBlockingQueue;
+import java.util.concurrent.TimeUnit;
+
+import org.apache.log4j.Logger;
+
+import com.qspin.qtaste.config.StaticConfiguration;
+import com.qspin.qtaste.util.FileUtilities;
+import com.qspin.qtaste.util.Log4jLoggerFactory;
+
+/**
+ * Cache of the test suites directories content, shared by the test case trees.
+ * <p>
+ * Each directory is listed once and its summary (sub-directories, presence of a test script and
+ * presence of test scripts in its sub-tree) is kept until the directory is modified.
+ * A background scanner computes the sub-tree summaries requested by the trees, so that the trees
+ * can be displayed before the whole test suites directory has been browsed, and periodically checks
+ * the modification time of the directories displayed by the trees, i.e. the directories watched by the listeners
+ * and their sub-directories. The listeners are notified of the directories whose summary has been computed
+ * or has changed.
+ */
+public class TestSuiteDirectoryCache {
+
+    /**
+     * Listener of directory summaries changes. Listeners are called from the scanner thread.
+     */
+    public interface Listener {
+        /**
+         * Called when the summary of directories has been computed or has changed.
+         * @param directories the absolute directories whose summary has been computed or has changed
+         */
+        void directoriesChanged(Set<File> directories);
+    }
+
+    private static Logger logger = Log4jLoggerFactory.getLogger(TestSuiteDirectoryCache.class);
+    private static final long CHECK_PERIOD_ms = 2000;
+    private static final long NOTIFICATION_PERIOD_ms = 200;
+    private static TestSuiteDirectoryCache instance;
+
+    private final Map<File, DirectorySummary> summaries = new ConcurrentHashMap<File, DirectorySummary>();
+    private final LinkedBlockingQueue<File> scanRequests = new LinkedBlockingQueue<File>();
+    private final Set<File> queuedDirectories = Collections.newSetFromMap(new ConcurrentHashMap<File, Boolean>());
+    private final List<Listener> listeners = new CopyOnWriteArrayList<Listener>();
+    private final Map<Listener, Set<File>> watchedDirectories = new ConcurrentHashMap<Listener, Set<File>>();
+
+    /**
+     * Summary of the content of a directory.
+     */
+    private static class DirectorySummary {
+        final long lastModified;
+        final boolean testcaseDir;
+        final File[] subDirectories;
+        /** true if the directory or one of its sub-directories contains a test script, null if unknown */
+        volatile Boolean containsTestScript;
+        /** true if containsTestScript must be computed again because a sub-directory has changed */
+        volatile boolean outdated;
+
+        DirectorySummary(File directory) {
+            lastModified = directory.lastModified();
+            boolean hasTestScript = false;
+            List<File> directories = new ArrayList<File>();
+            File[] childFiles = FileUtilities.listSortedFiles(directory);
+            if (childFiles != null) {
+                for (File childFile : childFiles) {
+                    if (childFile.isDirectory()) {
+                        directories.add(childFile);
+                    } else if (childFile.getName().equalsIgnoreCase(StaticConfiguration.TEST_SCRIPT_FILENAME)) {
+                        hasTestScript = true;
+                    }
+                }
+            }
+            testcaseDir = hasTestScript;
+            subDirectories = directories.toArray(new File[directories.size()]);
+            if (testcaseDir) {
+                containsTestScript = Boolean.TRUE;
+            }
+        }
+    }
+
+    /**
+     * Gets the cache instance, starting the background scanner on first use.
+     * @return the test suites directory cache
+     */
+    public static synchronized TestSuiteDirectoryCache getInstance() {
+        if (instance == null) {
+            instance = new TestSuiteDirectoryCache();
+            instance.startScanner();
+        }
+        return instance;
+    }
+
+    private TestSuiteDirectoryCache() {
+    }
+
+    public void addListener(Listener listener) {
+        listeners.add(listener);
+    }
+
+    public void removeListener(Listener listener) {
+        listeners.remove(listener);
+        watchedDirectories.remove(listener);
+    }
+
+    /**
+     * Sets the directories displayed by a registered listener, typically the expanded directories of a tree.
+     * Only these directories and their sub-directories are checked for modifications, so that the modifications
+     * of a directory which was not watched are detected at the first check after it becomes watched.
+     * @param listener the listener
+     * @param directories the directories
+     */
+    public void setWatchedDirectories(Listener listener, Collection<File> directories) {
+        Set<File> absoluteDirectories = new HashSet<File>();
+        for (File directory : directories) {
+            absoluteDirectories.add(directory.getAbsoluteFile());
+        }
+        if (listeners.contains(listener)) {
+            watchedDirectories.put(listener, absoluteDirectories);
+        }
+    }
+
+    /**
+     * Checks if a directory contains a test script.
+     * @param directory the directory
+     * @return true if the directory contains a test script, false otherwise
+     */
+    public boolean isTestcaseDir(File directory) {
+        return getSummary(directory).testcaseDir;
+    }
+
+    /**
+     * Gets the sub-directories of a directory, sorted by name (ignoring case).
+     * @param directory the directory
+     * @return the sub-directories of the directory, empty if none or if the directory doesn't exist
+     */
+    public File[] getSubDirectories(File directory) {
+        return getSummary(directory).subDirectories.clone();
+    }
+
+    /**
+     * Checks if a directory or one of its sub-directories contains a test script,
+     * browsing the sub-tree if not yet known.
+     * @param directory the directory
+     * @return true if the directory or one of its sub-directories contains a test script, false otherwise
+     */
+    public synchronized boolean containsTestScript(File directory) {
+        DirectorySummary summary = getSummary(directory);
+        Boolean containsTestScript = summary.containsTestScript;
+        if (containsTestScript == null || summary.outdated) {
+            summary.outdated = false;
+            containsTestScript = Boolean.FALSE;
+            for (File subDirectory : summary.subDirectories) {
+                if (containsTestScript(subDirectory)) {
+                    containsTestScript = Boolean.TRUE;
+                    break;
+                }
+            }
+            summary.containsTestScript = containsTestScript;
+        }
+        return containsTestScript;
+    }
+
+    /**
+     * Checks if a directory or one of its sub-directories contains a test script, without browsing the sub-tree.
+     * If not yet known or outdated, the sub-tree is browsed by the background scanner and the listeners
+     * are notified once done; an outdated value is returned meanwhile.
+     * @param directory the directory
+     * @return Boolean.TRUE if the directory or one of its sub-directories contains a test script,
+     *         Boolean.FALSE if not, null if not yet known
+     */
+    public Boolean getContainsTestScript(File directory) {
+        DirectorySummary summary = summaries.get(directory.getAbsoluteFile());
+        Boolean containsTestScript = (summary != null ? summary.containsTestScript : null);
+        if (containsTestScript == null || summary.outdated) {
+            requestScan(directory.getAbsoluteFile());
+        }
+        return containsTestScript;
+    }
+
+    /**
+     * Lists again a directory, to be called after modifying it.
+     * The summaries of its parent directories are updated accordingly.
+     * @param directory the modified directory
+     */
+    public synchronized void invalidate(File directory) {
+        File absoluteDirectory = directory.getAbsoluteFile();
+        refreshSummary(absoluteDirectory, summaries.get(absoluteDirectory));
+    }
+
+    /**
+     * Requests the background scanner to compute the sub-tree summary of a directory, unless already requested.
+     */
+    private void requestScan(File absoluteDirectory) {
+        if (queuedDirectories.add(absoluteDirectory)) {
+            scanRequests.offer(absoluteDirectory);
+        }
+    }
+
+    private DirectorySummary getSummary(File directory) {
+        File absoluteDirectory = directory.getAbsoluteFile();
+        DirectorySummary summary = summaries.get(absoluteDirectory);
+        if (summary == null) {
+            summary = new DirectorySummary(absoluteDirectory);
+            summaries.put(absoluteDirectory, summary);
+        }
+        return summary;
+    }
+
+    /**
+     * Lists again a directory, keeping its previous sub-tree summary until computed again
+     * so that the trees don't hide it meanwhile.
+     */
+    private void refreshSummary(File absoluteDirectory, DirectorySummary previousSummary) {
+        if (absoluteDirectory.exists()) {
+            DirectorySummary summary = new DirectorySummary(absoluteDirectory);
+            if (summary.containsTestScript == null && previousSummary != null && previousSummary.containsTestScript != null) {
+                summary.containsTestScript = previousSummary.containsTestScript;
+                summary.outdated = true;
+            }
+            summaries.put(absoluteDirectory, summary);
+        } else {
+            summaries.remove(absoluteDirectory);
+        }
+        for (File parent = absoluteDirectory.getParentFile(); parent != null; parent = parent.getParentFile()) {
+            DirectorySummary parentSummary = summaries.get(parent);
+            if (parentSummary != null && !parentSummary.testcaseDir) {
+                parentSummary.outdated = true;
+            }
+        }
+    }
+
+    private void startScanner() {
+        Thread scanner = new Thread("Test suites directory scanner") {
+            @Override
+            public void run() {
+                scan();
+            }
+        };
+        scanner.setDaemon(true);
+        scanner.setPriority(Thread.MIN_PRIORITY);
+        scanner.start();
+    }
+
+    private void scan() {
+        Set<File> changedDirectories = new HashSet<File>();
+        long lastCheckTime = System.currentTimeMillis();
+        long lastNotificationTime = lastCheckTime;
+        while (true) {
+            try {
+                File directory = scanRequests.poll(changedDirectories.isEmpty() ? CHECK_PERIOD_ms : NOTIFICATION_PERIOD_ms, TimeUnit.MILLISECONDS);
+                if (directory != null) {
+                    queuedDirectories.remove(directory);
+                    DirectorySummary summary = summaries.get(directory);
+                    if (summary == null || summary.containsTestScript == null || summary.outdated) {
+                        containsTestScript(directory);
+                        changedDirectories.add(directory);
+                    }
+                }
+                long now = System.currentTimeMillis();
+                if (now - lastCheckTime >= CHECK_PERIOD_ms) {
+                    checkModifiedDirectories(changedDirectories);
+                    lastCheckTime = now;
+                }
+                // notify listeners regularly while scanning to let the trees fill in progressively
+                if (!changedDirectories.isEmpty() && (directory == null || now - lastNotificationTime >= NOTIFICATION_PERIOD_ms)) {
+                    for (Listener listener : listeners) {
+                        listener.directoriesChanged(changedDirectories);
+                    }
+                    changedDirectories = new HashSet<File>();
+                    lastNotificationTime = now;
+                }
+            } catch (InterruptedException e) {
+                return;
+            } catch (RuntimeException e) {
+                logger.error("Error while scanning test suites directory: " + e.getMessage(), e);
+            }
+        }
+    }
+
+    /**
+     * Checks the modification time of the watched directories and of their sub-directories.
+     */
+    private void checkModifiedDirectories(Set<File> changedDirectories) {
+        Set<File> directories = new HashSet<File>();
+        for (Set<File> watched : watchedDirectories.values()) {
+            for (File directory : watched) {
+                DirectorySummary summary = summaries.get(directory);
+                if (summary != null) {
+                    directories.add(directory);
+                    Collections.addAll(directories, summary.subDirectories);
+                }
+            }
+        }
+        for (File directory : directories) {
+            DirectorySummary summary = summaries.get(directory);
+            if (summary != null && directory.lastModified() != summary.lastModified) {
+                refreshModifiedDirectory(directory, summary);
+                changedDirectories.add(directory);
+            }
+        }
+    }
+
+    private synchronized void refreshModifiedDirectory(File directory, DirectorySummary summary) {
+        logger.debug("Directory " + directory + " has been modified");
+        refreshSummary(directory, summary);
+        // compute again the sub-tree summaries of the modified directory and its parents
+        requestScan(directory);
+        for (File parent = directory.getParentFile(); parent != null && summaries.containsKey(parent); parent = parent.getParentFile()) {
+            requestScan(parent);
+        }
+    }
+}
@@ -1,12 +1,12 @@
 package com.qspin.qtaste.util;
 
 import java.io.BufferedReader;
+import java.io.File;
 import java.io.IOException;
 import java.io.InputStream;
 import java.io.InputStreamReader;
-import java.util.ArrayList;
 import java.util.List;
-import java.util.Collections;
+import java.util.regex.Pattern;
 
 import org.apache.log4j.Logger;
 
@@ -25,8 +25,7 @@ public final class InputStreamWriter extends Thread
    {
       mInput = pInput;
       mLogPrefix = pLogPrefix;
-      mOutput = Collections.synchronizedList(new ArrayList<String>());
-      mLimit = 1000;
+      mOutput = new OutputLinesBuffer(OutputLinesBuffer.DEFAULT_LIMIT);
    }
 
    public void run()
@@ -36,21 +35,15 @@ public final class InputStreamWriter extends Thread
          LOGGER.debug("Stream redirection start");
          BufferedReader br = new BufferedReader(new InputStreamReader(mInput));
          String line = null;
+         boolean debugEnabled = LOGGER.isDebugEnabled();
          while ((line = br.readLine()) != null)
          {
-        	 if (mLimit != 0 )
-        	 {
-        		 mOutput.add(line);
-        	 }
-        	 if ( mLimit > 0)
-    		 {
-    			 while ( mOutput.size() > mLimit )
-    			 {
-    				 mOutput.remove(0);
-    			 }
-    		 }
-        	 LOGGER.debug(mLogPrefix + " => " + line);
-        	 mLastLine = line;
+            mOutput.add(line);
+            if ( debugEnabled )
+            {
+               LOGGER.debug(mLogPrefix + " => " + line);
+            }
+            mLastLine = line;
          }
       }
       catch (IOException ioe)
@@ -59,24 +52,31 @@ public final class InputStreamWriter extends Thread
       }
       finally
       {
+         mOutput.close();
          LOGGER.debug("Stream redirection stop");
       }
    }
-   
+
+   /**
+    * Defines the maximal number of lines kept.
+    *
+    * @param pLimit negative value for no limit, 0 to keep nothing.
+    */
    public void setBufferLimit(int pLimit)
    {
-	   mLimit = pLimit;
-	   if ( mLimit == 0 )
-	   {
-		   mOutput.clear();
-	   }
-	   else if ( mLimit > 0)
-	   {
-		   while ( mOutput.size() > mLimit )
-		   {
-			   mOutput.remove(0);
-		   }
-	   }
+      mOutput.setLimit(pLimit);
+   }
+
+   /**
+    * Writes all the lines read from now on to a file, rotated when it exceeds
+    * {@link OutputLinesBuffer#DEFAULT_SPILL_FILE_MAX_SIZE} bytes.
+    *
+    * @param pFile the spill file, or null to stop spilling.
+    * @throws IOException if the file cannot be opened.
+    */
+   public void setSpillFile(File pFile) throws IOException
+   {
+      mOutput.setSpillFile(pFile, OutputLinesBuffer.DEFAULT_SPILL_FILE_MAX_SIZE, OutputLinesBuffer.DEFAULT_SPILL_FILE_BACKUPS);
    }
 
    /**
@@ -89,9 +89,49 @@ public final class InputStreamWriter extends Thread
       return mLastLine;
    }
    
+   /**
+    * Returns a copy of the lines kept.
+    *
+    * @return the lines kept, from the oldest to the most recent.
+    */
    public List<String> getLogs()
    {
-	   return mOutput;
+      return mOutput.getLines();
+   }
+
+   /**
+    * Returns a copy of the lines kept read after a given line.
+    *
+    * @param pSequenceNumber sequence number of the last line already read, 0 to get all the lines kept.
+    * @return the lines kept read after the given one.
+    */
+   public List<String> getLogsSince(long pSequenceNumber)
+   {
+      return mOutput.getLinesSince(pSequenceNumber);
+   }
+
+   /**
+    * Returns the sequence number of the last line read, the lines being numbered from 1.
+    *
+    * @return the sequence number of the last line read, 0 if no line has been read.
+    */
+   public long getSequenceNumber()
+   {
+      return mOutput.getLastSequenceNumber();
+   }
+
+   /**
+    * Waits for a line containing a match of a pattern, among the lines read after a given line.
+    *
+    * @param pPattern the pattern to find.
+    * @param pSequenceNumber sequence number of the last line not to check, 0 to check all the lines kept.
+    * @param pTimeout the maximum time to wait, in milliseconds.
+    * @return the first matching line, or null if none has been read before the timeout or the end of the stream.
+    * @throws InterruptedException if the current thread is interrupted.
+    */
+   public String waitForLine(Pattern pPattern, long pSequenceNumber, long pTimeout) throws InterruptedException
+   {
+      return mOutput.waitForLine(pPattern, pSequenceNumber, pTimeout);
    }
 
    /** Prefix that will appear in the logger. */
@@ -100,10 +140,8 @@ public final class InputStreamWriter extends Thread
    private String mLastLine = "";
    /** The redirected input stream. */
    private final InputStream mInput;
-   /** buffer limit */
-   private int mLimit;
-   /** The output stream. Can be null. */
-   private final List<String> mOutput;
+   /** The last lines read. */
+   private final OutputLinesBuffer mOutput;
    /** Used for logging. */
    private static final Logger LOGGER = Logger.getLogger(InputStreamWriter.class);
 }
\ No newline at end of file
@@ -0,0 +1,273 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.util;
+
+import java.io.BufferedWriter;
+import java.io.File;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.regex.Pattern;
+
+import org.apache.log4j.Logger;
+
+/**
+ * Ring buffer of the last lines of an output, each line having a sequence number.
+ * <p>
+ * The lines are numbered from 1 in the order they are added. When the buffer is full, the oldest line is
+ * overwritten, so adding a line takes a constant time whatever the limit. Threads can wait for a line
+ * matching a pattern and are woken up as soon as a line is added.
+ * <p>
+ * Optionally, all the lines are also written to a spill file, which is rotated when it exceeds a maximum size,
+ * so that the whole output of a chatty process is kept without keeping it in memory.
+ */
+public class OutputLinesBuffer {
+
+    public static final int DEFAULT_LIMIT = 1000;
+    /** default maximum size of a spill file, in bytes */
+    public static final long DEFAULT_SPILL_FILE_MAX_SIZE = 10 * 1024 * 1024;
+    /** default number of rotated spill files kept, in addition to the current one */
+    public static final int DEFAULT_SPILL_FILE_BACKUPS = 5;
+
+    private static Logger logger = Log4jLoggerFactory.getLogger(OutputLinesBuffer.class);
+    private static final int INITIAL_UNLIMITED_CAPACITY = 1024;
+
+    private String[] lines;
+    /** index in lines of the oldest line */
+    private int first;
+    private int count;
+    /** maximum number of lines kept, negative for no limit */
+    private int limit;
+    private long lastSequenceNumber;
+    private boolean closed;
+
+    private File spillFile;
+    private long spillFileMaxSize;
+    private int spillFileBackups;
+    private BufferedWriter spillWriter;
+    private long spillFileSize;
+
+    /**
+     * Creates a buffer keeping the last {@link #DEFAULT_LIMIT} lines.
+     */
+    public OutputLinesBuffer() {
+        this(DEFAULT_LIMIT);
+    }
+
+    /**
+     * Creates a buffer keeping a limited number of lines.
+     * @param limit the maximum number of lines kept: negative for no limit, 0 to keep nothing
+     */
+    public OutputLinesBuffer(int limit) {
+        setLimit(limit);
+    }
+
+    /**
+     * Sets the maximum number of lines kept, removing the oldest lines if needed.
+     * @param limit the maximum number of lines kept: negative for no limit, 0 to keep nothing
+     */
+    public synchronized void setLimit(int limit) {
+        List<String> keptLines = getLinesSince(0);
+        if (limit >= 0 && keptLines.size() > limit) {
+            keptLines = keptLines.subList(keptLines.size() - limit, keptLines.size());
+        }
+        this.limit = limit;
+        lines = new String[limit >= 0 ? limit : Math.max(INITIAL_UNLIMITED_CAPACITY, keptLines.size())];
+        first = 0;
+        count = 0;
+        for (String line : keptLines) {
+            store(line);
+        }
+    }
+
+    /**
+     * Writes all the lines added from now on to a spill file, which is rotated when it exceeds a maximum size.
+     * The rotated files are named file.1 (the most recent) to file.N.
+     * @param file the spill file, or null to stop spilling
+     * @param maxSize the maximum size of the spill file, in bytes
+     * @param backups the number of rotated spill files to keep
+     * @throws IOException if the spill file cannot be opened
+     */
+    public synchronized void setSpillFile(File file, long maxSize, int backups) throws IOException {
+        closeSpillFile();
+        spillFile = file;
+        spillFileMaxSize = maxSize;
+        spillFileBackups = backups;
+        if (spillFile != null) {
+            openSpillFile();
+        }
+    }
+
+    /**
+     * Adds a line, waking up the threads waiting for a line.
+     * @param line the line
+     * @return the sequence number of the line
+     */
+    public synchronized long add(String line) {
+        lastSequenceNumber++;
+        if (limit != 0) {
+            store(line);
+        }
+        if (spillWriter != null) {
+            spill(line);
+        }
+        notifyAll();
+        return lastSequenceNumber;
+    }
+
+    private void store(String line) {
+        if (count == lines.length) {
+            if (limit < 0) {
+                // unlimited: grow the buffer
+                String[] newLines = new String[lines.length * 2];
+                for (int i = 0; i < count; i++) {
+                    newLines[i] = lines[(first + i) % lines.length];
+                }
+                lines = newLines;
+                first = 0;
+            } else {
+                // overwrite the oldest line
+                lines[first] = line;
+                first = (first + 1) % lines.length;
+                return;
+            }
+        }
+        lines[(first + count) % lines.length] = line;
+        count++;
+    }
+
+    private void spill(String line) {
+        try {
+            if (spillFileSize + line.length() + 1 > spillFileMaxSize && spillFileSize > 0) {
+                rotateSpillFile();
+            }
+            spillWriter.write(line);
+            spillWriter.newLine();
+            // flushed for each line, so that the spill file can be followed while the process runs
+            spillWriter.flush();
+            spillFileSize += line.length() + 1;
+        } catch (IOException e) {
+            logger.error("Unable to write to spill file " + spillFile + ", spilling stopped: " + e.getMessage());
+            closeSpillFile();
+        }
+    }
+
+    private void openSpillFile() throws IOException {
+        File parentDirectory = spillFile.getAbsoluteFile().getParentFile();
+        if (!parentDirectory.exists()) {
+            parentDirectory.mkdirs();
+        }
+        spillWriter = new BufferedWriter(new FileWriter(spillFile));
+        spillFileSize = 0;
+    }
+
+    private void rotateSpillFile() throws IOException {
+        spillWriter.close();
+        spillWriter = null;
+        for (int i = spillFileBackups; i >= 1; i--) {
+            File source = (i == 1 ? spillFile : new File(spillFile.getPath() + "." + (i - 1)));
+            File destination = new File(spillFile.getPath() + "." + i);
+            if (source.exists()) {
+                destination.delete();
+                source.renameTo(destination);
+            }
+        }
+        if (spillFileBackups == 0) {
+            spillFile.delete();
+        }
+        openSpillFile();
+    }
+
+    private void closeSpillFile() {
+        if (spillWriter != null) {
+            try {
+                spillWriter.close();
+            } catch (IOException e) {
+                logger.warn("Unable to close spill file " + spillFile + ": " + e.getMessage());
+            }
+            spillWriter = null;
+        }
+    }
+
+    /**
+     * Marks the end of the output, waking up the threads waiting for a line, and closes the spill file.
+     */
+    public synchronized void close() {
+        closed = true;
+        closeSpillFile();
+        notifyAll();
+    }
+
+    /**
+     * Returns the sequence number of the last line added.
+     * @return the sequence number of the last line added, or 0 if no line has been added
+     */
+    public synchronized long getLastSequenceNumber() {
+        return lastSequenceNumber;
+    }
+
+    /**
+     * Returns a copy of the lines kept.
+     * @return the lines kept, from the oldest to the most recent
+     */
+    public synchronized List<String> getLines() {
+        return getLinesSince(0);
+    }
+
+    /**
+     * Returns a copy of the lines kept whose sequence number is greater than the given one.
+     * @param sequenceNumber the sequence number of the last line already read, or 0 to get all the lines kept
+     * @return the lines added after the given one and still kept, from the oldest to the most recent
+     */
+    public synchronized List<String> getLinesSince(long sequenceNumber) {
+        int newLinesCount = (int) Math.min(count, Math.max(0, lastSequenceNumber - sequenceNumber));
+        List<String> result = new ArrayList<String>(newLinesCount);
+        for (int i = count - newLinesCount; i < count; i++) {
+            result.add(lines[(first + i) % lines.length]);
+        }
+        return result;
+    }
+
+    /**
+     * Waits for a line containing a match of a pattern, among the lines added after the given one.
+     * @param pattern the pattern to find in the line
+     * @param sequenceNumber the sequence number of the last line not to check, or 0 to check all the lines kept
+     * @param timeout the maximum time to wait, in milliseconds
+     * @return the first matching line, or null if no matching line has been added before the timeout or the end of the output
+     * @throws InterruptedException if the current thread is interrupted
+     */
+    public synchronized String waitForLine(Pattern pattern, long sequenceNumber, long timeout) throws InterruptedException {
+        long end = System.currentTimeMillis() + timeout;
+        while (true) {
+            for (String line : getLinesSince(sequenceNumber)) {
+                if (pattern.matcher(line).find()) {
+                    return line;
+                }
+            }
+            sequenceNumber = lastSequenceNumber;
+            long remaining = end - System.currentTimeMillis();
+            if (closed || remaining <= 0) {
+                return null;
+            }
+            wait(remaining);
+        }
+    }
+}
@@ -19,10 +19,9 @@
 
 package com.qspin.qtaste.util;
 
+import java.util.ArrayList;
 import java.util.HashMap;
 import java.util.Iterator;
-import java.util.LinkedList;
-import java.util.ListIterator;
 import java.util.TreeSet;
 
 import org.apache.log4j.Logger;
@@ -31,6 +30,13 @@ import com.qspin.qtaste.testsuite.QTasteDataException;
 import com.qspin.qtaste.testsuite.QTasteTestFailException;
 
 /**
+ * PropertiesHistory keeps the history of the values of the properties of a component,
+ * as received through change notifications, and allows to check that a property
+ * reaches a value or makes a sequence of transitions.
+ * <p>
+ * Waiting checks are woken up as soon as a change is added and only examine the values
+ * added since their previous examination, so that a check completes as soon as the
+ * expected value or transition is received.
  *
  * @author lvboque
  */
@@ -45,65 +51,116 @@ public class PropertiesHistory {
         TimestampedValue(String value, long timestamp) {
             this.value = value;
             this.timestamp = timestamp;
+            this.receptionTime_ms = System.currentTimeMillis();
         }
         String value;
         long timestamp;
+        long receptionTime_ms;
     }
-    private HashMap<String, LinkedList<TimestampedValue>> hash;
+
+    /**
+     * Values history of one property.
+     * Values are identified by their absolute index, which stays valid when the oldest values are removed,
+     * so that waiting checks can keep their position in the history.
+     */
+    private static class PropertyValues {
+
+        ArrayList<TimestampedValue> values = new ArrayList<TimestampedValue>();
+        long firstIndex = 0; // absolute index of values.get(0)
+
+        TimestampedValue getLast() {
+            return values.get(values.size() - 1);
+        }
+
+        long endIndex() {
+            return firstIndex + values.size();
+        }
+
+        void removeFirst(int count) {
+            values.subList(0, count).clear();
+            firstIndex += count;
+        }
+
+        /**
+         * Returns the number of expected values matched by the history values starting at given position.
+         */
+        int countMatching(int start, String[] expectedValues) {
+            int count = 0;
+            while (count < expectedValues.length && start + count < values.size()
+                    && values.get(start + count).value.equalsIgnoreCase(expectedValues[count])) {
+                count++;
+            }
+            return count;
+        }
+
+        /**
+         * Returns true if the given values have been received within given time, i.e. if the last one
+         * has been received at most maxTime_ms after the first one, or if maxTime_ms is negative.
+         */
+        boolean isReceivedWithin(int start, int count, long maxTime_ms) {
+            if (maxTime_ms < 0) {
+                return true;
+            }
+            return values.get(start + count - 1).receptionTime_ms - values.get(start).receptionTime_ms <= maxTime_ms;
+        }
+    }
+    private HashMap<String, PropertyValues> hash;
 
     public PropertiesHistory(String component) {
         this.component = component;
-        hash = new HashMap<String, LinkedList<TimestampedValue>>();
+        hash = new HashMap<String, PropertyValues>();
     }
 
     public synchronized void reset() {
         hash.clear();
         possibleNotificationLoss = false;
+        notifyAll();
     }
 
     public synchronized void clear() {
         hash.clear();
+        notifyAll();
     }
 
     public synchronized void clearHistory() {
-        for (String property : hash.keySet()) {
-            LinkedList<TimestampedValue> list = hash.get(property);
-            while (list.size() > 1) {
-                list.remove();
+        for (PropertyValues history : hash.values()) {
+            if (history.values.size() > 1) {
+                history.removeFirst(history.values.size() - 1);
             }
         }
+        notifyAll();
     }
 
-    public void signalPossibleNotificationLoss() {
+    public synchronized void signalPossibleNotificationLoss() {
         possibleNotificationLoss = true;
+        notifyAll();
     }
 
     public synchronized void addChange(String property, String oldValue, String newValue, long timestamp, boolean checkOldValue) {
-        oldValue = oldValue.toLowerCase();
-        newValue = newValue.toLowerCase();
-
-        LinkedList<TimestampedValue> list = hash.get(property);
-        if (list == null) {
-            list = new LinkedList<TimestampedValue>();
-            hash.put(property, list);
+        PropertyValues history = hash.get(property);
+        if (history == null) {
+            history = new PropertyValues();
+            hash.put(property, history);
         }
 
-        if (list.isEmpty()) {
-            list.add(new TimestampedValue(oldValue, 0));
+        if (history.values.isEmpty()) {
+            history.values.add(new TimestampedValue(oldValue, 0));
         } else {
-            if (checkOldValue && !list.getLast().value.equals(oldValue)) {
-                logger.warn(component + " " + property + " property change old value (" + oldValue + ") doesn't match last received value (" + list.getLast().value + ")");
-                list.add(new TimestampedValue(oldValue, 0));
+            if (checkOldValue && !history.getLast().value.equalsIgnoreCase(oldValue)) {
+                logger.warn(component + " " + property + " property change old value (" + oldValue + ") doesn't match last received value (" + history.getLast().value + ")");
+                history.values.add(new TimestampedValue(oldValue, 0));
             }
-            if (list.getLast().value.equals(newValue)) {
+            if (history.getLast().value.equalsIgnoreCase(newValue)) {
                 logger.warn("Ignoring not-changed new value of " + component + " " + property + " property (" + newValue + ")");
                 return;
             }
         }
-        list.add(new TimestampedValue(newValue, timestamp));
+        history.values.add(new TimestampedValue(newValue, timestamp));
+        notifyAll();
 
-        String logMessage = "Change event on " + component + ": " + property + ": " + oldValue + " -> " + newValue + " (" + timestamp + ")";
-        logger.trace(logMessage);
+        if (logger.isTraceEnabled()) {
+            logger.trace("Change event on " + component + ": " + property + ": " + oldValue + " -> " + newValue + " (" + timestamp + ")");
+        }
     }
 
     /**
@@ -120,84 +177,101 @@ public class PropertiesHistory {
      *                              if a possible notification loss occurred
      */
     public void checkPropertyValueOrTransition(String property, String[] values, boolean mustBeAtBegin, boolean mustBeAtEnd, long maxTime_ms, String expectedValueOrTransition) throws QTasteDataException, QTasteTestFailException {
-        long beginTime_ms = System.currentTimeMillis(); // begin time
-        long elapsedTime_ms = 0; // total elapsed time
-        long checkTimeInterval_ms = 100; // check every 100 milliseconds
-        LinkedList<TimestampedValue> list = null;
-
-        long lastCheckedTimestamp = 0;
-        boolean foundMatching = false;
-        boolean foundNotMatching = false;
+        checkPropertyValueOrTransition(property, values, mustBeAtBegin, mustBeAtEnd, maxTime_ms, -1, expectedValueOrTransition);
+    }
+
+    /**
+     * Checks that property reaches given value or makes given transitions within given time.
+     * If found, remove old values from history.
+     * <p>
+     * The check waits for property changes and examines each value of the history only once.
+     *
+     * @param property the property name
+     * @param values the expected property value or values sequence (transitions)
+     * @param mustBeAtBegin true if value or transitions must occur at begin of history
+     * @param mustBeAtEnd true if value or transitions must occur at end of history
+     * @param maxTime_ms the maximum time to wait for the property value, in milliseconds
+     * @param maxSequenceTime_ms the maximum time between the receptions of the first and last values of the sequence,
+     *                           in milliseconds, or -1 for no limit
+     * @param expectedValueOrTransition expected value or transition (only used for error messages)
+     * @throws QTasteTestFailException if the property doesn't reach specified value or make specified transitions or
+     *                              if a possible notification loss occurred
+     */
+    public void checkPropertyValueOrTransition(String property, String[] values, boolean mustBeAtBegin, boolean mustBeAtEnd, long maxTime_ms, long maxSequenceTime_ms, String expectedValueOrTransition) throws QTasteDataException, QTasteTestFailException {
+        long endTime_ms = System.currentTimeMillis() + maxTime_ms;
+        TimestampedValue lastMatchingValue = null;
         String currentPropertyHistory = null;
 
-        loop:
-        do {
-            synchronized (this) {
-                // get list of values if none yet
-                if (list == null) {
-                    list = hash.get(property);
+        synchronized (this) {
+            PropertyValues history = null;
+            long nextIndex = 0; // absolute index of the next history value where the sequence may begin
+            boolean foundNotMatching = false;
+
+            while (!possibleNotificationLoss) {
+                PropertyValues currentHistory = hash.get(property);
+                if (currentHistory != history) {
+                    // first values or history cleared in the meantime
+                    history = currentHistory;
+                    nextIndex = (history == null ? 0 : history.firstIndex);
                 }
-                if (list != null && list.size() > 0) {
+                if (history != null && !history.values.isEmpty()) {
+                    // values may have been removed from history in the meantime
+                    nextIndex = Math.max(nextIndex, history.firstIndex);
                     if (mustBeAtBegin) {
-                        if (!list.get(0).value.equals(values[0])) {
-                            foundNotMatching = true;                        		
-                        } else if (list.size() >= values.length) {
-                            if ((values.length == 1 || list.get(1).value.equals(values[1])) && (!mustBeAtEnd || list.size() == values.length)) {
-                                foundMatching = true;
-                                lastCheckedTimestamp = list.get(values.length - 1).timestamp;
-                                break loop;
+                        int matchingCount = history.countMatching(0, values);
+                        if (matchingCount < Math.min(values.length, history.values.size())) {
+                            foundNotMatching = true;
+                        } else if (history.values.size() >= values.length) {
+                            if ((!mustBeAtEnd || history.values.size() == values.length) && history.isReceivedWithin(0, values.length, maxSequenceTime_ms)) {
+                                lastMatchingValue = history.values.get(values.length - 1);
+                                break;
                             } else {
                                 foundNotMatching = true;
                             }
                         }
                     } else {
-                        ListIterator<TimestampedValue> iTSValue = list.listIterator();
-                        int index = -1;
-                        while (iTSValue.hasNext()) {
-                            index++;
-                            TimestampedValue tsValue = iTSValue.next();
-                            TimestampedValue nextTsValue = null;
-                            if (iTSValue.hasNext()) {
-                                nextTsValue = iTSValue.next();
-                                iTSValue.previous();
-                            }
-                            if (tsValue.value.equals(values[0]) && (values.length == 1 || (iTSValue.hasNext() && nextTsValue.value.equals(values[1])))) {
-                                if (!mustBeAtEnd || list.size() == (index + values.length)) {
-                                    foundMatching = true;
-                                    lastCheckedTimestamp = (values.length == 1 ? tsValue.timestamp : nextTsValue.timestamp);
-                                    break loop;
-                                } else {
+                        // examine only the positions at which the sequence can be complete
+                        while (nextIndex + values.length <= history.endIndex()) {
+                            int start = (int) (nextIndex - history.firstIndex);
+                            nextIndex++;
+                            if (history.countMatching(start, values) == values.length) {
+                                if (mustBeAtEnd && start + values.length != history.values.size()) {
                                     foundNotMatching = true;
+                                } else if (history.isReceivedWithin(start, values.length, maxSequenceTime_ms)) {
+                                    lastMatchingValue = history.values.get(start + values.length - 1);
+                                    break;
                                 }
                             }
                         }
+                        if (lastMatchingValue != null) {
+                            break;
+                        }
                     }
                 }
 
-                // value is not in list yet
-                elapsedTime_ms = System.currentTimeMillis() - beginTime_ms;
-                if (foundNotMatching || (elapsedTime_ms >= maxTime_ms)) {
-                    currentPropertyHistory = getHistoryString(property, false);
+                // value or transition is not in history yet
+                long remainingTime_ms = endTime_ms - System.currentTimeMillis();
+                if (foundNotMatching || (remainingTime_ms <= 0)) {
                     break;
                 }
+                try {
+                    wait(remainingTime_ms);
+                } catch (InterruptedException e) {
+                    throw new QTasteDataException("Wait has been interrupted while checking " + component + " property");
+                }
             }
 
-            try {
-                Thread.sleep(checkTimeInterval_ms);
-            } catch (InterruptedException e) {
-                throw new QTasteDataException("Sleep has been interrupted while checking " + component + " property");
+            if (possibleNotificationLoss) {
+                throw new QTasteTestFailException(component + " property value cannot be checked because of a possible notification loss!");
             }
-        } while (true);
-
-        if (possibleNotificationLoss) {
-            throw new QTasteTestFailException(component + " property value cannot be checked because of a possible notification loss!");
+            if (lastMatchingValue != null) {
+                removePrecedingValues(property, lastMatchingValue.timestamp);
+                return;
+            }
+            currentPropertyHistory = getHistoryString(property, false);
         }
 
-        if (foundMatching) {
-            removePrecedingValues(property, lastCheckedTimestamp);
-        } else {
-            throw new QTasteTestFailException(component + " " + property + " property didn't behave as expected ('" + currentPropertyHistory + "' doesn't match expected '" + expectedValueOrTransition + "')");
-        }
+        throw new QTasteTestFailException(component + " " + property + " property didn't behave as expected ('" + currentPropertyHistory + "' doesn't match expected '" + expectedValueOrTransition + "')");
     }
 
     /**
@@ -208,7 +282,8 @@ public class PropertiesHistory {
      * @param propertyValueOrTransition the property value or transition to check (case insensitive)
      *           <dl>
      *           <dd>Format: "<code><i>property</i>:</code>[<code>[</code>]<code><i>expected_value</i></code>[<code>]</code>]" or
-     *                       "<code><i>property</i>:</code>[<code>[</code>]<code><i>initial_value</i>-><i>final_value</i></code>[<code>]</code>]"
+     *                       "<code><i>property</i>:</code>[<code>[</code>]<code><i>initial_value</i>-><i>final_value</i></code>[<code>]</code>]" or
+     *                       "<code><i>property</i>:</code>[<code>[</code>]<code><i>initial_value</i>-><i>intermediate_value</i>-> ... -><i>final_value</i></code>[<code>]</code>]"
      *           <dd>beginning <code>[</code> means that the expected or initial value must be the first one in the current values history
      *           <dd>ending <code>]</code> means that the expected or final value must be the last one in the current values history
      *           </dl>
@@ -219,8 +294,27 @@ public class PropertiesHistory {
      *                              within specified time
      */
     public void checkPropertyValueOrTransition(String propertyValueOrTransition, double maxTime) throws QTasteDataException, QTasteTestFailException {
+        checkPropertyValueOrTransition(propertyValueOrTransition, maxTime, -1);
+    }
+
+    /**
+     * Checks that a property reaches a given value or do a given values
+     * transitions sequence within given time, the whole sequence being received within a given duration.
+     * If found, remove old values from history.
+     *
+     * @param propertyValueOrTransition the property value or transition to check (case insensitive),
+     *           see {@link #checkPropertyValueOrTransition(String, double)}
+     * @param maxTime the maximum time to wait for the property value or transition, in seconds
+     * @param maxSequenceTime the maximum time between the receptions of the initial and final values, in seconds,
+     *           or a negative value for no limit
+     * @throws QTasteDataException in case of invalid syntax in propertyValueOrTransition
+     * @throws QTasteTestFailException if the property doesn't reach specified value or do specified values transitions
+     *                              within specified times or if a possible notification loss occurred
+     */
+    public void checkPropertyValueOrTransition(String propertyValueOrTransition, double maxTime, double maxSequenceTime) throws QTasteDataException, QTasteTestFailException {
         long beginTime_ms = System.currentTimeMillis();
         long maxTime_ms = Math.round(maxTime * 1000);
+        long maxSequenceTime_ms = (maxSequenceTime < 0 ? -1 : Math.round(maxSequenceTime * 1000));
         propertyValueOrTransition = propertyValueOrTransition.toLowerCase();
         String[] splitted = propertyValueOrTransition.split(" *: *");
         if (splitted.length != 2) {
@@ -240,24 +334,28 @@ public class PropertiesHistory {
             transition = transition.replaceFirst(" *\\]$", "");
         }
         String[] values = transition.split(" *-> *");
-        if ((values.length != 1) && (values.length != 2)) {
+        if (values.length == 0) {
             throw new QTasteDataException("Invalid syntax");
         }
         String expectedValueOrTransition = propertyValueOrTransition.replaceFirst(".*: *", "");
 
         long remainingTime_ms = maxTime_ms - (System.currentTimeMillis() - beginTime_ms);
-        checkPropertyValueOrTransition(property, values, mustBeAtBegin, mustBeAtEnd, remainingTime_ms, expectedValueOrTransition);
+        checkPropertyValueOrTransition(property, values, mustBeAtBegin, mustBeAtEnd, remainingTime_ms, maxSequenceTime_ms, expectedValueOrTransition);
     }
 
     public synchronized void removePrecedingValues(String checkedProperty, long timestamp) {
         for (String property : hash.keySet()) {
-            LinkedList<TimestampedValue> list = hash.get(property);
-            TimestampedValue head = null;
-            while (!list.isEmpty() && (list.peekFirst().timestamp < timestamp)) {
-                head = list.remove();
+            PropertyValues history = hash.get(property);
+            int count = 0;
+            while (count < history.values.size() && history.values.get(count).timestamp < timestamp) {
+                count++;
+            }
+            if ((count > 0) && (!property.equals(checkedProperty))) {
+                // keep the current value of the other properties
+                count--;
             }
-            if ((head != null) && (!property.equals(checkedProperty))) {
-                list.offerFirst(head);
+            if (count > 0) {
+                history.removeFirst(count);
             }
         }
     }
@@ -277,9 +375,9 @@ public class PropertiesHistory {
 
     public synchronized String getHistoryString(String property, boolean withPropertyPrefix, boolean withTimestamps) {
         String result = (withPropertyPrefix ? (property + ": ") : "");
-        LinkedList<TimestampedValue> list = hash.get(property);
-        if (list != null) {
-            Iterator<TimestampedValue> iValue = list.iterator();
+        PropertyValues history = hash.get(property);
+        if (history != null) {
+            Iterator<TimestampedValue> iValue = history.values.iterator();
             while (iValue.hasNext()) {
                 TimestampedValue timestampedValue = iValue.next();
                 result += timestampedValue.value;
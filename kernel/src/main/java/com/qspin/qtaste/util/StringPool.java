@@ -0,0 +1,61 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.util;
+
+import java.util.HashMap;
+import java.util.Map;
+
+/**
+ * Pool of strings, used to share a single instance of the strings which are repeated in many objects.
+ * <p>
+ * Unlike String.intern(), the strings are kept in the heap and are released when the pool is cleared.
+ */
+public class StringPool {
+
+    private final Map<String, String> strings = new HashMap<String, String>();
+
+    /**
+     * Returns the pooled instance of a string, adding the string to the pool if it doesn't contain it.
+     * @param string the string, may be null
+     * @return the pooled instance equal to the string, or null if the string is null
+     */
+    public synchronized String intern(String string) {
+        if (string == null) {
+            return null;
+        }
+        String pooledString = strings.get(string);
+        if (pooledString == null) {
+            strings.put(string, string);
+            return string;
+        }
+        return pooledString;
+    }
+
+    public synchronized int size() {
+        return strings.size();
+    }
+
+    /**
+     * Removes all the strings from the pool.
+     */
+    public synchronized void clear() {
+        strings.clear();
+    }
+}
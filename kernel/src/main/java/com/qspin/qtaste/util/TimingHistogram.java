@@ -0,0 +1,108 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.util;
+
+/**
+ * Histogram of durations with a fixed memory footprint.
+ * <p>
+ * Durations are counted in buckets whose bounds grow geometrically by 5% from 1 microsecond,
+ * so that percentiles are computed with a relative error of at most 5% whatever the number
+ * of recorded durations. Durations longer than about 4 hours are counted in the last bucket,
+ * whose percentiles are the recorded maximum duration.
+ */
+public class TimingHistogram {
+
+    private static final double MIN_VALUE_ns = 1000;
+    private static final double BUCKET_RATIO = 1.05;
+    private static final double LOG_BUCKET_RATIO = Math.log(BUCKET_RATIO);
+    private static final int BUCKETS_COUNT = 480;
+
+    private final long[] counts = new long[BUCKETS_COUNT];
+    private long count;
+    private long total_ns;
+    private long min_ns = Long.MAX_VALUE;
+    private long max_ns;
+
+    /**
+     * Records a duration.
+     * @param duration_ns the duration, in nanoseconds
+     */
+    public synchronized void record(long duration_ns) {
+        if (duration_ns < 0) {
+            duration_ns = 0;
+        }
+        counts[getBucketIndex(duration_ns)]++;
+        count++;
+        total_ns += duration_ns;
+        min_ns = Math.min(min_ns, duration_ns);
+        max_ns = Math.max(max_ns, duration_ns);
+    }
+
+    public synchronized long getCount() {
+        return count;
+    }
+
+    public synchronized long getTotal_ns() {
+        return total_ns;
+    }
+
+    public synchronized long getMin_ns() {
+        return (count == 0 ? 0 : min_ns);
+    }
+
+    public synchronized long getMax_ns() {
+        return max_ns;
+    }
+
+    public synchronized long getMean_ns() {
+        return (count == 0 ? 0 : total_ns / count);
+    }
+
+    /**
+     * Gets a percentile of the recorded durations.
+     * @param percentile the percentile, between 0 and 100
+     * @return the upper bound of the bucket containing the percentile, limited to the recorded
+     *         minimum and maximum durations, or 0 if no duration has been recorded
+     */
+    public synchronized long getPercentile_ns(double percentile) {
+        if (count == 0) {
+            return 0;
+        }
+        long rank = Math.max(1, (long) Math.ceil(percentile / 100 * count));
+        long cumulatedCount = 0;
+        for (int i = 0; i < BUCKETS_COUNT; i++) {
+            cumulatedCount += counts[i];
+            if (cumulatedCount >= rank) {
+                // the last bucket has no upper bound
+                long upperBound = (i == BUCKETS_COUNT - 1 ? max_ns : (long) (MIN_VALUE_ns * Math.pow(BUCKET_RATIO, i)));
+                return Math.max(min_ns, Math.min(max_ns, upperBound));
+            }
+        }
+        return max_ns;
+    }
+
+    private static int getBucketIndex(long duration_ns) {
+        if (duration_ns <= MIN_VALUE_ns) {
+            return 0;
+        }
+        int index = (int) Math.ceil(Math.log(duration_ns / MIN_VALUE_ns) / LOG_BUCKET_RATIO);
+        return Math.min(index, BUCKETS_COUNT - 1);
+    }
+}
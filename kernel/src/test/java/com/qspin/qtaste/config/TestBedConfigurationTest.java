@@ -0,0 +1,170 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+
+package com.qspin.qtaste.config;
+
+import java.io.File;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.io.Writer;
+import java.util.NoSuchElementException;
+
+import junit.framework.TestCase;
+
+public class TestBedConfigurationTest extends TestCase {
+
+    private static final String CONFIGURATION =
+            "<?xml version=\"1.0\" encoding=\"ISO-8859-1\" standalone=\"no\"?>\n"
+            + "<testbed_configuration>\n"
+            + "    <multiple_instances_components default=\"1\">\n"
+            + "        <Server id=\"1\"><port>1000</port><secure>true</secure></Server>\n"
+            + "        <Server id=\"2\"><port>2000</port></Server>\n"
+            + "        <Server id=\"1b\" standby_of=\"1\"><port>1001</port></Server>\n"
+            + "        <Client id=\"A\"><name>client A</name></Client>\n"
+            + "    </multiple_instances_components>\n"
+            + "</testbed_configuration>\n";
+
+    private File configFile;
+    private int configurationChangesCount;
+    private TestBedConfiguration.ConfigurationChangeHandler configurationChangeHandler =
+            new TestBedConfiguration.ConfigurationChangeHandler() {
+                public void onConfigurationChange() {
+                    configurationChangesCount++;
+                }
+            };
+
+    public TestBedConfigurationTest(String testName) {
+        super(testName);
+    }
+
+    @Override
+    protected void setUp() throws Exception {
+        super.setUp();
+        configFile = File.createTempFile("TestBedConfigurationTest", ".xml");
+        writeConfigFile(CONFIGURATION);
+        TestBedConfiguration.setConfigFile(configFile.getPath());
+        TestBedConfiguration.registerConfigurationChangeHandler(configurationChangeHandler);
+        configurationChangesCount = 0;
+    }
+
+    @Override
+    protected void tearDown() throws Exception {
+        TestBedConfiguration.unregisterConfigurationChangeHandler(configurationChangeHandler);
+        TestBedConfiguration.setStandbyInstancesActive(false);
+        configFile.delete();
+        super.tearDown();
+    }
+
+    public void testMIIndex() {
+        TestBedConfiguration config = TestBedConfiguration.getInstance();
+        assertEquals(0, config.getMIIndex("1", "Server"));
+        assertEquals(1, config.getMIIndex("2", "Server"));
+        assertEquals(2, config.getMIIndex("1b", "Server"));
+        assertEquals(0, config.getMIIndex("A", "Client"));
+        assertEquals(-1, config.getMIIndex("3", "Server"));
+        assertEquals(-1, config.getMIIndex("1", "Client"));
+        assertEquals(-1, config.getMIIndex("1", "Unknown"));
+    }
+
+    public void testMIValues() {
+        TestBedConfiguration config = TestBedConfiguration.getInstance();
+        assertEquals("client A", config.getMIString("A", "Client", "name"));
+        assertEquals(1000, config.getMIInt("1", "Server", "port"));
+        assertEquals(2000, config.getMIShort("2", "Server", "port"));
+        assertTrue(config.getMIBoolean("1", "Server", "secure"));
+
+        // the missing keys are cached too
+        assertNull(config.getMIString("2", "Server", "secure"));
+        assertNull(config.getMIString("2", "Server", "secure"));
+        assertEquals("none", config.getMIString("2", "Server", "secure", "none"));
+        assertFalse(config.getMIBoolean("2", "Server", "secure", false));
+        assertEquals(3000, config.getMIInt("2", "Server", "timeout", 3000));
+        try {
+            config.getMIInt("2", "Server", "timeout");
+            fail("NoSuchElementException expected");
+        } catch (NoSuchElementException e) {
+            // expected
+        }
+    }
+
+    public void testStandbyInstances() {
+        TestBedConfiguration config = TestBedConfiguration.getInstance();
+        TestBedConfiguration.setStandbyInstancesActive(true);
+        assertEquals(1, configurationChangesCount);
+        assertEquals(2, config.getMIIndex("1", "Server"));
+        assertEquals(1001, config.getMIInt("1", "Server", "port"));
+        // the instances without standby instance are used as is
+        assertEquals(1, config.getMIIndex("2", "Server"));
+        assertEquals(2000, config.getMIInt("2", "Server", "port"));
+
+        TestBedConfiguration.setStandbyInstancesActive(false);
+        assertEquals(2, configurationChangesCount);
+        assertEquals(0, config.getMIIndex("1", "Server"));
+        assertEquals(1000, config.getMIInt("1", "Server", "port"));
+    }
+
+    public void testSnapshotInvalidatedOnChange() {
+        TestBedConfiguration config = TestBedConfiguration.getInstance();
+        assertEquals(2000, config.getMIInt("2", "Server", "port"));
+        assertEquals(-1, config.getMIIndex("3", "Server"));
+
+        config.setProperty("multiple_instances_components.Server(1).port", "2500");
+        assertEquals(2500, config.getMIInt("2", "Server", "port"));
+
+        config.addProperty("multiple_instances_components.Server(-1)[@id]", "3");
+        config.addProperty("multiple_instances_components.Server(3).port", "3000");
+        assertEquals(3, config.getMIIndex("3", "Server"));
+        assertEquals(3000, config.getMIInt("3", "Server", "port"));
+
+        config.clearProperty("multiple_instances_components.Client(0).name");
+        assertNull(config.getMIString("A", "Client", "name"));
+    }
+
+    public void testTouchedConfigFileNotReloaded() throws Exception {
+        TestBedConfiguration config = TestBedConfiguration.getInstance();
+        assertTrue(configFile.setLastModified(configFile.lastModified() + 10000));
+        TestBedConfiguration.reloadConfigFileIfModified();
+        assertSame(config, TestBedConfiguration.getInstance());
+        assertEquals(0, configurationChangesCount);
+    }
+
+    public void testModifiedConfigFileReloaded() throws Exception {
+        TestBedConfiguration config = TestBedConfiguration.getInstance();
+        assertEquals(1000, config.getMIInt("1", "Server", "port"));
+        long lastModifiedTime = configFile.lastModified();
+        writeConfigFile(CONFIGURATION.replace("1000", "1100"));
+        assertTrue(configFile.setLastModified(lastModifiedTime + 10000));
+        TestBedConfiguration.reloadConfigFileIfModified();
+        assertEquals(1, configurationChangesCount);
+
+        TestBedConfiguration reloadedConfig = TestBedConfiguration.getInstance();
+        assertNotSame(config, reloadedConfig);
+        assertEquals(1100, reloadedConfig.getMIInt("1", "Server", "port"));
+    }
+
+    private void writeConfigFile(String content) throws IOException {
+        Writer writer = new FileWriter(configFile);
+        try {
+            writer.write(content);
+        } finally {
+            writer.close();
+        }
+    }
+}
@@ -0,0 +1,156 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.kernel.campaign;
+
+import java.io.File;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.util.Arrays;
+
+import com.qspin.qtaste.config.StaticConfiguration;
+import junit.framework.TestCase;
+
+public class TestImpactAnalyzerTest extends TestCase {
+
+    private File testSuitesDirectory;
+
+    public TestImpactAnalyzerTest(String testName) {
+        super(testName);
+    }
+
+    @Override
+    protected void setUp() throws Exception {
+        super.setUp();
+        File directory = File.createTempFile("TestImpactAnalyzerTest", "");
+        directory.delete();
+        // the pythonlib directories of a test script are looked for up to the TestSuites directory
+        testSuitesDirectory = new File(directory, "TestSuites");
+        testSuitesDirectory.mkdirs();
+    }
+
+    @Override
+    protected void tearDown() throws Exception {
+        delete(testSuitesDirectory.getParentFile());
+        super.tearDown();
+    }
+
+    private static void delete(File file) {
+        File[] children = file.listFiles();
+        if (children != null) {
+            for (File child : children) {
+                delete(child);
+            }
+        }
+        file.delete();
+    }
+
+    private File writeFile(String path, String... lines) throws IOException {
+        File file = new File(testSuitesDirectory, path);
+        file.getParentFile().mkdirs();
+        FileWriter writer = new FileWriter(file);
+        try {
+            for (String line : lines) {
+                writer.write(line + "\n");
+            }
+        } finally {
+            writer.close();
+        }
+        return file;
+    }
+
+    /**
+     * Creates a test case directory with a test script made of the given lines and a one-row test data file.
+     */
+    private File createTestCase(String path, String testData, String... testScriptLines) throws IOException {
+        writeFile(path + "/" + StaticConfiguration.TEST_SCRIPT_FILENAME, testScriptLines);
+        writeFile(path + "/" + StaticConfiguration.TEST_DATA_FILENAME, "COMMENT" + (testData != null ? ";" + testData.split("=")[0] : ""),
+                "row" + (testData != null ? ";" + testData.split("=")[1] : ""));
+        return new File(testSuitesDirectory, path);
+    }
+
+    private static TestImpactAnalyzer createAnalyzer(File... changedFiles) {
+        String[] changedFileNames = new String[changedFiles.length];
+        for (int i = 0; i < changedFiles.length; i++) {
+            changedFileNames[i] = changedFiles[i].getPath();
+        }
+        return new TestImpactAnalyzer(Arrays.asList(changedFileNames));
+    }
+
+    public void testChangedTestCaseFile() throws Exception {
+        File testA = createTestCase("suite/TestA", null, "pass");
+        File testB = createTestCase("suite/TestB", null, "pass");
+        TestImpactAnalyzer analyzer = createAnalyzer(new File(testA, StaticConfiguration.TEST_DATA_FILENAME));
+        assertNotNull(analyzer.getImpactReason(testA));
+        assertNull(analyzer.getImpactReason(testB));
+    }
+
+    public void testChangedTestDataFile() throws Exception {
+        File dataFile = writeFile("suite/data/input.txt", "data");
+        File testA = createTestCase("suite/TestA", "FILE_INPUT=../data/input.txt", "pass");
+        File testB = createTestCase("suite/TestB", null, "pass");
+        TestImpactAnalyzer analyzer = createAnalyzer(dataFile);
+        assertNotNull(analyzer.getImpactReason(testA));
+        assertNull(analyzer.getImpactReason(testB));
+    }
+
+    public void testChangedImportedTestScript() throws Exception {
+        File testA = createTestCase("suite/TestA", null, "pass");
+        File testB = createTestCase("suite/TestB", null, "importTestScript('TestA')");
+        TestImpactAnalyzer analyzer = createAnalyzer(new File(testA, StaticConfiguration.TEST_SCRIPT_FILENAME));
+        assertNotNull(analyzer.getImpactReason(testB));
+    }
+
+    public void testChangedComponent() throws Exception {
+        writeFile("pythonlib/helpers.py", "def start():", "    testAPI.getEngine().start()");
+        File testA = createTestCase("suite/TestA", null, "import helpers");
+        File testB = createTestCase("suite/TestB", null, "testAPI.getEngineTest().check()");
+        TestImpactAnalyzer analyzer = createAnalyzer(new File("src/main/java/EngineImpl.java"));
+        assertEquals("component Engine changed", analyzer.getImpactReason(testA));
+        assertNull(analyzer.getImpactReason(testB));
+    }
+
+    public void testCircularImports() throws Exception {
+        // module_a imports module_b and module_c, module_b imports module_a:
+        // the dependencies of module_b include module_c whatever the analysis order
+        writeFile("pythonlib/module_a.py", "import module_b", "import module_c");
+        writeFile("pythonlib/module_b.py", "import module_a");
+        File changedModule = writeFile("pythonlib/module_c.py", "pass");
+        writeFile("pythonlib/module_d.py", "pass");
+        File testA = createTestCase("suite/TestA", null, "import module_a");
+        File testB = createTestCase("suite/TestB", null, "import module_b");
+        File testC = createTestCase("suite/TestC", null, "import module_d");
+        TestImpactAnalyzer analyzer = createAnalyzer(changedModule);
+        assertNotNull(analyzer.getImpactReason(testA));
+        assertNotNull(analyzer.getImpactReason(testB));
+        assertNull(analyzer.getImpactReason(testC));
+    }
+
+    public void testSharedModuleWithDifferentPythonPaths() throws Exception {
+        // the shared module imports the suite_lib module of the python path of the test script importing it
+        writeFile("pythonlib/shared.py", "from suite_lib import check");
+        writeFile("suite1/pythonlib/suite_lib.py", "def check():", "    pass");
+        File changedModule = writeFile("suite2/pythonlib/suite_lib.py", "def check():", "    pass");
+        File testA = createTestCase("suite1/TestA", null, "import shared");
+        File testB = createTestCase("suite2/TestB", null, "import shared");
+        TestImpactAnalyzer analyzer = createAnalyzer(changedModule);
+        assertNull(analyzer.getImpactReason(testA));
+        assertNotNull(analyzer.getImpactReason(testB));
+    }
+}
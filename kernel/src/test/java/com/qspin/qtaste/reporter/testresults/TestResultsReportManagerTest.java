@@ -0,0 +1,85 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+
+package com.qspin.qtaste.reporter.testresults;
+
+import java.util.ArrayList;
+import java.util.List;
+
+import com.qspin.qtaste.config.TestEngineConfiguration;
+import junit.framework.TestCase;
+
+public class TestResultsReportManagerTest extends TestCase {
+
+    private TestResultsReportManager manager;
+
+    public TestResultsReportManagerTest(String testName) {
+        super(testName);
+    }
+
+    @Override
+    protected void setUp() throws Exception {
+        super.setUp();
+        manager = TestResultsReportManager.getInstance();
+        manager.releaseResults();
+    }
+
+    @Override
+    protected void tearDown() throws Exception {
+        manager.releaseResults();
+        manager = null;
+        super.tearDown();
+    }
+
+    public void testSpilledResultReadableAfterNextReportStart() {
+        int resultsInMemory = TestEngineConfiguration.getInstance().getInt("reporting.results_in_memory", 100);
+        assertTrue("the test needs the finished test results to be spilled", resultsInMemory >= 0);
+        List<TestResultImpl> results = new ArrayList<TestResultImpl>();
+        for (int i = 0; i < resultsInMemory + 2; i++) {
+            TestResultImpl result = new TestResultImpl("TestCase" + i, null, null, 1, 1);
+            manager.putEntry(result);
+            result.setStackTrace("stack trace " + i);
+            result.addStepResult("1", "Step1", "step " + i, "expected", TestResult.Status.SUCCESS, 0.5);
+            manager.archiveEntry(result);
+            results.add(result);
+        }
+        TestResultImpl displayedResult = results.get(0);
+        TestResultImpl forgottenResult = results.get(1);
+        assertTrue(displayedResult.isSpilled());
+        assertTrue(forgottenResult.isSpilled());
+        // the first result is displayed in a GUI table
+        displayedResult.retain();
+
+        // as done when the next report is started
+        manager.releaseResults();
+        assertTrue(manager.getResults().isEmpty());
+        assertEquals("stack trace 0", displayedResult.getStackTrace());
+        assertEquals(1, displayedResult.getStepResults().size());
+        assertEquals("step 0", displayedResult.getStepResults().iterator().next().getStepDescription());
+        // the details of the results which are not held anymore are dropped
+        assertNull(forgottenResult.getStackTrace());
+        assertTrue(forgottenResult.getStepResults().isEmpty());
+
+        // as done when the GUI table is cleared
+        displayedResult.release();
+        assertFalse(displayedResult.isSpilled());
+        assertNull(displayedResult.getStackTrace());
+    }
+}
@@ -0,0 +1,114 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.reporter.testresults;
+
+import java.io.File;
+import java.io.IOException;
+import java.util.Arrays;
+
+import junit.framework.TestCase;
+
+public class TestResultsSpillFileTest extends TestCase {
+
+    private TestResultsSpillFile spillFile;
+
+    public TestResultsSpillFileTest(String testName) {
+        super(testName);
+    }
+
+    @Override
+    protected void setUp() throws Exception {
+        super.setUp();
+        spillFile = TestResultsSpillFile.createTemporary();
+    }
+
+    @Override
+    protected void tearDown() throws Exception {
+        spillFile.close();
+        spillFile = null;
+        super.tearDown();
+    }
+
+    public void testWriteAndRead() throws Exception {
+        byte[] first = "first record".getBytes("UTF-8");
+        byte[] second = new byte[0];
+        byte[] third = new byte[100000];
+        Arrays.fill(third, (byte) 0xA5);
+        long firstOffset = spillFile.write(first);
+        long secondOffset = spillFile.write(second);
+        long thirdOffset = spillFile.write(third);
+        assertEquals(0, firstOffset);
+        assertEquals(4 + first.length, secondOffset);
+        assertEquals(4 + first.length + 4, thirdOffset);
+        assertEquals(4 + first.length + 4 + 4 + third.length, spillFile.length());
+        assertTrue(Arrays.equals(third, spillFile.read(thirdOffset)));
+        assertTrue(Arrays.equals(first, spillFile.read(firstOffset)));
+        assertTrue(Arrays.equals(second, spillFile.read(secondOffset)));
+    }
+
+    public void testReadManyRecords() throws Exception {
+        // more records than the read cache can hold
+        long[] offsets = new long[1000];
+        for (int i = 0; i < offsets.length; i++) {
+            offsets[i] = spillFile.write(("record " + i).getBytes("UTF-8"));
+        }
+        for (int pass = 0; pass < 2; pass++) {
+            for (int i = 0; i < offsets.length; i++) {
+                assertEquals("record " + i, new String(spillFile.read(offsets[i]), "UTF-8"));
+            }
+        }
+    }
+
+    public void testCloseDeletesFile() throws Exception {
+        File file = spillFile.getFile();
+        long offset = spillFile.write("record".getBytes("UTF-8"));
+        assertTrue(file.exists());
+        spillFile.close();
+        assertFalse(file.exists());
+        try {
+            spillFile.read(offset);
+            fail("IOException expected");
+        } catch (IOException e) {
+            // expected
+        }
+        try {
+            spillFile.write("record".getBytes("UTF-8"));
+            fail("IOException expected");
+        } catch (IOException e) {
+            // expected
+        }
+        // closing again has no effect
+        spillFile.close();
+    }
+
+    public void testReleaseDeletesFileOnceUnused() throws Exception {
+        File file = spillFile.getFile();
+        long offset = spillFile.write("record".getBytes("UTF-8"));
+        // used by a test result besides its creator
+        spillFile.retain();
+        spillFile.release();
+        assertTrue(file.exists());
+        assertEquals("record", new String(spillFile.read(offset), "UTF-8"));
+        spillFile.release();
+        assertFalse(file.exists());
+        // releasing again has no effect
+        spillFile.release();
+    }
+}
@@ -0,0 +1,133 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.testsuite.impl;
+
+import java.io.File;
+import java.io.FileWriter;
+import java.io.IOException;
+import java.util.Arrays;
+import java.util.Date;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+import com.qspin.qtaste.reporter.testresults.archive.TestResultsArchive;
+import junit.framework.TestCase;
+
+public class TestSchedulerTest extends TestCase {
+
+    private File archiveDirectory;
+    private TestResultsArchive archive;
+    private TestScheduler scheduler;
+    private TestScheduler.Order previousOrder;
+
+    public TestSchedulerTest(String testName) {
+        super(testName);
+    }
+
+    @Override
+    protected void setUp() throws Exception {
+        super.setUp();
+        archiveDirectory = File.createTempFile("TestSchedulerTest", "");
+        archiveDirectory.delete();
+        archiveDirectory.mkdirs();
+        archive = new TestResultsArchive(archiveDirectory);
+        // TestA row 1 fails then succeeds, TestA row 2 always succeeds, TestB fails, TestC has no history
+        writeRun("2026-01-01_10.00.00_run", "TestA\t1\tFAIL\t100", "TestA\t2\tSUCCESS\t300", "TestB\t1\tSUCCESS\t1000");
+        writeRun("2026-01-02_10.00.00_run", "TestA\t1\tSUCCESS\t200", "TestA\t2\tSUCCESS\t500", "TestB\t1\tFAIL\t3000");
+        scheduler = TestScheduler.getInstance();
+        previousOrder = scheduler.getOrder();
+        scheduler.loadHistory(archive.readRuns(0));
+    }
+
+    @Override
+    protected void tearDown() throws Exception {
+        archive.stopRun();
+        scheduler.setOrder(previousOrder);
+        scheduler.loadHistory(Arrays.<TestResultsArchive.Run>asList());
+        File[] files = archiveDirectory.listFiles();
+        if (files != null) {
+            for (File file : files) {
+                file.delete();
+            }
+        }
+        archiveDirectory.delete();
+        super.tearDown();
+    }
+
+    /**
+     * Writes an archived run, each test being given as "test case, row id, status, elapsed time in ms"
+     * separated by tabs.
+     */
+    private void writeRun(String name, String... tests) throws IOException {
+        FileWriter writer = new FileWriter(new File(archiveDirectory, name + TestResultsArchive.FILE_EXTENSION));
+        try {
+            writer.write("R\t0\t" + name + "\n");
+            for (String test : tests) {
+                String[] fields = test.split("\t");
+                writer.write("T\t0\t" + fields[0] + "\t" + fields[1] + "\t" + fields[2] + "\t0\t" + fields[3] + "\t\t0\t\n");
+            }
+        } finally {
+            writer.close();
+        }
+    }
+
+    public void testMeanDurations() {
+        assertEquals(150, scheduler.getExpectedDuration("TestA", Arrays.asList(1)));
+        assertEquals(150 + 400, scheduler.getExpectedDuration("TestA", Arrays.asList(1, 2)));
+        assertEquals(2000, scheduler.getExpectedDuration("TestB", Arrays.asList(1)));
+        // a row without history is expected to last the mean duration of the rows with history
+        assertEquals((150 + 400 + 2000) / 3, scheduler.getExpectedDuration("TestC", Arrays.asList(1)));
+    }
+
+    public void testLastStatuses() {
+        assertFalse(scheduler.hasFailed("TestA", Arrays.asList(1, 2)));
+        assertTrue(scheduler.hasFailed("TestB", Arrays.asList(1)));
+        assertFalse(scheduler.hasFailed("TestC", Arrays.asList(1)));
+    }
+
+    public void testSortOrders() {
+        List<String> tests = Arrays.asList("TestA", "TestB", "TestC", "TestD");
+        Map<String, Long> durations = new HashMap<String, Long>();
+        Map<String, Boolean> failures = new HashMap<String, Boolean>();
+        for (String test : tests) {
+            List<Integer> rowIds = Arrays.asList(1);
+            durations.put(test, scheduler.getExpectedDuration(test, rowIds));
+            failures.put(test, scheduler.hasFailed(test, rowIds));
+        }
+
+        scheduler.setOrder(TestScheduler.Order.DEFINITION);
+        assertEquals(tests, scheduler.sort(tests, durations, failures));
+        scheduler.setOrder(TestScheduler.Order.FAILED_FIRST);
+        assertEquals(Arrays.asList("TestB", "TestA", "TestC", "TestD"), scheduler.sort(tests, durations, failures));
+        // TestC and TestD have no history and keep their definition order
+        scheduler.setOrder(TestScheduler.Order.SHORTEST_FIRST);
+        assertEquals(Arrays.asList("TestA", "TestC", "TestD", "TestB"), scheduler.sort(tests, durations, failures));
+        scheduler.setOrder(TestScheduler.Order.LONGEST_FIRST);
+        assertEquals(Arrays.asList("TestB", "TestC", "TestD", "TestA"), scheduler.sort(tests, durations, failures));
+    }
+
+    public void testRunInProgressIgnored() throws Exception {
+        archive.startRun(new Date(), "run in progress");
+        assertEquals(2, archive.readRuns(0).size());
+        archive.stopRun();
+        assertEquals(3, archive.readRuns(0).size());
+    }
+}
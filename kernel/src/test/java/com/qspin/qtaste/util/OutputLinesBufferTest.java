@@ -0,0 +1,192 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.util;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileReader;
+import java.io.IOException;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.List;
+import java.util.regex.Pattern;
+
+import junit.framework.TestCase;
+
+public class OutputLinesBufferTest extends TestCase {
+
+    private File directory;
+
+    public OutputLinesBufferTest(String testName) {
+        super(testName);
+    }
+
+    @Override
+    protected void setUp() throws Exception {
+        super.setUp();
+        directory = File.createTempFile("OutputLinesBufferTest", "");
+        directory.delete();
+        directory.mkdirs();
+    }
+
+    @Override
+    protected void tearDown() throws Exception {
+        File[] files = directory.listFiles();
+        if (files != null) {
+            for (File file : files) {
+                file.delete();
+            }
+        }
+        directory.delete();
+        super.tearDown();
+    }
+
+    public void testLimitedBuffer() {
+        OutputLinesBuffer buffer = new OutputLinesBuffer(3);
+        for (int i = 1; i <= 5; i++) {
+            assertEquals(i, buffer.add("line " + i));
+        }
+        assertEquals(5, buffer.getLastSequenceNumber());
+        assertEquals(Arrays.asList("line 3", "line 4", "line 5"), buffer.getLines());
+        assertEquals(Arrays.asList("line 5"), buffer.getLinesSince(4));
+        // the lines already overwritten are not returned
+        assertEquals(Arrays.asList("line 3", "line 4", "line 5"), buffer.getLinesSince(1));
+        assertTrue(buffer.getLinesSince(5).isEmpty());
+    }
+
+    public void testNoLineKept() {
+        OutputLinesBuffer buffer = new OutputLinesBuffer(0);
+        buffer.add("line 1");
+        assertEquals(1, buffer.getLastSequenceNumber());
+        assertTrue(buffer.getLines().isEmpty());
+    }
+
+    public void testUnlimitedBuffer() {
+        OutputLinesBuffer buffer = new OutputLinesBuffer(-1);
+        for (int i = 1; i <= 5000; i++) {
+            buffer.add("line " + i);
+        }
+        List<String> lines = buffer.getLines();
+        assertEquals(5000, lines.size());
+        assertEquals("line 1", lines.get(0));
+        assertEquals("line 5000", lines.get(4999));
+    }
+
+    public void testSetLimitKeepsLastLines() {
+        OutputLinesBuffer buffer = new OutputLinesBuffer(5);
+        for (int i = 1; i <= 5; i++) {
+            buffer.add("line " + i);
+        }
+        buffer.setLimit(2);
+        assertEquals(Arrays.asList("line 4", "line 5"), buffer.getLines());
+        buffer.add("line 6");
+        assertEquals(Arrays.asList("line 5", "line 6"), buffer.getLines());
+        assertEquals(6, buffer.getLastSequenceNumber());
+    }
+
+    public void testWaitForLineAlreadyAdded() throws Exception {
+        OutputLinesBuffer buffer = new OutputLinesBuffer();
+        buffer.add("starting");
+        long sequenceNumber = buffer.add("ready on port 1234");
+        assertEquals("ready on port 1234", buffer.waitForLine(Pattern.compile("ready"), 0, 0));
+        // the lines up to the given sequence number are not checked
+        assertNull(buffer.waitForLine(Pattern.compile("ready"), sequenceNumber, 0));
+    }
+
+    public void testWaitForLineAddedWhileWaiting() throws Exception {
+        final OutputLinesBuffer buffer = new OutputLinesBuffer();
+        Thread thread = new Thread() {
+            @Override
+            public void run() {
+                try {
+                    Thread.sleep(100);
+                } catch (InterruptedException e) {
+                    return;
+                }
+                buffer.add("starting");
+                buffer.add("ready");
+            }
+        };
+        long startTime_ms = System.currentTimeMillis();
+        thread.start();
+        assertEquals("ready", buffer.waitForLine(Pattern.compile("^ready$"), 0, 10000));
+        assertTrue(System.currentTimeMillis() - startTime_ms < 5000);
+        thread.join();
+    }
+
+    public void testWaitForLineEndedByClose() throws Exception {
+        final OutputLinesBuffer buffer = new OutputLinesBuffer();
+        Thread thread = new Thread() {
+            @Override
+            public void run() {
+                try {
+                    Thread.sleep(100);
+                } catch (InterruptedException e) {
+                    return;
+                }
+                buffer.close();
+            }
+        };
+        long startTime_ms = System.currentTimeMillis();
+        thread.start();
+        assertNull(buffer.waitForLine(Pattern.compile("ready"), 0, 10000));
+        assertTrue(System.currentTimeMillis() - startTime_ms < 5000);
+        thread.join();
+    }
+
+    public void testSpillFileWrittenForEachLine() throws Exception {
+        File spillFile = new File(directory, "output.log");
+        OutputLinesBuffer buffer = new OutputLinesBuffer(1);
+        buffer.setSpillFile(spillFile, OutputLinesBuffer.DEFAULT_SPILL_FILE_MAX_SIZE, OutputLinesBuffer.DEFAULT_SPILL_FILE_BACKUPS);
+        buffer.add("line 1");
+        buffer.add("line 2");
+        // the spill file can be read before the buffer is closed
+        assertEquals(Arrays.asList("line 1", "line 2"), readLines(spillFile));
+        buffer.close();
+    }
+
+    public void testSpillFileRotation() throws Exception {
+        File spillFile = new File(directory, "output.log");
+        OutputLinesBuffer buffer = new OutputLinesBuffer(1);
+        // 2 lines of 5 characters per file
+        buffer.setSpillFile(spillFile, 10, 1);
+        for (int i = 1; i <= 5; i++) {
+            buffer.add("line" + i);
+        }
+        buffer.close();
+        assertEquals(Arrays.asList("line5"), readLines(spillFile));
+        assertEquals(Arrays.asList("line3", "line4"), readLines(new File(directory, "output.log.1")));
+        assertFalse(new File(directory, "output.log.2").exists());
+    }
+
+    private static List<String> readLines(File file) throws IOException {
+        List<String> lines = new ArrayList<String>();
+        BufferedReader reader = new BufferedReader(new FileReader(file));
+        try {
+            String line;
+            while ((line = reader.readLine()) != null) {
+                lines.add(line);
+            }
+        } finally {
+            reader.close();
+        }
+        return lines;
+    }
+}
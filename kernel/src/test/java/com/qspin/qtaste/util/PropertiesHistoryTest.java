@@ -0,0 +1,178 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.util;
+
+import com.qspin.qtaste.testsuite.QTasteTestFailException;
+import junit.framework.TestCase;
+
+public class PropertiesHistoryTest extends TestCase {
+
+    private PropertiesHistory history;
+
+    public PropertiesHistoryTest(String testName) {
+        super(testName);
+    }
+
+    @Override
+    protected void setUp() throws Exception {
+        super.setUp();
+        history = new PropertiesHistory("Component");
+    }
+
+    @Override
+    protected void tearDown() throws Exception {
+        history = null;
+        super.tearDown();
+    }
+
+    /**
+     * Adds the given changes of a property in another thread, after a delay.
+     */
+    private Thread addChangesLater(final String property, final long delay_ms, final String... values) {
+        Thread thread = new Thread() {
+            @Override
+            public void run() {
+                try {
+                    Thread.sleep(delay_ms);
+                } catch (InterruptedException e) {
+                    return;
+                }
+                for (int i = 1; i < values.length; i++) {
+                    history.addChange(property, values[i - 1], values[i], i, true);
+                }
+            }
+        };
+        thread.start();
+        return thread;
+    }
+
+    public void testValueAlreadyReceived() throws Exception {
+        history.addChange("state", "Idle", "Running", 1, true);
+        history.checkPropertyValueOrTransition("STATE: idle -> RUNNING", 0);
+        history.checkPropertyValueOrTransition("state:running", 0);
+    }
+
+    public void testTransitionReceivedWhileWaiting() throws Exception {
+        long startTime_ms = System.currentTimeMillis();
+        Thread thread = addChangesLater("state", 100, "Idle", "Starting", "Running");
+        history.checkPropertyValueOrTransition("state:idle->starting->running", 10);
+        // the check is woken up by the change instead of waiting for its timeout
+        assertTrue(System.currentTimeMillis() - startTime_ms < 5000);
+        thread.join();
+    }
+
+    public void testValueNotReceived() throws Exception {
+        history.addChange("state", "Idle", "Starting", 1, true);
+        try {
+            history.checkPropertyValueOrTransition("state:running", 0.1);
+            fail("QTasteTestFailException expected");
+        } catch (QTasteTestFailException e) {
+            // the values of the history are reported as received, they are no longer lower-cased
+            assertTrue(e.getMessage(), e.getMessage().contains("'Idle -> Starting'"));
+        }
+    }
+
+    public void testValueMustBeAtBegin() throws Exception {
+        history.addChange("state", "Idle", "Running", 1, true);
+        history.checkPropertyValueOrTransition("state:[idle", 0);
+
+        history.reset();
+        history.addChange("state", "Idle", "Running", 1, true);
+        long startTime_ms = System.currentTimeMillis();
+        try {
+            history.checkPropertyValueOrTransition("state:[running", 10);
+            fail("QTasteTestFailException expected");
+        } catch (QTasteTestFailException e) {
+            // the check fails at once as the value can no longer be at the beginning of the history
+            assertTrue(System.currentTimeMillis() - startTime_ms < 5000);
+        }
+    }
+
+    public void testValueMustBeAtEnd() throws Exception {
+        history.addChange("state", "Idle", "Running", 1, true);
+        history.addChange("state", "Running", "Stopped", 2, true);
+        history.checkPropertyValueOrTransition("state:stopped]", 0);
+        try {
+            history.checkPropertyValueOrTransition("state:running]", 0);
+            fail("QTasteTestFailException expected");
+        } catch (QTasteTestFailException e) {
+            // expected
+        }
+    }
+
+    public void testMaxSequenceTime() throws Exception {
+        history.addChange("state", "Idle", "Starting", 1, true);
+        Thread.sleep(300);
+        history.addChange("state", "Starting", "Running", 2, true);
+        try {
+            history.checkPropertyValueOrTransition("state:starting->running", 0, 0.1);
+            fail("QTasteTestFailException expected");
+        } catch (QTasteTestFailException e) {
+            // expected
+        }
+        history.checkPropertyValueOrTransition("state:starting->running", 0, 10);
+    }
+
+    public void testPrecedingValuesRemoved() throws Exception {
+        history.addChange("state", "Idle", "Starting", 1, true);
+        history.addChange("state", "Starting", "Running", 2, true);
+        history.addChange("state", "Running", "Stopped", 3, true);
+        history.checkPropertyValueOrTransition("state:running", 0);
+        assertEquals("Running -> Stopped", history.getHistoryString("state", false));
+        try {
+            history.checkPropertyValueOrTransition("state:starting", 0);
+            fail("QTasteTestFailException expected");
+        } catch (QTasteTestFailException e) {
+            // expected
+        }
+    }
+
+    public void testHistoryClearedWhileWaiting() throws Exception {
+        history.addChange("state", "Idle", "Starting", 1, true);
+        Thread thread = new Thread() {
+            @Override
+            public void run() {
+                try {
+                    Thread.sleep(100);
+                } catch (InterruptedException e) {
+                    return;
+                }
+                history.clear();
+                history.addChange("state", "Stopped", "Running", 2, true);
+            }
+        };
+        thread.start();
+        history.checkPropertyValueOrTransition("state:stopped->running", 10);
+        thread.join();
+    }
+
+    public void testPossibleNotificationLoss() throws Exception {
+        history.signalPossibleNotificationLoss();
+        try {
+            history.checkPropertyValueOrTransition("state:running", 0);
+            fail("QTasteTestFailException expected");
+        } catch (QTasteTestFailException e) {
+            assertTrue(e.getMessage(), e.getMessage().contains("notification loss"));
+        }
+        history.reset();
+        history.addChange("state", "Idle", "Running", 1, true);
+        history.checkPropertyValueOrTransition("state:running", 0);
+    }
+}
@@ -0,0 +1,55 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.util;
+
+import junit.framework.TestCase;
+
+public class StringPoolTest extends TestCase {
+
+    public StringPoolTest(String testName) {
+        super(testName);
+    }
+
+    public void testIntern() {
+        StringPool pool = new StringPool();
+        String first = new String("FAIL");
+        String second = new String("FAIL");
+        assertSame(first, pool.intern(first));
+        assertSame(first, pool.intern(second));
+        assertSame("SUCCESS", pool.intern("SUCCESS"));
+        assertEquals(2, pool.size());
+    }
+
+    public void testInternNull() {
+        StringPool pool = new StringPool();
+        assertNull(pool.intern(null));
+        assertEquals(0, pool.size());
+    }
+
+    public void testClear() {
+        StringPool pool = new StringPool();
+        String first = new String("FAIL");
+        pool.intern(first);
+        pool.clear();
+        assertEquals(0, pool.size());
+        String second = new String("FAIL");
+        assertSame(second, pool.intern(second));
+    }
+}
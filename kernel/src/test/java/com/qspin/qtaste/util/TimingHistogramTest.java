@@ -0,0 +1,105 @@
+/*
+    Copyright 2007-2009 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.util;
+
+import junit.framework.TestCase;
+
+public class TimingHistogramTest extends TestCase {
+
+    private TimingHistogram histogram;
+
+    public TimingHistogramTest(String testName) {
+        super(testName);
+    }
+
+    @Override
+    protected void setUp() throws Exception {
+        super.setUp();
+        histogram = new TimingHistogram();
+    }
+
+    @Override
+    protected void tearDown() throws Exception {
+        histogram = null;
+        super.tearDown();
+    }
+
+    public void testEmpty() {
+        assertEquals(0, histogram.getCount());
+        assertEquals(0, histogram.getTotal_ns());
+        assertEquals(0, histogram.getMin_ns());
+        assertEquals(0, histogram.getMax_ns());
+        assertEquals(0, histogram.getMean_ns());
+        assertEquals(0, histogram.getPercentile_ns(50));
+    }
+
+    public void testStatistics() {
+        histogram.record(2000);
+        histogram.record(4000);
+        histogram.record(9000);
+        assertEquals(3, histogram.getCount());
+        assertEquals(15000, histogram.getTotal_ns());
+        assertEquals(2000, histogram.getMin_ns());
+        assertEquals(9000, histogram.getMax_ns());
+        assertEquals(5000, histogram.getMean_ns());
+    }
+
+    public void testNegativeDurationRecordedAsZero() {
+        histogram.record(-10);
+        assertEquals(1, histogram.getCount());
+        assertEquals(0, histogram.getMin_ns());
+        assertEquals(0, histogram.getPercentile_ns(100));
+    }
+
+    public void testPercentilesRelativeError() {
+        // 1 to 1000 milliseconds
+        for (long duration_ms = 1; duration_ms <= 1000; duration_ms++) {
+            histogram.record(duration_ms * 1000000);
+        }
+        assertPercentile(500 * 1000000L, histogram.getPercentile_ns(50));
+        assertPercentile(900 * 1000000L, histogram.getPercentile_ns(90));
+        assertPercentile(990 * 1000000L, histogram.getPercentile_ns(99));
+        assertPercentile(1000000, histogram.getPercentile_ns(0));
+        assertEquals(1000 * 1000000L, histogram.getPercentile_ns(100));
+    }
+
+    public void testPercentilesLimitedToRecordedDurations() {
+        histogram.record(123456);
+        assertEquals(123456, histogram.getPercentile_ns(1));
+        assertEquals(123456, histogram.getPercentile_ns(50));
+        assertEquals(123456, histogram.getPercentile_ns(100));
+    }
+
+    public void testVeryLongDuration() {
+        long duration_ns = 24L * 3600 * 1000000000L;
+        histogram.record(1000);
+        histogram.record(duration_ns);
+        assertEquals(duration_ns, histogram.getMax_ns());
+        assertEquals(duration_ns, histogram.getPercentile_ns(100));
+    }
+
+    /**
+     * Checks that a percentile is computed with a relative error of at most 5%.
+     */
+    private static void assertPercentile(long expected_ns, long actual_ns) {
+        assertTrue("expected " + expected_ns + " but was " + actual_ns,
+                actual_ns >= expected_ns && actual_ns <= expected_ns * 1.05);
+    }
+}
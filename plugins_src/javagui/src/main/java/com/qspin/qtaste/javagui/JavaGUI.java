@@ -410,8 +410,33 @@ public interface JavaGUI {
    void selectFileThroughFileChooser(String fileChooserComponentName, String filepath) throws QTasteException;
 
    /**
-    * Analyze the structure of a java application and save it in the specified filename in the current working directory.
-    * @param fileName the name of the image file.
+    * Analyze the structure of a java application and save it in the specified filename in the current working directory.</br>
+    * The file is compressed with gzip if its name ends with ".gz".
+    * @param fileName the name of the XML file.
     */
     void analyzeStructure(String fileName) throws QTasteException;
+
+   /**
+    * Takes a snapshot of the structure of the java application and returns the components which have
+    * been added, removed or changed (name, text, parent, enabled or visible state) since the previous snapshot.</br>
+    * The first call returns all the components as added. Components keep the same identifier for their whole life.
+    * @return the components changed since the previous call.
+    */
+   JavaGUIComponentChange[] getStructureChanges() throws QTasteException;
+
+   /**
+    * Executes a batch of commands in one go, in order, inside a single Swing event thread task.</br>
+    * Each command is one of the other methods of this interface, identified by its name and arguments.
+    * As the GUI cannot change while the batch is running, the components are not waited for:
+    * a command on a component which is not yet enabled or visible fails immediately.
+    * A command opening a modal dialog should be the last one of the batch.
+    * The commands which wait or simulate key presses (whoAmI, setComponentName and pressKey)
+    * cannot be executed in a batch.
+    * @param verbs the names of the commands to execute.
+    * @param arguments the arguments of each command (same length as verbs, <code>null</code> for no argument).
+    * @param stopOnError if <code>true</code>, the commands following a failed command are skipped.
+    * @return the result of each command, in the same order as verbs.
+    * @throws QTasteException if the batch itself is invalid or cannot be executed.
+    */
+   JavaGUICommandResult[] executeCommands(String[] verbs, Object[][] arguments, boolean stopOnError) throws QTasteException;
 }
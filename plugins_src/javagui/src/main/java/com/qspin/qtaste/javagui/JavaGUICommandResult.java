@@ -0,0 +1,101 @@
+/*
+    Copyright 2007-2012 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.javagui;
+
+import java.io.Serializable;
+
+/**
+ * Result of one command of a batch executed by {@link JavaGUI#executeCommands(String[], Object[][], boolean)}.
+ */
+public class JavaGUICommandResult implements Serializable {
+
+	/**
+	 * Execution status of a command.
+	 */
+	public enum Status {
+		/** the command has been executed successfully */
+		SUCCESS,
+		/** the command has failed */
+		FAILED,
+		/** the command has not been executed because a previous command has failed */
+		SKIPPED
+	}
+
+	public JavaGUICommandResult(String verb, Status status, Object result, String error)
+	{
+		mVerb = verb;
+		mStatus = status;
+		mResult = result;
+		mError = error;
+	}
+
+	/**
+	 * @return the name of the executed JavaGUI verb.
+	 */
+	public String getVerb()
+	{
+		return mVerb;
+	}
+
+	/**
+	 * @return the execution status of the command.
+	 */
+	public Status getStatus()
+	{
+		return mStatus;
+	}
+
+	/**
+	 * @return <code>true</code> if the command has been executed successfully.
+	 */
+	public boolean isSuccess()
+	{
+		return mStatus == Status.SUCCESS;
+	}
+
+	/**
+	 * @return the value returned by the command, <code>null</code> if none or if the command has failed.
+	 */
+	public Object getResult()
+	{
+		return mResult;
+	}
+
+	/**
+	 * @return the error message if the command has failed, <code>null</code> otherwise.
+	 */
+	public String getError()
+	{
+		return mError;
+	}
+
+	@Override
+	public String toString()
+	{
+		return mVerb + ": " + mStatus + (mError != null ? " (" + mError + ")" : (mResult != null ? " -> " + mResult : ""));
+	}
+
+	private final String mVerb;
+	private final Status mStatus;
+	private final Object mResult;
+	private final String mError;
+
+	private static final long serialVersionUID = 1L;
+}
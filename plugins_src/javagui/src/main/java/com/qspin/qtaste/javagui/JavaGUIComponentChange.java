@@ -0,0 +1,124 @@
+/*
+    Copyright 2007-2012 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.javagui;
+
+import java.io.Serializable;
+
+/**
+ * Change of a GUI component between two structure snapshots, as returned by {@link JavaGUI#getStructureChanges()}.
+ * For added and changed components, the fields describe the new state of the component;
+ * for removed components, they describe its last known state.
+ */
+public class JavaGUIComponentChange implements Serializable {
+
+	/**
+	 * Type of change.
+	 */
+	public enum Type {
+		/** the component has appeared since the previous snapshot */
+		ADDED,
+		/** the component has disappeared since the previous snapshot */
+		REMOVED,
+		/** the name, text, parent, enabled or visible state of the component has changed */
+		CHANGED
+	}
+
+	public JavaGUIComponentChange(Type type, int id, int parentId, String className, String name, String text, boolean enabled, boolean visible)
+	{
+		mType = type;
+		mId = id;
+		mParentId = parentId;
+		mClassName = className;
+		mName = name;
+		mText = text;
+		mEnabled = enabled;
+		mVisible = visible;
+	}
+
+	/**
+	 * @return the type of change.
+	 */
+	public Type getType()
+	{
+		return mType;
+	}
+
+	/**
+	 * @return the component identifier, stable for the whole life of the component.
+	 */
+	public int getId()
+	{
+		return mId;
+	}
+
+	/**
+	 * @return the identifier of the parent component, 0 for a window without parent.
+	 */
+	public int getParentId()
+	{
+		return mParentId;
+	}
+
+	public String getClassName()
+	{
+		return mClassName;
+	}
+
+	public String getName()
+	{
+		return mName;
+	}
+
+	/**
+	 * @return the text displayed by the component, <code>null</code> if not applicable.
+	 */
+	public String getText()
+	{
+		return mText;
+	}
+
+	public boolean isEnabled()
+	{
+		return mEnabled;
+	}
+
+	public boolean isVisible()
+	{
+		return mVisible;
+	}
+
+	@Override
+	public String toString()
+	{
+		return mType + " #" + mId + " (parent #" + mParentId + ") " + mClassName + " name=" + mName
+				+ (mText != null ? " text=" + mText : "") + " enabled=" + mEnabled + " visible=" + mVisible;
+	}
+
+	private final Type mType;
+	private final int mId;
+	private final int mParentId;
+	private final String mClassName;
+	private final String mName;
+	private final String mText;
+	private final boolean mEnabled;
+	private final boolean mVisible;
+
+	private static final long serialVersionUID = 1L;
+}
@@ -0,0 +1,171 @@
+/*
+    Copyright 2007-2012 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.javagui.client;
+
+import java.util.ArrayList;
+import java.util.List;
+
+import com.qspin.qtaste.javagui.JavaGUI;
+import com.qspin.qtaste.javagui.JavaGUICommandResult;
+import com.qspin.qtaste.testsuite.QTasteException;
+import com.qspin.qtaste.testsuite.QTasteTestFailException;
+
+/**
+ * Collects JavaGUI commands to execute them in one remote call, inside one Swing event thread task.
+ * <p>
+ * Usage from a test script:
+ * <pre>
+ * batch = javaGUI.createBatch()
+ * batch.setText("firstName", "John").setText("lastName", "Doe")
+ * batch.clickOnButton("ok")
+ * batch.execute()
+ * </pre>
+ * Any JavaGUI verb can be added using {@link #add(String, Object...)}; the most used ones have shortcuts.
+ */
+public class JavaGUIBatch {
+
+	JavaGUIBatch(JavaGUI javaGUI)
+	{
+		mJavaGUI = javaGUI;
+	}
+
+	/**
+	 * Adds a command to the batch.
+	 * @param verb the JavaGUI verb name.
+	 * @param arguments the verb arguments.
+	 * @return this batch.
+	 */
+	public JavaGUIBatch add(String verb, Object... arguments)
+	{
+		mVerbs.add(verb);
+		mArguments.add(arguments);
+		return this;
+	}
+
+	public JavaGUIBatch setText(String componentName, String value)
+	{
+		return add("setText", componentName, value);
+	}
+
+	public JavaGUIBatch getText(String componentName)
+	{
+		return add("getText", componentName);
+	}
+
+	public JavaGUIBatch clickOnButton(String componentName)
+	{
+		return add("clickOnButton", componentName);
+	}
+
+	public JavaGUIBatch selectComponent(String componentName, boolean value)
+	{
+		return add("selectComponent", componentName, value);
+	}
+
+	public JavaGUIBatch selectValue(String componentName, String value)
+	{
+		return add("selectValue", componentName, value);
+	}
+
+	public JavaGUIBatch selectIndex(String componentName, int index)
+	{
+		return add("selectIndex", componentName, index);
+	}
+
+	public JavaGUIBatch selectNode(String componentName, String nodeName, String nodeSeparator)
+	{
+		return add("selectNode", componentName, nodeName, nodeSeparator);
+	}
+
+	public JavaGUIBatch selectTab(String tabbedPaneComponentName, int tabIndex)
+	{
+		return add("selectTab", tabbedPaneComponentName, tabIndex);
+	}
+
+	public JavaGUIBatch selectTabTitled(String tabbedPaneComponentName, String tabTitle)
+	{
+		return add("selectTabTitled", tabbedPaneComponentName, tabTitle);
+	}
+
+	public JavaGUIBatch getSelectedValue(String componentName)
+	{
+		return add("getSelectedValue", componentName);
+	}
+
+	public JavaGUIBatch isEnabled(String componentName)
+	{
+		return add("isEnabled", componentName);
+	}
+
+	public JavaGUIBatch isVisible(String componentName)
+	{
+		return add("isVisible", componentName);
+	}
+
+	/**
+	 * @return the number of commands in the batch.
+	 */
+	public int size()
+	{
+		return mVerbs.size();
+	}
+
+	/**
+	 * Executes the collected commands, stopping at the first failure, and empties the batch.
+	 * @return the result of each command.
+	 * @throws QTasteTestFailException if one of the commands has failed.
+	 * @throws QTasteException if the batch cannot be executed.
+	 */
+	public JavaGUICommandResult[] execute() throws QTasteException
+	{
+		JavaGUICommandResult[] results = execute(true);
+		for (JavaGUICommandResult result : results)
+		{
+			if (result.getStatus() == JavaGUICommandResult.Status.FAILED)
+			{
+				throw new QTasteTestFailException("Batch command " + result.getVerb() + " failed: " + result.getError());
+			}
+		}
+		return results;
+	}
+
+	/**
+	 * Executes all the collected commands, even after a failure, and empties the batch.
+	 * @return the result of each command, to be checked by the caller.
+	 * @throws QTasteException if the batch cannot be executed.
+	 */
+	public JavaGUICommandResult[] executeAll() throws QTasteException
+	{
+		return execute(false);
+	}
+
+	private JavaGUICommandResult[] execute(boolean stopOnError) throws QTasteException
+	{
+		String[] verbs = mVerbs.toArray(new String[mVerbs.size()]);
+		Object[][] arguments = mArguments.toArray(new Object[mArguments.size()][]);
+		mVerbs.clear();
+		mArguments.clear();
+		return mJavaGUI.executeCommands(verbs, arguments, stopOnError);
+	}
+
+	private final JavaGUI mJavaGUI;
+	private final List<String> mVerbs = new ArrayList<String>();
+	private final List<Object[]> mArguments = new ArrayList<Object[]>();
+}
@@ -5,6 +5,8 @@
 package com.qspin.qtaste.javagui.client;
 
 import com.qspin.qtaste.javagui.JavaGUI;
+import com.qspin.qtaste.javagui.JavaGUICommandResult;
+import com.qspin.qtaste.javagui.JavaGUIComponentChange;
 import com.qspin.qtaste.tcom.jmx.impl.JMXClient;
 import com.qspin.qtaste.testsuite.QTasteException;
 
@@ -255,6 +257,27 @@ public class JavaGUIImpl implements JavaGUI {
 		mProxy.analyzeStructure(fileName);
 	}
 
+	@Override
+	public JavaGUIComponentChange[] getStructureChanges() throws QTasteException
+	{
+		return mProxy.getStructureChanges();
+	}
+
+	@Override
+	public JavaGUICommandResult[] executeCommands(String[] verbs, Object[][] arguments, boolean stopOnError) throws QTasteException
+	{
+		return mProxy.executeCommands(verbs, arguments, stopOnError);
+	}
+
+	/**
+	 * Creates a new batch of commands, to execute them in one remote call.
+	 * @return a new empty batch for this JavaGUI instance.
+	 */
+	public JavaGUIBatch createBatch()
+	{
+		return new JavaGUIBatch(this);
+	}
+
     protected JavaGUI mProxy;
 	protected JMXClient mClient;
 	private static final String BEAN_NAME = "com.qspin.qtaste.javagui.server:type=JavaGUI";
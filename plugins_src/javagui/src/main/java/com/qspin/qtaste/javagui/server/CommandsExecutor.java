@@ -0,0 +1,180 @@
+/*
+    Copyright 2007-2012 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.javagui.server;
+
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.util.Arrays;
+import java.util.HashSet;
+import java.util.Set;
+
+import javax.swing.SwingUtilities;
+
+import org.apache.log4j.Logger;
+
+import com.qspin.qtaste.javagui.JavaGUICommandResult;
+import com.qspin.qtaste.javagui.JavaGUICommandResult.Status;
+import com.qspin.qtaste.testsuite.QTasteException;
+
+/**
+ * Executes a batch of JavaGUI commands inside a single Swing event thread task.
+ * Each command is dispatched by name to the corresponding {@link com.qspin.qtaste.javagui.JavaGUI} method.
+ */
+final class CommandsExecutor implements Runnable {
+
+	CommandsExecutor(com.qspin.qtaste.javagui.JavaGUI javaGUI)
+	{
+		mJavaGUI = javaGUI;
+	}
+
+	/**
+	 * Executes the commands in the swing thread and waits for their completion.
+	 * @param verbs the names of the commands.
+	 * @param arguments the arguments of each command.
+	 * @param stopOnError if <code>true</code>, the commands following a failed command are skipped.
+	 * @return the result of each command.
+	 * @throws QTasteException if the batch is invalid or if its execution is interrupted.
+	 */
+	JavaGUICommandResult[] executeCommands(String[] verbs, Object[][] arguments, boolean stopOnError) throws QTasteException
+	{
+		if (verbs == null || (arguments != null && arguments.length != verbs.length))
+		{
+			throw new QTasteException("Invalid batch: the number of arguments lists doesn't match the number of commands");
+		}
+		for (String verb : verbs)
+		{
+			if (BATCH_FORBIDDEN_VERBS.contains(verb))
+			{
+				throw new QTasteException("Invalid batch: the command " + verb + " cannot be executed in a batch");
+			}
+		}
+		mVerbs = verbs;
+		mArguments = arguments;
+		mStopOnError = stopOnError;
+		mResults = new JavaGUICommandResult[verbs.length];
+		try {
+			if (SwingUtilities.isEventDispatchThread()) {
+				run();
+			} else {
+				SwingUtilities.invokeAndWait(this);
+			}
+		} catch (InterruptedException e) {
+			throw new QTasteException("Execution of the batch of commands interrupted", e);
+		} catch (InvocationTargetException e) {
+			throw new QTasteException("Error during the execution of the batch of commands: " + e.getCause(), e.getCause());
+		}
+		return mResults;
+	}
+
+	public void run()
+	{
+		boolean failed = false;
+		for (int i = 0; i < mVerbs.length; i++)
+		{
+			String verb = mVerbs[i];
+			if (failed && mStopOnError)
+			{
+				mResults[i] = new JavaGUICommandResult(verb, Status.SKIPPED, null, null);
+				continue;
+			}
+			Object[] arguments = (mArguments == null || mArguments[i] == null) ? new Object[0] : mArguments[i];
+			mResults[i] = executeCommand(verb, arguments);
+			failed |= !mResults[i].isSuccess();
+		}
+	}
+
+	private JavaGUICommandResult executeCommand(String verb, Object[] arguments)
+	{
+		LOGGER.trace("batch command " + verb + "(" + arguments.length + " argument(s))");
+		try {
+			Method method = findMethod(verb, arguments.length);
+			Object result = method.invoke(mJavaGUI, convertArguments(method.getParameterTypes(), arguments));
+			return new JavaGUICommandResult(verb, Status.SUCCESS, result, null);
+		} catch (InvocationTargetException e) {
+			Throwable cause = e.getCause();
+			LOGGER.warn("batch command " + verb + " failed: " + cause.getMessage());
+			return new JavaGUICommandResult(verb, Status.FAILED, null, cause.getClass().getSimpleName() + ": " + cause.getMessage());
+		} catch (Exception e) {
+			LOGGER.warn("batch command " + verb + " cannot be executed: " + e.getMessage());
+			return new JavaGUICommandResult(verb, Status.FAILED, null, e.getMessage());
+		}
+	}
+
+	private static Method findMethod(String verb, int argumentsCount) throws NoSuchMethodException
+	{
+		for (Method method : com.qspin.qtaste.javagui.JavaGUI.class.getMethods())
+		{
+			if (method.getName().equals(verb) && method.getParameterTypes().length == argumentsCount)
+			{
+				return method;
+			}
+		}
+		throw new NoSuchMethodException("No JavaGUI command " + verb + " with " + argumentsCount + " argument(s)");
+	}
+
+	private static Object[] convertArguments(Class<?>[] types, Object[] arguments)
+	{
+		Object[] converted = new Object[arguments.length];
+		for (int i = 0; i < arguments.length; i++)
+		{
+			Object argument = arguments[i];
+			Class<?> type = types[i];
+			if (argument == null || type.isInstance(argument))
+			{
+				converted[i] = argument;
+			}
+			else if (type == String.class)
+			{
+				converted[i] = argument.toString();
+			}
+			else if (type == int.class)
+			{
+				converted[i] = argument instanceof Number ? ((Number) argument).intValue() : Integer.parseInt(argument.toString());
+			}
+			else if (type == long.class)
+			{
+				converted[i] = argument instanceof Number ? ((Number) argument).longValue() : Long.parseLong(argument.toString());
+			}
+			else if (type == boolean.class)
+			{
+				converted[i] = argument instanceof Number ? ((Number) argument).intValue() != 0 : Boolean.parseBoolean(argument.toString());
+			}
+			else
+			{
+				converted[i] = argument;
+			}
+		}
+		return converted;
+	}
+
+	private final com.qspin.qtaste.javagui.JavaGUI mJavaGUI;
+	private String[] mVerbs;
+	private Object[][] mArguments;
+	private boolean mStopOnError;
+	private JavaGUICommandResult[] mResults;
+
+	/**
+	 * Commands which cannot be executed in a batch: another batch and the commands which sleep
+	 * or use the java.awt.Robot, which would block the Swing event thread.
+	 */
+	private static final Set<String> BATCH_FORBIDDEN_VERBS = new HashSet<String>(Arrays.asList(
+			"executeCommands", "whoAmI", "setComponentName", "pressKey"));
+	private static final Logger LOGGER = Logger.getLogger(CommandsExecutor.class);
+}
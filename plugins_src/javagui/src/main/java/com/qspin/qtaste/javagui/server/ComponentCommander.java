@@ -54,17 +54,17 @@ abstract class ComponentCommander {
 		mFindWithEqual = false;
 		LOGGER.debug("try to find a component with the name : " + name);
 		// TODO: Think about several component having the same names!
-		for (Window window: Window.getWindows()) {
-			if (mFindWithEqual) {
-				break;
-			}
-			if ( !checkName(name, window) || !mFindWithEqual ) {
-				LOGGER.debug("parse window");
-				lookForComponent(name, window.getComponents());
-			}
-		}
-		if ( mFoundComponent != null )
+		List<Component> components = ComponentIndex.getInstance().findComponents(name);
+		if ( !components.isEmpty() )
 		{
+			mFoundComponent = components.get(0);
+			mFindWithEqual = name.equals(mFoundComponent.getName());
+			if ( mFindWithEqual )
+			{
+				LOGGER.debug("Component:" + name + " is found!");
+			} else {
+				LOGGER.debug("Component:" + name + " is (maybe) found! (component's name : " + mFoundComponent.getName() + ")");
+			}
 			mFoundComponent.requestFocus();
 			Component parent = mFoundComponent.getParent();
 			//active the parent
@@ -80,49 +80,6 @@ abstract class ComponentCommander {
 		throw new QTasteTestFailException("The component \"" + name + "\" is not found.");
 	}
 
-	/**
-	 * Browses recursively the components in order to find components with the name.
-	 * @param name the component's name.
-	 * @param components components to browse.
-	 * @return the first component with the name.
-	 */
-	protected Component lookForComponent(String name, Component[] components) {
-		for (int i = 0; i < components.length && !mFindWithEqual; i++) {
-			//String componentName = ComponentNamer.getInstance().getNameForComponent(components[c]);
-			Component c = components[i];
-			checkName(name, c);
-			if ( !mFindWithEqual )
-			{
-				if (c instanceof Container) {
-					Component result = lookForComponent(name, ((Container) c).getComponents());
-					if (result != null) {
-						return result;
-					}
-				}
-			}
-		}
-		return null;
-	}
-	
-	protected boolean checkName(String name, Component c)
-	{
-		if (c != null && c.getName() != null)
-		{
-			if ( c.getName().contains(name) ) {
-				mFoundComponent = c;
-				if ( c.getName().equals(name) )
-				{
-					mFindWithEqual = true;
-					LOGGER.debug("Component:" + name + " is found!");
-				} else {
-					LOGGER.debug("Component:" + name + " is (maybe) found! (component's name : " + mFoundComponent.getName() + ")");
-				}
-				return true;
-			}
-		}
-		return false;
-	}
-	
 	protected boolean mFindWithEqual;
 	protected Component mFoundComponent;
 
@@ -215,7 +172,14 @@ abstract class ComponentCommander {
 		}
 		final Window window = (Window) parent;
 			    
-		if ( !window.isFocused() )
+		if ( !window.isFocused() && SwingUtilities.isEventDispatchThread() )
+		{
+			// focus events cannot be dispatched while the swing thread is busy, so don't wait for them
+			LOGGER.trace("request the focus for the window of '" + c.getName() + "' from the swing thread");
+			window.toFront();
+			window.requestFocus();
+		}
+		else if ( !window.isFocused() )
 		{
 			if ( !window.isVisible() )
 			{
@@ -0,0 +1,374 @@
+/*
+    Copyright 2007-2012 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.javagui.server;
+
+import java.awt.AWTEvent;
+import java.awt.Component;
+import java.awt.Container;
+import java.awt.Toolkit;
+import java.awt.Window;
+import java.awt.event.AWTEventListener;
+import java.awt.event.ContainerEvent;
+import java.awt.event.WindowEvent;
+import java.beans.PropertyChangeEvent;
+import java.beans.PropertyChangeListener;
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.HashSet;
+import java.util.LinkedHashSet;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.SortedMap;
+import java.util.TreeMap;
+import java.util.WeakHashMap;
+
+import org.apache.log4j.Logger;
+
+/**
+ * Index of the GUI components by name.
+ * <p>
+ * The index is built once from {@link Window#getWindows()} and is then maintained
+ * incrementally through AWT container/window events and the "name" property change
+ * of each indexed component. The tree of a closed window is removed from the index, so that
+ * disposed windows can be garbage collected and are not found anymore. Exact name lookups are a single map access; a lookup on
+ * a part of a name only scans the (sorted) set of distinct names, not the component tree.
+ * <p>
+ * If the system property <code>qtaste.javagui.index.validate</code> is set to <code>true</code>,
+ * every lookup is checked against a full scan of the component tree and differences are logged.
+ */
+final class ComponentIndex implements AWTEventListener, PropertyChangeListener {
+
+	/**
+	 * Gets the index instance, building it on first use.
+	 * @return the component index.
+	 */
+	static synchronized ComponentIndex getInstance()
+	{
+		if (INSTANCE == null)
+		{
+			INSTANCE = new ComponentIndex();
+			INSTANCE.install();
+		}
+		return INSTANCE;
+	}
+
+	/**
+	 * Finds the components matching a name.
+	 * If some components have exactly this name, only those are returned, otherwise
+	 * all the components whose name contains the given name are returned.
+	 * @param name the component's name (or a part of it).
+	 * @return the list of matching components, empty if none.
+	 */
+	List<Component> findComponents(String name)
+	{
+		List<Component> found = lookup(name);
+		if (found.isEmpty() && addNewWindows())
+		{
+			found = lookup(name);
+		}
+		if (VALIDATE)
+		{
+			List<Component> scanned = scan(name);
+			if (!new HashSet<Component>(found).equals(new HashSet<Component>(scanned)))
+			{
+				LOGGER.warn("Component index mismatch for '" + name + "': index found " + found.size()
+						+ " component(s), full scan found " + scanned.size() + " component(s). Rebuilding index.");
+				rebuild();
+				return scanned;
+			}
+		}
+		return found;
+	}
+
+	/**
+	 * Forgets all indexed components and indexes again all the existing windows.
+	 */
+	synchronized void rebuild()
+	{
+		for (Component c : mIndexedNames.keySet())
+		{
+			c.removePropertyChangeListener(NAME_PROPERTY, this);
+		}
+		mIndexedNames.clear();
+		mComponentsByName.clear();
+		for (Window window : Window.getWindows())
+		{
+			if (!mClosedWindows.contains(window))
+			{
+				addTree(window);
+			}
+		}
+	}
+
+	/**
+	 * Indexes the windows not yet known, i.e. created but never opened.
+	 * @return <code>true</code> if at least one window has been indexed.
+	 */
+	private synchronized boolean addNewWindows()
+	{
+		boolean added = false;
+		for (Window window : Window.getWindows())
+		{
+			if (!mIndexedNames.containsKey(window) && !mClosedWindows.contains(window))
+			{
+				addTree(window);
+				added = true;
+			}
+		}
+		return added;
+	}
+
+	/**
+	 * Gets the identifier of a component. The identifier is unique and stays the same
+	 * for the whole life of the component, even if it is renamed or moved.
+	 * @param c the component.
+	 * @return the component identifier.
+	 */
+	synchronized int getComponentId(Component c)
+	{
+		Integer id = mComponentIds.get(c);
+		if (id == null)
+		{
+			id = ++mLastComponentId;
+			mComponentIds.put(c, id);
+		}
+		return id;
+	}
+
+	private synchronized List<Component> lookup(String name)
+	{
+		Set<Component> exact = mComponentsByName.get(name);
+		if (exact != null && !exact.isEmpty())
+		{
+			return new ArrayList<Component>(exact);
+		}
+		List<Component> found = new ArrayList<Component>();
+		// names starting with the given name are contiguous in the sorted map
+		SortedMap<String, Set<Component>> prefixed = mComponentsByName.tailMap(name);
+		for (Map.Entry<String, Set<Component>> entry : prefixed.entrySet())
+		{
+			if (!entry.getKey().startsWith(name))
+			{
+				break;
+			}
+			found.addAll(entry.getValue());
+		}
+		for (Map.Entry<String, Set<Component>> entry : mComponentsByName.entrySet())
+		{
+			String key = entry.getKey();
+			if (!key.startsWith(name) && key.contains(name))
+			{
+				found.addAll(entry.getValue());
+			}
+		}
+		return found;
+	}
+
+	/**
+	 * Finds the components matching a name by browsing the whole component tree.
+	 * @param name the component's name (or a part of it).
+	 * @return the list of matching components, with the same rules as {@link #findComponents(String)}.
+	 */
+	synchronized List<Component> scan(String name)
+	{
+		List<Component> exact = new ArrayList<Component>();
+		List<Component> contains = new ArrayList<Component>();
+		for (Window window : Window.getWindows())
+		{
+			if (!mClosedWindows.contains(window))
+			{
+				scan(name, window, exact, contains);
+			}
+		}
+		return exact.isEmpty() ? contains : exact;
+	}
+
+	private static void scan(String name, Component c, List<Component> exact, List<Component> contains)
+	{
+		String componentName = c.getName();
+		if (componentName != null && componentName.contains(name))
+		{
+			if (componentName.equals(name))
+			{
+				exact.add(c);
+			}
+			contains.add(c);
+		}
+		if (c instanceof Container)
+		{
+			for (Component child : ((Container) c).getComponents())
+			{
+				scan(name, child, exact, contains);
+			}
+		}
+	}
+
+	private void install()
+	{
+		Toolkit.getDefaultToolkit().addAWTEventListener(this, AWTEvent.CONTAINER_EVENT_MASK | AWTEvent.WINDOW_EVENT_MASK);
+		rebuild();
+	}
+
+	@Override
+	public void eventDispatched(AWTEvent event)
+	{
+		switch (event.getID())
+		{
+			case ContainerEvent.COMPONENT_ADDED:
+				addTree(((ContainerEvent) event).getChild());
+				break;
+			case ContainerEvent.COMPONENT_REMOVED:
+				removeTree(((ContainerEvent) event).getChild());
+				break;
+			case WindowEvent.WINDOW_OPENED:
+				openWindow(((WindowEvent) event).getWindow());
+				break;
+			case WindowEvent.WINDOW_CLOSED:
+				closeWindow(((WindowEvent) event).getWindow());
+				break;
+			default:
+				break;
+		}
+	}
+
+	@Override
+	public synchronized void propertyChange(PropertyChangeEvent event)
+	{
+		Component c = (Component) event.getSource();
+		if (mIndexedNames.containsKey(c))
+		{
+			unindexName(c, mIndexedNames.get(c));
+			mIndexedNames.put(c, c.getName());
+			indexName(c, c.getName());
+		}
+	}
+
+	private synchronized void addTree(Component c)
+	{
+		if (!mIndexedNames.containsKey(c))
+		{
+			c.addPropertyChangeListener(NAME_PROPERTY, this);
+			mIndexedNames.put(c, c.getName());
+			indexName(c, c.getName());
+		}
+		if (c instanceof Container)
+		{
+			for (Component child : ((Container) c).getComponents())
+			{
+				addTree(child);
+			}
+		}
+	}
+
+	private synchronized void openWindow(Window window)
+	{
+		mClosedWindows.remove(window);
+		addTree(window);
+	}
+
+	/**
+	 * Removes the tree of a closed (disposed) window from the index. The window stays in
+	 * {@link Window#getWindows()} until it is garbage collected, so it is remembered as closed
+	 * until it is opened again.
+	 */
+	private synchronized void closeWindow(Window window)
+	{
+		mClosedWindows.add(window);
+		unindexTree(window);
+	}
+
+	private synchronized void removeTree(Component c)
+	{
+		if (c instanceof Window)
+		{
+			// windows stay reachable through Window.getWindows() even if removed from their owner
+			return;
+		}
+		unindexTree(c);
+	}
+
+	private synchronized void unindexTree(Component c)
+	{
+		if (mIndexedNames.containsKey(c))
+		{
+			c.removePropertyChangeListener(NAME_PROPERTY, this);
+			unindexName(c, mIndexedNames.remove(c));
+		}
+		if (c instanceof Container)
+		{
+			for (Component child : ((Container) c).getComponents())
+			{
+				unindexTree(child);
+			}
+		}
+	}
+
+	private void indexName(Component c, String name)
+	{
+		if (name == null)
+		{
+			return;
+		}
+		Set<Component> components = mComponentsByName.get(name);
+		if (components == null)
+		{
+			components = new LinkedHashSet<Component>();
+			mComponentsByName.put(name, components);
+		}
+		components.add(c);
+	}
+
+	private void unindexName(Component c, String name)
+	{
+		if (name == null)
+		{
+			return;
+		}
+		Set<Component> components = mComponentsByName.get(name);
+		if (components != null)
+		{
+			components.remove(c);
+			if (components.isEmpty())
+			{
+				mComponentsByName.remove(name);
+			}
+		}
+	}
+
+	private ComponentIndex() {}
+
+	/** name under which each known component is indexed (<code>null</code> if unnamed). */
+	private final Map<Component, String> mIndexedNames = new WeakHashMap<Component, String>();
+	/** components by name, sorted by name for prefix lookups. */
+	private final TreeMap<String, Set<Component>> mComponentsByName = new TreeMap<String, Set<Component>>();
+
+	/** windows closed and not opened again, not indexed although still listed by {@link Window#getWindows()}. */
+	private final Set<Window> mClosedWindows = Collections.newSetFromMap(new WeakHashMap<Window, Boolean>());
+
+	/** identifiers of the components, see {@link #getComponentId(Component)}. */
+	private final Map<Component, Integer> mComponentIds = new WeakHashMap<Component, Integer>();
+	private int mLastComponentId;
+
+	private static ComponentIndex INSTANCE;
+	private static final String NAME_PROPERTY = "name";
+	private static final boolean VALIDATE = Boolean.getBoolean("qtaste.javagui.index.validate");
+	private static final Logger LOGGER = Logger.getLogger(ComponentIndex.class);
+}
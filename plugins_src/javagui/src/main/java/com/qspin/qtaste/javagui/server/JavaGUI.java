@@ -28,6 +28,8 @@ import java.util.List;
 
 import org.apache.log4j.Logger;
 
+import com.qspin.qtaste.javagui.JavaGUICommandResult;
+import com.qspin.qtaste.javagui.JavaGUIComponentChange;
 import com.qspin.qtaste.tcom.jmx.impl.JMXAgent;
 import com.qspin.qtaste.testsuite.QTasteException;
 import com.qspin.qtaste.testsuite.QTasteTestFailException;
@@ -332,6 +334,18 @@ public class JavaGUI extends JMXAgent implements JavaGUIMBean {
 		new StructureAnalyzer().executeCommand(COMPONENT_ENABLED_TIMEOUT, null, fileName);
 	}
 
+	@Override
+	public JavaGUIComponentChange[] getStructureChanges() throws QTasteException {
+		LOGGER.trace("getStructureChanges()");
+		return new StructureChangesGetter().executeCommand(COMPONENT_ENABLED_TIMEOUT, null);
+	}
+
+	@Override
+	public JavaGUICommandResult[] executeCommands(String[] verbs, Object[][] arguments, boolean stopOnError) throws QTasteException {
+		LOGGER.trace("executeCommands(" + (verbs == null ? 0 : verbs.length) + " command(s), " + stopOnError + ")");
+		return new CommandsExecutor(this).executeCommands(verbs, arguments, stopOnError);
+	}
+
 	private static int COMPONENT_ENABLED_TIMEOUT = 10;
 	private static Logger LOGGER = Logger.getLogger(JavaGUI.class);
 }
@@ -45,6 +45,7 @@ public class PopupButtonClicker extends UpdateComponentCommander {
 	public Boolean executeCommand(int timeout, String componentName, Object... data) throws QTasteException {
 		setData(data);
 		long maxTime = System.currentTimeMillis() + 1000 * timeout;
+		boolean inSwingThread = SwingUtilities.isEventDispatchThread();
 		String buttonText = mData[0].toString();
 		component = null;
 		
@@ -74,7 +75,7 @@ public class PopupButtonClicker extends UpdateComponentCommander {
 			}
 			component = findButtonComponent(targetPopup, buttonText);
 			
-			if ( component != null && component.isEnabled() && checkComponentIsVisible(component) )
+			if ( inSwingThread || (component != null && component.isEnabled() && checkComponentIsVisible(component)) )
 				break;
 			
 			try {
@@ -95,8 +96,13 @@ public class PopupButtonClicker extends UpdateComponentCommander {
 			throw new QTasteTestFailException("The button with the text \"" + buttonText + "\" is not visible!");
 		
 		prepareActions();
-		SwingUtilities.invokeLater(this);
-		synchronizeThreads();
+		if ( inSwingThread )
+		{
+			doActionsInSwingThread();
+		} else {
+			SwingUtilities.invokeLater(this);
+			synchronizeThreads();
+		}
 		return true;
 	}
 	
@@ -47,6 +47,7 @@ public class PopupTextSetter extends UpdateComponentCommander {
 	public Boolean executeCommand(int timeout, String componentName, Object... data) throws QTasteException {
 		setData(data);
 		long maxTime = System.currentTimeMillis() + 1000 * timeout;
+		boolean inSwingThread = SwingUtilities.isEventDispatchThread();
 		
 		while ( System.currentTimeMillis() < maxTime )
 		{
@@ -74,7 +75,7 @@ public class PopupTextSetter extends UpdateComponentCommander {
 			}
 			component = findTextComponent(targetPopup);
 			
-			if ( component != null && component.isEnabled() && checkComponentIsVisible(component) )
+			if ( inSwingThread || (component != null && component.isEnabled() && checkComponentIsVisible(component)) )
 				break;
 			
 			try {
@@ -96,8 +97,13 @@ public class PopupTextSetter extends UpdateComponentCommander {
 		
 		
 		prepareActions();
-		SwingUtilities.invokeLater(this);
-		synchronizeThreads();
+		if ( inSwingThread )
+		{
+			doActionsInSwingThread();
+		} else {
+			SwingUtilities.invokeLater(this);
+			synchronizeThreads();
+		}
 		
 		return true;
 	}
@@ -21,11 +21,19 @@ package com.qspin.qtaste.javagui.server;
 
 import java.awt.Component;
 import java.awt.Container;
-import java.awt.Frame;
 import java.awt.Window;
 import java.io.BufferedWriter;
-import java.io.FileWriter;
+import java.io.FileOutputStream;
 import java.io.IOException;
+import java.io.OutputStream;
+import java.io.OutputStreamWriter;
+import java.util.zip.GZIPOutputStream;
+
+import javax.swing.AbstractButton;
+import javax.swing.JLabel;
+import javax.swing.JPasswordField;
+import javax.swing.text.JTextComponent;
+
 import org.apache.log4j.Logger;
 
 import com.qspin.qtaste.testsuite.QTasteException;
@@ -38,20 +46,23 @@ final class StructureAnalyzer extends ComponentCommander {
 
 	/**
 	* Analyze the structure of a java application and save it in the specified filename in the current working directory.
+	* The file is streamed while browsing the components, and compressed with gzip if its name ends with ".gz".
 	* @return null
 	*/
 	@Override
 	Object executeCommand(int timeout, String componentName, Object... data) throws QTasteException {
 		try {
 			prepareWriter(data[0].toString());
-			for ( int i=0; i<Frame.getWindows().length; ++i )
-			{
-				Window windows = Frame.getWindows()[i];
-				analyzeComponent(windows, 1);
+			try {
+				for (Window window : Window.getWindows())
+				{
+					analyzeComponent(window, 1);
+				}
+				mWriter.write("</root>");
+				mWriter.newLine();
+			} finally {
+				mWriter.close();
 			}
-			mWriter.write("</root>");
-			mWriter.flush();
-			mWriter.close();
 		} catch (IOException e) {
 			throw new QTasteTestFailException("Error saving to file" + data[0].toString() + ":", e);
 		}
@@ -59,59 +70,48 @@ final class StructureAnalyzer extends ComponentCommander {
 		return null;
 	}
 
-	protected void analyzeComponent(Component pComponent, int pLevel) throws IOException
+	/**
+	 * Gets the text displayed by a component, if any.
+	 * @param pComponent the component.
+	 * @return the text of labels, buttons and text components (except password fields), <code>null</code> otherwise.
+	 */
+	static String getComponentText(Component pComponent)
 	{
-		Class<?> componentClass = pComponent.getClass();
-		String componentName = componentClass.getName().replace(componentClass.getPackage().getName() +".", "");
-		String componentText = null;
-		componentName = componentName.replace('$', '_');
-
-		if (componentClass.getName() == "javax.swing.JButton")
+		if (pComponent instanceof AbstractButton)
 		{
-			componentText = ((javax.swing.JButton) pComponent).getText();
+			return ((AbstractButton) pComponent).getText();
 		}
-		else if (componentClass.getName() == "javax.swing.JToggleButton")
+		else if (pComponent instanceof JLabel)
 		{
-			componentText = ((javax.swing.JToggleButton) pComponent).getText();
+			return ((JLabel) pComponent).getText();
 		}
-		else if (componentClass.getName() == "javax.swing.JRadioButton")
+		else if (pComponent instanceof JTextComponent && !(pComponent instanceof JPasswordField))
 		{
-			componentText = ((javax.swing.JRadioButton) pComponent).getText();
-		}
-		else if (componentClass.getName() == "javax.swing.JLabel")
-		{
-			componentText = ((javax.swing.JLabel) pComponent).getText();
-		}
-		else if (componentClass.getName() == "javax.swing.JTextField")
-		{
-			componentText = ((javax.swing.JTextField) pComponent).getText();
-		}
-		else if (componentClass.getName() == "javax.swing.JFormattedTextField")
-		{
-			componentText = ((javax.swing.JFormattedTextField) pComponent).getText();
-		}
-		else if (componentClass.getName() == "javax.swing.JTextArea")
-		{
-			componentText = ((javax.swing.JTextArea) pComponent).getText();
+			return ((JTextComponent) pComponent).getText();
 		}
+		return null;
+	}
+
+	protected void analyzeComponent(Component pComponent, int pLevel) throws IOException
+	{
+		String componentText = getComponentText(pComponent);
+		String description = "<component id=\"" + ComponentIndex.getInstance().getComponentId(pComponent) + "\""
+				+ " class=\"" + pComponent.getClass().getName() + "\""
+				+ " name=\"" + escape(pComponent.getName()) + "\""
+				+ ((componentText == null || componentText.equals("")) ? "" : " text=\"" + escape(componentText) + "\"");
 
 		if ( pComponent instanceof Container && ((Container)pComponent).getComponentCount() > 0 )
 		{
-			writeComponent("<component class=\"" + componentClass.getName() + "\" name=\""+ pComponent.getName() + "\""
-					+ ((componentText != null && componentText.equals(""))?"":" text=\"" + componentText + "\"")
-					+ ">", pLevel);
-			for ( int i=0; i<((Container)pComponent).getComponentCount(); ++i )
+			writeComponent(description + ">", pLevel);
+			for (Component c : ((Container)pComponent).getComponents())
 			{
-				Component c = ((Container)pComponent).getComponent(i);
 				analyzeComponent(c, pLevel+1);
 			}
 			writeComponent("</component>", pLevel);
 		}
 		else
 		{
-			writeComponent("<component class=\"" + componentClass.getName() + "\" name=\""+ pComponent.getName() + "\""
-					+ ((componentText != null && componentText.equals(""))?"":" text=\"" + componentText + "\"")
-					+ "></component>", pLevel);
+			writeComponent(description + "></component>", pLevel);
 		}
 	}
 
@@ -119,24 +119,35 @@ final class StructureAnalyzer extends ComponentCommander {
 		if (fileName.equals("")) {
 			fileName = "struct.xml";
 		}
-		mWriter = new BufferedWriter( new FileWriter(fileName));
-		mWriter.write("<?xml version=\"1.0\"?>");
+		OutputStream output = new FileOutputStream(fileName);
+		if (fileName.endsWith(".gz")) {
+			output = new GZIPOutputStream(output);
+		}
+		mWriter = new BufferedWriter(new OutputStreamWriter(output, "UTF-8"));
+		mWriter.write("<?xml version=\"1.0\" encoding=\"UTF-8\"?>");
 		mWriter.newLine();
 		mWriter.write("<root>");
 		mWriter.newLine();
 	}
 
 	protected void writeComponent(String pText, int pLevel) throws IOException {
-		StringBuilder builder = new StringBuilder();
 		for ( int i=0; i<pLevel; ++i){
-			builder.append("   ");
+			mWriter.write("   ");
 		}
-		builder.append(pText);
-		mWriter.write(builder.toString());
+		mWriter.write(pText);
 		mWriter.newLine();
 	}
 
+	private static String escape(String pValue)
+	{
+		if (pValue == null)
+		{
+			return "null";
+		}
+		return pValue.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\"", "&quot;");
+	}
+
 	protected BufferedWriter mWriter;
 	private static Logger LOGGER = Logger.getLogger(StructureAnalyzer.class);
 
-}
\ No newline at end of file
+}
@@ -0,0 +1,163 @@
+/*
+    Copyright 2007-2012 QSpin - www.qspin.be
+
+    This file is part of QTaste framework.
+
+    QTaste is free software: you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    QTaste is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public License
+    along with QTaste. If not, see <http://www.gnu.org/licenses/>.
+*/
+
+package com.qspin.qtaste.javagui.server;
+
+import java.awt.Component;
+import java.awt.Container;
+import java.awt.Window;
+import java.lang.reflect.InvocationTargetException;
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+import javax.swing.SwingUtilities;
+
+import com.qspin.qtaste.javagui.JavaGUIComponentChange;
+import com.qspin.qtaste.javagui.JavaGUIComponentChange.Type;
+import com.qspin.qtaste.testsuite.QTasteException;
+
+/**
+ * Component asker which takes a snapshot of the whole component tree and returns the components
+ * which have changed since the previous snapshot. The first snapshot returns all the components as added.
+ */
+final class StructureChangesGetter extends ComponentCommander implements Runnable {
+
+	/**
+	 * Takes a new snapshot of the component tree and compares it with the previous one.
+	 * @return the changes since the previous snapshot.
+	 */
+	@Override
+	JavaGUIComponentChange[] executeCommand(int timeout, String componentName, Object... data) throws QTasteException {
+		try {
+			if (SwingUtilities.isEventDispatchThread()) {
+				run();
+			} else {
+				SwingUtilities.invokeAndWait(this);
+			}
+		} catch (InterruptedException e) {
+			throw new QTasteException("Structure snapshot interrupted", e);
+		} catch (InvocationTargetException e) {
+			throw new QTasteException("Error while taking the structure snapshot: " + e.getCause(), e.getCause());
+		}
+
+		synchronized (StructureChangesGetter.class)
+		{
+			List<JavaGUIComponentChange> changes = new ArrayList<JavaGUIComponentChange>();
+			for (Map.Entry<Integer, ComponentState> entry : mSnapshot.entrySet())
+			{
+				ComponentState previous = PREVIOUS_SNAPSHOT.remove(entry.getKey());
+				ComponentState current = entry.getValue();
+				if (previous == null)
+				{
+					changes.add(current.toChange(Type.ADDED, entry.getKey()));
+				}
+				else if (!previous.equals(current))
+				{
+					changes.add(current.toChange(Type.CHANGED, entry.getKey()));
+				}
+			}
+			for (Map.Entry<Integer, ComponentState> entry : PREVIOUS_SNAPSHOT.entrySet())
+			{
+				changes.add(entry.getValue().toChange(Type.REMOVED, entry.getKey()));
+			}
+			PREVIOUS_SNAPSHOT = mSnapshot;
+			LOGGER.trace(changes.size() + " component(s) changed since the previous structure snapshot");
+			return changes.toArray(new JavaGUIComponentChange[changes.size()]);
+		}
+	}
+
+	public void run()
+	{
+		mSnapshot = new HashMap<Integer, ComponentState>();
+		for (Window window : Window.getWindows())
+		{
+			takeSnapshot(window, 0);
+		}
+	}
+
+	private void takeSnapshot(Component c, int parentId)
+	{
+		int id = ComponentIndex.getInstance().getComponentId(c);
+		mSnapshot.put(id, new ComponentState(c, parentId));
+		if (c instanceof Container)
+		{
+			for (Component child : ((Container) c).getComponents())
+			{
+				takeSnapshot(child, id);
+			}
+		}
+	}
+
+	/**
+	 * State of a component in a snapshot.
+	 */
+	private static final class ComponentState {
+
+		ComponentState(Component c, int parentId)
+		{
+			mParentId = parentId;
+			mClassName = c.getClass().getName();
+			mName = c.getName();
+			mText = StructureAnalyzer.getComponentText(c);
+			mEnabled = c.isEnabled();
+			mVisible = c.isVisible();
+		}
+
+		JavaGUIComponentChange toChange(Type type, int id)
+		{
+			return new JavaGUIComponentChange(type, id, mParentId, mClassName, mName, mText, mEnabled, mVisible);
+		}
+
+		@Override
+		public boolean equals(Object o)
+		{
+			if (!(o instanceof ComponentState))
+			{
+				return false;
+			}
+			ComponentState other = (ComponentState) o;
+			return mParentId == other.mParentId && mEnabled == other.mEnabled && mVisible == other.mVisible
+					&& equals(mName, other.mName) && equals(mText, other.mText);
+		}
+
+		@Override
+		public int hashCode()
+		{
+			return mParentId;
+		}
+
+		private static boolean equals(String s1, String s2)
+		{
+			return s1 == null ? s2 == null : s1.equals(s2);
+		}
+
+		private final int mParentId;
+		private final String mClassName;
+		private final String mName;
+		private final String mText;
+		private final boolean mEnabled;
+		private final boolean mVisible;
+	}
+
+	private Map<Integer, ComponentState> mSnapshot;
+	/** snapshot taken by the previous call, guarded by the class lock. */
+	private static Map<Integer, ComponentState> PREVIOUS_SNAPSHOT = new HashMap<Integer, ComponentState>();
+}
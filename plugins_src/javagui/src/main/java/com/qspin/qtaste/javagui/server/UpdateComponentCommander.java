@@ -20,11 +20,9 @@
 package com.qspin.qtaste.javagui.server;
 
 import java.awt.Component;
-import java.awt.Container;
 import java.awt.Window;
 import java.awt.Dialog;
 import java.lang.reflect.InvocationTargetException;
-import java.util.ArrayList;
 import java.util.List;
 
 import javax.swing.SwingUtilities;
@@ -40,11 +38,13 @@ abstract class UpdateComponentCommander extends ComponentCommander implements Ru
 		this.componentName = componentName;
 		setData(data);
 		m_maxTime = System.currentTimeMillis() + 1000 * timeout;
+		// when called from the swing thread (batch of commands), the GUI cannot change while waiting
+		boolean inSwingThread = SwingUtilities.isEventDispatchThread();
 
 		while ( System.currentTimeMillis() < m_maxTime )
 		{
 			component = getComponentByName(componentName);
-			if ( component != null && component.isEnabled() && checkComponentIsVisible(component) )
+			if ( inSwingThread || (component != null && component.isEnabled() && checkComponentIsVisible(component)) )
 				break;
 			try {
 				Thread.sleep(1000);
@@ -74,8 +74,13 @@ abstract class UpdateComponentCommander extends ComponentCommander implements Ru
 	    	//throw new QTasteException("Unable to activate/focus the parent window!");
 	    }
 
-		SwingUtilities.invokeLater(this);
-		synchronizeThreads();
+		if ( inSwingThread )
+		{
+			doActionsInSwingThread();
+		} else {
+			SwingUtilities.invokeLater(this);
+			synchronizeThreads();
+		}
 
 		return true;
 	}
@@ -105,37 +110,14 @@ abstract class UpdateComponentCommander extends ComponentCommander implements Ru
 	}
 
 	protected Component getComponentByName(String name) throws QTasteTestFailException {
-		mFoundComponents = new ArrayList<Component>();
 		mFoundComponent = null;
 		mFindWithEqual = false;
 		LOGGER.debug("try to find a component with the name : " + name);
 		// TODO: Think about several component having the same names!
-		//search for all components which contains the name
-		Window[] windows = Window.getWindows();
-		for (Window window : windows) {
-//			LOGGER.debug("parse window");
-			if ( checkName(name, window) )
-			{
-				mFoundComponents.add(window);
-			}
-			lookForComponent(name, window.getComponents());
-		}
-		LOGGER.trace( mFoundComponents.size() + " component(s) found with the contains");
-
-		//if equals the remove others
-		if ( mFindWithEqual )
-		{
-			for (int i=0; i<mFoundComponents.size(); )
-			{
-				if (!mFoundComponents.get(i).getName().equals(name))
-				{
-					mFoundComponents.remove(i);
-				} else {
-					i++;
-				}
-			}
-			LOGGER.trace( mFoundComponents.size() + " component(s) found with the equals");
-		}
+		//search for all components which contains the name (or only the ones having exactly the name, if any)
+		mFoundComponents = ComponentIndex.getInstance().findComponents(name);
+		mFindWithEqual = !mFoundComponents.isEmpty() && name.equals(mFoundComponents.get(0).getName());
+		LOGGER.trace( mFoundComponents.size() + " component(s) found" + (mFindWithEqual ? " with the equals" : " with the contains"));
 
 		//Remove invisible components
 		for (int i=0; i<mFoundComponents.size(); )
@@ -166,23 +148,6 @@ abstract class UpdateComponentCommander extends ComponentCommander implements Ru
 		return null;
 	}
 
-	protected Component lookForComponent(String name, Component[] components) {
-		for (int i = 0; i < components.length; i++) {
-			//String componentName = ComponentNamer.getInstance().getNameForComponent(components[c]);
-			Component c = components[i];
-			if ( checkName(name, c) )
-			{
-				LOGGER.debug("Component " + c.getName() + " added to the list of found components");
-				mFoundComponents.add(c);
-			}
-			if (c instanceof Container) {
-//				LOGGER.trace("Will parse the container " + c.getName() );
-				lookForComponent(name, ((Container) c).getComponents());
-			}
-		}
-		return null;
-	}
-
 	protected boolean checkComponentIsVisible(Component c)
 	{
 		Component currentComponent = c;
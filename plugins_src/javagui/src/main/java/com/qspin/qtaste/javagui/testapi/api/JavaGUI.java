@@ -19,8 +19,16 @@
 
 package com.qspin.qtaste.javagui.testapi.api;
 
+import com.qspin.qtaste.javagui.client.JavaGUIBatch;
 import com.qspin.qtaste.kernel.testapi.MultipleInstancesComponent;
 
 public interface JavaGUI extends com.qspin.qtaste.javagui.JavaGUI, MultipleInstancesComponent {
 
+	/**
+	 * Creates a new batch of commands. Commands added to the batch using the same verbs as this component
+	 * (e.g. <code>batch.setText("name", "value")</code>) are only collected, and are executed all together
+	 * in one remote call by {@link JavaGUIBatch#execute()}.
+	 * @return a new empty batch of commands.
+	 */
+	JavaGUIBatch createBatch();
 }
@@ -20,8 +20,13 @@
 package com.qspin.qtaste.javagui.testapi.impl;
 
 import com.qspin.qtaste.config.TestBedConfiguration;
+import com.qspin.qtaste.kernel.testapi.ComponentLifecycle;
 import com.qspin.qtaste.testsuite.QTasteException;
 
+/**
+ * The JMX connection is kept for all the data rows of a test script.
+ */
+@ComponentLifecycle(ComponentLifecycle.Scope.TEST_SCRIPT)
 public class JavaGUIImpl extends com.qspin.qtaste.javagui.client.JavaGUIImpl implements com.qspin.qtaste.javagui.testapi.api.JavaGUI {
 
 	public JavaGUIImpl(String instanceId) throws Exception
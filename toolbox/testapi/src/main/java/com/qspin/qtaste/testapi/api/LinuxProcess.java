@@ -23,5 +23,19 @@ public interface LinuxProcess extends Process {
 	 * @throws QTasteException If the process is not running.
 	 */
 	int getPid() throws QTasteException;
+
+	/**
+	 * Returns the CPU time (user and system) consumed by the process.
+	 * @return the CPU time in milliseconds.
+	 * @throws QTasteException If the process is not running.
+	 */
+	long getCpuTime() throws QTasteException;
+
+	/**
+	 * Returns the resident set size (physical memory used) of the process.
+	 * @return the resident set size in bytes.
+	 * @throws QTasteException If the process is not running.
+	 */
+	long getResidentSetSize() throws QTasteException;
 	
 }
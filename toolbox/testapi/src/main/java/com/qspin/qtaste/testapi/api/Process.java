@@ -44,6 +44,22 @@ public interface Process extends MultipleInstancesComponent {
 	 * @param pLimit The number of line to save.
 	 */
 	void setStdErrLimit(int pLimit);
+
+	/**
+	 * Writes all the lines of the standard output to a file, in addition to the last lines kept in memory.
+	 * The file is rotated when it exceeds 10 MB, the previous files being renamed with the .1 to .5 suffixes.
+	 * @param pFileName The spill file path or <code>null</code> to stop spilling.
+	 * @throws QTasteException if the file cannot be opened.
+	 */
+	void setStdOutSpillFile(String pFileName) throws QTasteException;
+
+	/**
+	 * Writes all the lines of the standard error output to a file, in addition to the last lines kept in memory.
+	 * The file is rotated when it exceeds 10 MB, the previous files being renamed with the .1 to .5 suffixes.
+	 * @param pFileName The spill file path or <code>null</code> to stop spilling.
+	 * @throws QTasteException if the file cannot be opened.
+	 */
+	void setStdErrSpillFile(String pFileName) throws QTasteException;
 	
 	/**
 	 * Returns the status of the process. If no process are specified, return {@link ProcessStatus#UNDEFINED}.
@@ -78,4 +94,42 @@ public interface Process extends MultipleInstancesComponent {
 	 * @throws QTasteException If the process is not running or stopped.
 	 */
 	List<String> getStdErr() throws QTasteException;
+
+	/**
+	 * Returns the lines of the standard output read after a given line.
+	 * The lines are numbered from 1; only the lines still kept are returned.
+	 * @param pSequenceNumber The sequence number of the last line already read, 0 to get all the lines kept.
+	 * @return the new lines of the process's standard output.
+	 * @throws QTasteException If the process is not running or stopped.
+	 * @see #getStdOutSequenceNumber()
+	 */
+	List<String> getStdOutSince(long pSequenceNumber) throws QTasteException;
+
+	/**
+	 * Returns the sequence number of the last line read from the standard output.
+	 * @return the sequence number of the last line read, 0 if no line has been read.
+	 * @throws QTasteException If the process is not running or stopped.
+	 */
+	long getStdOutSequenceNumber() throws QTasteException;
+
+	/**
+	 * Waits until the standard output contains a line matching a regular expression.
+	 * The lines already kept are checked first, then the waiting thread is woken up at each new line.
+	 * @param pRegex The regular expression to find in a line.
+	 * @param pTimeout The maximum time to wait, in milliseconds.
+	 * @return the first matching line or <code>null</code> if none is read before the timeout or the process end.
+	 * @throws QTasteException If the process is not running or stopped.
+	 */
+	String waitForOutput(String pRegex, long pTimeout) throws QTasteException;
+
+	/**
+	 * Waits until the standard output contains a line matching a regular expression, after a given line.
+	 * @param pRegex The regular expression to find in a line.
+	 * @param pSequenceNumber The sequence number of the last line not to check, 0 to check all the lines kept.
+	 * @param pTimeout The maximum time to wait, in milliseconds.
+	 * @return the first matching line or <code>null</code> if none is read before the timeout or the process end.
+	 * @throws QTasteException If the process is not running or stopped.
+	 * @see #getStdOutSequenceNumber()
+	 */
+	String waitForOutput(String pRegex, long pSequenceNumber, long pTimeout) throws QTasteException;
 }
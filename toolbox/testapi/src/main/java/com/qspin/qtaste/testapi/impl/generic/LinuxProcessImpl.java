@@ -1,10 +1,7 @@
 package com.qspin.qtaste.testapi.impl.generic;
 
-import java.io.BufferedReader;
 import java.io.IOException;
-import java.io.InputStreamReader;
-import java.util.ArrayList;
-import java.util.List;
+import java.util.Map;
 
 import com.qspin.qtaste.testapi.api.LinuxProcess;
 import com.qspin.qtaste.testapi.api.ProcessStatus;
@@ -20,10 +17,23 @@ public class LinuxProcessImpl extends ProcessImpl implements LinuxProcess {
 			throw new QTasteTestFailException("Cannot create a Linux process on a non Linux operating system.");
 	}
 
+	@Override
+	public void initialize() throws QTasteException {
+		super.initialize();
+		mPid = -1;
+	}
+
+	@Override
+	public void initialize(Map<String, String> pEnvUpdate, String workingDirectory, String... pProcessArguments) throws QTasteException {
+		super.initialize(pEnvUpdate, workingDirectory, pProcessArguments);
+		mPid = -1;
+	}
+
 	@Override
 	public void start() throws QTasteException {
 		super.start();
-		mPid = searchPid();
+		// the process is created by the start thread, its pid cannot be read before
+		mPid = waitForProcessCreation() != null ? searchPid() : -1;
 	}
 
 	@Override
@@ -53,8 +63,9 @@ public class LinuxProcessImpl extends ProcessImpl implements LinuxProcess {
 			
 			command +=  getPid();
 			LOGGER.trace("Kill the process " + getInstanceId() + " with the command : " + command);
-			Runtime.getRuntime().exec(command);
-			Thread.sleep(10000);
+			Runtime.getRuntime().exec(command).waitFor();
+			// wait until the process has actually exited instead of a fixed delay
+			waitForStop(KILL_TIMEOUT);
 			LOGGER.trace("Process " + getInstanceId() + " status : " + getStatus());
 			if ( getStatus() != ProcessStatus.STOPPED )
 				throw new QTasteTestFailException("The process " + getInstanceId() + " is still running.");
@@ -77,14 +88,36 @@ public class LinuxProcessImpl extends ProcessImpl implements LinuxProcess {
 			mPid = searchPid();
 		return mPid;
 	}
+
+	@Override
+	public long getCpuTime() throws QTasteException {
+		long cpuTime = LinuxProcessInspector.getInstance().getCpuTime(getPid());
+		if ( cpuTime < 0 )
+			throw new QTasteException("Unable to read the CPU time of the process " + getInstanceId() + ".");
+		return cpuTime;
+	}
+
+	@Override
+	public long getResidentSetSize() throws QTasteException {
+		long residentSetSize = LinuxProcessInspector.getInstance().getResidentSetSize(getPid());
+		if ( residentSetSize < 0 )
+			throw new QTasteException("Unable to read the resident set size of the process " + getInstanceId() + ".");
+		return residentSetSize;
+	}
 	
 	/**
 	 * Searches the process'identifier of the current process. If none found, return -1.
-	 * <br/> Only available for Unix process.
+	 * <br/> The identifier of the started process is used if it can be retrieved, otherwise the processes
+	 * are searched by command line in /proc.
+	 * <br/> Only available for Linux process.
 	 * @return the process'identifier or -1 if none found.
 	 */
 	protected synchronized int searchPid()
 	{
+		int pid = LinuxProcessInspector.getPid(mCurrentProcess);
+		if ( pid != -1 )
+			return pid;
+
 		//rebuild the process command
 		String cmd = "";
 		for (int i=0; i<mParameters.length; i++)
@@ -94,41 +127,13 @@ public class LinuxProcessImpl extends ProcessImpl implements LinuxProcess {
 			cmd += mParameters[i];
 		}
 
-		List<String> lines = new ArrayList<String>();		
-		//use ps command to list all processes and filter on the process command
-		try
-		{
-			java.lang.Process myProcess = Runtime.getRuntime().exec( "ps -eo pid,command" );  
-            BufferedReader stdout = new BufferedReader( new InputStreamReader( myProcess.getInputStream() ) ) ;  
-            String line = stdout.readLine();
-            while ( line != null )  
-            {
-            	if (line.contains(cmd) && !lines.contains(line))
-            	{
-            		LOGGER.info("line found for the process : " + line);
-					lines.add(line);
-            	}
-            	line = stdout.readLine();
-            }  
-            myProcess.waitFor() ;  
-		} catch (IOException e) {
-			LOGGER.error(e.getMessage(), e);
-		} catch (InterruptedException e) {
-			LOGGER.error(e.getMessage(), e);
-		}
-		
-		//get the last process and retrieve the pid (first value of the line)
-		if ( lines.size() >= 1 )
-		{
-			String line = lines.get(lines.size()-1).trim();
-			return Integer.parseInt(line.split(" ")[0]);
-		}
-		else
-		{
+		pid = LinuxProcessInspector.getInstance().searchPid(cmd);
+		if ( pid == -1 )
 			LOGGER.warn("unable to find the process pid");
-			return -1;
-		}
+		return pid;
 	}
 
-	protected int mPid;
+	protected int mPid = -1;
+	/** maximum time to wait for the end of a killed process, in milliseconds */
+	protected static final long KILL_TIMEOUT = 10000;
 }
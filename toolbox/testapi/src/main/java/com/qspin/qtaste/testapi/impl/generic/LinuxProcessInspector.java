@@ -0,0 +1,240 @@
+package com.qspin.qtaste.testapi.impl.generic;
+
+import java.io.ByteArrayOutputStream;
+import java.io.File;
+import java.io.FileInputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.lang.reflect.Field;
+import java.lang.reflect.Method;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.Map;
+import java.util.Set;
+
+import org.apache.log4j.Logger;
+
+/**
+ * Inspects the Linux processes through the /proc file system, without forking any command.
+ */
+public class LinuxProcessInspector {
+
+	/**
+	 * Returns the shared inspector, whose command lines cache is shared by all the Linux processes.
+	 * @return the shared inspector.
+	 */
+	public static LinuxProcessInspector getInstance()
+	{
+		return INSTANCE;
+	}
+
+	/**
+	 * Returns the identifier of a process started by this JVM.
+	 * <br/> Uses <code>Process.pid()</code> on Java 9+ and the pid field of the UNIX process implementation otherwise.
+	 * @param pProcess the process.
+	 * @return the process'identifier or -1 if it cannot be retrieved.
+	 */
+	public static int getPid(java.lang.Process pProcess)
+	{
+		if ( pProcess == null )
+			return -1;
+		try
+		{
+			Method pidMethod = pProcess.getClass().getMethod("pid");
+			return ((Number) pidMethod.invoke(pProcess)).intValue();
+		} catch (NoSuchMethodException e) {
+			// before Java 9
+		} catch (Exception e) {
+			LOGGER.debug("Unable to call pid() on the process : " + e.getMessage());
+		}
+		try
+		{
+			Field pidField = pProcess.getClass().getDeclaredField("pid");
+			pidField.setAccessible(true);
+			return pidField.getInt(pProcess);
+		} catch (Exception e) {
+			LOGGER.debug("Unable to get the pid field of the process : " + e.getMessage());
+			return -1;
+		}
+	}
+
+	/**
+	 * Searches the most recently started process whose command line contains the given command.
+	 * <br/> The command lines are read from /proc/&lt;pid&gt;/cmdline and cached by pid and start time.
+	 * @param pCommand the command, with its arguments separated by spaces.
+	 * @return the process'identifier or -1 if none found.
+	 */
+	public synchronized int searchPid(String pCommand)
+	{
+		File[] processDirectories = PROC_DIRECTORY.listFiles();
+		if ( processDirectories == null )
+		{
+			LOGGER.warn("Unable to list the processes in " + PROC_DIRECTORY);
+			return -1;
+		}
+		int foundPid = -1;
+		long foundStartTime = -1;
+		Set<Integer> existingPids = new HashSet<Integer>();
+		for (File processDirectory : processDirectories)
+		{
+			int pid;
+			try
+			{
+				pid = Integer.parseInt(processDirectory.getName());
+			} catch (NumberFormatException e) {
+				// not a process directory
+				continue;
+			}
+			String[] stat = readStat(pid);
+			if ( stat == null )
+				continue;
+			existingPids.add(pid);
+			long startTime = Long.parseLong(stat[STAT_START_TIME]);
+			CommandLine commandLine = mCommandLines.get(pid);
+			if ( commandLine == null || commandLine.mStartTime != startTime )
+			{
+				String command = readCommandLine(pid);
+				if ( command == null )
+					continue;
+				commandLine = new CommandLine(startTime, command);
+				mCommandLines.put(pid, commandLine);
+			}
+			if ( commandLine.mCommand.contains(pCommand) && startTime >= foundStartTime )
+			{
+				LOGGER.info("process found for the command : " + pid + " " + commandLine.mCommand);
+				foundPid = pid;
+				foundStartTime = startTime;
+			}
+		}
+		mCommandLines.keySet().retainAll(existingPids);
+		return foundPid;
+	}
+
+	/**
+	 * Returns the CPU time consumed by a process (user and system), read from /proc/&lt;pid&gt;/stat.
+	 * @param pPid the process'identifier.
+	 * @return the CPU time in milliseconds or -1 if the process doesn't exist.
+	 */
+	public long getCpuTime(int pPid)
+	{
+		String[] stat = readStat(pPid);
+		if ( stat == null )
+			return -1;
+		long ticks = Long.parseLong(stat[STAT_USER_TIME]) + Long.parseLong(stat[STAT_SYSTEM_TIME]);
+		return ticks * 1000 / CLOCK_TICKS_PER_SECOND;
+	}
+
+	/**
+	 * Returns the resident set size of a process, read from /proc/&lt;pid&gt;/status.
+	 * @param pPid the process'identifier.
+	 * @return the resident set size in bytes or -1 if the process doesn't exist.
+	 */
+	public long getResidentSetSize(int pPid)
+	{
+		String status = readFile(new File(PROC_DIRECTORY, pPid + File.separator + "status"));
+		if ( status == null )
+			return -1;
+		for (String line : status.split("\n"))
+		{
+			if ( line.startsWith("VmRSS:") )
+			{
+				// value in kB
+				String value = line.substring("VmRSS:".length()).trim().split("\\s+")[0];
+				return Long.parseLong(value) * 1024;
+			}
+		}
+		// kernel thread or zombie process
+		return 0;
+	}
+
+	/**
+	 * Reads the fields of /proc/&lt;pid&gt;/stat following the process name.
+	 * @return the fields, the first one being the process state, or <code>null</code> if the process doesn't exist.
+	 */
+	protected String[] readStat(int pPid)
+	{
+		String stat = readFile(new File(PROC_DIRECTORY, pPid + File.separator + "stat"));
+		if ( stat == null )
+			return null;
+		// the process name is between parentheses and may contain spaces
+		int nameEnd = stat.lastIndexOf(')');
+		if ( nameEnd < 0 )
+			return null;
+		String[] fields = stat.substring(nameEnd + 1).trim().split(" ");
+		if ( fields.length <= STAT_START_TIME )
+			return null;
+		return fields;
+	}
+
+	/**
+	 * Reads /proc/&lt;pid&gt;/cmdline, whose arguments are separated by null characters.
+	 * @return the command line with the arguments separated by spaces, as displayed by ps, or <code>null</code> if the process doesn't exist.
+	 */
+	protected String readCommandLine(int pPid)
+	{
+		String commandLine = readFile(new File(PROC_DIRECTORY, pPid + File.separator + "cmdline"));
+		if ( commandLine == null )
+			return null;
+		return commandLine.replace('\0', ' ').trim();
+	}
+
+	/**
+	 * Reads a /proc file, whose size is not known in advance.
+	 * @return the file content or <code>null</code> if it cannot be read.
+	 */
+	protected static String readFile(File pFile)
+	{
+		InputStream input = null;
+		try
+		{
+			input = new FileInputStream(pFile);
+			ByteArrayOutputStream content = new ByteArrayOutputStream();
+			byte[] buffer = new byte[4096];
+			int length;
+			while ( (length = input.read(buffer)) > 0 )
+			{
+				content.write(buffer, 0, length);
+			}
+			return content.toString();
+		} catch (IOException e) {
+			// process has terminated or is not accessible
+			return null;
+		}
+		finally
+		{
+			if ( input != null )
+			{
+				try
+				{
+					input.close();
+				} catch (IOException e) {
+					LOGGER.debug("Unable to close " + pFile + " : " + e.getMessage());
+				}
+			}
+		}
+	}
+
+	protected static class CommandLine
+	{
+		protected CommandLine(long pStartTime, String pCommand)
+		{
+			mStartTime = pStartTime;
+			mCommand = pCommand;
+		}
+
+		protected final long mStartTime;
+		protected final String mCommand;
+	}
+
+	protected final Map<Integer, CommandLine> mCommandLines = new HashMap<Integer, CommandLine>();
+
+	protected static final File PROC_DIRECTORY = new File("/proc");
+	/** indexes of the /proc/&lt;pid&gt;/stat fields following the process name (field 3 of proc(5) is at index 0) */
+	protected static final int STAT_USER_TIME = 11;
+	protected static final int STAT_SYSTEM_TIME = 12;
+	protected static final int STAT_START_TIME = 19;
+	/** USER_HZ, the unit of the times in /proc/&lt;pid&gt;/stat, is 100 on all Linux architectures */
+	protected static final long CLOCK_TICKS_PER_SECOND = 100;
+	protected static final Logger LOGGER = Logger.getLogger(LinuxProcessInspector.class);
+	private static final LinuxProcessInspector INSTANCE = new LinuxProcessInspector();
+}
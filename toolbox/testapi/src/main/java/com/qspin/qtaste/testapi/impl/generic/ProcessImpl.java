@@ -5,6 +5,7 @@ import java.io.IOException;
 import java.util.Arrays;
 import java.util.List;
 import java.util.Map;
+import java.util.regex.Pattern;
 
 import org.apache.log4j.Logger;
 
@@ -12,6 +13,7 @@ import com.qspin.qtaste.testapi.api.Process;
 import com.qspin.qtaste.testapi.api.ProcessStatus;
 import com.qspin.qtaste.testsuite.QTasteException;
 import com.qspin.qtaste.util.InputStreamWriter;
+import com.qspin.qtaste.util.OutputLinesBuffer;
 
 public class ProcessImpl implements Process {
 
@@ -46,18 +48,28 @@ public class ProcessImpl implements Process {
 		{
 			throw new QTasteException("Invalide state. Cannot start a non initialized process.");
 		}
+		synchronized (this)
+		{
+			mCurrentProcess = null;
+			mStdLogs = null;
+			mErrLogs = null;
+			// set before starting the thread so that the outputs can be waited for as soon as this method returns
+			mStatus = ProcessStatus.RUNNING;
+		}
 		new Thread(new Runnable() {
 			@Override
 			public void run() {
 				try
 				{
-					mStatus = ProcessStatus.RUNNING;
-					mCurrentProcess = mBuilder.start();
-					mStdLogs = new InputStreamWriter(getInstanceId(), mCurrentProcess.getInputStream());
-					new Thread(mStdLogs).start();
-					mErrLogs = new InputStreamWriter(getInstanceId(), mCurrentProcess.getErrorStream());
-					new Thread(mErrLogs).start();
-					mReturnCode = mCurrentProcess.waitFor();
+					java.lang.Process process = mBuilder.start();
+					synchronized (ProcessImpl.this)
+					{
+						mStdLogs = createOutputWriter(process.getInputStream(), mStdOutLimit, mStdOutSpillFile);
+						mErrLogs = createOutputWriter(process.getErrorStream(), mStdErrLimit, mStdErrSpillFile);
+						mCurrentProcess = process;
+						ProcessImpl.this.notifyAll();
+					}
+					mReturnCode = process.waitFor();
 				} catch (IOException e) {
 					LOGGER.error(e.getMessage(), e);
 				} catch (InterruptedException e) {
@@ -65,7 +77,11 @@ public class ProcessImpl implements Process {
 				}
 				finally
 				{
-					mStatus = ProcessStatus.STOPPED;
+					synchronized (ProcessImpl.this)
+					{
+						mStatus = ProcessStatus.STOPPED;
+						ProcessImpl.this.notifyAll();
+					}
 				}
 			}
 		}).start();
@@ -73,6 +89,21 @@ public class ProcessImpl implements Process {
 	
 	
 
+	/**
+	 * Creates and starts the writer capturing an output of the process.
+	 */
+	protected InputStreamWriter createOutputWriter(java.io.InputStream pOutput, int pLimit, String pSpillFile) throws IOException
+	{
+		InputStreamWriter writer = new InputStreamWriter(getInstanceId(), pOutput);
+		writer.setBufferLimit(pLimit);
+		if ( pSpillFile != null )
+		{
+			writer.setSpillFile(new File(pSpillFile));
+		}
+		writer.start();
+		return writer;
+	}
+
 	@Override
 	public void initialize(Map<String, String> pEnvUpdate, String workingDirectory, String... pProcessArguments) throws QTasteException {
 		 mBuilder = new ProcessBuilder(Arrays.asList(pProcessArguments));
@@ -85,17 +116,54 @@ public class ProcessImpl implements Process {
 			 }
 		 }
 		 mParameters = pProcessArguments;
+		 mCurrentProcess = null;
 		 mStatus = ProcessStatus.READY_TO_START;
 	}
 
 	@Override
-	public void setStdOutLimit(int pLimit) {
-		mStdLogs.setBufferLimit(pLimit);
+	public synchronized void setStdOutLimit(int pLimit) {
+		mStdOutLimit = pLimit;
+		if ( mStdLogs != null )
+		{
+			mStdLogs.setBufferLimit(pLimit);
+		}
 	}
 
 	@Override
-	public void setStdErrLimit(int pLimit) {
-		mErrLogs.setBufferLimit(pLimit);
+	public synchronized void setStdErrLimit(int pLimit) {
+		mStdErrLimit = pLimit;
+		if ( mErrLogs != null )
+		{
+			mErrLogs.setBufferLimit(pLimit);
+		}
+	}
+
+	@Override
+	public synchronized void setStdOutSpillFile(String pFileName) throws QTasteException {
+		mStdOutSpillFile = pFileName;
+		if ( mStdLogs != null )
+		{
+			setSpillFile(mStdLogs, pFileName);
+		}
+	}
+
+	@Override
+	public synchronized void setStdErrSpillFile(String pFileName) throws QTasteException {
+		mStdErrSpillFile = pFileName;
+		if ( mErrLogs != null )
+		{
+			setSpillFile(mErrLogs, pFileName);
+		}
+	}
+
+	protected void setSpillFile(InputStreamWriter pWriter, String pFileName) throws QTasteException
+	{
+		try
+		{
+			pWriter.setSpillFile(pFileName == null ? null : new File(pFileName));
+		} catch (IOException e) {
+			throw new QTasteException("Unable to open the spill file " + pFileName + " : " + e.getMessage(), e);
+		}
 	}
 
 	@Override
@@ -103,13 +171,51 @@ public class ProcessImpl implements Process {
 		return mStatus;
 	}
 
+	/**
+	 * Waits until the process is stopped.
+	 * @param pTimeout the maximum time to wait, in milliseconds.
+	 * @return <code>true</code> if the process is stopped, <code>false</code> if the timeout expired.
+	 * @throws InterruptedException if the current thread is interrupted.
+	 */
+	protected synchronized boolean waitForStop(long pTimeout) throws InterruptedException
+	{
+		long end = System.currentTimeMillis() + pTimeout;
+		while ( mStatus != ProcessStatus.STOPPED )
+		{
+			long remaining = end - System.currentTimeMillis();
+			if ( remaining <= 0 )
+				return false;
+			wait(remaining);
+		}
+		return true;
+	}
+
+	/**
+	 * Waits until the process has been created by the start thread.
+	 * @return the process or <code>null</code> if it is not started or failed to start.
+	 * @throws QTasteException if the current thread is interrupted.
+	 */
+	protected synchronized java.lang.Process waitForProcessCreation() throws QTasteException
+	{
+		try
+		{
+			while ( mCurrentProcess == null && mStatus == ProcessStatus.RUNNING )
+			{
+				wait();
+			}
+		} catch (InterruptedException e) {
+			throw new QTasteException("Interrupted while waiting for the process start", e);
+		}
+		return mCurrentProcess;
+	}
+
 	@Override
 	public void stop() throws QTasteException {
 		if (getStatus() != ProcessStatus.RUNNING)
 		{
 			throw new QTasteException("Invalide state. Cannot stop a non running process.");
 		}
-		mCurrentProcess.destroy();
+		waitForStartedProcess().destroy();
 	}
 
 	@Override
@@ -123,29 +229,87 @@ public class ProcessImpl implements Process {
 
 	@Override
 	public List<String> getStdOut() throws QTasteException {
-		if ( getStatus() != ProcessStatus.RUNNING && getStatus() != ProcessStatus.STOPPED )
+		return getStdOutWriter().getLogs();
+	}
+
+	@Override
+	public List<String> getStdErr() throws QTasteException {
+		return getStdErrWriter().getLogs();
+	}
+
+	@Override
+	public List<String> getStdOutSince(long pSequenceNumber) throws QTasteException {
+		return getStdOutWriter().getLogsSince(pSequenceNumber);
+	}
+
+	@Override
+	public long getStdOutSequenceNumber() throws QTasteException {
+		return getStdOutWriter().getSequenceNumber();
+	}
+
+	@Override
+	public String waitForOutput(String pRegex, long pSequenceNumber, long pTimeout) throws QTasteException {
+		InputStreamWriter writer = getStdOutWriter();
+		try
 		{
-			throw new QTasteException("Invalide state. The process is not yet started.");
+			return writer.waitForLine(Pattern.compile(pRegex), pSequenceNumber, pTimeout);
+		} catch (InterruptedException e) {
+			throw new QTasteException("Interrupted while waiting for the output " + pRegex, e);
 		}
-		return mStdLogs.getLogs();
 	}
 
 	@Override
-	public List<String> getStdErr() throws QTasteException {
+	public String waitForOutput(String pRegex, long pTimeout) throws QTasteException {
+		return waitForOutput(pRegex, 0, pTimeout);
+	}
+
+	/**
+	 * Returns the standard output writer, waiting for its creation if the process is starting.
+	 */
+	protected synchronized InputStreamWriter getStdOutWriter() throws QTasteException
+	{
+		waitForStartedProcess();
+		return mStdLogs;
+	}
+
+	/**
+	 * Returns the standard error writer, waiting for its creation if the process is starting.
+	 */
+	protected synchronized InputStreamWriter getStdErrWriter() throws QTasteException
+	{
+		waitForStartedProcess();
+		return mErrLogs;
+	}
+
+	/**
+	 * Returns the started process, waiting for its creation if the process is starting.
+	 * @throws QTasteException if the process is not started or failed to start.
+	 */
+	protected synchronized java.lang.Process waitForStartedProcess() throws QTasteException
+	{
 		if ( getStatus() != ProcessStatus.RUNNING && getStatus() != ProcessStatus.STOPPED )
 		{
 			throw new QTasteException("Invalide state. The process is not yet started.");
 		}
-		return mErrLogs.getLogs();
+		java.lang.Process process = waitForProcessCreation();
+		if ( process == null )
+		{
+			throw new QTasteException("The process failed to start.");
+		}
+		return process;
 	}
-	
+
 	protected String mInstanceId;
 	protected ProcessBuilder mBuilder;
-	protected java.lang.Process mCurrentProcess;
+	protected volatile java.lang.Process mCurrentProcess;
 	protected String[] mParameters;
-	protected ProcessStatus mStatus;
+	protected volatile ProcessStatus mStatus;
 	protected InputStreamWriter mStdLogs;
 	protected InputStreamWriter mErrLogs;
+	protected int mStdOutLimit = OutputLinesBuffer.DEFAULT_LIMIT;
+	protected int mStdErrLimit = OutputLinesBuffer.DEFAULT_LIMIT;
+	protected String mStdOutSpillFile;
+	protected String mStdErrSpillFile;
 	protected int mReturnCode;
 	
 	protected static final Logger LOGGER = Logger.getLogger(ProcessImpl.class);
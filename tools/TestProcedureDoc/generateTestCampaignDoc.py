@@ -8,7 +8,7 @@
 # Precondition: must be run from QTaste root directory and qtaste-kernel-deploy.jar must be in CLASSPATH
 ##
 
-import sys, re, os.path, os.sep
+import sys, re, os.path, os.sep, bisect
 from sets import Set
 try:
     import xml.etree.ElementTree as et
@@ -21,17 +21,13 @@ from com.qspin.qtaste.config import StaticConfiguration
 from com.qspin.qtaste.config import TestEngineConfiguration
 from org.apache.log4j import PropertyConfigurator
 from com.qspin.qtaste.kernel.campaign import CampaignManager
-from com.qspin.qtaste.testsuite.impl import MetaTestSuite
 from org.apache.log4j import Logger, Level
 
 # conditional expression
 IF = lambda a,b,c:(a and [b] or [c])[0]
 
-# regular expression patterns
-REMOVE_HTML_HEADERS_PATTERN = re.compile('^.*<body>(.*)</body>.*$', re.IGNORECASE | re.DOTALL)
+# regular expression patterns (table patterns are only applied to a single table)
 HTML_HEADING_TAG_PATTERN = re.compile('(</?h)([23])>', re.IGNORECASE)
-TEST_STEPS_TABLE_PATTERN = re.compile('<h3>Steps</h3>(<table[^>]*>.*</table>)(?=<h3>Test data</h3>)', re.IGNORECASE | re.DOTALL)
-TEST_DATA_TABLE_PATTERN = re.compile('<h3>Test data</h3>(<table[^>]*>.*</table>)', re.IGNORECASE | re.DOTALL)
 TABLE_ROW_PATTERN = re.compile('<tr>(.*?)</tr>', re.IGNORECASE | re.DOTALL)
 TABLE_HEADING_PATTERN = re.compile('<th>(?:<font[^>]*>)?(?:<code>)?(.*?)(?:</code>)?(?:</font>)?</th>', re.IGNORECASE | re.DOTALL)
 TABLE_DATA_PATTERN = re.compile('<td>(.*?)</td>', re.IGNORECASE | re.DOTALL)
@@ -43,17 +39,49 @@ ADD_STEP_RESULT_COLUMN = TestEngineConfiguration.getInstance().getBoolean('repor
 DUPLICATE_STEPS_PER_TEST_DATA_ROW = TestEngineConfiguration.getInstance().getBoolean('reporting.test_campaign_doc.duplicate_steps_per_test_data_row', False)
 
 
+##
+# Node of the test cases directory hierarchy.
+# Children are stored in a dictionary and their names in a list kept sorted, so that adding
+# a test case and visiting the tree in natural order don't need to scan the children.
+# A test case node has a testCaseDir attribute which is the full test case directory path,
+# a selectedRowsForTestbeds dictionary mapping testbed names to the Set of selected data rows
+# or None if all rows are selected, and a testbeds attribute containing the list of testbeds names.
+class TestCasesNode:
+    def __init__(self, name):
+        self.name = name
+        self.children = {}
+        self.childrenNames = []
+        self.testCaseDir = None
+        self.selectedRowsForTestbeds = {}
+        self.testbeds = []
+
+    ##
+    # Return the child node of given name, creating it if needed.
+    def getChild(self, name):
+        child = self.children.get(name)
+        if child is None:
+            child = TestCasesNode(name)
+            self.children[name] = child
+            bisect.insort(self.childrenNames, name)
+        return child
+
+    ##
+    # Return the list of child nodes, in natural order.
+    def getChildren(self):
+        return [self.children[name] for name in self.childrenNames]
+
 ##
 # Read an QTaste test campaign file and generate the aggregated test cases doc file.
+# The doc of each test case is appended to the aggregated doc file as soon as it is read.
 # @param campaignFileName the test campaign file name
 # @return the aggregated test cases doc file name
 def generateTestCasesDoc(campaignFileName):
-    testCasesElem = generateTestCasesTree(campaignFileName)
+    testCasesNode = generateTestCasesTree(campaignFileName)
 
     # don't use unique parent directories
-    rootElem = testCasesElem
-    while len(rootElem) == 1 and len(rootElem[0]):
-        rootElem = rootElem[0]
+    rootNode = testCasesNode
+    while len(rootNode.childrenNames) == 1 and rootNode.getChildren()[0].childrenNames:
+        rootNode = rootNode.getChildren()[0]
 
     # generate aggregated doc file
     aggregatedDocFileName = os.path.splitext(campaignFileName)[0] + '-doc.html'
@@ -61,133 +89,161 @@ def generateTestCasesDoc(campaignFileName):
     aggregatedDocFile.write('<!DOCTYPE html PUBLIC "-//W3C//DTD HTML 4.0 Transitional//EN" "http://www.w3.org/TR/html4/loose.dtd">\n')
     aggregatedDocFile.write('<html xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:fn="http://www.w3.org/2005/xpath-functions" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xdt="http://www.w3.org/2005/xpath-datatypes">\n')
     aggregatedDocFile.write('<head><META http-equiv="Content-Type" content="text/html; charset=UTF-8"><title>Aggregated test cases documentation for test campaign %s</title></head>\n<body>\n' % os.path.splitext(os.path.basename(campaignFileName))[0])
-    visit(rootElem, aggregatedDocFile)
+    visit(rootNode, aggregatedDocFile)
     aggregatedDocFile.write('</body>\n</html>')
     aggregatedDocFile.close()
 
     return aggregatedDocFileName
 
 ##
-# Read an QTaste test campaign file and return an Element tree of test cases directory hierarchy.
-# The root node is named 'testcases', other nodes are named with the directory basename,
-# leaf nodes represent testcases and have a 'testCaseDir' attribute which is the full test case directory path,
-# a 'selectedRows' attribute containing the comma-separated list of selected data rows,
-# a 'selectedRowsForTestbedX' where X is a testbed name attribute containing the comma-separated list of selected data rows for the given testbed,
-# and a 'testbeds' attribute containing the comma-separated list of testbeds names
+# Read an QTaste test campaign file and return the tree of test cases directory hierarchy.
+# The test cases of the test suites are found by browsing their directories, the same way as the test engine,
+# but without loading the test scripts and their test data. Each test suite directory is browsed only once.
 # @param campaignFileName  the test campaign file name
-# @return a 'testcases' Element tree
+# @return the 'testcases' root TestCasesNode
 def generateTestCasesTree(campaignFileName):
-    testCasesElem = et.Element('testcases')
+    testCasesNode = TestCasesNode('testcases')
+    testCaseDirsByTestSuite = {}
     campaign = CampaignManager.getInstance().readFile(campaignFileName)
     for run in campaign.getRuns():
         testbed = os.path.splitext(run.getTestbed())[0]
-        for testScript in MetaTestSuite(testbed, run.getTestsuites()).getTestScripts():
-            dataSet = testScript.getTestDataSet()
-            selectedRows = dataSet.getSelectedRows();
-            addTestCase(testScript.getTestCaseDirectory(), dataSet.size(), selectedRows, testbed, testCasesElem)
-    return testCasesElem
+        for testSuiteParams in run.getTestsuites():
+            testSuiteDir = testSuiteParams.getDirectory()
+            testCaseDirs = testCaseDirsByTestSuite.get(testSuiteDir)
+            if testCaseDirs is None:
+                testCaseDirs = []
+                findTestCaseDirs(testSuiteDir, testCaseDirs)
+                testCaseDirsByTestSuite[testSuiteDir] = testCaseDirs
+            selectedRows = testSuiteParams.getSelectedDataRows()
+            if not selectedRows is None:
+                selectedRows = Set(selectedRows)
+            for testCaseDir in testCaseDirs:
+                addTestCase(testCaseDir, selectedRows, testbed, testCasesNode)
+    return testCasesNode
+
+##
+# Find the test case directories in a directory and its sub-directories, in execution order.
+# @param directory the directory from which to start searching
+# @param testCaseDirs the list to which the test case directories are appended
+def findTestCaseDirs(directory, testCaseDirs):
+    if os.path.isfile(os.path.join(directory, StaticConfiguration.TEST_SCRIPT_FILENAME)) and \
+       os.path.isfile(os.path.join(directory, StaticConfiguration.TEST_DATA_FILENAME)):
+        testCaseDirs.append(directory)
+    elif os.path.isdir(directory):
+        names = os.listdir(directory)
+        names.sort(lambda name1, name2: cmp(name1.lower(), name2.lower()))
+        for name in names:
+            subDirectory = os.path.join(directory, name)
+            if os.path.isdir(subDirectory):
+                findTestCaseDirs(subDirectory, testCaseDirs)
 
 ##
 # Add a test case to the test cases tree.
 # @param testCaseDir the full test case directory path
-# @param numberRows total number of test data rows
-# @param selectedRows SortedSet of selected test data rows or None if all rows selected
+# @param selectedRows Set of selected test data rows or None if all rows selected
 # @param testbed the testbed on which the test case is run
-# @param testCasesElem the test cases Element tree root node
-def addTestCase(testCaseDir, numberRows, selectedRows, testbed, testCasesElem):
-    # add test case dir element
-    testCaseDirPath = os.path.normpath(testCaseDir).split(os.sep)
-    elem = testCasesElem
-    for dir in testCaseDirPath:
-        dirElem = elem.find(dir)
-        if dirElem is None:
-            # insert child keeping natural order
-            index = 0
-            for child in list(elem):
-               if child.tag > dir:
-                  break
-               index = index + 1
-            dirElem = et.Element(dir)
-            elem.insert(index, dirElem)
-        elem = dirElem
-    # set testCaseDir attribute
-    elem.attrib['testCaseDir'] = testCaseDir
-
-    # set/update selectedRows and selectedRowsForTestbedX attributes
-    if selectedRows is None:
-        selectedRows = Set(range(1, numberRows+1))
-        elem.attrib['selectedRowsForTestbed' + testbed] = ','.join([str(x) for x in selectedRows])
-    else:
-        selectedRows = Set(selectedRows)
-        elem.attrib['selectedRowsForTestbed' + testbed] = ','.join([str(x) for x in selectedRows])
-        alreadySelectedRows = elem.get('selectedRows')
-        if not alreadySelectedRows is None:
-            alreadySelectedRows = Set([int(x) for x in alreadySelectedRows.split(',')])
-            selectedRows = selectedRows.union(alreadySelectedRows)
-    elem.attrib['selectedRows'] = ','.join([str(x) for x in selectedRows])
+# @param testCasesNode the test cases tree root node
+def addTestCase(testCaseDir, selectedRows, testbed, testCasesNode):
+    # add test case dir node
+    node = testCasesNode
+    for dir in os.path.normpath(testCaseDir).split(os.sep):
+        node = node.getChild(dir)
+    node.testCaseDir = testCaseDir
 
-    # set/update testbeds attribute
-    testbeds = elem.get('testbeds')
-    if testbeds is None:
-        testbeds = testbed
-    else:
-        testbeds = testbeds + ',' + testbed
-    elem.attrib['testbeds'] = testbeds
+    # set/update testbeds and selected rows for testbed
+    if not testbed in node.testbeds:
+        node.testbeds.append(testbed)
+        node.selectedRowsForTestbeds[testbed] = selectedRows
+    elif not node.selectedRowsForTestbeds[testbed] is None:
+        if selectedRows is None:
+            node.selectedRowsForTestbeds[testbed] = None
+        else:
+            node.selectedRowsForTestbeds[testbed] = node.selectedRowsForTestbeds[testbed].union(selectedRows)
 
 ##
 # Visit a test cases tree node and append its doc to the aggregated doc file.
-# @param nodeElem the test cases tree node to visit
+# @param node the test cases tree node to visit
 # @param aggregatedDocFile the aggregated doc file
 # @param level the node level, starting at 1 for the first directory to handle
 # @param prefix the prefix to add to the string to print
-def visit(nodeElem, aggregatedDocFile, level=1, prefix=''):
+def visit(node, aggregatedDocFile, level=1, prefix=''):
     index = 1
-    for elem in nodeElem:
-        dirName = elem.tag
+    for childNode in node.getChildren():
+        dirName = childNode.name
         print '%s%d. %s' % (prefix, index, dirName)
-        if len(elem):
+        if childNode.childrenNames:
             aggregatedDocFile.write('<h%d>%s</h%d>' % (level+1, dirName, level+1))
-            visit(elem, aggregatedDocFile, level+1, '  ' + prefix + str(index) + '.' )
+            visit(childNode, aggregatedDocFile, level+1, '  ' + prefix + str(index) + '.' )
         else:
-            testCaseDir = elem.get('testCaseDir')
-            selectedRows = Set([int(x) for x in elem.get('selectedRows').split(',')])
-            testbeds = elem.get('testbeds').split(',')
-            selectedRowsForTestbeds = {}
-            for testbed in testbeds:
-                selectedRowsForTestbeds[testbed] = Set([int(x) for x in elem.get('selectedRowsForTestbed' + testbed).split(',')])
-            aggregateTestCaseDoc(dirName, testCaseDir, selectedRows, selectedRowsForTestbeds, testbeds, level, aggregatedDocFile)
+            aggregateTestCaseDoc(childNode, level, aggregatedDocFile)
         index += 1
 
+##
+# Split the content of a test script HTML doc, as generated by testscriptdoc_xml2html.xsl, in parts.
+# The sections are located by searching their headings once instead of matching the whole document.
+# @param content the test script HTML doc content
+# @return (body content before the steps section, steps table, content between the steps table and the
+#          test data table, test data table, body content after the test data table)
+def splitTestScriptDoc(content):
+    lowerContent = content.lower()
+    bodyStart = lowerContent.rfind('<body>') + len('<body>')
+    bodyEnd = lowerContent.rfind('</body>')
+    stepsHeadingStart = lowerContent.find('<h3>steps</h3>', bodyStart)
+    testDataHeadingStart = lowerContent.rfind('<h3>test data</h3>', 0, bodyEnd)
+    if bodyStart < len('<body>') or bodyEnd < 0 or stepsHeadingStart < 0 or testDataHeadingStart < stepsHeadingStart:
+        raise ValueError('steps or test data section not found')
+    stepsTableStart = stepsHeadingStart + len('<h3>steps</h3>')
+    stepsTableEnd = lowerContent.rfind('</table>', stepsTableStart, testDataHeadingStart) + len('</table>')
+    testDataTableStart = lowerContent.find('<table', testDataHeadingStart, bodyEnd)
+    testDataTableEnd = lowerContent.rfind('</table>', testDataTableStart, bodyEnd) + len('</table>')
+    if stepsTableEnd < stepsTableStart or testDataTableStart < 0 or testDataTableEnd < testDataTableStart:
+        raise ValueError('steps or test data table not found')
+    return (content[bodyStart:stepsHeadingStart], content[stepsTableStart:stepsTableEnd],
+            content[stepsTableEnd:testDataTableStart], content[testDataTableStart:testDataTableEnd],
+            content[testDataTableEnd:bodyEnd])
+
 ##
 # Append a test case doc to the aggregated doc file.
-# @param testCaseName the test case name
-# @param testCaseDir the full test case directory path
-# @param selectedRows the Set of selected rows
-# @param selectedRowsForTestbedsDict the dictionary mapping testbed names to selected rows Sets
-# @param testbedsList the list of testbeds on which the test case is run
+# @param testCaseNode the test case node
 # @param level the node level, starting at 1 for the first directory to handle
 # @param aggregatedDocFile the aggregated doc file
-def aggregateTestCaseDoc(testCaseName, testCaseDir, selectedRows, selectedRowsForTestbedsDict, testbedsList, level, aggregatedDocFile):
-    if len(testbedsList) == 1:
-        testbedsText = 'This test script is run on the testbed <i>' + testbedsList[0] + '</i>.'
-    else:
-        testbedsWithRowsSelection = []
-        for testbed in testbedsList:
-            selectedRowsForTestbed = selectedRowsForTestbedsDict.get(testbed)
-            if selectedRowsForTestbed == selectedRows:
-                testbedsWithRowsSelection.append(testbed)
-            else:
-                testbedsWithRowsSelection.append(testbed + ' (' + IF(len(selectedRowsForTestbed) > 1, 'rows ' , 'row ') + ', '.join([str(x) for x in selectedRowsForTestbed]) + ')')
-        testbedsText = 'This test script is run on the following testbeds: <i>' + '</i>, <i>'.join(testbedsWithRowsSelection) + '</i>.'
-
+def aggregateTestCaseDoc(testCaseNode, level, aggregatedDocFile):
+    testCaseDir = testCaseNode.testCaseDir
     testScriptDocFileName = testCaseDir + os.sep + StaticConfiguration.TEST_SCRIPT_DOC_HTML_FILENAME
     testScriptDocFile = None
     try:
         testScriptDocFile = open(testScriptDocFileName, 'rb')
         content = testScriptDocFile.read()
-        content = REMOVE_HTML_HEADERS_PATTERN.match(content).group(1)
-        testStepsTableMatch = TEST_STEPS_TABLE_PATTERN.search(content)
-        testStepsTable = testStepsTableMatch.group(1)
+        testScriptDocFile.close()
+        testScriptDocFile = None
+        contentBeforeSteps, testStepsTable, contentBetweenTables, testDataTable, contentAfterTestData = splitTestScriptDoc(content)
+        testDataRows, dataNames, dataValuesList = getTestData(testDataTable)
+
+        # rows are only known now for test cases run with all rows
+        allRows = Set(range(1, len(dataValuesList)+1))
+        selectedRowsForTestbedsDict = {}
+        selectedRows = Set()
+        testbedsList = testCaseNode.testbeds
+        for testbed in testbedsList:
+            selectedRowsForTestbed = testCaseNode.selectedRowsForTestbeds[testbed]
+            if selectedRowsForTestbed is None:
+                selectedRowsForTestbed = allRows
+            selectedRowsForTestbedsDict[testbed] = selectedRowsForTestbed
+            selectedRows = selectedRows.union(selectedRowsForTestbed)
+        if len(testbedsList) == 1:
+            testbedsText = 'This test script is run on the testbed <i>' + testbedsList[0] + '</i>.'
+        else:
+            testbedsWithRowsSelection = []
+            for testbed in testbedsList:
+                selectedRowsForTestbed = selectedRowsForTestbedsDict[testbed]
+                if selectedRowsForTestbed == selectedRows:
+                    testbedsWithRowsSelection.append(testbed)
+                else:
+                    selectedRowsForTestbed = list(selectedRowsForTestbed)
+                    selectedRowsForTestbed.sort()
+                    testbedsWithRowsSelection.append(testbed + ' (' + IF(len(selectedRowsForTestbed) > 1, 'rows ' , 'row ') + ', '.join([str(x) for x in selectedRowsForTestbed]) + ')')
+            testbedsText = 'This test script is run on the following testbeds: <i>' + '</i>, <i>'.join(testbedsWithRowsSelection) + '</i>.'
+
         if REMOVE_STEP_NAME_COLUMN or ADD_STEP_RESULT_COLUMN:
             htmlTreeBuilder = HTMLTreeBuilder(encoding = 'utf-8')
             htmlTreeBuilder.feed(testStepsTable)
@@ -202,24 +258,21 @@ def aggregateTestCaseDoc(testCaseName, testCaseDir, selectedRows, selectedRowsFo
                     elif tag == "td":
                         et.SubElement(trElem, tag).text = '' # non-breakable space
             testStepsTable = et.tostring(testStepsTableHtmlTree, 'utf-8')
+
+        parts = [contentBeforeSteps.replace('</h2>', '</h2><h3>Testbeds</h3><p>' + testbedsText + '</p>', 1)]
         if DUPLICATE_STEPS_PER_TEST_DATA_ROW:
-            contentBeforeSteps = content[:testStepsTableMatch.start(0)]
-            testDataContent = content[testStepsTableMatch.end(1):]
-            testDataTableMatch = TEST_DATA_TABLE_PATTERN.search(testDataContent)
-            testDataTable = testDataTableMatch.group(1)
-            dataNames, dataValuesList = getTestData(testDataTable)
             if len(dataValuesList) == 0:
                 # no test data
-                duplicatedStepsContent = '<h3>Steps</h3>' + testStepsTable
+                parts.append('<h3>Steps</h3>' + testStepsTable)
             else:
-                duplicatedStepsContent = ''
                 for rowId in range(1, len(dataValuesList)+1):
                     if rowId in selectedRows:
                         dataValues = dataValuesList[rowId-1]
-                        testDataSection = '<b>Test data:</b><br><table cellspacing="0" cellpadding="0">'
+                        testDataSection = ['<b>Test data:</b><br><table cellspacing="0" cellpadding="0">']
                         for dataIndex in range(len(dataNames)):
-                            testDataSection += '<tr><td width="20">&nbsp;</td><td><b><code>' + dataNames[dataIndex] + '</code></b></td><td width="20">&nbsp;</td><td>' + dataValues[dataIndex]+ '</td></tr>'
-                        testDataSection += '</table>'
+                            testDataSection.append('<tr><td width="20">&nbsp;</td><td><b><code>' + dataNames[dataIndex] + '</code></b></td><td width="20">&nbsp;</td><td>' + dataValues[dataIndex]+ '</td></tr>')
+                        testDataSection.append('</table>')
+                        testDataSection = ''.join(testDataSection)
                         putTestDataBeforeSteps = True
                         try:
                             comment = dataValues[dataNames.index('COMMENT')]
@@ -235,102 +288,96 @@ def aggregateTestCaseDoc(testCaseName, testCaseDir, selectedRows, selectedRowsFo
                                 stepsTitle = '<h3>Steps</h3>'
                                 putTestDataBeforeSteps = False
                         if putTestDataBeforeSteps:
-                            duplicatedStepsContent = duplicatedStepsContent + stepsTitle + testDataSection + '<br><p>' + testStepsTable
+                            parts.append(stepsTitle + testDataSection + '<br><p>' + testStepsTable)
                         else:
-                            duplicatedStepsContent = duplicatedStepsContent + stepsTitle + testStepsTable + '<br><p>' + testDataSection
-            content = contentBeforeSteps + duplicatedStepsContent
+                            parts.append(stepsTitle + testStepsTable + '<br><p>' + testDataSection)
         else:
-            content = content[:testStepsTableMatch.start(1)] + testStepsTable + content[testStepsTableMatch.end(1):]
-            testDataTableMatch = TEST_DATA_TABLE_PATTERN.search(content)
-            testDataTable = testDataTableMatch.group(1)
-            testDataSection = getTransformedTestDataSection(testDataTable, selectedRows)
-            content = content[:testDataTableMatch.start(1)] + testDataSection + content[testDataTableMatch.end(1):]
-        content = content.replace('</h2>', '</h2><h3>Testbeds</h3><p>' + testbedsText + '</p>', 1)
-        content = HTML_HEADING_TAG_PATTERN.sub(lambda m: m.group(1) + str(level+int(m.group(2))-1) + '>', content)
-        aggregatedDocFile.write(content)
+            parts.append('<h3>Steps</h3>')
+            parts.append(testStepsTable)
+            parts.append(contentBetweenTables)
+            parts.append(getTransformedTestDataSection(testDataTable, testDataRows, dataNames, dataValuesList, selectedRows))
+            parts.append(contentAfterTestData)
+        for part in parts:
+            aggregatedDocFile.write(HTML_HEADING_TAG_PATTERN.sub(lambda m: m.group(1) + str(level+int(m.group(2))-1) + '>', part))
         aggregatedDocFile.write('\n\n')
-        testScriptDocFile.close()
     except:
         print 'Warning: error while reading', testScriptDocFileName
         print 'Exception:', sys.exc_info()[0], sys.exc_info()[1]
         print sys.exc_info()[2]
         raise
-        aggregatedDocFile.write('<h%d>%s</h%d><p>Couldn\'t read test script doc file %s.</p>\n\n' % (level+1, testCaseName, level+1, testScriptDocFileName))
+        aggregatedDocFile.write('<h%d>%s</h%d><p>Couldn\'t read test script doc file %s.</p>\n\n' % (level+1, testCaseNode.name, level+1, testScriptDocFileName))
         if testScriptDocFile:
             testScriptDocFile.close()
 
 ##
 # Get the test data.
 # @param testDataTable the original test data HTML table string
-# @return (list of data names, list of lists of data values)
+# @return (list of (table row HTML string, table row content) including heading row, list of data names, list of lists of data values)
 def getTestData(testDataTable):
-    firstRow = True
+    rows = []
     dataNames = []
     dataValuesList = []
     for rowMatch in TABLE_ROW_PATTERN.finditer(testDataTable):
         row = rowMatch.group(1)
-        if firstRow:
+        if not rows:
             dataNames = TABLE_HEADING_PATTERN.findall(row)[1:] # skip 'Row' column
-            firstRow = False
         else:
             dataValues = TABLE_DATA_PATTERN.findall(row)[1:] # skip 'Row' column
             dataValuesList.append(dataValues)
-    return (dataNames, dataValuesList)
+        rows.append((rowMatch.group(0), row))
+    return (rows, dataNames, dataValuesList)
 
 ##
 # Return transformed test data section, where test data with values common for all rows extracted of the table.
 # @param testDataTable the original test data HTML table string
+# @param testDataRows the test data table rows, as returned by getTestData()
+# @param dataNames the list of data names
+# @param dataValuesList the list of lists of data values
 # @param selectedRows the Set of selected rows
 # @return the transformed test data section string, where test data with values common for all rows extracted of the table
-def getTransformedTestDataSection(testDataTable, selectedRows):
+def getTransformedTestDataSection(testDataTable, testDataRows, dataNames, dataValuesList, selectedRows):
     # extract test data with values common for all rows
-    dataNames, dataValuesList = getTestData(testDataTable)
     if len(dataValuesList) == 0:
         # no test data
-        testDataSection = testDataTable
-    else:
-        sameDataValuesIndexes = []
-        for dataIndex in range(len(dataNames)):
-            dataValue = dataValuesList[0][dataIndex]
-            sameDataValues = True
-            for dataValues in dataValuesList[1:]:
-                if dataValues[dataIndex] != dataValue:
-                    sameDataValues = False
-            if sameDataValues:
-                sameDataValuesIndexes.append(dataIndex)
-        if sameDataValuesIndexes:
-            testDataSection = '<table cellspacing="0" cellpadding="0">'
-            for dataIndex in sameDataValuesIndexes:
-                testDataSection += '<tr><td><code><b>' + dataNames[dataIndex] + '</code></b></td><td width="20">&nbsp;</td><td>' + dataValuesList[0][dataIndex]+ '</td></tr>'
-            testDataSection += '</table>'
-            if (len(sameDataValuesIndexes) < len(dataNames)):
-                # remove test data with values for all rows
-                updateTestDataTable = '<br><table border="1" cellSpacing="0" cellPadding="2">'
-                rowId = 0
-                for rowMatch in TABLE_ROW_PATTERN.finditer(testDataTable):
-                    if rowId == 0 or rowId in selectedRows:
-                        row = rowMatch.group(1)
-                        updatedRow = ''
-                        dataIndex = -1
-                        for dataNameOrValueMatch in TABLE_HEADING_OR_DATA_PATTERN.finditer(row):
-                            if not dataIndex in sameDataValuesIndexes:
-                                updatedRow += dataNameOrValueMatch.group(0)
-                            dataIndex += 1
-                        updateTestDataTable += '<tr>' + updatedRow + '</tr>'
-                    rowId += 1
-                updateTestDataTable += '</table>'
-                testDataSection += updateTestDataTable
-        else:
-            updateTestDataTable = '<table border="1" cellSpacing="0" cellPadding="2">'
-            rowId = 0
-            for rowMatch in TABLE_ROW_PATTERN.finditer(testDataTable):
+        return testDataTable
+
+    sameDataValuesIndexes = []
+    for dataIndex in range(len(dataNames)):
+        dataValue = dataValuesList[0][dataIndex]
+        sameDataValues = True
+        for dataValues in dataValuesList[1:]:
+            if dataValues[dataIndex] != dataValue:
+                sameDataValues = False
+                break
+        if sameDataValues:
+            sameDataValuesIndexes.append(dataIndex)
+    testDataSection = []
+    if sameDataValuesIndexes:
+        testDataSection.append('<table cellspacing="0" cellpadding="0">')
+        for dataIndex in sameDataValuesIndexes:
+            testDataSection.append('<tr><td><code><b>' + dataNames[dataIndex] + '</code></b></td><td width="20">&nbsp;</td><td>' + dataValuesList[0][dataIndex]+ '</td></tr>')
+        testDataSection.append('</table>')
+        if (len(sameDataValuesIndexes) < len(dataNames)):
+            # remove test data with values for all rows
+            testDataSection.append('<br><table border="1" cellSpacing="0" cellPadding="2">')
+            for rowId in range(len(testDataRows)):
                 if rowId == 0 or rowId in selectedRows:
-                    updateTestDataTable += rowMatch.group(0)
-                rowId += 1
-            updateTestDataTable += '</table>'
-            testDataSection = updateTestDataTable
+                    updatedRow = []
+                    dataIndex = -1
+                    for dataNameOrValueMatch in TABLE_HEADING_OR_DATA_PATTERN.finditer(testDataRows[rowId][1]):
+                        if not dataIndex in sameDataValuesIndexes:
+                            updatedRow.append(dataNameOrValueMatch.group(0))
+                        dataIndex += 1
+                    testDataSection.append('<tr>' + ''.join(updatedRow) + '</tr>')
+            testDataSection.append('</table>')
+    else:
+        testDataSection.append('<table border="1" cellSpacing="0" cellPadding="2">')
+        for rowId in range(len(testDataRows)):
+            if rowId == 0 or rowId in selectedRows:
+                testDataSection.append(testDataRows[rowId][0])
+        testDataSection.append('</table>')
 
-    return testDataSection
+    return ''.join(testDataSection)
 
 # main
 if __name__ == '__main__':
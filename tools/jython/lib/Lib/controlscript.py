@@ -4,6 +4,9 @@
 # This module contains the following classes:
 # - ControlScript: this is the main class to be used at the main control script file. This class is initialized with an array controlActions. 
 #   Those control actions are classes derived from ControlAction class  having 2 methods implemented: start and stop
+#   By default, control actions are started in list order (respecting declared dependencies) and stopped in reverse order.
+#   If parallel is True, control actions are started concurrently as soon as the actions they depend on are started,
+#   and stopped concurrently as soon as the actions depending on them are stopped; failures are collected per action.
 #
 # - ControlAction: this is the class from which specific actions can be derived from. Also following generic methods are implemented:
 # 		- executeCommand(command) where command is the command to be executed (os)
@@ -12,6 +15,18 @@
 #			arguments (optional) the string to be passed as arguments to the shell script
 #		- start: abstract method
 #		- stop: abstract method
+#		- waitUntil(probes...): declares readiness probes to wait for after start, returns the control action itself
+#		- after(controlActions...): declares control actions to start before this one (and stop after it), returns the control action itself
+#
+# - ReadinessProbe: this is the class from which readiness conditions are derived. A probe is polled with an increasing
+#	interval (from pollInterval to maxPollInterval) until it is satisfied or its timeout (in seconds) expires.
+#	The following probes are implemented:
+#		- PortProbe(port, host="localhost"): waits until a TCP port accepts connections
+#		- JMXProbe(mbeanName, port=None, url=None, host="localhost"): waits until a JMX MBean is registered
+#		- LogProbe(fileName, pattern): waits until a line of a log file matches a regular expression
+#		- FileProbe(fileName): waits until a file exists
+#	The time taken by each control action to start and become ready is written in the .param file (readinessTime).
+#	The warm standby SUT instance (SUT_INSTANCE environment variable set to "standby") uses its own _standby.param file.
 #
 # - NativeProcess: derived from ControlAction where start and stop methods are implemented
 #	This class is initialized with following parameters:
@@ -85,17 +100,25 @@
 # 	This class is initialized with following parameters
 #		- host: name of the host where the command must be executed
 #		- login: login name 
-#		- waitingTime: default is 60 seconds. Sleeping time before continuing to the control script.
+#		- waitingTime: default is 60 seconds. Sleeping time before continuing to the control script, not used if readiness probes are declared.
+#
+# - Sleep: derived from ControlAction, sleeps a fixed time on start and on stop
+#
+# - WaitFor: derived from ControlAction, waits on start until the given readiness probes are satisfied
 #
 ##
 
 import os as _os, sys as _sys, re as _re, time as _time
+import threading as _threading
 import datetime as _datetime
 import traceback
 from org.apache.log4j import Logger as _Logger, Level as _Level
 from com.qspin.qtaste.util import OS as _OS, Exec as _Exec
 from com.qspin.qtaste.config import TestBedConfiguration as _TestBedConfiguration
 from com.qspin.qtaste.tcom.rlogin import RLogin as _RLogin
+from java.net import Socket as _Socket, InetSocketAddress as _InetSocketAddress
+from javax.management import ObjectName as _ObjectName
+from javax.management.remote import JMXConnectorFactory as _JMXConnectorFactory, JMXServiceURL as _JMXServiceURL
 
 # set log4j logger level to WARN
 _Logger.getRootLogger().setLevel(_Level.WARN)
@@ -156,7 +179,7 @@ controlScriptID = 1
 
 class ControlScript(object):
 	""" Control script """
-	def __init__(self, controlActions):
+	def __init__(self, controlActions, parallel=False):
 		"""
 		Initialize ControlScript object.
 		Store controlActions in self.controlActions,
@@ -164,8 +187,10 @@ class ControlScript(object):
 		store TESTBED environment variable in self.testbed,
 		and execute start() or stop() following the value of the first command-line argument (must be 'start' or 'stop')
 		@param controlActions sequence of ControlAction (list or tuple) 
+		@param parallel if True, start and stop independent control actions concurrently, following only declared dependencies
 		"""
 		self.controlActions = controlActions
+		self.parallel = parallel
 		caller = traceback.format_stack()[0].split("\"")[1]
 		self.callerScript = caller.split("/")[len(caller.split("/"))-1]
 		self.callerDirectory = caller.replace(self.callerScript, "")
@@ -175,10 +200,20 @@ class ControlScript(object):
 		else:
 			self.stop()
 	
+	def _getParamFileName(self):
+		"""
+		Get the name of the param file of the SUT instance controlled by this execution of the control script,
+		the warm standby SUT instance having its own param file
+		@return <script>.param, or <script>_standby.param for the warm standby SUT instance
+		"""
+		if _os.getenv("SUT_INSTANCE") == "standby":
+			return self.callerDirectory + _os.sep + self.callerScript.replace(".py", "_standby.param")
+		return self.callerDirectory + _os.sep + self.callerScript.replace(".py", ".param")
+
 	def start(self):
 		""" Method called on start, starts control actions in defined order"""
 		try:
-			writer = open(self.callerDirectory + _os.sep + self.callerScript.replace(".py", ".param"), "w")
+			writer = open(self._getParamFileName(), "w")
 			try:
 				processId = ""
 				for controlAction in self.controlActions:
@@ -189,19 +224,169 @@ class ControlScript(object):
 					controlAction.dumpDataType(controlAction.__class__.__name__, writer)
 				writer.write("processes=" + processId + "\n")
 			finally:
-				writer.close
+				writer.close()
 		except:
 			print "error during the param file generation"
 			raise
 
-		for controlAction in self.controlActions:
-			if controlAction.active:
-				controlAction.start()
+		prerequisites = self._getStartPrerequisites()
+		if self.parallel:
+			failures = _ActionsScheduler(self.controlActions, prerequisites).execute(ControlScript._startControlAction)
+		else:
+			for controlAction in _topologicalOrder(self.controlActions, prerequisites):
+				ControlScript._startControlAction(controlAction)
+			failures = []
+
+		writer = open(self._getParamFileName(), "a")
+		try:
+			for controlAction in self.controlActions:
+				controlAction.dumpReadiness(writer)
+		finally:
+			writer.close()
+
+		ControlScript._exitIfFailures("start", failures)
 	
 	def stop(self):
 		""" Method called on stop, stops control actions in reverse order """
+		prerequisites = self._getStopPrerequisites()
+		if self.parallel:
+			# best effort: every control action is stopped, even if a control action stopped before it failed
+			failures = _ActionsScheduler(self.controlActions, prerequisites).execute(ControlScript._stopControlAction, True)
+			ControlScript._exitIfFailures("stop", failures)
+		else:
+			for controlAction in _topologicalOrder(self.controlActions[::-1], prerequisites):
+				controlAction.stop()
+
+	def _getStartPrerequisites(self):
+		""" Return a dictionary giving for each control action the control actions to start before it """
+		prerequisites = {}
+		for controlAction in self.controlActions:
+			prerequisites[controlAction] = [a for a in controlAction.afterActions if a in self.controlActions]
+		return prerequisites
+
+	def _getStopPrerequisites(self):
+		""" Return a dictionary giving for each control action the control actions to stop before it """
+		prerequisites = {}
+		for controlAction in self.controlActions:
+			prerequisites[controlAction] = []
 		for controlAction in self.controlActions[::-1]:
-			controlAction.stop()
+			for afterAction in controlAction.afterActions:
+				if afterAction in self.controlActions:
+					prerequisites[afterAction].append(controlAction)
+		return prerequisites
+
+	def _startControlAction(controlAction):
+		""" Start a control action if it is active, wait until it is ready and record the time it took """
+		if controlAction.active:
+			startTime = _time.time()
+			controlAction.start()
+			controlAction.waitUntilReady()
+			controlAction.readinessTime = _time.time() - startTime
+	_startControlAction = staticmethod(_startControlAction)
+
+	def _stopControlAction(controlAction):
+		controlAction.stop()
+	_stopControlAction = staticmethod(_stopControlAction)
+
+	def _exitIfFailures(operation, failures):
+		""" Print the failed control actions and exit with error code if there is any """
+		if failures:
+			for controlAction, message in failures:
+				print >> _sys.stderr, "Failed to %s %s: %s" % (operation, controlAction.description, message)
+			_sys.exit(1)
+	_exitIfFailures = staticmethod(_exitIfFailures)
+
+
+def _topologicalOrder(controlActions, prerequisites):
+	"""
+	Sort control actions so that each one comes after its prerequisites, keeping the list order otherwise.
+	Exit with error if dependencies are cyclic.
+	@param controlActions sequence of ControlAction
+	@param prerequisites dictionary giving for each control action the list of control actions to execute before it
+	@return list of ControlAction
+	"""
+	ordered = []
+	remaining = list(controlActions)
+	while remaining:
+		for controlAction in remaining:
+			if not [a for a in prerequisites[controlAction] if a not in ordered]:
+				ordered.append(controlAction)
+				remaining.remove(controlAction)
+				break
+		else:
+			_exitWithError("Cyclic dependencies between control actions: " + ", ".join([a.description for a in remaining]))
+	return ordered
+
+
+class _ActionsScheduler(object):
+	""" Executes control actions concurrently, each one as soon as its prerequisites have been executed """
+	def __init__(self, controlActions, prerequisites):
+		"""
+		Initialize _ActionsScheduler object.
+		@param controlActions sequence of ControlAction
+		@param prerequisites dictionary giving for each control action the list of control actions to execute before it
+		"""
+		# exit with error now if dependencies are cyclic
+		_topologicalOrder(controlActions, prerequisites)
+		self.controlActions = controlActions
+		self.prerequisites = prerequisites
+		self.condition = _threading.Condition()
+		self.states = {}
+		self.failures = []
+
+	def execute(self, function, bestEffort=False):
+		"""
+		Execute function on all control actions, in separate threads, and wait until all are executed.
+		Control actions of which a prerequisite failed are not executed, unless bestEffort is True.
+		@param function function taking a control action as argument
+		@param bestEffort if True, execute each control action once its prerequisites have been executed, even if they failed
+		@return list of (control action, error message) tuples for the failed or not executed control actions
+		"""
+		if bestEffort:
+			finishedStates = ["done", "failed"]
+		else:
+			finishedStates = ["done"]
+		self.condition.acquire()
+		try:
+			while len(self.states) < len(self.controlActions) or "running" in self.states.values():
+				changed = False
+				for controlAction in self.controlActions:
+					if self.states.has_key(controlAction):
+						continue
+					prerequisitesStates = [self.states.get(a) for a in self.prerequisites[controlAction]]
+					if not bestEffort and ("failed" in prerequisitesStates or "skipped" in prerequisitesStates):
+						self.states[controlAction] = "skipped"
+						self.failures.append((controlAction, "not executed because a control action it depends on failed"))
+						changed = True
+					elif not [state for state in prerequisitesStates if state not in finishedStates]:
+						self.states[controlAction] = "running"
+						_threading.Thread(target=self._run, args=(function, controlAction)).start()
+						changed = True
+				if not changed:
+					self.condition.wait()
+		finally:
+			self.condition.release()
+		return self.failures
+
+	def _run(self, function, controlAction):
+		error = None
+		try:
+			function(controlAction)
+		except SystemExit, e:
+			error = "exited with code %s" % e.code
+		except:
+			traceback.print_exc()
+			error = str(_sys.exc_info()[1])
+		self.condition.acquire()
+		try:
+			if error is None:
+				self.states[controlAction] = "done"
+			else:
+				self.states[controlAction] = "failed"
+				self.failures.append((controlAction, error))
+			self.condition.notifyAll()
+		finally:
+			self.condition.release()
 
 class ControlAction(object):
 	""" Control script action """
@@ -215,12 +400,38 @@ class ControlAction(object):
 		self.description = description
 		self.caID = controlScriptID
 		self.active = active
+		self.readinessProbes = []
+		self.readinessTime = None
+		self.afterActions = []
 		controlScriptID += 1
 		
 	def start(self):
 		""" Method called on start, to be overridden by subclasses """
 		pass
 
+	def waitUntil(self, *probes):
+		"""
+		Declare readiness probes to wait for after the control action has been started.
+		@param probes ReadinessProbe objects, waited for in the given order
+		@return the control action itself, so that it can be used directly in the control actions list
+		"""
+		self.readinessProbes = self.readinessProbes + list(probes)
+		return self
+
+	def after(self, *controlActions):
+		"""
+		Declare control actions on which this control action depends: they will be started before it and stopped after it.
+		@param controlActions ControlAction objects of the same control script
+		@return the control action itself, so that it can be used directly in the control actions list
+		"""
+		self.afterActions = self.afterActions + list(controlActions)
+		return self
+
+	def waitUntilReady(self):
+		""" Method called on start, after start(). Waits until all the readiness probes are satisfied """
+		for probe in self.readinessProbes:
+			probe.waitUntilReady()
+
 	def stop(self):
 		""" Method called on stop, to be overridden by subclasses """
 		pass
@@ -232,6 +443,8 @@ class ControlAction(object):
 		writer.write(prefix + ".controlActionID=integer\n")
 		writer.write(prefix + ".callerScript=string\n")
 		writer.write(prefix + ".active=boolean\n")
+		writer.write(prefix + ".readinessTime=double\n")
+		writer.write(prefix + ".after=string\n")
 
 	def dump(self, writer):
 		""" Method called on start. It dumps the control action parameter in the writer, to be overridden by subclasses """
@@ -243,6 +456,13 @@ class ControlAction(object):
 			writer.write(str(self.caID) + ".active=true\n")
 		else:
 			writer.write(str(self.caID) + ".active=false\n")
+		if self.afterActions:
+			writer.write(str(self.caID) + ".after=" + "|".join([str(a.caID) for a in self.afterActions]) + "\n")
+
+	def dumpReadiness(self, writer):
+		""" Method called at the end of start. It dumps the measured time to start the control action and wait until it is ready """
+		if self.readinessTime is not None:
+			writer.write(str(self.caID) + ".readinessTime=%.3f\n" % self.readinessTime)
 
 	def executeCommand(command):
 		""" 
@@ -293,6 +513,147 @@ class ControlAction(object):
 	# shell script extension
 	shellScriptExtension = _IF(_OS.getType() == _OS.Type.WINDOWS, ".cmd", ".sh")
 
+class ReadinessProbe(object):
+	""" Condition to wait for after a control action has been started """
+	def __init__(self, description, timeout=60, pollInterval=0.1, maxPollInterval=2):
+		"""
+		Initialize ReadinessProbe object.
+		@param description string describing the awaited condition
+		@param timeout maximum time to wait, in seconds
+		@param pollInterval initial time between two checks, in seconds, doubled after each check up to maxPollInterval
+		@param maxPollInterval maximum time between two checks, in seconds
+		"""
+		self.description = description
+		self.timeout = timeout
+		self.pollInterval = pollInterval
+		self.maxPollInterval = maxPollInterval
+
+	def isReady(self):
+		""" Check the condition once, to be overridden by subclasses """
+		return True
+
+	def waitUntilReady(self):
+		"""
+		Wait until the condition is satisfied and exit with error code if timeout expires
+		@return time waited, in seconds
+		"""
+		print "Waiting until " + self.description + "..."
+		startTime = _time.time()
+		endTime = startTime + self.timeout
+		pollInterval = self.pollInterval
+		while not self.isReady():
+			now = _time.time()
+			if now >= endTime:
+				_exitWithError("Timeout: %s not satisfied after %g seconds" % (self.description, self.timeout))
+			_time.sleep(min(pollInterval, endTime - now))
+			pollInterval = min(pollInterval * 2, self.maxPollInterval)
+		elapsedTime = _time.time() - startTime
+		print "%s after %.3f seconds" % (self.description, elapsedTime)
+		return elapsedTime
+
+class PortProbe(ReadinessProbe):
+	""" Readiness probe waiting until a TCP port accepts connections """
+	def __init__(self, port, host="localhost", timeout=60, pollInterval=0.1, maxPollInterval=2):
+		"""
+		Initialize PortProbe object.
+		@param port TCP port number
+		@param host host name or address
+		"""
+		ReadinessProbe.__init__(self, "port %d on %s accepts connections" % (port, host), timeout, pollInterval, maxPollInterval)
+		self.port = port
+		self.host = host
+
+	def isReady(self):
+		socket = _Socket()
+		try:
+			try:
+				socket.connect(_InetSocketAddress(self.host, self.port), 1000)
+				return True
+			except:
+				return False
+		finally:
+			socket.close()
+
+class JMXProbe(ReadinessProbe):
+	""" Readiness probe waiting until a JMX MBean is registered """
+	def __init__(self, mbeanName, port=None, url=None, host="localhost", timeout=60, pollInterval=0.1, maxPollInterval=2):
+		"""
+		Initialize JMXProbe object.
+		@param mbeanName object name of the MBean
+		@param port JMX port, used to build the JMX service URL if url is None
+		@param url JMX service URL
+		@param host host name or address, used to build the JMX service URL if url is None
+		"""
+		if url is None:
+			url = "service:jmx:rmi:///jndi/rmi://%s:%d/jmxrmi" % (host, port)
+		ReadinessProbe.__init__(self, "MBean %s is registered at %s" % (mbeanName, url), timeout, pollInterval, maxPollInterval)
+		self.mbeanName = mbeanName
+		self.url = url
+
+	def isReady(self):
+		try:
+			connector = _JMXConnectorFactory.connect(_JMXServiceURL(self.url))
+		except:
+			return False
+		try:
+			try:
+				return connector.getMBeanServerConnection().isRegistered(_ObjectName(self.mbeanName))
+			except:
+				return False
+		finally:
+			connector.close()
+
+class LogProbe(ReadinessProbe):
+	""" Readiness probe waiting until a line of a log file matches a regular expression """
+	def __init__(self, fileName, pattern, timeout=60, pollInterval=0.1, maxPollInterval=2):
+		"""
+		Initialize LogProbe object.
+		@param fileName name of the log file, only the lines written after the probe creation are considered if the file already exists
+		@param pattern regular expression to search in the lines of the log file
+		"""
+		ReadinessProbe.__init__(self, "a line of %s matches %s" % (fileName, repr(pattern)), timeout, pollInterval, maxPollInterval)
+		self.fileName = fileName
+		self.pattern = _re.compile(pattern)
+		self.offset = 0
+		self.remainder = ""
+		if _os.path.exists(fileName):
+			self.offset = _os.path.getsize(fileName)
+
+	def isReady(self):
+		if not _os.path.exists(self.fileName):
+			return False
+		if _os.path.getsize(self.fileName) < self.offset:
+			# file has been truncated or rotated, read it again from the beginning
+			self.offset = 0
+			self.remainder = ""
+		logFile = open(self.fileName, "r")
+		try:
+			logFile.seek(self.offset)
+			data = logFile.read()
+			self.offset = logFile.tell()
+		finally:
+			logFile.close()
+		lines = (self.remainder + data).split("\n")
+		# last element is an incomplete line, keep it for the next check
+		self.remainder = lines.pop()
+		for line in lines:
+			if self.pattern.search(line):
+				return True
+		return False
+
+class FileProbe(ReadinessProbe):
+	""" Readiness probe waiting until a file exists """
+	def __init__(self, fileName, timeout=60, pollInterval=0.1, maxPollInterval=2):
+		"""
+		Initialize FileProbe object.
+		@param fileName name of the file
+		"""
+		ReadinessProbe.__init__(self, "file %s exists" % fileName, timeout, pollInterval, maxPollInterval)
+		self.fileName = fileName
+
+	def isReady(self):
+		return _os.path.exists(self.fileName)
+
 class Command(ControlAction):
    """ Control script action for executing a command. """
    def __init__(self, description, startCommand, stopCommand):
@@ -815,8 +1176,9 @@ class RebootRlogin(ControlAction):
 		print "Rebooting %s..." % self.host
 		if self.rlogin.connect() and self.rlogin.reboot():
 			print
-			print "Waiting %g seconds while %s is rebooting..." % (self.waitingTime, self.host)
-			_time.sleep(self.waitingTime)
+			if not self.readinessProbes:
+				print "Waiting %g seconds while %s is rebooting..." % (self.waitingTime, self.host)
+				_time.sleep(self.waitingTime)
 			print
 		else:
 			_sys.exit(1)
@@ -865,6 +1227,26 @@ class Sleep(ControlAction):
 		self.execute()
 
 
+class WaitFor(ControlAction):
+	""" Control script action to wait on start until readiness probes are satisfied, instead of sleeping a fixed time """
+	def __init__(self, probes, active=True):
+		"""
+		Initialize WaitFor object.
+		@param probes ReadinessProbe object or list of ReadinessProbe objects
+		"""
+		if isinstance(probes, ReadinessProbe):
+			probes = [probes]
+		ControlAction.__init__(self, "Wait for " + ", ".join([probe.description for probe in probes]), active)
+		self.callerScript = traceback.format_stack()[0].split("\"")[1]
+		self.waitUntil(*probes)
+
+	def start(self):
+		pass
+
+	def stop(self):
+		pass
+
+
 class OnStart(ControlAction):
 	""" Control script action to execute an action only on start """
 	def __init__(self, controlAction, active=True):
@@ -889,6 +1271,10 @@ class OnStart(ControlAction):
 	def start(self):
 		self.controlAction.start()
 
+	def waitUntilReady(self):
+		ControlAction.waitUntilReady(self)
+		self.controlAction.waitUntilReady()
+
 	def stop(self):
 		pass
 